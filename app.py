@@ -1,5 +1,6 @@
 import os
 import logging
+import importlib.util
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -7,114 +8,170 @@ load_dotenv()
 
 from flask import Flask
 from werkzeug.middleware.proxy_fix import ProxyFix
-from extensions import db, login_manager
-from authlib.integrations.flask_client import OAuth
-from flask_login import LoginManager
-from apscheduler.schedulers.background import BackgroundScheduler
-from datetime import datetime, timezone, timedelta
-
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+from extensions import db, login_manager, oauth
+from datetime import timezone, timedelta
 
 # Configure timezone to Eastern Time
 EASTERN_TIMEZONE = timezone(timedelta(hours=-4))  # EDT (UTC-4)
 # For EST (UTC-5), use: timezone(timedelta(hours=-5))
 
-# create the app
-app = Flask(__name__)
-app.config['GOOGLE_CLIENT_ID'] = os.environ.get('GOOGLE_CLIENT_ID', 'YOUR_GOOGLE_CLIENT_ID')
-app.config['GOOGLE_CLIENT_SECRET'] = os.environ.get('GOOGLE_CLIENT_SECRET', 'YOUR_GOOGLE_CLIENT_SECRET')
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production-12345')
-
-# Configure URL scheme based on environment
-# For local development, use HTTP; for production, use HTTPS
-if os.environ.get('FLASK_ENV') == 'development' or os.environ.get('FLASK_DEBUG') == '1':
-    app.config['PREFERRED_URL_SCHEME'] = 'http'
-    # Removed SERVER_NAME to avoid routing issues in development
-    print("✅ Running in DEVELOPMENT mode - SERVER_NAME not set")
-else:
-    app.config['PREFERRED_URL_SCHEME'] = 'https'
-    # Set production domain if provided
-    production_domain = os.environ.get('YOUR_DOMAIN', '').replace('https://', '').replace('http://', '')
-    if production_domain:
-        app.config['SERVER_NAME'] = production_domain
-        print(f"⚠️  Running in PRODUCTION mode - SERVER_NAME set to: {production_domain}")
-
-# Debug: Print loaded credentials (remove in production)
-print(f"Loaded GOOGLE_CLIENT_ID: {app.config['GOOGLE_CLIENT_ID']}")
-print(f"Loaded GOOGLE_CLIENT_SECRET: {app.config['GOOGLE_CLIENT_SECRET'][:10]}..." if app.config['GOOGLE_CLIENT_SECRET'] != 'YOUR_GOOGLE_CLIENT_SECRET' else "Using placeholder secret")
-
-# OAuth setup
-oauth = OAuth(app)
-google = oauth.register(
-    name='google',
-    client_id=app.config['GOOGLE_CLIENT_ID'],
-    client_secret=app.config['GOOGLE_CLIENT_SECRET'],
-    server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
-    client_kwargs={'scope': 'openid email profile'},
-)
-
-app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1, x_for=1)  # needed for url_for to generate with https
-
-# configure the database
-app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///droply.db")
-app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-    "pool_recycle": 300,
-    "pool_pre_ping": True,
-}
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# initialize the app with the extension
-db.init_app(app)
-
-# Setup Flask-Login
-login_manager.init_app(app)
-login_manager.login_view = 'login'
-login_manager.login_message = 'Please log in to access this page.'
+# Blueprints in views/, registered in this order
+BLUEPRINTS = ['main', 'auth', 'profiles', 'availability', 'bookings', 'payments', 'meetings', 'debug']
+
+
+def configure_app(app, config=None):
+    config = config or {}
+    app.config['GOOGLE_CLIENT_ID'] = os.environ.get('GOOGLE_CLIENT_ID', 'YOUR_GOOGLE_CLIENT_ID')
+    app.config['GOOGLE_CLIENT_SECRET'] = os.environ.get('GOOGLE_CLIENT_SECRET', 'YOUR_GOOGLE_CLIENT_SECRET')
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production-12345')
+    app.config['STRIPE_SECRET_KEY'] = os.environ.get('STRIPE_SECRET_KEY')
+
+    # Configure URL scheme based on environment
+    # For local development, use HTTP; for production, use HTTPS
+    if os.environ.get('FLASK_ENV') == 'development' or os.environ.get('FLASK_DEBUG') == '1':
+        app.config['PREFERRED_URL_SCHEME'] = 'http'
+        # Removed SERVER_NAME to avoid routing issues in development
+        print("✅ Running in DEVELOPMENT mode - SERVER_NAME not set")
+    else:
+        app.config['PREFERRED_URL_SCHEME'] = 'https'
+        # Set production domain if provided
+        production_domain = os.environ.get('YOUR_DOMAIN', '').replace('https://', '').replace('http://', '')
+        if production_domain:
+            app.config['SERVER_NAME'] = production_domain
+            print(f"⚠️  Running in PRODUCTION mode - SERVER_NAME set to: {production_domain}")
+
+    # configure the database
+    app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///droply.db")
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        "pool_recycle": 300,
+        "pool_pre_ping": True,
+    }
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    # Startup work that tests and short-lived CLI commands can switch off:
+    # building the search indexes up front (otherwise built on first use)
+    # and the optional AI agents integration
+    app.config['WARM_SEARCH_INDEXES'] = not config.get('TESTING', False)
+    app.config['ENABLE_AGENTS'] = os.environ.get('ENABLE_AGENTS', '1') == '1'
+
+    app.config.update(config)
+
+
+def init_extensions(app):
+    import stripe
+    stripe.api_key = app.config['STRIPE_SECRET_KEY']
+    # e.g. the local stub in benchmarks/stripe_stub.py
+    if os.environ.get('STRIPE_API_BASE'):
+        stripe.api_base = os.environ['STRIPE_API_BASE']
+
+    db.init_app(app)
+
+    # Setup Flask-Login
+    login_manager.init_app(app)
+    login_manager.login_view = 'auth.login'
+    login_manager.login_message = 'Please log in to access this page.'
+
+    # OAuth setup; the Google metadata document is fetched on first use
+    oauth.init_app(app)
+    oauth.register(
+        name='google',
+        client_id=app.config['GOOGLE_CLIENT_ID'],
+        client_secret=app.config['GOOGLE_CLIENT_SECRET'],
+        server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
+        client_kwargs={'scope': 'openid email profile'},
+    )
+
 
 @login_manager.user_loader
 def load_user(user_id):
     # Import here to avoid circular import
-    from models import User
-    return User.query.get(int(user_id))
+    from user_cache import load_session_user
+    # Lightweight projection, served from a short-TTL cache when possible
+    return load_session_user(int(user_id))
+
 
-def update_past_bookings():
+def init_database(app):
     with app.app_context():
-        from models import Booking
-        from app import db
-        now = datetime.now(EASTERN_TIMEZONE)  # Use Eastern Time instead of UTC
-        bookings = Booking.query.filter(
-            Booking.status == 'confirmed',
-            Booking.end_time < now
-        ).all()
-        updated = 0
-        for booking in bookings:
-            booking.status = 'completed'
-            updated += 1
-        if updated > 0:
-            db.session.commit()
-            print(f"[APScheduler] Updated {updated} bookings to completed.")
-
-scheduler = BackgroundScheduler()
-scheduler.add_job(update_past_bookings, 'interval', minutes=5)
-scheduler.start()
-
-with app.app_context():
-    # Make sure to import the models here or their tables won't be created
-    from models import User, AvailabilityRule, AvailabilityException, Booking, Category
-    db.create_all()
-
-# Import routes after app initialization
-from routes import *  # noqa: F401,F403
-
-# Initialize agentic system
-try:
-    from agents.flask_integration import init_agents
-    init_agents(app)
-    print("✅ ProcuraAI agentic system initialized successfully")
-except Exception as e:
-    print(f"⚠️  Warning: Could not initialize agentic system: {e}")
-    print("   The system will run without AI agents")
+        # Make sure to import the models here or their tables won't be created
+        from models import User, AvailabilityRule, AvailabilityException, Booking, Category  # noqa: F401
+        db.create_all()
+
+    # Apply schema migrations (new columns/indexes on existing databases)
+    from migrations import init_migrations
+    init_migrations(app)
+
+    # Backfill the precomputed browse category before anything reads User
+    from categories import init_categories
+    init_categories(app)
+
+    # Ledger entries for paid bookings and payouts from before the ledger
+    from earnings_ledger import init_earnings_ledger
+    init_earnings_ledger(app)
+
+    # Daily payout roll-ups behind the earnings page and chart
+    from earnings_stats import init_earnings_stats
+    init_earnings_stats(app)
+
+    # Create/verify the full-text search index for discover and homepage
+    from fulltext import init_fulltext
+    init_fulltext(app)
+
+
+def init_subsystems(app):
+    # Persisted embedding index and the autocomplete index; both build
+    # themselves on first use when not warmed here
+    from semantic_search import init_semantic_search
+    init_semantic_search(app, warm=app.config['WARM_SEARCH_INDEXES'])
+    if app.config['WARM_SEARCH_INDEXES']:
+        from search_index import init_search_index
+        init_search_index(app)
+
+    # Periodic jobs run in one leader process (`flask scheduler`), not per worker
+    from scheduler import init_scheduler
+    init_scheduler(app)
+
+    # Stripe webhook events are stored on receipt and applied in the background
+    from stripe_events import init_stripe_events
+    init_stripe_events(app)
+
+    # Payouts on each provider's payout schedule
+    from scheduled_payouts import init_scheduled_payouts
+    init_scheduled_payouts(app)
+
+    # Optional agentic system, only when the package is installed
+    if app.config['ENABLE_AGENTS'] and importlib.util.find_spec('agents') is not None:
+        try:
+            from agents.flask_integration import init_agents
+            init_agents(app)
+            print("✅ ProcuraAI agentic system initialized successfully")
+        except Exception as e:
+            print(f"⚠️  Warning: Could not initialize agentic system: {e}")
+            print("   The system will run without AI agents")
+
+
+def register_blueprints(app):
+    for name in BLUEPRINTS:
+        module = importlib.import_module(f'views.{name}')
+        app.register_blueprint(module.bp)
+
+
+def create_app(config=None):
+    """Application factory: ``create_app({'TESTING': True, ...})`` for tests"""
+    logging.basicConfig(level=logging.DEBUG)
+
+    app = Flask(__name__)
+    configure_app(app, config)
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1, x_for=1)  # needed for url_for to generate with https
+
+    init_extensions(app)
+    init_database(app)
+    init_subsystems(app)
+    register_blueprints(app)
+    return app
+
 
 if __name__ == '__main__':
+    # The dev server has no separate scheduler process; init_scheduler starts it
+    os.environ.setdefault('SCHEDULER_EMBEDDED', '1')
+    app = create_app()
     app.run(debug=True, host='0.0.0.0', port=5001)
@@ -0,0 +1,106 @@
+"""Query plans and timings for the Booking hot paths, before and after the
+composite indexes from migration 2.
+
+Seeds an in-memory SQLite database with synthetic bookings, then runs the
+queries behind slot generation, the booking conflict check, the bookings
+page and update_past_bookings with and without the indexes.
+
+    python benchmarks/booking_query_plans.py [--bookings 200000] [--providers 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from migrations import MIGRATIONS  # noqa: E402
+from models import Booking  # noqa: E402
+
+STATUSES = ['confirmed', 'completed', 'cancelled', 'pending']
+PAYMENT_STATUSES = ['paid', 'pending', 'refunded']
+REPEAT = 20
+
+QUERIES = {
+    'slot generation': (
+        "SELECT start_time, end_time FROM booking WHERE provider_id = :provider "
+        "AND status IN ('confirmed', 'pending') AND start_time < :window_end AND end_time > :window_start"
+    ),
+    'conflict check': (
+        "SELECT id FROM booking WHERE provider_id = :provider AND status = 'confirmed' "
+        "AND start_time < :window_end AND end_time > :window_start LIMIT 1"
+    ),
+    'client bookings page': (
+        "SELECT * FROM booking WHERE user_id = :user AND payment_status = 'paid' "
+        "AND start_time >= :now ORDER BY start_time"
+    ),
+    'expert bookings page': (
+        "SELECT * FROM booking WHERE provider_id = :provider AND payment_status = 'paid' "
+        "AND start_time >= :now ORDER BY start_time"
+    ),
+    'update_past_bookings': (
+        "SELECT id FROM booking WHERE status = 'confirmed' AND end_time < :now"
+    ),
+}
+
+
+def seed(conn, bookings, providers):
+    rng = random.Random(42)
+    base = datetime(2025, 1, 1)
+    rows = []
+    for i in range(bookings):
+        start = base + timedelta(minutes=30 * rng.randrange(0, 2 * 365 * 48))
+        rows.append({
+            'user_id': rng.randrange(1, providers * 5),
+            'provider_id': rng.randrange(1, providers),
+            'start_time': start,
+            'end_time': start + timedelta(minutes=30),
+            'duration': 30,
+            'status': rng.choice(STATUSES),
+            'payment_status': rng.choice(PAYMENT_STATUSES),
+            'payment_amount': 50.0,
+        })
+    conn.execute(Booking.__table__.insert(), rows)
+
+
+def run(conn, label):
+    params = {
+        'provider': 7, 'user': 11, 'now': datetime(2026, 1, 1),
+        'window_start': datetime(2026, 1, 1), 'window_end': datetime(2026, 1, 31),
+    }
+    print(f"\n== {label} ==")
+    for name, sql in QUERIES.items():
+        plan = conn.execute(text('EXPLAIN QUERY PLAN ' + sql), params).all()
+        started = time.perf_counter()
+        for _ in range(REPEAT):
+            conn.execute(text(sql), params).all()
+        elapsed = (time.perf_counter() - started) / REPEAT * 1000
+        print(f"{name:<22} {elapsed:8.2f} ms   {' | '.join(row[-1] for row in plan)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bookings', type=int, default=200000)
+    parser.add_argument('--providers', type=int, default=2000)
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://')
+    with engine.begin() as conn:
+        Booking.__table__.create(conn)
+        for index in Booking.__table__.indexes:
+            index.drop(conn)
+        seed(conn, args.bookings, args.providers)
+        conn.execute(text('ANALYZE'))
+        run(conn, f'{args.bookings} bookings, no secondary indexes')
+
+        MIGRATIONS[2][1](conn)
+        conn.execute(text('ANALYZE'))
+        run(conn, 'after migration 2 (composite indexes)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Daily.co room creation latency when the API is healthy, flaky, slow or down.
+
+Creates --rooms rooms with DailyClient against the fake server in
+benchmarks/daily_stub.py and reports latency percentiles and how many
+calls failed over to the simple meeting room, per scenario:
+
+* healthy - normal latency
+* flaky   - 30% of requests answered with 503 (retried with jitter)
+* hanging - every request stalls past the read timeout (breaker opens)
+* down    - nothing listening on the port
+
+    python benchmarks/daily_rooms.py [--rooms 40]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DAILY_READ_TIMEOUT', '1')
+os.environ.setdefault('DAILY_DEADLINE', '3')
+
+import daily_client  # noqa: E402
+from daily_stub import start_stub  # noqa: E402
+
+SCENARIOS = {
+    'healthy': {'latency_ms': 30},
+    'flaky': {'latency_ms': 30, 'fail_rate': 0.3},
+    'hanging': {'hang': 2.0},
+    'down': None,
+}
+
+
+def run(name, options, port, rooms):
+    server = start_stub(port, **options) if options is not None else None
+    client = daily_client.DailyClient(api_key='test', base_url=f'http://127.0.0.1:{port}')
+    latencies, fallbacks = [], 0
+    for i in range(rooms):
+        started = time.perf_counter()
+        try:
+            client.create_room(f'bench-{name}-{i}')
+        except daily_client.DailyUnavailable:
+            fallbacks += 1
+        latencies.append(time.perf_counter() - started)
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+    latencies.sort()
+    print(f"{name:<8} p50 {statistics.median(latencies) * 1000:7.1f} ms   "
+          f"max {latencies[-1] * 1000:7.1f} ms   total {sum(latencies):6.2f} s   "
+          f"fallbacks {fallbacks}/{rooms}   breaker {client.breaker.state}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rooms', type=int, default=40)
+    parser.add_argument('--port', type=int, default=8098)
+    args = parser.parse_args()
+    for offset, (name, options) in enumerate(SCENARIOS.items()):
+        run(name, options, args.port + offset, args.rooms)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
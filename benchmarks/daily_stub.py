@@ -0,0 +1,125 @@
+"""Local fake of the Daily.co rooms API, with injectable latency and faults.
+
+* POST   /rooms         - create a room (400 "already exists" on a repeat name)
+* GET    /rooms         - list rooms
+* GET    /rooms/<name>  - one room
+* DELETE /rooms/<name>  - delete a room
+
+--latency adds a delay to every response, --fail-rate answers that
+fraction of requests with a 503, and --hang makes every request stall
+for --hang seconds (longer than the client's read timeout). Point the
+app at it with
+
+    python benchmarks/daily_stub.py --port 8098 &
+    DAILY_API_KEY=test DAILY_API_URL=http://127.0.0.1:8098 flask run
+
+or start it in-process with ``start_stub(port, ...)``.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+ROOMS = {}
+STATS = {'requests': 0, 'failed': 0}
+_lock = threading.Lock()
+
+
+class DailyStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    latency = 0.0
+    fail_rate = 0.0
+    hang = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        try:
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up (timeout) before we answered
+
+    def _handle(self, method):
+        with _lock:
+            STATS['requests'] += 1
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        time.sleep(self.hang or self.latency)
+        if random.random() < self.fail_rate:
+            with _lock:
+                STATS['failed'] += 1
+            return self._send(503, {'error': 'service-unavailable'})
+
+        parts = urlparse(self.path).path.strip('/').split('/')
+        if parts[0] != 'rooms':
+            return self._send(404, {'error': 'not-found'})
+        name = parts[1] if len(parts) > 1 else None
+        with _lock:
+            if method == 'POST' and name is None:
+                data = json.loads(body or b'{}')
+                name = data.get('name') or f'stub-{len(ROOMS)}'
+                if name in ROOMS:
+                    return self._send(400, {'error': 'invalid-request-error',
+                                            'info': f'a room named {name} already exists'})
+                ROOMS[name] = {'id': name, 'name': name, 'url': f'https://stub.daily.co/{name}',
+                               'privacy': data.get('privacy', 'public'),
+                               'created_at': time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime()),
+                               'config': data.get('properties', {})}
+                return self._send(200, ROOMS[name])
+            if method == 'GET' and name is None:
+                return self._send(200, {'total_count': len(ROOMS), 'data': list(ROOMS.values())})
+            if name not in ROOMS:
+                return self._send(404, {'error': 'not-found', 'info': f'room {name} was not found'})
+            if method == 'GET':
+                return self._send(200, ROOMS[name])
+            if method == 'DELETE':
+                del ROOMS[name]
+                return self._send(200, {'deleted': True, 'name': name})
+        self._send(405, {'error': 'method-not-allowed'})
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+
+def start_stub(port=8098, latency_ms=30, fail_rate=0.0, hang=0.0):
+    """Serve the fake on a daemon thread; returns the server"""
+    handler = type('Handler', (DailyStubHandler,), {
+        'latency': latency_ms / 1000, 'fail_rate': fail_rate, 'hang': hang,
+    })
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8098)
+    parser.add_argument('--latency', type=float, default=30, help='Milliseconds added to every response')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--hang', type=float, default=0.0, help='Seconds every request stalls for')
+    args = parser.parse_args()
+    start_stub(args.port, args.latency, args.fail_rate, args.hang)
+    print(f"Daily.co stub on http://127.0.0.1:{args.port} "
+          f"(latency {args.latency:.0f}ms, fail rate {args.fail_rate:.0%}, hang {args.hang}s)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Free/busy cache: slot generation cost with cold, warm and batched lookups.
+
+Runs against the local Google stub (benchmarks/google_stub.py) with a
+throwaway SQLite database of --providers connected calendars, and
+reports wall time and how many HTTP calls reached "Google" for:
+
+* cold    - ProviderSchedule.load per provider, empty cache
+* warm    - the same again, served from the cache
+* batched - one busy_intervals() call for every provider, empty cache
+
+    python benchmarks/freebusy_cache.py [--providers 100] [--latency 80]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, time as time_of_day
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PORT = 8099
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--providers', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=80, help='Stub round trip in milliseconds')
+    parser.add_argument('--days', type=int, default=14, help='Days of slots per provider')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='freebusy-bench-')
+    os.environ.update(
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        GOOGLE_API_ROOT=f'http://127.0.0.1:{PORT}/',
+        GOOGLE_TOKEN_URI=f'http://127.0.0.1:{PORT}/token',
+    )
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from google_stub import STATS, start_stub
+    start_stub(PORT, args.latency)
+
+    from app import create_app
+    from extensions import db
+    from freebusy import busy_intervals, freebusy_cache
+    from models import AvailabilityRule, User
+    from slot_engine import ProviderSchedule
+
+    app = create_app({'TESTING': True, 'ENABLE_AGENTS': False})
+    with app.test_request_context():
+        providers = [
+            User(username=f'provider{i}', email=f'provider{i}@example.com', timezone='America/New_York',
+                 google_calendar_connected=True, google_calendar_id=f'provider{i}@example.com',
+                 google_calendar_token='stale', google_calendar_refresh_token=f'refresh-{i}')
+            for i in range(args.providers)
+        ]
+        db.session.add_all(providers)
+        db.session.flush()
+        db.session.add_all([
+            AvailabilityRule(user_id=provider.id, weekday=weekday, start=time_of_day(9), end=time_of_day(17))
+            for provider in providers for weekday in range(5)
+        ])
+        db.session.commit()
+
+        # Token refreshes are per process, not per lookup; get them out of the way
+        busy_intervals(providers, date.today(), 1)
+
+        def run(name, fn):
+            freebusy_cache_size = len(freebusy_cache._entries)
+            before = dict(STATS)
+            started = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - started
+            calls = STATS['requests'] - before['requests']
+            print(f"{name:<8} {elapsed * 1000:9.1f} ms   {calls:4d} HTTP calls   "
+                  f"({freebusy_cache_size} cached entries before)")
+
+        def load_each():
+            for provider in providers:
+                ProviderSchedule.load(provider, date.today(), args.days).slots_for_range(date.today(), args.days)
+
+        print(f"{args.providers} providers, {args.days} days, {args.latency:.0f}ms stub latency")
+        freebusy_cache.clear()
+        run('cold', load_each)
+        run('warm', load_each)
+        freebusy_cache.clear()
+        run('batched', lambda: busy_intervals(providers, date.today(), args.days))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""Local stand-in for the Google OAuth token and Calendar APIs.
+
+Serves just enough for google_calendar.py, calendar_sync.py and
+freebusy.py to run without network access or real accounts:
+
+* POST /token                             - always issues a 1h access token
+* GET  /calendar/v3/calendars/<id>        - calendar metadata
+* GET  /calendar/v3/calendars/<id>/events - events a page (maxResults) at a time; a
+                                            syncToken gets the changes queued in CHANGES,
+                                            or 410 Gone if it is in EXPIRED_TOKENS
+* POST /calendar/v3/freeBusy              - busy 16:00-17:00 every day (timeMin's offset)
+* POST /batch/calendar/v3                 - multipart batches of the above
+
+Every response is delayed by --latency milliseconds to mimic the real
+round trip. Point the app at it with
+
+    python benchmarks/google_stub.py --port 8099 &
+    GOOGLE_API_ROOT=http://127.0.0.1:8099/ GOOGLE_TOKEN_URI=http://127.0.0.1:8099/token flask run
+
+or start it in-process with ``start_stub(port, latency)``.
+"""
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+# Counters a benchmark can read to see how many calls reached "Google"
+STATS = {'requests': 0, 'batches': 0, 'freebusy': 0, 'token': 0}
+SYNC_TOKEN = 'stub-sync-token'
+# calendar id -> events the next incremental (syncToken) list returns
+CHANGES = {}
+# Sync tokens answered with 410 Gone, as Google does once it expires one
+EXPIRED_TOKENS = set()
+_stats_lock = threading.Lock()
+
+
+def _count(name):
+    with _stats_lock:
+        STATS[name] += 1
+
+
+def freebusy_response(body):
+    start = datetime.fromisoformat(body['timeMin'].replace('Z', '+00:00'))
+    end = datetime.fromisoformat(body['timeMax'].replace('Z', '+00:00'))
+    busy = []
+    day = start.replace(hour=16, minute=0, second=0, microsecond=0)
+    while day < end:
+        busy.append({'start': day.isoformat(), 'end': (day + timedelta(hours=1)).isoformat()})
+        day += timedelta(days=1)
+    return {
+        'kind': 'calendar#freeBusy',
+        'timeMin': body['timeMin'],
+        'timeMax': body['timeMax'],
+        'calendars': {item['id']: {'busy': busy} for item in body.get('items', [])},
+    }
+
+
+def events_response(calendar_id, query):
+    """(status, payload) for one page of an events list"""
+    if 'syncToken' in query:
+        if query['syncToken'] in EXPIRED_TOKENS:
+            return 410, {'error': {'code': 410, 'message': 'Sync token is no longer valid, a full sync is required.'}}
+        return 200, {'items': CHANGES.pop(calendar_id, []), 'nextSyncToken': SYNC_TOKEN}
+    start = datetime.utcnow().replace(hour=15, minute=0, second=0, microsecond=0)
+    items = [
+        {
+            'id': f'{calendar_id}-{i}',
+            'status': 'confirmed',
+            'summary': 'Busy',
+            'start': {'dateTime': (start + timedelta(days=i)).isoformat() + 'Z'},
+            'end': {'dateTime': (start + timedelta(days=i, hours=1)).isoformat() + 'Z'},
+        }
+        for i in range(30)
+    ]
+    offset = int(query.get('pageToken', 0))
+    size = int(query.get('maxResults', 250))
+    page = {'items': items[offset:offset + size]}
+    if offset + size < len(items):
+        page['nextPageToken'] = str(offset + size)
+    else:
+        page['nextSyncToken'] = SYNC_TOKEN
+    return 200, page
+
+
+def handle(method, path, query, body):
+    """(status, payload) for one API call"""
+    parts = [unquote(part) for part in path.strip('/').split('/')]
+    if method == 'POST' and parts == ['calendar', 'v3', 'freeBusy']:
+        _count('freebusy')
+        return 200, freebusy_response(json.loads(body or b'{}'))
+    if method == 'GET' and parts[:3] == ['calendar', 'v3', 'calendars'] and len(parts) == 4:
+        return 200, {'id': parts[3], 'summary': f'Stub calendar {parts[3]}'}
+    if method == 'GET' and parts[:3] == ['calendar', 'v3', 'calendars'] and parts[4:] == ['events']:
+        return events_response(parts[3], query)
+    if method == 'GET' and parts == ['calendar', 'v3', 'users', 'me', 'calendarList']:
+        return 200, {'items': [{'id': 'primary', 'primary': True, 'summary': 'Stub'}]}
+    return 404, {'error': {'code': 404, 'message': f'No stub for {method} {path}'}}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+    def _send(self, status, payload, content_type='application/json'):
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _dispatch(self, method):
+        _count('requests')
+        time.sleep(self.latency)
+        url = urlparse(self.path)
+        body = self._body() if method == 'POST' else b''
+        if url.path == '/token':
+            _count('token')
+            return self._send(200, {'access_token': f'stub-{time.time()}', 'expires_in': 3600, 'token_type': 'Bearer'})
+        if url.path.startswith('/batch/'):
+            return self._batch(body)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        self._send(*handle(method, url.path, query, body))
+
+    def _batch(self, body):
+        _count('batches')
+        boundary = 'stub_batch_boundary'
+        message = BytesParser().parsebytes(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body
+        )
+        chunks = []
+        for part in message.get_payload():
+            content_id = part['Content-ID'].strip('<>')
+            request = part.get_payload(decode=True).replace(b'\r\n', b'\n')
+            head, _, inner_body = request.partition(b'\n\n')
+            method, target, _ = head.split(b'\n', 1)[0].decode().split(' ', 2)
+            url = urlparse(target)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            status, payload = handle(method, url.path, query, inner_body)
+            data = json.dumps(payload)
+            chunks.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} OK\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n\r\n{data}\r\n"
+            )
+        payload = (''.join(chunks) + f"--{boundary}--\r\n").encode()
+        self._send(200, payload, f'multipart/mixed; boundary={boundary}')
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+
+def start_stub(port=8099, latency_ms=50):
+    """Serve the stub on a daemon thread; returns the server"""
+    handler = type('Handler', (StubHandler,), {'latency': latency_ms / 1000})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--latency', type=float, default=50, help='Milliseconds added to every response')
+    args = parser.parse_args()
+    start_stub(args.port, args.latency)
+    print(f"Google stub on http://127.0.0.1:{args.port}/ (latency {args.latency:.0f}ms)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Requests-per-second comparison between the Flask dev server and gunicorn.
+
+Starts each server configuration on a local port against the configured
+database, drives it with concurrent keep-alive clients for a fixed time
+and prints throughput and latency percentiles.
+
+    python benchmarks/load_test.py --duration 20 --concurrency 32 \
+        --path / --path /discover --path "/api/search-suggestions?q=de"
+"""
+import argparse
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FLASK_COMMAND = ['python', '-m', 'flask', 'run', '--host=127.0.0.1', '--port={port}']
+GUNICORN_COMMAND = ['gunicorn', '-c', 'gunicorn.conf.py', '--bind=127.0.0.1:{port}', 'wsgi:app']
+# The gunicorn-* names select GUNICORN_WORKER_CLASS
+SERVERS = {
+    'flask-dev': FLASK_COMMAND,
+    'gunicorn-sync': GUNICORN_COMMAND,
+    'gunicorn-gthread': GUNICORN_COMMAND,
+    'gunicorn-gevent': GUNICORN_COMMAND,
+}
+
+
+def wait_until_up(port, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/')
+            conn.getresponse().read()
+            return True
+        except OSError:
+            time.sleep(0.5)
+    return False
+
+
+def client(port, paths, stop_at, latencies, errors):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    i = 0
+    while time.monotonic() < stop_at:
+        path = paths[i % len(paths)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors.append(response.status)
+            latencies.append(time.perf_counter() - started)
+        except (OSError, http.client.HTTPException):
+            # Usually a keep-alive connection closed by a recycled worker
+            errors.append('reconnect')
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+
+
+def run_load(port, paths, concurrency, duration):
+    latencies, errors = [], []
+    stop_at = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=client, args=(port, paths, stop_at, latencies, errors))
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+
+def benchmark(name, args):
+    env = dict(os.environ, FLASK_APP='app.py', FLASK_DEBUG='0')
+    if name.startswith('gunicorn-'):
+        env['GUNICORN_WORKER_CLASS'] = name.split('-', 1)[1]
+        env.setdefault('WEB_CONCURRENCY', str(args.workers))
+    command = [part.format(port=args.port) for part in SERVERS[name]]
+    server = subprocess.Popen(command, cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_until_up(args.port):
+            print(f"{name:<18} did not start")
+            return
+        run_load(args.port, args.path, args.concurrency, min(3, args.duration))  # warm-up
+        latencies, errors = run_load(args.port, args.path, args.concurrency, args.duration)
+    finally:
+        server.terminate()
+        server.wait()
+
+    if not latencies:
+        print(f"{name:<18} no successful requests ({len(errors)} errors)")
+        return
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    reconnects = errors.count('reconnect')
+    print(f"{name:<18} {len(latencies) / args.duration:8.1f} req/s   "
+          f"p50 {statistics.median(latencies) * 1000:7.1f} ms   "
+          f"p95 {p95 * 1000:7.1f} ms   5xx {len(errors) - reconnects}   reconnects {reconnects}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--server', action='append', choices=sorted(SERVERS),
+                        help='Server configuration(s) to test (default: flask-dev, gunicorn-sync, gunicorn-gthread)')
+    parser.add_argument('--path', action='append', help='Path(s) to request in rotation (default: /)')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=int, default=15, help='Seconds of measured load per server')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn workers')
+    parser.add_argument('--port', type=int, default=5055)
+    args = parser.parse_args()
+    args.path = args.path or ['/']
+    servers = args.server or ['flask-dev', 'gunicorn-sync', 'gunicorn-gthread']
+
+    print(f"{args.concurrency} clients, {args.duration}s per server, paths: {', '.join(args.path)}")
+    for name in servers:
+        benchmark(name, args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Application startup time: module import and create_app(), in fresh processes.
+
+Each scenario runs in a new interpreter so import caches don't carry over.
+"worker boot" uses a throwaway SQLite database seeded with --users
+profiles, so the startup index builds have realistic work to do.
+
+    python benchmarks/startup_time.py [--runs 5] [--users 2000]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+application = app.create_app(json.loads(sys.argv[1]) or None)
+created = time.perf_counter()
+print(json.dumps({"import": imported - started, "create_app": created - imported,
+                  "routes": len(list(application.url_map.iter_rules()))}))
+'''
+
+SCENARIOS = {
+    # What a gunicorn master (or `flask run`) does
+    'worker boot': {},
+    # What a test does: in-memory database, no index warm-up, no agents
+    'test setup': {'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'ENABLE_AGENTS': False},
+}
+
+
+SEED = '''
+import sys
+from app import create_app
+from extensions import db
+from models import User
+app = create_app({'TESTING': True, 'ENABLE_AGENTS': False})
+with app.app_context():
+    db.session.add_all([
+        User(username=f'user{i}', email=f'user{i}@example.com', full_name=f'Expert {i}',
+             profession=['Software Engineer', 'Nurse', 'Designer', 'Accountant'][i % 4],
+             skills='python, design, taxes', bio='Happy to help with your questions. ' * 5,
+             is_available=True, hourly_rate=i % 200)
+        for i in range(int(sys.argv[1]))
+    ])
+    db.session.commit()
+'''
+
+
+def measure(config, env):
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE, json.dumps(config)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--users', type=int, default=2000, help='Profiles to seed for the worker boot scenario')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='startup-bench-')
+    env = dict(os.environ,
+               DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+               SEMANTIC_INDEX_PATH=os.path.join(workdir, 'semantic_index.json'))
+    subprocess.run([sys.executable, '-c', SEED, str(args.users)], cwd=ROOT, env=env,
+                   capture_output=True, check=True)
+
+    for name, config in SCENARIOS.items():
+        samples = [measure(config, env) for _ in range(args.runs)]
+        imports = [sample['import'] * 1000 for sample in samples]
+        creates = [sample['create_app'] * 1000 for sample in samples]
+        totals = [i + c for i, c in zip(imports, creates)]
+        print(f"{name:<12} import {statistics.median(imports):7.1f} ms   "
+              f"create_app {statistics.median(creates):7.1f} ms   "
+              f"total {statistics.median(totals):7.1f} ms (min {min(totals):.1f})   "
+              f"{samples[0]['routes']} routes")
+
+
+if __name__ == '__main__':
+    main()
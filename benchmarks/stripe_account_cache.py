@@ -0,0 +1,93 @@
+"""Payment pages with the cached Stripe Connect account state.
+
+Runs against the local Stripe stub (benchmarks/stripe_stub.py) with a
+throwaway SQLite database of --providers connected providers, and
+reports wall time and how many calls reached "Stripe" for:
+
+* reconcile - the first reconcile_stripe_accounts run (fills the cache)
+* pages     - /payment/dashboard and /expert/payout-details per provider
+* webhook   - an account.updated event disabling payouts for one provider
+
+    python benchmarks/stripe_account_cache.py [--providers 50] [--latency 150]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PORT = 8097
+WEBHOOK_SECRET = 'whsec_bench'
+
+
+def report(name, started, stats, before):
+    calls = {key: stats[key] - before[key] for key in stats}
+    print(f"{name:<10} {time.perf_counter() - started:7.2f} s   "
+          f"stripe calls {calls['requests']:>4} (accounts {calls['accounts']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--providers', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=150, help='Stub round trip in milliseconds')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='stripe-accounts-bench-')
+    os.environ.update(
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        STRIPE_API_BASE=f'http://127.0.0.1:{PORT}',
+        STRIPE_SECRET_KEY='sk_test_stub',
+        STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET,
+    )
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from stripe_stub import STATS, signed_event, start_stub
+    start_stub(PORT, args.latency)
+
+    from app import create_app
+    from extensions import db
+    from models import User
+    from stripe_accounts import reconcile_accounts
+
+    app = create_app({'TESTING': True})
+    with app.app_context():
+        users = [User(username=f'bench{i}', email=f'bench{i}@example.com',
+                      stripe_account_id=f'acct_bench{i:08d}') for i in range(args.providers)]
+        db.session.add_all(users)
+        db.session.commit()
+        user_ids = [user.id for user in users]
+
+    with app.app_context():
+        before, started = dict(STATS), time.perf_counter()
+        reconcile_accounts()
+        report('reconcile', started, STATS, before)
+
+    client = app.test_client()
+    before, started = dict(STATS), time.perf_counter()
+    for user_id in user_ids:
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+            session['_fresh'] = True
+        client.get('/payment/dashboard')
+        client.get('/expert/payout-details')
+    report('pages', started, STATS, before)
+
+    body, headers = signed_event('evt_bench_1', 'account.updated', {
+        'id': 'acct_bench00000000', 'object': 'account', 'charges_enabled': True,
+        'payouts_enabled': False, 'details_submitted': True,
+    }, WEBHOOK_SECRET, account='acct_bench00000000')
+    before, started = dict(STATS), time.perf_counter()
+    client.post('/stripe/webhook', data=body, headers=headers)
+    with app.app_context():
+        deadline = time.monotonic() + 5
+        while db.session.get(User, user_ids[0]).payout_enabled and time.monotonic() < deadline:
+            db.session.rollback()
+            time.sleep(0.05)
+        user = db.session.get(User, user_ids[0])
+        report('webhook', started, STATS, before)
+        print(f"           provider 0 now {user.stripe_account_status}, payouts enabled: {user.payout_enabled}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""Local stand-in for the parts of the Stripe API the app calls.
+
+Serves just enough for stripe_accounts.py and the payout code to run
+without network access or real keys:
+
+* GET  /v1/accounts/<id>              - a Connect account (active, with a bank account)
+* POST /v1/accounts/<id>/login_links  - an Express dashboard link
+* POST /v1/payouts                    - a payout on the Stripe-Account given, honouring
+                                        Idempotency-Key like Stripe does (a reused key with
+                                        different parameters is an idempotency_error); refused
+                                        for accounts in ACCOUNTS with payouts_enabled False
+
+Accounts not in ACCOUNTS are made up on first read; tests can put their
+own in first. Every response is delayed by --latency milliseconds, and
+the next FAIL_NEXT['count'] requests answer 500 as if Stripe were down.
+``signed_event(...)`` builds a webhook body and Stripe-Signature header
+for posting to /stripe/webhook. Point the app at it with
+
+    python benchmarks/stripe_stub.py --port 8097 &
+    STRIPE_API_BASE=http://127.0.0.1:8097 STRIPE_SECRET_KEY=sk_test_stub flask run
+
+or start it in-process with ``start_stub(port, latency)``.
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ACCOUNTS = {}
+PAYOUTS = {}  # idempotency key -> (request parameters, payout)
+STATS = {'requests': 0, 'accounts': 0, 'login_links': 0, 'payouts': 0}
+FAIL_NEXT = {'count': 0}
+_lock = threading.Lock()
+
+
+def make_account(account_id, **overrides):
+    account = {
+        'id': account_id,
+        'object': 'account',
+        'type': 'express',
+        'charges_enabled': True,
+        'payouts_enabled': True,
+        'details_submitted': True,
+        'requirements': {'disabled_reason': None},
+        'external_accounts': {
+            'object': 'list',
+            'data': [{
+                'id': f'ba_{account_id[-8:]}',
+                'object': 'bank_account',
+                'account': account_id,
+                'bank_name': 'STRIPE TEST BANK',
+                'last4': '6789',
+                'default_for_currency': True,
+            }],
+        },
+    }
+    account.update(overrides)
+    return account
+
+
+def signed_event(event_id, event_type, obj, secret, account=None, created=None):
+    """(body, headers) for a webhook event signed the way Stripe signs them"""
+    event = {'id': event_id, 'object': 'event', 'type': event_type,
+             'created': created or int(time.time()), 'data': {'object': obj}}
+    if account:
+        event['account'] = account
+    body = json.dumps(event)
+    timestamp = int(time.time())
+    signature = hmac.new(secret.encode(), f'{timestamp}.{body}'.encode(), hashlib.sha256).hexdigest()
+    return body, {'Stripe-Signature': f't={timestamp},v1={signature}', 'Content-Type': 'application/json'}
+
+
+class StripeStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        try:
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up before we answered
+
+    def _count(self, name):
+        with _lock:
+            STATS['requests'] += 1
+            if name:
+                STATS[name] += 1
+
+    def _handle(self, method):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        time.sleep(self.latency)
+        params = {key: values[0] for key, values in parse_qs(body.decode()).items()}
+        parts = urlparse(self.path).path.strip('/').split('/')
+        with _lock:
+            failing = FAIL_NEXT['count'] > 0
+            FAIL_NEXT['count'] -= failing
+        if failing:
+            self._count(None)
+            return self._send(500, {'error': {'type': 'api_error', 'message': 'Stub outage'}})
+
+        if method == 'GET' and parts[:2] == ['v1', 'accounts'] and len(parts) == 3:
+            self._count('accounts')
+            with _lock:
+                account = ACCOUNTS.setdefault(parts[2], make_account(parts[2]))
+            return self._send(200, account)
+        if method == 'POST' and parts[:2] == ['v1', 'accounts'] and parts[3:] == ['login_links']:
+            self._count('login_links')
+            return self._send(200, {'object': 'login_link', 'created': int(time.time()),
+                                    'url': f'https://connect.stripe.com/express/{parts[2]}/stub'})
+        if method == 'POST' and parts == ['v1', 'payouts']:
+            self._count('payouts')
+            key = self.headers.get('Idempotency-Key')
+            account_id = self.headers.get('Stripe-Account')
+            with _lock:
+                if key and key in PAYOUTS:
+                    if PAYOUTS[key][0] != params:
+                        return self._send(400, {'error': {
+                            'type': 'idempotency_error',
+                            'message': 'Keys for idempotent requests can only be used with the same parameters'}})
+                    return self._send(200, PAYOUTS[key][1])
+                if account_id in ACCOUNTS and not ACCOUNTS[account_id].get('payouts_enabled'):
+                    return self._send(400, {'error': {'type': 'invalid_request_error',
+                                                      'message': 'Payouts are not enabled for this account'}})
+                payout = {
+                    'id': f'po_stub_{len(PAYOUTS) + 1}',
+                    'object': 'payout',
+                    'amount': int(params.get('amount', 0)),
+                    'currency': params.get('currency', 'usd'),
+                    'status': 'pending',
+                    'created': int(time.time()),
+                    'metadata': {k[9:-1]: v for k, v in params.items() if k.startswith('metadata[')},
+                }
+                PAYOUTS[key or payout['id']] = (params, payout)
+            return self._send(200, payout)
+        self._count(None)
+        self._send(404, {'error': {'type': 'invalid_request_error',
+                                   'message': f'No stub for {method} {self.path}'}})
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+
+def start_stub(port=8097, latency_ms=100):
+    """Serve the stub on a daemon thread; returns the server"""
+    handler = type('Handler', (StripeStubHandler,), {'latency': latency_ms / 1000})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8097)
+    parser.add_argument('--latency', type=float, default=100, help='Milliseconds added to every response')
+    args = parser.parse_args()
+    start_stub(args.port, args.latency)
+    print(f"Stripe stub on http://127.0.0.1:{args.port} (latency {args.latency:.0f}ms)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
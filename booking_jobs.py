@@ -0,0 +1,77 @@
+"""Periodic booking maintenance jobs.
+
+update_past_bookings used to load every confirmed booking that had ended
+into the ORM and flip them one at a time, so each run cost more as the
+backlog grew. complete_past_bookings issues set-based UPDATEs instead,
+bounded to BATCH_SIZE rows each so a large backlog never holds a long
+write lock, and reports how many rows changed and how long it took.
+
+Each batch also records its paid bookings as earned in the earnings
+ledger, in the same transaction, since total_earnings only counts
+completed sessions.
+
+Booking times are stored naive in Eastern time, so "now" is computed in
+Eastern and stripped of its tzinfo before comparing.
+"""
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+
+import earnings_ledger
+from extensions import db
+from models import Booking
+from scheduler import scheduled_job
+
+EASTERN_TIMEZONE = timezone(timedelta(hours=-4))  # EDT (UTC-4)
+BATCH_SIZE = 1000
+
+CompletionResult = namedtuple('CompletionResult', ['updated', 'batches', 'seconds'])
+
+
+def eastern_now():
+    """Current Eastern time as a naive datetime, matching stored booking times"""
+    return datetime.now(EASTERN_TIMEZONE).replace(tzinfo=None)
+
+
+def complete_past_bookings(now=None, batch_size=BATCH_SIZE):
+    """Mark confirmed bookings that ended before ``now`` as completed.
+
+    Returns a CompletionResult with the number of rows updated, the number
+    of UPDATE batches issued and the elapsed wall time in seconds.
+    """
+    now = now or eastern_now()
+    started = time.perf_counter()
+    updated = 0
+    batches = 0
+    while True:
+        # The (status, end_time) index serves the id query
+        batch_ids = db.session.execute(select(Booking.id).where(
+            Booking.status == 'confirmed',
+            Booking.end_time < now
+        ).limit(batch_size)).scalars().all()
+        result = db.session.execute(
+            update(Booking).where(Booking.id.in_(batch_ids), Booking.status == 'confirmed')
+            .values(status='completed'),
+            execution_options={'synchronize_session': False}
+        )
+        for booking in db.session.execute(select(Booking).where(
+            Booking.id.in_(batch_ids), Booking.status == 'completed', Booking.payment_status == 'paid'
+        )).scalars():
+            earnings_ledger.record_earned(booking)
+        db.session.commit()
+        batches += 1
+        updated += result.rowcount
+        if len(batch_ids) < batch_size:
+            break
+    return CompletionResult(updated, batches, time.perf_counter() - started)
+
+
+@scheduled_job('complete_past_bookings', minutes=5)
+def complete_past_bookings_job():
+    result = complete_past_bookings()
+    if result.updated > 0:
+        print(f"[Scheduler] Updated {result.updated} bookings to completed "
+              f"in {result.seconds * 1000:.1f}ms ({result.batches} batches).")
+    return result.updated
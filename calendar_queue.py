@@ -0,0 +1,246 @@
+"""Background Google Calendar sync.
+
+Syncing used to run inline in ``POST /api/availability/sync-calendar``,
+so a slow Google API call held a web worker for its whole duration.
+Syncs now run on a bounded thread pool instead:
+
+* The scheduler leader runs ``sync_calendars`` every minute, syncing
+  every connected calendar whose ``next_sync_at`` is due.
+* The sync endpoint only marks the user's calendar due and hands it to a
+  small pool in the web process, returning straight away.
+
+Each user is synced at most once per CALENDAR_SYNC_MIN_INTERVAL seconds,
+and a failed sync is retried with exponential backoff plus jitter. A
+sync is claimed with a conditional UPDATE on CalendarSyncState, so the
+scheduler and web workers never sync the same calendar at once.
+
+Booking pages never call Google themselves. They read the synced
+AvailabilityException blocks plus whatever Google free/busy the
+per-process cache in freebusy.py holds; a successful sync here also
+refetches that provider's upcoming free/busy into the cache of the
+process that ran it, and pages queue a background fetch for any days
+still missing.
+"""
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+import freebusy
+from calendar_sync import sync_user_calendar
+from extensions import db
+from models import CalendarSyncState, User
+from scheduler import scheduled_job
+
+CALENDAR_SYNC_WORKERS = int(os.environ.get('CALENDAR_SYNC_WORKERS', 4))
+CALENDAR_SYNC_WEB_WORKERS = int(os.environ.get('CALENDAR_SYNC_WEB_WORKERS', 2))
+CALENDAR_SYNC_INTERVAL = timedelta(minutes=int(os.environ.get('CALENDAR_SYNC_INTERVAL_MINUTES', 15)))
+CALENDAR_SYNC_MIN_INTERVAL = timedelta(seconds=int(os.environ.get('CALENDAR_SYNC_MIN_INTERVAL', 60)))
+CALENDAR_SYNC_BATCH = 200
+BACKOFF_BASE = timedelta(minutes=1)
+BACKOFF_MAX = timedelta(hours=6)
+# A claim older than this belongs to a process that died mid-sync
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def backoff_delay(attempts):
+    """Exponential backoff with jitter for the given number of failures"""
+    delay = min(BACKOFF_BASE * (2 ** max(attempts - 1, 0)), BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def request_sync(user_id):
+    """Mark a user's calendar due now, or as soon as the rate limit allows.
+
+    Returns when the sync will run.
+    """
+    now = datetime.now()
+    state = db.session.get(CalendarSyncState, user_id)
+    if state is None:
+        state = CalendarSyncState(user_id=user_id, attempts=0)
+        db.session.add(state)
+    due = now
+    if state.last_synced_at and state.last_synced_at + CALENDAR_SYNC_MIN_INTERVAL > now:
+        due = state.last_synced_at + CALENDAR_SYNC_MIN_INTERVAL
+    if state.next_sync_at is None or state.next_sync_at > due or state.status == 'failed':
+        state.next_sync_at = due
+    if state.status != 'syncing':
+        state.status = 'queued'
+    db.session.commit()
+    return state.next_sync_at
+
+
+def claim(user_id):
+    """Atomically mark a calendar as syncing; False if someone else has it"""
+    now = datetime.now()
+    result = db.session.execute(
+        update(CalendarSyncState)
+        .where(
+            CalendarSyncState.user_id == user_id,
+            or_(
+                CalendarSyncState.status.is_(None),
+                CalendarSyncState.status != 'syncing',
+                CalendarSyncState.sync_started_at < now - CLAIM_TIMEOUT
+            )
+        )
+        .values(status='syncing', sync_started_at=now),
+        execution_options={'synchronize_session': False}
+    )
+    if result.rowcount == 0:
+        if db.session.get(CalendarSyncState, user_id) is not None:
+            db.session.rollback()
+            return False
+        db.session.add(CalendarSyncState(user_id=user_id, status='syncing', sync_started_at=now, attempts=0))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return False
+    return True
+
+
+def _finish(user_id, **values):
+    db.session.execute(
+        update(CalendarSyncState).where(CalendarSyncState.user_id == user_id).values(**values),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.commit()
+
+
+def sync_calendar(user_id):
+    """Claim and sync one user's calendar, recording the outcome.
+
+    Returns the SyncResult, or None if the calendar was skipped or failed.
+    """
+    from google.auth.exceptions import RefreshError
+
+    if not claim(user_id):
+        return None
+    user = db.session.get(User, user_id)
+    if user is None or not user.google_calendar_connected or not user.google_calendar_id:
+        _finish(user_id, status='idle', next_sync_at=None)
+        return None
+
+    try:
+        result = sync_user_calendar(user)
+    except RefreshError as e:
+        # Access was revoked: stop retrying until the user reconnects
+        db.session.rollback()
+        user = db.session.get(User, user_id)
+        user.google_calendar_connected = False
+        db.session.commit()
+        _finish(user_id, status='failed', last_error=f'Calendar access expired: {e}', next_sync_at=None)
+        print(f"[CalendarSync] Disconnected calendar for user {user_id}: {e}")
+        return None
+    except Exception as e:
+        db.session.rollback()
+        state = db.session.get(CalendarSyncState, user_id)
+        attempts = (state.attempts or 0) + 1
+        _finish(user_id, status='failed', attempts=attempts, last_error=str(e)[:1000],
+                next_sync_at=datetime.now() + backoff_delay(attempts))
+        print(f"[CalendarSync] Sync failed for user {user_id} (attempt {attempts}): {e}")
+        return None
+
+    _finish(user_id, status='ok', attempts=0, last_error=None,
+            next_sync_at=datetime.now() + CALENDAR_SYNC_INTERVAL)
+    try:
+        # Booking pages read free/busy from the cache only; fill it while we're here
+        freebusy.warm(db.session.get(User, user_id))
+    except Exception as e:
+        print(f"⚠️  Warning: Could not warm free/busy for user {user_id}: {e}")
+    return result
+
+
+def due_user_ids(limit=CALENDAR_SYNC_BATCH):
+    """Connected users whose calendar has never synced or is due"""
+    now = datetime.now()
+    query = (
+        select(User.id)
+        .outerjoin(CalendarSyncState, CalendarSyncState.user_id == User.id)
+        .where(
+            User.google_calendar_connected == True,
+            User.google_calendar_id.isnot(None),
+            or_(
+                CalendarSyncState.user_id.is_(None),
+                # Synced before background sync existed, or reconnected
+                CalendarSyncState.next_sync_at.is_(None),
+                CalendarSyncState.next_sync_at <= now
+            )
+        )
+        .order_by(CalendarSyncState.next_sync_at)
+        .limit(limit)
+    )
+    return list(db.session.execute(query).scalars())
+
+
+class SyncPool:
+    """Bounded pool of sync threads that skips users already in flight"""
+
+    def __init__(self, max_workers, name):
+        self.max_workers = max_workers
+        self.name = name
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = set()
+
+    def submit(self, app, user_id):
+        with self._lock:
+            if user_id in self._in_flight:
+                return None
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+            self._in_flight.add(user_id)
+        return self._executor.submit(self._run, app, user_id)
+
+    def _run(self, app, user_id):
+        try:
+            with app.app_context():
+                return sync_calendar(user_id)
+        except Exception as e:
+            print(f"[CalendarSync] Worker error for user {user_id}: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(user_id)
+
+
+scheduler_pool = SyncPool(CALENDAR_SYNC_WORKERS, 'calendar-sync')
+web_pool = SyncPool(CALENDAR_SYNC_WEB_WORKERS, 'calendar-sync-web')
+
+
+def enqueue_sync(user_id):
+    """Request a sync from a web request without waiting for Google"""
+    due = request_sync(user_id)
+    if due <= datetime.now():
+        web_pool.submit(current_app._get_current_object(), user_id)
+    return due
+
+
+@scheduled_job('sync_calendars', minutes=1)
+def sync_calendars():
+    """Sync every due calendar on the pool; returns how many synced"""
+    app = current_app._get_current_object()
+    futures = [f for f in (scheduler_pool.submit(app, user_id) for user_id in due_user_ids()) if f]
+    done, _ = wait(futures)
+    synced = sum(1 for future in done if future.result() is not None)
+    if futures:
+        print(f"[CalendarSync] Synced {synced}/{len(futures)} due calendars")
+    return synced
+
+
+def sync_status(user_id):
+    """The user's background sync state, for the calendar status endpoint"""
+    state = db.session.get(CalendarSyncState, user_id)
+    if state is None:
+        return {'status': 'never'}
+    return {
+        'status': state.status or 'idle',
+        'last_synced_at': state.last_synced_at.isoformat() if state.last_synced_at else None,
+        'next_sync_at': state.next_sync_at.isoformat() if state.next_sync_at else None,
+        'attempts': state.attempts or 0,
+        'last_error': state.last_error,
+    }
@@ -0,0 +1,181 @@
+"""Incremental Google Calendar sync into AvailabilityException blocks.
+
+The sync endpoint used to delete all of a user's 'Google Calendar Event'
+exceptions and re-insert 30 days of events on every run, ignoring
+pagination. Now the first sync lists the calendar once, page by page,
+and stores the ``nextSyncToken`` Google returns in CalendarSyncState;
+later syncs pass that token and receive only events created, changed or
+cancelled since, which are upserted (or deleted) by event id. Sync cost
+follows the number of changes rather than the size of the calendar.
+
+Google rejects timeMin/timeMax alongside a sync token, so the full sync
+is unbounded and events that have already ended are simply not stored.
+A token Google has expired (HTTP 410) falls back to a full sync.
+
+Exception times are stored naive in the user's own timezone, like the
+rest of the availability data (see slot_engine.py).
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from extensions import db
+from google_calendar import user_calendar
+from models import AvailabilityException, CalendarSyncState
+
+GOOGLE_EVENT_REASON = 'Google Calendar Event'
+DEFAULT_TIMEZONE = 'America/New_York'
+PAGE_SIZE = 250
+
+SyncResult = namedtuple('SyncResult', ['upserted', 'deleted', 'pages', 'full_sync'])
+
+
+def event_times(event, tz):
+    """(start, end) of an event as naive datetimes in ``tz``, or None"""
+    start, end = event.get('start', {}), event.get('end', {})
+    if 'dateTime' in start and 'dateTime' in end:
+        return (
+            datetime.fromisoformat(start['dateTime'].replace('Z', '+00:00')).astimezone(tz).replace(tzinfo=None),
+            datetime.fromisoformat(end['dateTime'].replace('Z', '+00:00')).astimezone(tz).replace(tzinfo=None),
+        )
+    if 'date' in start and 'date' in end:
+        # All-day events: the end date is exclusive
+        return (datetime.fromisoformat(start['date']), datetime.fromisoformat(end['date']))
+    return None
+
+
+def _list_pages(client, calendar_id, sync_token):
+    """Yield pages of events; the last page carries nextSyncToken"""
+    page_token = None
+    while True:
+        params = {'calendarId': calendar_id, 'singleEvents': True, 'maxResults': PAGE_SIZE}
+        if sync_token:
+            params['syncToken'] = sync_token
+        else:
+            # Full sync: cancelled events are irrelevant when starting over
+            params['showDeleted'] = False
+        if page_token:
+            params['pageToken'] = page_token
+        page = client.execute(client.service.events().list(**params))
+        yield page
+        page_token = page.get('nextPageToken')
+        if not page_token:
+            return
+
+
+def _apply_page(user_id, events, tz, now):
+    """Upsert changed events and delete cancelled ones; returns (upserted, deleted, seen ids)"""
+    seen = set()
+    changes = {}
+    for event in events:
+        seen.add(event['id'])
+        times = None if event.get('status') == 'cancelled' else event_times(event, tz)
+        # Events that ended already (or have no usable times) are removed
+        changes[event['id']] = times if times and times[1] > now else None
+
+    if not changes:
+        return 0, 0, seen
+
+    existing = {
+        exception.google_event_id: exception
+        for exception in AvailabilityException.query.filter(
+            AvailabilityException.user_id == user_id,
+            AvailabilityException.google_event_id.in_(list(changes))
+        )
+    }
+    upserted = deleted = 0
+    for event_id, times in changes.items():
+        exception = existing.get(event_id)
+        if times is None:
+            if exception is not None:
+                db.session.delete(exception)
+                deleted += 1
+            continue
+        if exception is None:
+            exception = AvailabilityException(
+                user_id=user_id,
+                google_event_id=event_id,
+                reason=GOOGLE_EVENT_REASON,
+                is_blocked=True
+            )
+            db.session.add(exception)
+        exception.start, exception.end = times
+        upserted += 1
+    return upserted, deleted, seen
+
+
+def _is_expired_token(error):
+    return getattr(getattr(error, 'resp', None), 'status', None) == 410
+
+
+def sync_user_calendar(user, full=False):
+    """Bring a user's synced calendar blocks up to date; returns a SyncResult.
+
+    Commits once at the end, so a failure part way leaves the previous
+    state and token in place and the next sync simply repeats the work.
+    """
+    from googleapiclient.errors import HttpError
+
+    # A new state row is only added when the sync completes, so nothing is
+    # written before the first API call (which may refresh the token)
+    state = db.session.get(CalendarSyncState, user.id) or CalendarSyncState(user_id=user.id)
+    sync_token = state.sync_token
+    if full or state.calendar_id != user.google_calendar_id:
+        sync_token = None
+
+    try:
+        return _sync(user, state, sync_token)
+    except HttpError as e:
+        if not sync_token or not _is_expired_token(e):
+            raise
+        db.session.rollback()
+        print(f"[CalendarSync] Sync token expired for user {user.id}; running a full sync")
+        return _sync(user, state, None)
+
+
+def _sync(user, state, sync_token):
+    client = user_calendar(user)
+    tz = ZoneInfo(user.timezone or DEFAULT_TIMEZONE)
+    now = datetime.now(tz).replace(tzinfo=None)
+    full_sync = not sync_token
+
+    upserted = deleted = pages = 0
+    seen = set()
+    next_sync_token = None
+    for page in _list_pages(client, user.google_calendar_id, sync_token):
+        pages += 1
+        page_upserted, page_deleted, page_seen = _apply_page(user.id, page.get('items', []), tz, now)
+        upserted += page_upserted
+        deleted += page_deleted
+        seen |= page_seen
+        next_sync_token = page.get('nextSyncToken', next_sync_token)
+
+    if full_sync:
+        # Anything not in a full listing is gone, including blocks created
+        # by the old delete-and-reinsert sync (no event id)
+        stale = AvailabilityException.query.filter(
+            AvailabilityException.user_id == user.id,
+            AvailabilityException.reason == GOOGLE_EVENT_REASON,
+            db.or_(
+                AvailabilityException.google_event_id.is_(None),
+                AvailabilityException.google_event_id.notin_(seen) if seen else db.true()
+            )
+        )
+        deleted += stale.delete(synchronize_session=False)
+
+    # Blocks that have since ended no longer matter to anyone
+    deleted += AvailabilityException.query.filter(
+        AvailabilityException.user_id == user.id,
+        AvailabilityException.google_event_id.isnot(None),
+        AvailabilityException.end < now - timedelta(days=1)
+    ).delete(synchronize_session=False)
+
+    synced_at = datetime.now()
+    db.session.add(state)
+    state.calendar_id = user.google_calendar_id
+    state.sync_token = next_sync_token
+    state.last_synced_at = synced_at
+    if full_sync:
+        state.last_full_sync_at = synced_at
+    db.session.commit()
+    return SyncResult(upserted, deleted, pages, full_sync)
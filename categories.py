@@ -0,0 +1,134 @@
+"""Expert category assignment for /api/browse-users.
+
+Each user's browse category is computed once when their profile is saved
+(see the User flush hooks in models.py) and stored in the indexed
+``user.category`` column, so browsing a category is a single indexed query
+instead of running the keyword rules over every available user per request.
+"""
+import click
+from sqlalchemy import update
+
+from extensions import db
+
+CATEGORY_NAMES = ['technology', 'health', 'creative', 'education', 'finance', 'marketing', 'writing', 'business']
+BACKFILL_BATCH_SIZE = 500
+
+# Search keywords for the discover/homepage category chips
+CATEGORY_SEARCH_TERMS = {
+    'technology': ['technology', 'development', 'programming', 'coding', 'software', 'web', 'app', 'tech', 'developer', 'engineer', 'computer', 'it'],
+    'business': ['business', 'consulting', 'strategy', 'management', 'entrepreneur', 'startup', 'finance', 'marketing', 'sales'],
+    'creative': ['creative', 'design', 'ui', 'ux', 'graphic', 'visual', 'art', 'branding', 'illustration', 'style', 'beauty', 'fashion', 'photography'],
+    'health': ['health', 'fitness', 'wellness', 'nutrition', 'medical', 'therapy', 'coaching', 'mental health'],
+    'education': ['education', 'teaching', 'tutoring', 'training', 'learning', 'academic', 'course', 'mentor', 'astrology', 'spiritual'],
+    'finance': ['finance', 'accounting', 'investment', 'financial', 'tax', 'budget', 'money', 'wealth'],
+    'marketing': ['marketing', 'digital marketing', 'social media', 'seo', 'advertising', 'brand', 'growth', 'content'],
+    'writing': ['writing', 'content', 'copywriting', 'blogging', 'journalism', 'editing', 'proofreading', 'author']
+}
+
+def categorize_user(user):
+    """
+    Categorize a user into a single category based on priority.
+    Returns the category name as a string.
+    """
+    profession = (user.profession or '').lower()
+    skills = (user.skills or '').lower()
+    
+    # Priority-based categorization (order matters - first match wins)
+    
+    # 1. Technology (highest priority for tech roles)
+    if any(keyword in profession for keyword in ['software', 'developer', 'engineer', 'programmer', 'coder', 'architect', 'data scientist', 'product manager', 'tech lead', 'cto', 'cio']):
+        return 'technology'
+    if any(keyword in skills for keyword in ['javascript', 'python', 'java', 'react', 'node.js', 'programming', 'coding', 'software development', 'web development', 'mobile development', 'machine learning', 'ai', 'data science']):
+        return 'technology'
+    
+    # 2. Health (high priority for health roles)
+    if any(keyword in profession for keyword in ['doctor', 'nurse', 'therapist', 'counselor', 'psychologist', 'psychiatrist', 'nutritionist', 'dietitian', 'fitness trainer', 'personal trainer', 'yoga instructor', 'massage therapist', 'chiropractor', 'dentist', 'veterinarian']):
+        return 'health'
+    if any(keyword in skills for keyword in ['fitness', 'nutrition', 'wellness', 'mental health', 'therapy', 'counseling', 'yoga', 'meditation', 'health coaching']):
+        return 'health'
+    
+    # 3. Creative (high priority for creative roles)
+    if any(keyword in profession for keyword in ['designer', 'artist', 'photographer', 'videographer', 'graphic designer', 'ui designer', 'ux designer', 'interior designer', 'fashion designer', 'illustrator', 'animator', 'video editor', 'creative director']):
+        return 'creative'
+    if any(keyword in skills for keyword in ['design', 'ui', 'ux', 'graphic design', 'photography', 'video editing', 'illustration', 'branding', 'visual design', 'creative writing', 'art', 'drawing', 'painting']):
+        return 'creative'
+    
+    # 4. Education (high priority for education roles)
+    if any(keyword in profession for keyword in ['teacher', 'professor', 'instructor', 'tutor', 'trainer', 'educator', 'academic', 'researcher', 'librarian', 'curriculum developer', 'education consultant']):
+        return 'education'
+    if any(keyword in skills for keyword in ['teaching', 'education', 'tutoring', 'training', 'mentoring', 'coaching', 'curriculum development', 'academic writing', 'research']):
+        return 'education'
+    
+    # 5. Finance (specific finance roles)
+    if any(keyword in profession for keyword in ['accountant', 'financial advisor', 'investment advisor', 'financial analyst', 'banker', 'insurance agent', 'tax preparer', 'financial planner', 'wealth manager', 'cfo', 'controller']):
+        return 'finance'
+    if any(keyword in skills for keyword in ['accounting', 'financial planning', 'investment', 'tax preparation', 'budgeting', 'financial analysis', 'wealth management', 'insurance']):
+        return 'finance'
+    
+    # 6. Marketing (specific marketing roles)
+    if any(keyword in profession for keyword in ['marketing manager', 'marketing director', 'digital marketing', 'social media manager', 'seo specialist', 'content marketer', 'brand manager', 'advertising', 'public relations', 'pr specialist']):
+        return 'marketing'
+    if any(keyword in skills for keyword in ['digital marketing', 'social media', 'seo', 'content marketing', 'brand management', 'advertising', 'public relations', 'pr', 'growth hacking', 'email marketing']):
+        return 'marketing'
+    
+    # 7. Writing (specific writing roles)
+    if any(keyword in profession for keyword in ['writer', 'author', 'journalist', 'copywriter', 'content writer', 'blogger', 'editor', 'proofreader', 'technical writer', 'grant writer', 'screenwriter']):
+        return 'writing'
+    if any(keyword in skills for keyword in ['writing', 'copywriting', 'content writing', 'blogging', 'journalism', 'editing', 'proofreading', 'technical writing', 'creative writing', 'grant writing']):
+        return 'writing'
+    
+    # 8. Business (catch-all for business-related roles)
+    if any(keyword in profession for keyword in ['manager', 'director', 'executive', 'consultant', 'advisor', 'analyst', 'coordinator', 'specialist', 'supervisor', 'lead', 'head', 'chief', 'president', 'ceo', 'coo', 'vp', 'vice president']):
+        return 'business'
+    if any(keyword in skills for keyword in ['management', 'leadership', 'strategy', 'consulting', 'project management', 'business development', 'sales', 'customer service', 'operations', 'administration']):
+        return 'business'
+    
+    # Default to business if no clear category
+    return 'business'
+
+def backfill_user_categories(recompute=False, batch_size=BACKFILL_BATCH_SIZE):
+    """Store categorize_user() for users in batches.
+
+    Only rows with no category are touched unless recompute is set, which
+    is what you want after changing the keyword rules above.
+    """
+    from models import User
+    updated = 0
+    last_id = 0
+    while True:
+        query = User.query.with_entities(
+            User.id, User.profession, User.skills
+        ).filter(User.id > last_id)
+        if not recompute:
+            query = query.filter(User.category.is_(None))
+        rows = query.order_by(User.id).limit(batch_size).all()
+        if not rows:
+            break
+
+        db.session.execute(
+            update(User),
+            [{'id': row.id, 'category': categorize_user(row)} for row in rows]
+        )
+        db.session.commit()
+        updated += len(rows)
+        last_id = rows[-1].id
+
+    if updated:
+        print(f"[Categories] Categorized {updated} users")
+    return updated
+
+
+def init_categories(app):
+    """Fill in missing categories at startup and register the CLI"""
+    with app.app_context():
+        try:
+            backfill_user_categories()
+        except Exception as e:
+            print(f"⚠️  Warning: Could not backfill user categories: {e}")
+
+    @app.cli.command('backfill-categories')
+    @click.option('--all', 'recompute', is_flag=True, help='Recompute every user, not just uncategorized ones.')
+    def backfill_categories_command(recompute):
+        """Compute and store browse categories for users."""
+        count = backfill_user_categories(recompute=recompute)
+        click.echo(f"Categorized {count} users")
@@ -0,0 +1,198 @@
+"""Daily.co REST client used for meeting rooms.
+
+create_meeting_room used to call ``requests.post``/``requests.get`` with
+no timeout and a new connection each time, inside the join request, so a
+slow or unreachable Daily.co API could hold a web worker indefinitely.
+DailyClient instead:
+
+* keeps one pooled ``requests.Session`` per process (keep-alive, TLS reuse)
+* bounds every call with connect/read timeouts and an overall deadline
+* retries connection errors, timeouts, 429 and 5xx with exponential
+  backoff and full jitter; room names are fixed per call, so a retried
+  create is idempotent ("already exists" reads the room back)
+* trips a circuit breaker after DAILY_BREAKER_THRESHOLD consecutive
+  failures, failing fast with DailyUnavailable for DAILY_BREAKER_RESET
+  seconds; callers fall back to create_simple_meeting_room.
+
+DAILY_API_URL points the client elsewhere, e.g. the fake server in
+benchmarks/daily_stub.py.
+"""
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DAILY_API_KEY = os.environ.get('DAILY_API_KEY', 'your_daily_api_key_here')
+DAILY_API_URL = os.environ.get('DAILY_API_URL', 'https://api.daily.co/v1')
+DAILY_CONNECT_TIMEOUT = float(os.environ.get('DAILY_CONNECT_TIMEOUT', 3))
+DAILY_READ_TIMEOUT = float(os.environ.get('DAILY_READ_TIMEOUT', 5))
+DAILY_DEADLINE = float(os.environ.get('DAILY_DEADLINE', 10))  # whole call incl. retries
+DAILY_MAX_RETRIES = int(os.environ.get('DAILY_MAX_RETRIES', 2))
+DAILY_BREAKER_THRESHOLD = int(os.environ.get('DAILY_BREAKER_THRESHOLD', 5))
+DAILY_BREAKER_RESET = float(os.environ.get('DAILY_BREAKER_RESET', 30))
+DAILY_POOL_SIZE = int(os.environ.get('DAILY_POOL_SIZE', 10))
+BACKOFF_BASE = 0.25
+BACKOFF_MAX = 2.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class DailyError(Exception):
+    """Daily.co rejected a request (4xx other than 429)"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class DailyUnavailable(DailyError):
+    """Daily.co could not be reached, kept failing, or the breaker is open"""
+
+
+def is_configured():
+    return bool(DAILY_API_KEY) and DAILY_API_KEY != 'your_daily_api_key_here'
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half-open (one probe) -> closed"""
+
+    def __init__(self, threshold=DAILY_BREAKER_THRESHOLD, reset_after=DAILY_BREAKER_RESET):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at >= self.reset_after:
+                return 'half-open'
+            return 'open'
+
+    def allow(self):
+        """True if a call may go ahead; in half-open only one probe at a time"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_after or self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.threshold:
+                if self._opened_at is None or self._probing:
+                    print(f"[Daily] Circuit open after {self._failures} failures; "
+                          f"failing fast for {self.reset_after:.0f}s")
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class DailyClient:
+    """Pooled, timeout-bounded Daily.co API client with retries and a breaker"""
+
+    def __init__(self, api_key=DAILY_API_KEY, base_url=DAILY_API_URL, breaker=None):
+        self.base_url = base_url.rstrip('/')
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=DAILY_POOL_SIZE, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json',
+        })
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(BACKOFF_BASE * (2 ** attempt), BACKOFF_MAX))
+
+    def request(self, method, path, json=None):
+        """Send one API call; returns (status, parsed body).
+
+        Retryable failures are retried within DAILY_DEADLINE; raises
+        DailyUnavailable when the breaker is open or retries run out.
+        """
+        if not self.breaker.allow():
+            raise DailyUnavailable('Daily.co circuit breaker is open')
+
+        deadline = time.monotonic() + DAILY_DEADLINE
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                response = self.session.request(
+                    method, f'{self.base_url}{path}', json=json,
+                    timeout=(DAILY_CONNECT_TIMEOUT, max(min(DAILY_READ_TIMEOUT, remaining), 0.1))
+                )
+                if response.status_code not in RETRY_STATUSES:
+                    self.breaker.record_success()
+                    try:
+                        body = response.json()
+                    except ValueError:
+                        body = {'info': response.text}
+                    return response.status_code, body
+                failure = f'HTTP {response.status_code}: {response.text[:200]}'
+            except (requests.ConnectionError, requests.Timeout) as e:
+                failure = f'{type(e).__name__}: {e}'
+
+            delay = self._backoff(attempt)
+            attempt += 1
+            if attempt > DAILY_MAX_RETRIES or time.monotonic() + delay >= deadline:
+                self.breaker.record_failure()
+                raise DailyUnavailable(f'Daily.co {method} {path} failed after {attempt} attempt(s): {failure}')
+            time.sleep(delay)
+
+    def create_room(self, name, properties=None):
+        """Create a room (or return it if it already exists)"""
+        data = {'name': name, 'privacy': 'public'}  # public works on the free tier
+        if properties:
+            data['properties'] = properties
+        status, body = self.request('POST', '/rooms', json=data)
+        if status == 200:
+            return body
+        if status == 400 and 'already exists' in str(body):
+            return self.get_room(name)
+        raise DailyError(f'Failed to create room: {body}', status)
+
+    def get_room(self, name):
+        status, body = self.request('GET', f'/rooms/{name}')
+        if status != 200:
+            raise DailyError(f'Error retrieving room: {body}', status)
+        return body
+
+    def delete_room(self, name):
+        """Delete a room; True if it existed"""
+        status, body = self.request('DELETE', f'/rooms/{name}')
+        if status == 404:
+            return False
+        if status != 200:
+            raise DailyError(f'Error deleting room: {body}', status)
+        return True
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def daily_client():
+    """The process-wide DailyClient (one session and breaker per worker)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = DailyClient()
+    return _client
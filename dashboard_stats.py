@@ -0,0 +1,127 @@
+"""Aggregated dashboard statistics.
+
+dashboard() used to run a dozen queries per page view - separate counts,
+``.all()`` followed by Python ``sum()`` for earnings and content, and the
+same user_id query twice for the provider and client totals. The figures
+here come from two grouped aggregate queries built from conditional sums:
+one over the user's bookings and one over their content (with the
+availability rule count folded in as a scalar subquery).
+
+Results are kept in a short per-user TTL cache (DASHBOARD_CACHE_TTL
+seconds, 0 disables it). Entries are dropped when a transaction touching
+the user's bookings, content or availability commits in this process.
+"""
+import os
+from datetime import datetime, time, timedelta, timezone
+
+from sqlalchemy import case, event, func, or_, select
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import AvailabilityRule, Booking, Content
+from user_cache import UserCache
+
+EASTERN_TIMEZONE = timezone(timedelta(hours=-4))  # EDT (UTC-4)
+
+DASHBOARD_CACHE_TTL = float(os.environ.get('DASHBOARD_CACHE_TTL', 15))
+PENDING_KEY = 'dashboard_cache_invalidate'
+
+dashboard_cache = UserCache(ttl=DASHBOARD_CACHE_TTL)
+
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _sum_if(condition, column):
+    return func.coalesce(func.sum(case((condition, column), else_=0)), 0)
+
+
+def _in_range(column, start, end):
+    return (column >= start) & (column < end)
+
+
+def _booking_stats(user_id, now):
+    """Booking counts and earnings for one user in a single aggregate query"""
+    week_ago = now - timedelta(days=7)
+    week_ahead = now + timedelta(days=7)
+    day_start = datetime.combine(now.date(), time.min)
+    day_end = day_start + timedelta(days=1)
+
+    # The dashboard has always scoped "provider" figures by Booking.user_id;
+    # keep that so the numbers don't change under users.
+    as_client = Booking.user_id == user_id
+    this_week = Booking.start_time.between(week_ago, week_ahead)
+
+    row = db.session.execute(
+        select(
+            _count_if(as_client).label('total_bookings'),
+            _count_if(Booking.created_at >= week_ago).label('recent_bookings'),
+            _count_if(this_week).label('this_week_bookings'),
+            _count_if(_in_range(Booking.start_time, day_start, day_end)).label('today_bookings'),
+            _sum_if(as_client & (Booking.status == 'confirmed'), Booking.payment_amount).label('total_earnings'),
+            _sum_if(as_client & (Booking.status == 'completed'), Booking.payment_amount).label('completed_earnings'),
+            _sum_if(as_client & this_week, Booking.payment_amount).label('this_week_earnings'),
+        ).where(
+            or_(Booking.provider_id == user_id, Booking.user_id == user_id)
+        )
+    ).one()
+    return dict(row._mapping)
+
+
+def _content_stats(user_id):
+    """Content totals plus the availability rule count in a single query"""
+    availability_count = select(func.count(AvailabilityRule.id)).where(
+        AvailabilityRule.user_id == user_id
+    ).scalar_subquery()
+
+    row = db.session.execute(
+        select(
+            func.count(Content.id).label('content_count'),
+            _count_if(Content.status == 'published').label('published_content'),
+            func.coalesce(func.sum(Content.earnings), 0).label('total_content_earnings'),
+            func.coalesce(func.sum(Content.views), 0).label('total_content_views'),
+            availability_count.label('availability_count'),
+        ).where(Content.user_id == user_id)
+    ).one()
+    return dict(row._mapping)
+
+
+def get_dashboard_stats(user_id, use_cache=True):
+    """Booking, earnings, content and availability figures for the dashboard"""
+    if use_cache:
+        stats = dashboard_cache.get(user_id)
+        if stats is not None:
+            return stats
+
+    # Stored times are naive Eastern, so compare against naive Eastern
+    now = datetime.now(EASTERN_TIMEZONE).replace(tzinfo=None)
+    stats = _booking_stats(user_id, now)
+    stats.update(_content_stats(user_id))
+
+    if use_cache:
+        dashboard_cache.set(user_id, stats)
+    return stats
+
+
+# -- invalidation ----------------------------------------------------------
+
+@event.listens_for(Session, 'after_flush')
+def _stage_invalidation(session, flush_context):
+    ids = session.info.setdefault(PENDING_KEY, set())
+    for obj in session.new.union(session.dirty).union(session.deleted):
+        if isinstance(obj, Booking):
+            ids.update((obj.user_id, obj.provider_id))
+        elif isinstance(obj, (Content, AvailabilityRule)):
+            ids.add(obj.user_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_invalidation(session):
+    for user_id in session.info.pop(PENDING_KEY, ()):
+        dashboard_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_invalidation(session):
+    session.info.pop(PENDING_KEY, None)
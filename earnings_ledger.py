@@ -0,0 +1,207 @@
+"""Provider earnings ledger and running balances.
+
+payment_dashboard used to load every paid booking the provider ever had
+on each page view and recompute total_earnings and pending_balance in
+Python, while the webhook, payouts and cancellations each adjusted the
+same columns their own way. Every change to a provider's money now goes
+through this module as one row in the append-only EarningsEntry table:
+
+* payment         - a booking was paid (+ the provider's share)
+* earned          - a paid booking was completed (+ its gross to total_earnings)
+* refund          - a paid booking was refunded (reverses its payment and earned)
+* payout          - money was sent to the provider's bank
+* payout_reversal - that payout failed and the money is back
+
+Appending an entry moves the running balances on User (total_earnings,
+pending_balance, total_payouts) in the same transaction, and the entry
+records the balances it left behind, so dashboards read three columns
+instead of rescanning bookings. Each entry has a unique entry_key (e.g.
+``payment:booking:12``), so recording the same payment or refund twice -
+from the webhook and a cancellation, or a retried event - is a no-op.
+Entries never change; a correction is a new entry.
+
+total_earnings keeps payment_dashboard's definition: the gross of paid
+bookings that have been completed. pending_balance is credited as soon
+as a booking is paid, but its gross only counts towards total_earnings
+once complete_past_bookings (booking_jobs.py) marks it completed, so an
+upcoming session is not reported as earned.
+"""
+from datetime import datetime, timedelta, timezone
+
+import click
+from sqlalchemy import func, select, update
+
+from extensions import db
+from models import Booking, EarningsEntry, Payout, User
+
+EASTERN_TIMEZONE = timezone(timedelta(hours=-4))  # EDT (UTC-4)
+PROVIDER_SHARE = 0.90  # What the provider keeps after the platform fee
+REBUILD_BATCH_SIZE = 200
+
+
+def _now():
+    return datetime.now(EASTERN_TIMEZONE).replace(tzinfo=None)
+
+
+def _append(user_id, kind, entry_key, amount, gross_amount=0.0, payouts=0.0,
+            booking_id=None, payout_id=None, created_at=None):
+    """Append one entry and move the user's balances; None if entry_key exists.
+
+    Does not commit. A concurrent writer of the same key fails the unique
+    constraint at flush, rolling back the balance change with it.
+    """
+    if db.session.execute(select(EarningsEntry.id).where(EarningsEntry.entry_key == entry_key)).first():
+        return None
+    db.session.execute(
+        update(User).where(User.id == user_id).values(
+            pending_balance=func.coalesce(User.pending_balance, 0.0) + amount,
+            total_earnings=func.coalesce(User.total_earnings, 0.0) + gross_amount,
+            total_payouts=func.coalesce(User.total_payouts, 0.0) + payouts,
+        ),
+        execution_options={'synchronize_session': False}
+    )
+    # The UPDATE holds the user's row, so these are our balances
+    balances = db.session.execute(
+        select(User.pending_balance, User.total_earnings, User.total_payouts).where(User.id == user_id)
+    ).one()
+    entry = EarningsEntry(
+        user_id=user_id, kind=kind, entry_key=entry_key,
+        booking_id=booking_id, payout_id=payout_id,
+        gross_amount=gross_amount, amount=amount,
+        balance_after=balances.pending_balance,
+        earnings_after=balances.total_earnings,
+        payouts_after=balances.total_payouts,
+        created_at=created_at or _now(),
+    )
+    db.session.add(entry)
+    db.session.flush()
+    return entry
+
+
+def _entry(entry_key):
+    return db.session.execute(
+        select(EarningsEntry).where(EarningsEntry.entry_key == entry_key)
+    ).scalar_one_or_none()
+
+
+def record_payment(booking, created_at=None):
+    """Credit the provider's share of a paid booking to the pending balance"""
+    gross = booking.payment_amount or 0.0
+    entry = _append(booking.provider_id, 'payment', f'payment:booking:{booking.id}',
+                    gross * PROVIDER_SHARE, booking_id=booking.id, created_at=created_at)
+    if booking.status == 'completed':
+        # Paid after the session ended (a late webhook)
+        record_earned(booking, created_at)
+    return entry
+
+
+def record_earned(booking, created_at=None):
+    """Count a completed, paid booking's gross in total_earnings"""
+    if _entry(f'payment:booking:{booking.id}') is None:
+        return None
+    return _append(booking.provider_id, 'earned', f'earned:booking:{booking.id}', 0.0,
+                   gross_amount=booking.payment_amount or 0.0, booking_id=booking.id,
+                   created_at=created_at)
+
+
+def record_refund(booking):
+    """Reverse a booking's payment and earned entries; None if it was never credited"""
+    payment = _entry(f'payment:booking:{booking.id}')
+    if payment is None:
+        return None
+    earned = _entry(f'earned:booking:{booking.id}')
+    return _append(booking.provider_id, 'refund', f'refund:booking:{booking.id}',
+                   -payment.amount, gross_amount=-earned.gross_amount if earned else 0.0,
+                   booking_id=booking.id)
+
+
+def record_payout(payout, created_at=None):
+    """Debit a payout (Payout.amount is in cents) from the pending balance"""
+    dollars = payout.amount / 100
+    return _append(payout.user_id, 'payout', f'payout:{payout.id}', -dollars, payouts=dollars,
+                   payout_id=payout.id, created_at=created_at)
+
+
+def record_payout_failure(payout):
+    """Put a failed payout back into the pending balance"""
+    if _entry(f'payout:{payout.id}') is None:
+        return None
+    dollars = payout.amount / 100
+    return _append(payout.user_id, 'payout_reversal', f'payout_reversal:{payout.id}', dollars,
+                   payouts=-dollars, payout_id=payout.id)
+
+
+def statement(user_id, limit=50):
+    """The user's most recent ledger entries, newest first"""
+    return (EarningsEntry.query.filter_by(user_id=user_id)
+            .order_by(EarningsEntry.id.desc()).limit(limit).all())
+
+
+# -- backfill --------------------------------------------------------------
+
+def rebuild_ledger():
+    """Write entries for paid bookings and payouts that predate the ledger.
+
+    Covers what payment_dashboard used to count - paid bookings that are
+    confirmed or completed, earned once completed, and payouts that did
+    not fail - in time order,
+    then resets each touched provider's balances to its ledger totals.
+    Safe to re-run: existing entry keys are skipped.
+    """
+    bookings = db.session.execute(
+        select(Booking).where(
+            Booking.payment_status == 'paid',
+            Booking.status.in_(['confirmed', 'completed'])
+        )
+    ).scalars().all()
+    payouts = db.session.execute(select(Payout).where(Payout.status != 'failed')).scalars().all()
+    items = [(b.created_at or b.start_time, 'payment', b) for b in bookings]
+    items += [(p.created_at, 'payout', p) for p in payouts]
+    items.sort(key=lambda item: (item[0] or datetime.min, item[1]))
+
+    user_ids = {b.provider_id for b in bookings} | {p.user_id for p in payouts}
+    if not user_ids:
+        return 0
+    # Balances restart from what the ledger already holds for these users
+    totals = dict.fromkeys(user_ids, (0.0, 0.0, 0.0))
+    for row in db.session.execute(
+        select(EarningsEntry.user_id, func.sum(EarningsEntry.amount), func.sum(EarningsEntry.gross_amount),
+               func.sum(EarningsEntry.amount).filter(EarningsEntry.kind.in_(['payout', 'payout_reversal'])))
+        .where(EarningsEntry.user_id.in_(user_ids))
+        .group_by(EarningsEntry.user_id)
+    ):
+        totals[row[0]] = (row[1] or 0.0, row[2] or 0.0, -(row[3] or 0.0))
+    for user_id, (pending, earnings, paid) in totals.items():
+        db.session.execute(
+            update(User).where(User.id == user_id).values(
+                pending_balance=pending, total_earnings=earnings, total_payouts=paid
+            ),
+            execution_options={'synchronize_session': False}
+        )
+
+    written = 0
+    for position, (created_at, kind, row) in enumerate(items, 1):
+        entry = record_payment(row, created_at) if kind == 'payment' else record_payout(row, created_at)
+        written += entry is not None
+        if position % REBUILD_BATCH_SIZE == 0:
+            db.session.commit()
+    db.session.commit()
+    return written
+
+
+def init_earnings_ledger(app):
+    """Backfill the ledger once for databases that predate it, and register the CLI"""
+    with app.app_context():
+        try:
+            if db.session.execute(select(EarningsEntry.id).limit(1)).first() is None:
+                written = rebuild_ledger()
+                if written:
+                    print(f"[Ledger] Backfilled {written} earnings entries")
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️  Warning: Could not backfill the earnings ledger: {e}")
+
+    @app.cli.command('rebuild-ledger')
+    def rebuild_ledger_command():
+        """Add ledger entries for paid bookings and payouts not yet recorded."""
+        click.echo(f"Wrote {rebuild_ledger()} entries")
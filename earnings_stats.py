@@ -0,0 +1,248 @@
+"""Earnings page totals and chart series from daily roll-ups.
+
+/earnings and /api/earnings-chart-data used to load every Payout the
+user ever had and bucket them by day in Python, so both got slower with
+each payout. Payout totals are now rolled up per user and day into
+EarningsDay (amount and count per status), kept current by a session
+``after_flush`` hook that applies the change of every inserted, updated
+or deleted Payout in the same transaction. Reads touch at most one row
+per day:
+
+* the page totals are one conditional-sum query over the user's rows
+* 7d/30d/90d charts read that many daily rows
+* 1y and all-time charts group the rows by month in SQL (strftime on
+  SQLite, date_trunc on PostgreSQL)
+
+Bulk Core statements on Payout bypass the hook; run
+``flask rebuild-earnings-days`` after any such manual change.
+"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+import click
+from sqlalchemy import case, event, func, inspect, select, update
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import EarningsDay, Payout
+
+EASTERN_TIMEZONE = timezone(timedelta(hours=-4))  # EDT (UTC-4)
+STATUSES = ('paid', 'pending', 'failed')
+# period -> (number of buckets, bucket size, label format); 'all' starts at the first payout
+CHART_PERIODS = {
+    '7d': (7, 'day', '%a'),
+    '30d': (30, 'day', '%m/%d'),
+    '90d': (90, 'day', '%m/%d'),
+    '1y': (12, 'month', '%b %y'),
+    'all': (None, 'month', '%b %y'),
+}
+DEFAULT_CHART_PERIOD = '7d'
+
+
+def _today():
+    return datetime.now(EASTERN_TIMEZONE).date()
+
+
+def _sum_if(condition, column):
+    return func.coalesce(func.sum(case((condition, column), else_=0)), 0)
+
+
+def _month(column):
+    """'YYYY-MM' of a date column, in the database's own dialect"""
+    if db.engine.dialect.name == 'postgresql':
+        return func.to_char(func.date_trunc('month', column), 'YYYY-MM')
+    return func.strftime('%Y-%m', column)
+
+
+def _add_months(day, months):
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+# -- reads -----------------------------------------------------------------
+
+def earnings_summary(user_id, today=None):
+    """Payout totals for the earnings page (amounts in cents) in one query"""
+    today = today or _today()
+    month_start = today.replace(day=1)
+    week_start = today - timedelta(days=today.weekday())
+    row = db.session.execute(
+        select(
+            func.coalesce(func.sum(EarningsDay.paid_amount), 0).label('total_earned'),
+            func.coalesce(func.sum(EarningsDay.paid_count), 0).label('paid_count'),
+            func.coalesce(func.sum(EarningsDay.pending_amount), 0).label('pending_total'),
+            func.coalesce(func.sum(EarningsDay.failed_amount), 0).label('failed_total'),
+            _sum_if(EarningsDay.day >= month_start, EarningsDay.paid_amount).label('monthly_earned'),
+            _sum_if(EarningsDay.day >= week_start, EarningsDay.paid_amount).label('weekly_earned'),
+        ).where(EarningsDay.user_id == user_id)
+    ).one()
+    return dict(row._mapping)
+
+
+def chart_series(user_id, period=DEFAULT_CHART_PERIOD, today=None):
+    """(labels, dollars) of paid payouts per bucket, oldest first"""
+    today = today or _today()
+    buckets, size, label_format = CHART_PERIODS.get(period, CHART_PERIODS[DEFAULT_CHART_PERIOD])
+
+    if size == 'day':
+        start = today - timedelta(days=buckets - 1)
+        totals = dict(db.session.execute(
+            select(EarningsDay.day, EarningsDay.paid_amount).where(
+                EarningsDay.user_id == user_id, EarningsDay.day >= start
+            )
+        ).all())
+        days = [start + timedelta(days=i) for i in range(buckets)]
+        return ([day.strftime(label_format) for day in days],
+                [(totals.get(day) or 0) / 100 for day in days])
+
+    month = _month(EarningsDay.day)
+    query = select(month, func.sum(EarningsDay.paid_amount)).where(EarningsDay.user_id == user_id)
+    this_month = today.replace(day=1)
+    if buckets is not None:
+        start = _add_months(this_month, -(buckets - 1))
+        query = query.where(EarningsDay.day >= start)
+    totals = dict(db.session.execute(query.group_by(month)).all())
+    if buckets is None:
+        first = min(totals) if totals else this_month.strftime('%Y-%m')
+        start = date(int(first[:4]), int(first[5:7]), 1)
+    months = []
+    while start <= this_month:
+        months.append(start)
+        start = _add_months(start, 1)
+    return ([m.strftime(label_format) for m in months],
+            [(totals.get(m.strftime('%Y-%m')) or 0) / 100 for m in months])
+
+
+# -- roll-up maintenance ---------------------------------------------------
+
+def _day(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _before_flush_value(obj, key):
+    history = inspect(obj).attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(obj, key)
+
+
+def _dialect_insert(dialect_name):
+    """insert() with ON CONFLICT support for this dialect, if it has one"""
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
+def _upsert(conn, user_id, day, deltas):
+    """Add {column: delta} to a user's day, creating the row if needed"""
+    table = EarningsDay.__table__
+    row = {f'{status}_{field}': 0 for status in STATUSES for field in ('amount', 'count')}
+    row.update(deltas, user_id=user_id, day=day)
+    insert = _dialect_insert(conn.dialect.name)
+    if insert is not None:
+        statement = insert(table).values(**row)
+        conn.execute(statement.on_conflict_do_update(
+            index_elements=['user_id', 'day'],
+            set_={column: table.c[column] + statement.excluded[column] for column in deltas}
+        ))
+        return
+    result = conn.execute(
+        update(table)
+        .where(table.c.user_id == user_id, table.c.day == day)
+        .values({column: table.c[column] + delta for column, delta in deltas.items()})
+    )
+    if result.rowcount == 0:
+        conn.execute(table.insert().values(**row))
+
+
+ROLLUP_KEYS = ('user_id', 'created_at', 'status', 'amount')
+
+
+def _load_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+# Setting an expired attribute does not load what it replaces unless some
+# listener asks for it; the roll-up needs that old value to subtract it.
+for _key in ROLLUP_KEYS:
+    event.listen(getattr(Payout, _key), 'set', _load_old_value, active_history=True, retval=True)
+
+
+@event.listens_for(Session, 'after_flush')
+def _roll_up_payouts(session, flush_context):
+    deltas = defaultdict(lambda: defaultdict(float))
+
+    def apply(values, sign):
+        user_id, created_at, status, amount = values
+        if user_id is None or created_at is None or status not in STATUSES:
+            return
+        bucket = deltas[(user_id, _day(created_at))]
+        bucket[f'{status}_amount'] += sign * (amount or 0)
+        bucket[f'{status}_count'] += sign
+
+    keys = ROLLUP_KEYS
+    for obj in session.new:
+        if isinstance(obj, Payout):
+            apply([getattr(obj, key) for key in keys], 1)
+    for obj in session.deleted:
+        if isinstance(obj, Payout):
+            apply([_before_flush_value(obj, key) for key in keys], -1)
+    for obj in session.dirty:
+        if isinstance(obj, Payout) and session.is_modified(obj):
+            apply([_before_flush_value(obj, key) for key in keys], -1)
+            apply([getattr(obj, key) for key in keys], 1)
+
+    if not deltas:
+        return
+    conn = session.connection()
+    for (user_id, day), columns in deltas.items():
+        changed = {column: int(delta) if column.endswith('_count') else delta
+                   for column, delta in columns.items() if delta}
+        if changed:
+            _upsert(conn, user_id, day, changed)
+
+
+def rebuild_earnings_days():
+    """Recompute every EarningsDay row from Payout in one grouped query"""
+    day = func.date(Payout.created_at)
+    columns = []
+    for status in STATUSES:
+        columns.append(_sum_if(Payout.status == status, Payout.amount).label(f'{status}_amount'))
+        columns.append(_sum_if(Payout.status == status, 1).label(f'{status}_count'))
+    rows = db.session.execute(
+        select(Payout.user_id, day.label('day'), *columns)
+        .where(Payout.created_at.isnot(None))
+        .group_by(Payout.user_id, day)
+    ).all()
+    db.session.execute(EarningsDay.__table__.delete())
+    if rows:
+        db.session.execute(EarningsDay.__table__.insert(), [
+            # SQLite's date() returns text
+            {**row._mapping, 'day': row.day if isinstance(row.day, date) else date.fromisoformat(row.day)}
+            for row in rows
+        ])
+    db.session.commit()
+    return len(rows)
+
+
+def init_earnings_stats(app):
+    """Build the roll-ups once for databases that predate them, and register the CLI"""
+    with app.app_context():
+        try:
+            if (db.session.execute(select(EarningsDay.user_id).limit(1)).first() is None
+                    and db.session.execute(select(Payout.id).limit(1)).first() is not None):
+                print(f"[EarningsStats] Rolled up payouts into {rebuild_earnings_days()} user-days")
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️  Warning: Could not build earnings roll-ups: {e}")
+
+    @app.cli.command('rebuild-earnings-days')
+    def rebuild_earnings_days_command():
+        """Recompute the daily earnings roll-ups from the payout table."""
+        click.echo(f"Rebuilt {rebuild_earnings_days()} user-days")
@@ -0,0 +1,22 @@
+"""Deployment environment checks shared by views and background jobs."""
+import os
+
+import stripe
+
+
+# Production safeguards
+def is_production_environment():
+    """Check if we're running in production environment"""
+    return os.environ.get('FLASK_ENV') == 'production' or os.environ.get('ENVIRONMENT') == 'production'
+
+def validate_stripe_environment():
+    """Validate that Stripe environment matches deployment environment"""
+    if is_production_environment():
+        if stripe.api_key.startswith('sk_test_'):
+            raise ValueError("❌ PRODUCTION ERROR: Test Stripe key detected in production environment!")
+        if not stripe.api_key.startswith('sk_live_'):
+            raise ValueError("❌ PRODUCTION ERROR: Invalid Stripe key format for production!")
+    else:
+        # In development, warn if using live keys
+        if stripe.api_key.startswith('sk_live_'):
+            print("⚠️  WARNING: Live Stripe key detected in development environment!")
@@ -1,9 +1,11 @@
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import DeclarativeBase
 from flask_login import LoginManager
+from authlib.integrations.flask_client import OAuth
 
 class Base(DeclarativeBase):
     pass
 
 db = SQLAlchemy(model_class=Base)
-login_manager = LoginManager() 
\ No newline at end of file
+login_manager = LoginManager() 
+oauth = OAuth()
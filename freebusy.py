@@ -0,0 +1,285 @@
+"""Cached Google Calendar free/busy for slot generation.
+
+Slot pages only saw a provider's Google Calendar once a sync had copied
+events into AvailabilityException rows. ProviderSchedule now also merges
+Google's free/busy answer, from a per-process cache keyed by
+(provider id, day). Pages only ever read the cache:
+
+* ``busy_intervals`` returns what is cached. A day that is missing or
+  expired counts as no extra busy time - the synced blocks still apply -
+  and is queued for a background fetch, so the next page view has it.
+* ``refresh`` does the fetching, on the small ``fetch_pool`` for page
+  misses and on the calendar sync pools after every successful sync
+  (calendar_queue.py), which warms the next FREEBUSY_WARM_DAYS for the
+  provider in that process.
+* A fetch covers at least FREEBUSY_PREFETCH_DAYS days, and several
+  providers go out as one batch HTTP request of ``freebusy.query``
+  calls, each authorized as its own provider, up to FREEBUSY_BATCH_SIZE
+  per round trip.
+* Entries expire after FREEBUSY_CACHE_TTL seconds; a provider whose
+  lookup failed is cached empty for FREEBUSY_ERROR_TTL so a Google
+  outage costs one timeout per provider, not one per page view.
+
+Busy times are returned naive in the provider's timezone, like the
+booking and exception times they are merged with.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from flask import current_app
+
+FREEBUSY_CACHE_TTL = float(os.environ.get('FREEBUSY_CACHE_TTL', 300))
+FREEBUSY_ERROR_TTL = float(os.environ.get('FREEBUSY_ERROR_TTL', 60))
+FREEBUSY_TIMEOUT = float(os.environ.get('FREEBUSY_TIMEOUT', 5))
+FREEBUSY_FETCH_WORKERS = int(os.environ.get('FREEBUSY_FETCH_WORKERS', 2))
+FREEBUSY_PREFETCH_DAYS = 14
+FREEBUSY_WARM_DAYS = 62  # the booking page's 60-day window, padded a day either side
+FREEBUSY_BATCH_SIZE = 50  # Calendar API limit per batch request
+FREEBUSY_CACHE_MAX_ENTRIES = 50000
+DEFAULT_TIMEZONE = 'America/New_York'
+
+
+class FreeBusyCache:
+    """Thread-safe TTL + LRU cache of busy intervals keyed by (user_id, date)"""
+
+    def __init__(self, ttl=FREEBUSY_CACHE_TTL, max_entries=FREEBUSY_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (user_id, date) -> (expires_at, intervals)
+
+    def get_many(self, keys):
+        """The cached intervals for whichever of ``keys`` are present and fresh"""
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry[0] < now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = entry[1]
+        return found
+
+    def set_many(self, values, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            for key, intervals in values.items():
+                self._entries[key] = (expires_at, intervals)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+freebusy_cache = FreeBusyCache()
+
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _split_by_day(intervals, first_day, days):
+    """{date: [(start, end), ...]} for each day each interval overlaps"""
+    by_day = {first_day + timedelta(days=i): [] for i in range(days)}
+    for start, end in intervals:
+        day = start.date()
+        while day <= (end - timedelta(microseconds=1)).date():
+            if day in by_day:
+                by_day[day].append((start, end))
+            day += timedelta(days=1)
+    return by_day
+
+
+def _parse_busy(calendar, tz):
+    return [
+        (
+            datetime.fromisoformat(period['start'].replace('Z', '+00:00')).astimezone(tz).replace(tzinfo=None),
+            datetime.fromisoformat(period['end'].replace('Z', '+00:00')).astimezone(tz).replace(tzinfo=None),
+        )
+        for period in calendar.get('busy', [])
+    ]
+
+
+def _fetch(requests):
+    """Run freebusy.query for each (provider, first_day, days) in batches.
+
+    Returns {(user_id, date): intervals} for the providers that answered
+    and the set of provider ids that failed.
+    """
+    import httplib2
+    from google_calendar import calendar_service, user_calendar
+
+    service = calendar_service()
+    results, failed = {}, set()
+
+    for offset in range(0, len(requests), FREEBUSY_BATCH_SIZE):
+        chunk = requests[offset:offset + FREEBUSY_BATCH_SIZE]
+        pending = {}
+
+        def collect(request_id, response, exception):
+            provider, first_day, days, tz = pending[request_id]
+            calendar = (response or {}).get('calendars', {}).get(provider.google_calendar_id, {})
+            if exception is not None or calendar.get('errors'):
+                failed.add(provider.id)
+                print(f"⚠️  Warning: Free/busy lookup failed for user {provider.id}: "
+                      f"{exception or calendar.get('errors')}")
+                return
+            by_day = _split_by_day(_parse_busy(calendar, tz), first_day, days)
+            for day, intervals in by_day.items():
+                results[(provider.id, day)] = intervals
+
+        batch = service.new_batch_http_request(callback=collect)
+        for provider, first_day, days in chunk:
+            tz = ZoneInfo(provider.timezone or DEFAULT_TIMEZONE)
+            time_min = datetime.combine(first_day, datetime.min.time(), tz)
+            try:
+                request = user_calendar(provider).authorize(service.freebusy().query(body={
+                    'timeMin': time_min.isoformat(),
+                    'timeMax': (time_min + timedelta(days=days)).isoformat(),
+                    'timeZone': str(tz),
+                    'items': [{'id': provider.google_calendar_id}],
+                }))
+            except Exception as e:
+                # Usually a revoked grant (RefreshError); the sync handles that
+                failed.add(provider.id)
+                print(f"⚠️  Warning: Free/busy lookup failed for user {provider.id}: {e}")
+                continue
+            request_id = str(provider.id)
+            pending[request_id] = (provider, first_day, days, tz)
+            batch.add(request, request_id=request_id)
+
+        if pending:
+            try:
+                batch.execute(http=httplib2.Http(timeout=FREEBUSY_TIMEOUT))
+            except Exception as e:
+                failed.update(provider.id for provider, _, _, _ in pending.values())
+                print(f"⚠️  Warning: Free/busy batch request failed: {e}")
+    return results, failed
+
+
+def _missing_ranges(providers, first_day, days, cached):
+    """(provider, first missing day, days to fetch) for each provider with a gap"""
+    ranges = []
+    for provider in providers:
+        missing = [first_day + timedelta(days=i) for i in range(days)
+                   if (provider.id, first_day + timedelta(days=i)) not in cached]
+        if missing:
+            ranges.append((provider, missing[0],
+                           max((missing[-1] - missing[0]).days + 1, FREEBUSY_PREFETCH_DAYS)))
+    return ranges
+
+
+def _has_calendar(provider):
+    return provider.google_calendar_connected and provider.google_calendar_id
+
+
+def refresh(requests):
+    """Fetch free/busy into the cache for each (provider, first_day, days).
+
+    Blocks on Google, so it runs on fetch_pool or a calendar sync pool,
+    never in a request. Returns how many providers were fetched.
+    """
+    requests = [(provider, _as_date(first_day), days) for provider, first_day, days in requests
+                if _has_calendar(provider)]
+    if not requests:
+        return 0
+    fetched, failed = _fetch(requests)
+    freebusy_cache.set_many(fetched)
+    # Cache failures briefly as "no extra busy time"
+    freebusy_cache.set_many({
+        (provider.id, first_day + timedelta(days=i)): []
+        for provider, first_day, days in requests if provider.id in failed
+        for i in range(days)
+    }, ttl=FREEBUSY_ERROR_TTL)
+    return len(requests) - len(failed)
+
+
+def warm(provider):
+    """Refetch the provider's next FREEBUSY_WARM_DAYS days, e.g. after a calendar sync"""
+    today = datetime.now(ZoneInfo(provider.timezone or DEFAULT_TIMEZONE)).date()
+    freebusy_cache.invalidate(provider.id)
+    return refresh([(provider, today - timedelta(days=1), FREEBUSY_WARM_DAYS)])
+
+
+class FetchPool:
+    """Bounded pool of background fetches, at most one in flight per provider"""
+
+    def __init__(self, max_workers, name):
+        self.max_workers = max_workers
+        self.name = name
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = set()
+
+    def submit(self, app, requests):
+        """Queue [(user_id, first_day, days)]; providers already being fetched are skipped"""
+        with self._lock:
+            requests = [request for request in requests if request[0] not in self._in_flight]
+            if not requests:
+                return None
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+            self._in_flight.update(user_id for user_id, _, _ in requests)
+        return self._executor.submit(self._run, app, requests)
+
+    def _run(self, app, requests):
+        from models import User
+        try:
+            with app.app_context():
+                users = {user.id: user for user in User.query.filter(
+                    User.id.in_([user_id for user_id, _, _ in requests]))}
+                return refresh([(users[user_id], first_day, days)
+                                for user_id, first_day, days in requests if user_id in users])
+        except Exception as e:
+            print(f"⚠️  Warning: Background free/busy fetch failed: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.difference_update(user_id for user_id, _, _ in requests)
+
+
+fetch_pool = FetchPool(FREEBUSY_FETCH_WORKERS, 'freebusy')
+
+
+def busy_intervals(providers, start_date, days):
+    """{provider id: [(start, end), ...]} of cached Google busy time in [start_date, +days).
+
+    Never calls Google: days not in the cache count as free and are
+    queued on fetch_pool. Providers without a connected calendar map to
+    an empty list.
+    """
+    first_day = _as_date(start_date)
+    busy = {provider.id: [] for provider in providers}
+    providers = [provider for provider in providers if _has_calendar(provider)]
+    keys = [(provider.id, first_day + timedelta(days=i)) for provider in providers for i in range(days)]
+    cached = freebusy_cache.get_many(keys)
+
+    missing = _missing_ranges(providers, first_day, days, cached)
+    if missing:
+        fetch_pool.submit(current_app._get_current_object(),
+                          [(provider.id, day, fetch_days) for provider, day, fetch_days in missing])
+
+    for provider in providers:
+        seen = set()
+        for i in range(days):
+            for interval in cached.get((provider.id, first_day + timedelta(days=i)), []):
+                if interval not in seen:
+                    seen.add(interval)
+                    busy[provider.id].append(interval)
+    return busy
@@ -0,0 +1,230 @@
+"""Pluggable full-text search over expert profiles.
+
+discover and homepage used to build OR chains of leading-wildcard ilike
+predicates, which no index can serve, and then ranked the rows in Python.
+A backend here turns search text into a ranked ``(user_id, rank)``
+subquery that routes join against their own User query, so filtering and
+ranking both happen inside the database:
+
+* ``SqliteFTSBackend`` - an FTS5 external-content table kept in sync with
+  ``user`` by triggers, ranked with bm25 (local development).
+* ``PostgresFTSBackend`` - a generated, weighted tsvector column with a GIN
+  index, ranked with ts_rank_cd (production).
+* ``LikeBackend`` - the old ilike matching with the ai_match_score weights
+  as a SQL expression, used when neither of the above is available.
+
+Field weights follow the old ai_match_score: name > skills > profession > bio.
+"""
+import re
+
+import click
+from sqlalchemy import Float, Integer, and_, case, inspect, literal, or_, select, text
+
+from extensions import db
+
+SEARCH_FIELDS = ['full_name', 'skills', 'profession', 'bio']
+# Relative weights for SEARCH_FIELDS, taken from ai_match_score (50/40/30/20)
+FIELD_WEIGHTS = [5.0, 4.0, 3.0, 2.0]
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def _tokenize(term):
+    return _TOKEN_RE.findall(term.lower())
+
+
+class SearchBackend:
+    """Base class: turns search terms into a ranked (user_id, rank) subquery"""
+
+    name = 'base'
+
+    def setup(self):
+        """Create whatever index structures the backend needs (idempotent)"""
+
+    def rebuild(self):
+        """Re-index every user from scratch"""
+
+    def ranked_ids(self, terms, match_all=True, name='fts'):
+        """Subquery of matching user ids with a relevance rank (higher is better).
+
+        ``terms`` is a list of words or phrases; ``match_all`` requires every
+        term to match (free-text search), otherwise any term may match
+        (category keyword lists). ``name`` aliases the subquery so several
+        can be joined into one query. Returns None if there is nothing to
+        search.
+        """
+        raise NotImplementedError
+
+    def search_text(self, search_query, name='fts'):
+        """ranked_ids() for a free-text search box value"""
+        return self.ranked_ids(search_query.split(), match_all=True, name=name)
+
+
+class SqliteFTSBackend(SearchBackend):
+    name = 'sqlite-fts5'
+
+    def setup(self):
+        with db.engine.begin() as conn:
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'user_fts'"
+            )).first()
+            if exists:
+                return
+            columns = ', '.join(SEARCH_FIELDS)
+            new_values = ', '.join(f'new.{field}' for field in SEARCH_FIELDS)
+            old_values = ', '.join(f'old.{field}' for field in SEARCH_FIELDS)
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE user_fts USING fts5({columns}, "
+                f"content='user', content_rowid='id', tokenize='porter unicode61')"
+            ))
+            conn.execute(text(
+                f'CREATE TRIGGER user_fts_ai AFTER INSERT ON "user" BEGIN '
+                f'INSERT INTO user_fts(rowid, {columns}) VALUES (new.id, {new_values}); END'
+            ))
+            conn.execute(text(
+                f'CREATE TRIGGER user_fts_ad AFTER DELETE ON "user" BEGIN '
+                f"INSERT INTO user_fts(user_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END"
+            ))
+            conn.execute(text(
+                f'CREATE TRIGGER user_fts_au AFTER UPDATE OF {columns} ON "user" BEGIN '
+                f"INSERT INTO user_fts(user_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+                f'INSERT INTO user_fts(rowid, {columns}) VALUES (new.id, {new_values}); END'
+            ))
+        print("[FullText] Created user_fts table and triggers")
+        self.rebuild()
+
+    def rebuild(self):
+        with db.engine.begin() as conn:
+            conn.execute(text("INSERT INTO user_fts(user_fts) VALUES ('rebuild')"))
+
+    def _match_expression(self, terms, match_all):
+        phrases = []
+        for term in terms:
+            tokens = _tokenize(term)
+            if tokens:
+                # Prefix-match the last word so partial input still hits
+                phrases.append('"' + ' '.join(tokens) + '"*')
+        if not phrases:
+            return None
+        return (' AND ' if match_all else ' OR ').join(phrases)
+
+    def ranked_ids(self, terms, match_all=True, name='fts'):
+        match = self._match_expression(terms, match_all)
+        if match is None:
+            return None
+        weights = ', '.join(str(weight) for weight in FIELD_WEIGHTS)
+        # bm25() is lower-is-better, so negate it. Bind names are per-alias
+        # so two rankings can share one statement.
+        return text(
+            f"SELECT rowid AS user_id, -bm25(user_fts, {weights}) AS rank "
+            f"FROM user_fts WHERE user_fts MATCH :{name}_match"
+        ).bindparams(**{f'{name}_match': match}).columns(user_id=Integer, rank=Float).subquery(name)
+
+
+class PostgresFTSBackend(SearchBackend):
+    name = 'postgres-tsvector'
+
+    # tsvector weight classes for SEARCH_FIELDS
+    FIELD_CLASSES = ['A', 'B', 'B', 'C']
+    # ts_rank_cd weights in {D, C, B, A} order
+    RANK_WEIGHTS = '{0.1, 0.4, 0.8, 1.0}'
+
+    def setup(self):
+        columns = {column['name'] for column in inspect(db.engine).get_columns('user')}
+        with db.engine.begin() as conn:
+            if 'search_vector' not in columns:
+                vector = ' || '.join(
+                    f"setweight(to_tsvector('english', coalesce({field}, '')), '{weight}')"
+                    for field, weight in zip(SEARCH_FIELDS, self.FIELD_CLASSES)
+                )
+                # Generated column: Postgres keeps it in sync on every write
+                conn.execute(text(
+                    f'ALTER TABLE "user" ADD COLUMN search_vector tsvector '
+                    f'GENERATED ALWAYS AS ({vector}) STORED'
+                ))
+                print("[FullText] Added user.search_vector column")
+            conn.execute(text(
+                'CREATE INDEX IF NOT EXISTS ix_user_search_vector ON "user" USING GIN (search_vector)'
+            ))
+
+    def _tsquery(self, terms, match_all):
+        phrases = []
+        for term in terms:
+            tokens = _tokenize(term)
+            if tokens:
+                tokens[-1] += ':*'
+                phrases.append('(' + ' <-> '.join(tokens) + ')')
+        if not phrases:
+            return None
+        return (' & ' if match_all else ' | ').join(phrases)
+
+    def ranked_ids(self, terms, match_all=True, name='fts'):
+        tsquery = self._tsquery(terms, match_all)
+        if tsquery is None:
+            return None
+        return text(
+            f"SELECT id AS user_id, "
+            f"ts_rank_cd('{self.RANK_WEIGHTS}', search_vector, to_tsquery('english', :{name}_tsquery)) AS rank "
+            f"FROM \"user\" WHERE search_vector @@ to_tsquery('english', :{name}_tsquery)"
+        ).bindparams(**{f'{name}_tsquery': tsquery}).columns(user_id=Integer, rank=Float).subquery(name)
+
+
+class LikeBackend(SearchBackend):
+    """ilike matching for databases without a full-text engine"""
+
+    name = 'like'
+
+    def ranked_ids(self, terms, match_all=True, name='fts'):
+        from models import User
+        terms = [term.strip() for term in terms if term.strip()]
+        if not terms:
+            return None
+        fields = [getattr(User, field) for field in SEARCH_FIELDS]
+
+        term_conditions = []
+        rank = literal(0.0)
+        for term in terms:
+            matches = [field.ilike(f'%{term}%') for field in fields]
+            term_conditions.append(or_(*matches))
+            for match, weight in zip(matches, FIELD_WEIGHTS):
+                rank = rank + case((match, weight), else_=0.0)
+
+        condition = and_(*term_conditions) if match_all else or_(*term_conditions)
+        return select(User.id.label('user_id'), rank.label('rank')).where(condition).subquery(name)
+
+
+_backend = None
+
+
+def get_search_backend():
+    """The backend for the configured database, set up once per process"""
+    global _backend
+    if _backend is None:
+        dialect = db.engine.dialect.name
+        if dialect == 'sqlite':
+            backend = SqliteFTSBackend()
+        elif dialect == 'postgresql':
+            backend = PostgresFTSBackend()
+        else:
+            backend = LikeBackend()
+        try:
+            backend.setup()
+        except Exception as e:
+            print(f"⚠️  Warning: {backend.name} search unavailable, falling back to ilike: {e}")
+            backend = LikeBackend()
+        _backend = backend
+    return _backend
+
+
+def init_fulltext(app):
+    """Set up the search backend at startup and register the rebuild CLI"""
+    with app.app_context():
+        backend = get_search_backend()
+        print(f"[FullText] Using {backend.name} search backend")
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Re-index every user in the full-text search backend."""
+        backend = get_search_backend()
+        backend.rebuild()
+        click.echo(f"Rebuilt {backend.name} search index")
@@ -0,0 +1,194 @@
+"""Google Calendar API client shared by the calendar endpoints.
+
+Each calendar endpoint used to import googleapiclient and call
+``build('calendar', 'v3', credentials=...)`` per request, re-parsing the
+~130KB discovery document and opening a fresh HTTP connection every
+time. Here the Calendar service is built once per process from the
+static discovery document bundled with googleapiclient (imported lazily,
+so app startup doesn't pay for it), and request objects are executed
+with a per-user authorized HTTP client that is kept between requests.
+
+Access tokens are refreshed before they expire (within
+TOKEN_REFRESH_MARGIN) rather than after a 401, and refreshed tokens are
+written back to the user row so other workers pick them up.
+
+GOOGLE_API_ROOT and GOOGLE_TOKEN_URI point the client at another server,
+e.g. the local stub in benchmarks/google_stub.py.
+
+    calendar = user_calendar(current_user)
+    calendar.execute(calendar.service.events().list(calendarId=...))
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from extensions import db
+
+TOKEN_URI = os.environ.get('GOOGLE_TOKEN_URI', 'https://oauth2.googleapis.com/token')
+API_ROOT = os.environ.get('GOOGLE_API_ROOT')  # e.g. http://127.0.0.1:8099/
+CALENDAR_TIMEOUT_SECONDS = float(os.environ.get('GOOGLE_CALENDAR_TIMEOUT', 10))
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+CLIENT_CACHE_MAX_ENTRIES = 1000
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def calendar_service():
+    """The Calendar v3 service, built once per process from the static document.
+
+    Requests built from it are executed with a user's authorized HTTP
+    client, so the service itself carries no credentials and is shared.
+    """
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                import httplib2
+                from googleapiclient import discovery_cache
+                from googleapiclient.discovery import build_from_document
+                document = discovery_cache.get_static_doc('calendar', 'v3')
+                if API_ROOT:
+                    # rootUrl also decides where batch requests go
+                    document = json.loads(document)
+                    document['rootUrl'] = API_ROOT
+                    document['baseUrl'] = API_ROOT + document['servicePath']
+                # Placeholder transport; every call passes its own http
+                _service = build_from_document(document, http=httplib2.Http())
+    return _service
+
+
+class UserCalendar:
+    """Credentials and a keep-alive HTTP client for one user's calendar"""
+
+    def __init__(self, user_id, token, refresh_token, client_id, client_secret):
+        import google_auth_httplib2
+        import httplib2
+        from google.oauth2.credentials import Credentials
+
+        self.user_id = user_id
+        self.refresh_token = refresh_token
+        self.credentials = Credentials(
+            token=token,
+            refresh_token=refresh_token,
+            token_uri=TOKEN_URI,
+            client_id=client_id,
+            client_secret=client_secret
+        )
+        self._http = httplib2.Http(timeout=CALENDAR_TIMEOUT_SECONDS)
+        self.authorized_http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=self._http)
+        # httplib2 connections are not thread-safe
+        self._lock = threading.Lock()
+
+    @property
+    def service(self):
+        return calendar_service()
+
+    def _needs_refresh(self):
+        if not self.refresh_token:
+            return False
+        # Stored tokens carry no expiry; refresh once so it becomes known
+        expiry = self.credentials.expiry
+        return expiry is None or expiry - TOKEN_REFRESH_MARGIN <= datetime.utcnow()
+
+    def _refresh_if_needed(self):
+        if self._needs_refresh():
+            import google_auth_httplib2
+            self.credentials.refresh(google_auth_httplib2.Request(self._http))
+
+    def execute(self, request):
+        """Execute a request built from ``self.service`` as this user.
+
+        Raises google.auth.exceptions.RefreshError when the grant has been
+        revoked, as the credentials did before.
+        """
+        with self._lock:
+            token = self.credentials.token
+            self._refresh_if_needed()
+            result = request.execute(http=self.authorized_http)
+            # Also catches a refresh done by AuthorizedHttp after a 401
+            if self.credentials.token != token:
+                save_access_token(self.user_id, self.credentials.token)
+            return result
+
+    def authorize(self, request):
+        """Attach fresh credentials to ``request`` for a batch (see freebusy.py)"""
+        with self._lock:
+            token = self.credentials.token
+            self._refresh_if_needed()
+            if self.credentials.token != token:
+                save_access_token(self.user_id, self.credentials.token)
+        request.http = self.authorized_http
+        return request
+
+
+def save_access_token(user_id, token):
+    """Persist a refreshed access token outside the request's transaction"""
+    if user_id is None:
+        return
+    from models import User
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(
+                User.__table__.update().where(User.__table__.c.id == user_id)
+                .values(google_calendar_token=token)
+            )
+    except Exception as e:
+        print(f"⚠️  Warning: Could not save refreshed calendar token for user {user_id}: {e}")
+
+
+class CalendarClientCache:
+    """Per-process LRU of UserCalendar objects keyed by user id"""
+
+    def __init__(self, max_entries=CLIENT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, user_id, refresh_token):
+        with self._lock:
+            calendar = self._entries.get(user_id)
+            # A reconnect issues a new refresh token; don't reuse the old grant
+            if calendar is None or calendar.refresh_token != refresh_token:
+                return None
+            self._entries.move_to_end(user_id)
+            return calendar
+
+    def set(self, user_id, calendar):
+        with self._lock:
+            self._entries[user_id] = calendar
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def forget(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+calendar_clients = CalendarClientCache()
+
+
+def user_calendar(user, token=None, refresh_token=None):
+    """Cached UserCalendar for ``user``; tokens default to the stored ones"""
+    token = token or user.google_calendar_token
+    refresh_token = refresh_token or user.google_calendar_refresh_token
+    calendar = calendar_clients.get(user.id, refresh_token) if user.id else None
+    if calendar is None:
+        calendar = UserCalendar(
+            user.id, token, refresh_token,
+            current_app.config['GOOGLE_CLIENT_ID'],
+            current_app.config['GOOGLE_CLIENT_SECRET']
+        )
+        if user.id:
+            calendar_clients.set(user.id, calendar)
+    return calendar
+
+
+def forget_user_calendar(user_id):
+    """Drop a user's cached client, e.g. when they disconnect their calendar"""
+    calendar_clients.forget(user_id)
@@ -0,0 +1,55 @@
+"""gunicorn settings for production (``gunicorn -c gunicorn.conf.py wsgi:app``).
+
+Everything is overridable from the environment:
+
+* WEB_CONCURRENCY       - worker processes (default 2 x CPUs + 1)
+* GUNICORN_WORKER_CLASS - sync, gthread (default) or gevent
+* GUNICORN_THREADS      - threads per gthread worker (default 4)
+* GUNICORN_TIMEOUT      - seconds a worker may stay silent before it is killed
+* GUNICORN_MAX_REQUESTS - recycle a worker after this many requests (0 disables)
+
+Request handlers block on Stripe (the client's default network timeout
+is 80s) and Daily.co, so the worker and graceful timeouts leave room
+for one of those calls to finish rather than killing it mid-payment.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4)) if worker_class == 'gthread' else 1
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 200))  # gevent only
+
+# Create the app once in the master: the search, semantic and autocomplete
+# indexes are built a single time and shared copy-on-write by the workers
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+# Recycle workers to bound slow memory growth; jitter staggers restarts
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 90))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 90))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+forwarded_allow_ips = '*'
+
+if worker_class == 'gevent':
+    # Must patch before app.py (and its DB/HTTP clients) are imported
+    from gevent import monkey
+    monkey.patch_all()
+
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the preloaded master"""
+    if not preload_app:
+        return
+    from wsgi import app
+    from extensions import db
+    with app.app_context():
+        db.engine.dispose(close=False)
@@ -0,0 +1,172 @@
+"""Meeting room provisioning and cleanup jobs.
+
+Rooms used to be created the first time someone opened
+``/meeting/<id>``, putting a Daily.co round trip on the critical path of
+joining a call. provision_meeting_rooms now creates rooms ahead of time
+for confirmed bookings starting within PROVISION_LEAD_MINUTES, a few
+at a time on a small thread pool, and records them on the bookings with
+one bulk UPDATE, so joining is a plain database read. The join-time
+creation in views/meetings.py stays as a fallback.
+
+Rooms are created with a Daily.co ``exp`` of the booking's end plus
+ROOM_GRACE, and gc_meeting_rooms deletes them once that has passed.
+
+Booking times are stored naive in Eastern time.
+"""
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import bindparam, select, true, update
+
+import daily_client as daily
+from extensions import db
+from models import Booking
+from scheduler import scheduled_job
+
+EASTERN_TIMEZONE = timezone(timedelta(hours=-4))  # EDT (UTC-4)
+PROVISION_LEAD_MINUTES = int(os.environ.get('MEETING_PROVISION_LEAD_MINUTES', 60))
+PROVISION_BATCH_SIZE = 100
+PROVISION_CONCURRENCY = int(os.environ.get('MEETING_PROVISION_CONCURRENCY', 4))
+ROOM_GRACE = timedelta(hours=1)
+GC_BATCH_SIZE = 200
+
+
+def eastern_now():
+    return datetime.now(EASTERN_TIMEZONE).replace(tzinfo=None)
+
+
+def room_expires_at(end_time):
+    """When a booking's room stops being useful (naive Eastern)"""
+    return end_time.replace(tzinfo=None) + ROOM_GRACE
+
+
+def room_properties(expires_at):
+    """Daily.co room properties: the room refuses joins after expiry"""
+    return {'exp': int(expires_at.replace(tzinfo=EASTERN_TIMEZONE).timestamp())}
+
+
+def room_name(booking_id, start_time):
+    """Daily.co room name for a booking, the same on every host whatever its TZ"""
+    return f"droply-{booking_id}-{int(start_time.replace(tzinfo=EASTERN_TIMEZONE).timestamp())}"
+
+
+def _create_room(booking_id, start_time, expires_at):
+    """(booking id, room name, url) for one booking, or None if Daily.co failed"""
+    if not daily.is_configured():
+        # Same shape as create_simple_meeting_room, without the API
+        name = f"droply-{booking_id}-{uuid.uuid4().hex[:8]}"
+        return booking_id, name, f"/meeting-room/{name}"
+    # Named by booking and start, so a retried create finds the same room
+    name = room_name(booking_id, start_time)
+    try:
+        room = daily.daily_client().create_room(name, room_properties(expires_at))
+    except daily.DailyUnavailable:
+        return None  # reported once per batch by the caller
+    except daily.DailyError as e:
+        print(f"[Meetings] Could not pre-create room for booking {booking_id}: {e}")
+        return None
+    return booking_id, room.get('name', name), room.get('url')
+
+
+def provision_meeting_rooms(now=None, lead=None, batch_size=PROVISION_BATCH_SIZE):
+    """Create rooms for confirmed bookings starting soon; returns how many were recorded"""
+    now = now or eastern_now()
+    lead = lead or timedelta(minutes=PROVISION_LEAD_MINUTES)
+    recorded = 0
+    seen = set()
+    while True:
+        # The (status, start_time) index serves this
+        rows = db.session.execute(
+            select(Booking.id, Booking.start_time, Booking.end_time).where(
+                Booking.status == 'confirmed',
+                Booking.start_time >= now - timedelta(minutes=30),
+                Booking.start_time <= now + lead,
+                Booking.meeting_room_id.is_(None),
+                Booking.id.notin_(seen) if seen else true()
+            ).order_by(Booking.start_time).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        seen.update(row.id for row in rows)
+
+        expiries = {row.id: room_expires_at(row.end_time) for row in rows}
+        with ThreadPoolExecutor(max_workers=PROVISION_CONCURRENCY) as pool:
+            created = [room for room in pool.map(
+                lambda row: _create_room(row.id, row.start_time, expiries[row.id]), rows
+            ) if room]
+        if len(created) < len(rows):
+            print(f"[Meetings] {len(rows) - len(created)} rooms not pre-created; they will be created on join")
+
+        if created:
+            # One executemany; a room created on join in the meantime wins
+            table = Booking.__table__
+            result = db.session.execute(
+                update(table)
+                .where(table.c.id == bindparam('b_id'), table.c.meeting_room_id.is_(None))
+                .values(meeting_room_id=bindparam('b_room'), meeting_url=bindparam('b_url'),
+                        meeting_room_expires_at=bindparam('b_expires')),
+                [
+                    {'b_id': booking_id, 'b_room': room_name, 'b_url': url, 'b_expires': expiries[booking_id]}
+                    for booking_id, room_name, url in created
+                ]
+            )
+            db.session.commit()
+            # Not every driver reports rowcounts for executemany
+            sane = db.engine.dialect.supports_sane_multi_rowcount
+            recorded += result.rowcount if sane else len(created)
+        if len(rows) < batch_size or len(created) < len(rows):
+            break
+    return recorded
+
+
+def gc_meeting_rooms(now=None, batch_size=GC_BATCH_SIZE):
+    """Delete expired Daily.co rooms; returns how many bookings were cleaned up"""
+    now = now or eastern_now()
+    rows = db.session.execute(
+        select(Booking.id, Booking.meeting_room_id).where(
+            Booking.meeting_room_expires_at < now,
+            Booking.meeting_room_deleted_at.is_(None),
+            Booking.meeting_room_id.isnot(None)
+        ).limit(batch_size)
+    ).all()
+    if not rows:
+        return 0
+
+    deleted_ids = []
+    for row in rows:
+        if daily.is_configured():
+            try:
+                daily.daily_client().delete_room(row.meeting_room_id)
+            except daily.DailyUnavailable as e:
+                print(f"[Meetings] Stopping room cleanup, Daily.co unavailable: {e}")
+                break
+            except daily.DailyError as e:
+                print(f"[Meetings] Could not delete room {row.meeting_room_id}: {e}")
+                continue
+        deleted_ids.append(row.id)
+
+    if deleted_ids:
+        db.session.execute(
+            update(Booking).where(Booking.id.in_(deleted_ids)).values(meeting_room_deleted_at=now),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.commit()
+    return len(deleted_ids)
+
+
+@scheduled_job('provision_meeting_rooms', minutes=1)
+def provision_meeting_rooms_job():
+    started = time.perf_counter()
+    recorded = provision_meeting_rooms()
+    if recorded:
+        print(f"[Meetings] Pre-created {recorded} meeting rooms in "
+              f"{(time.perf_counter() - started) * 1000:.0f}ms")
+    return recorded
+
+
+@scheduled_job('gc_meeting_rooms', minutes=30)
+def gc_meeting_rooms_job():
+    return gc_meeting_rooms()
@@ -0,0 +1,173 @@
+"""Versioned schema migrations.
+
+db.create_all() creates missing tables but never alters existing ones, so
+columns and indexes added after a database was created have to be applied
+in place. Each migration below is a function registered with a version
+number; the versions already applied are recorded in the
+``schema_migrations`` table and anything newer runs in order, one
+transaction per migration, at startup or via ``flask db-upgrade``.
+
+Migrations must be idempotent - a fresh database gets the same columns and
+indexes from create_all() before they run, so they check before creating.
+"""
+from datetime import datetime
+
+import click
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+
+from extensions import db
+
+SCHEMA_MIGRATIONS_TABLE = 'schema_migrations'
+
+_metadata = MetaData()
+schema_migrations = Table(
+    SCHEMA_MIGRATIONS_TABLE, _metadata,
+    Column('version', Integer, primary_key=True),
+    Column('description', String(200), nullable=False),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+# version -> (description, function(connection))
+MIGRATIONS = {}
+
+
+def migration(version, description):
+    """Register a migration function under a version number"""
+    def register(fn):
+        if version in MIGRATIONS:
+            raise ValueError(f"Duplicate migration version {version}")
+        MIGRATIONS[version] = (description, fn)
+        return fn
+    return register
+
+
+def _create_indexes(conn, table, *names):
+    """Create the named indexes of a model's table, if missing.
+
+    Each migration names only the indexes it introduces: the model holds
+    every index up to the latest version, and a later one may be on a
+    column an earlier migration has not added yet.
+    """
+    indexes = {index.name: index for index in table.indexes}
+    for name in names:
+        indexes[name].create(bind=conn, checkfirst=True)
+
+
+@migration(1, 'Add user.category and its browse index')
+def _add_user_category(conn):
+    from models import User
+    columns = {column['name'] for column in inspect(conn).get_columns('user')}
+    if 'category' not in columns:
+        conn.execute(text('ALTER TABLE "user" ADD COLUMN category VARCHAR(32)'))
+    _create_indexes(conn, User.__table__, 'ix_user_category_available')
+
+
+@migration(2, 'Add composite indexes for Booking lookups')
+def _add_booking_indexes(conn):
+    from models import Booking
+    _create_indexes(conn, Booking.__table__,
+                    'ix_booking_provider_status_start', 'ix_booking_user_payment_start',
+                    'ix_booking_provider_payment_start', 'ix_booking_status_end')
+
+
+@migration(3, 'Add availability_exception.google_event_id for incremental calendar sync')
+def _add_exception_event_id(conn):
+    from models import AvailabilityException
+    columns = {column['name'] for column in inspect(conn).get_columns('availability_exception')}
+    if 'google_event_id' not in columns:
+        conn.execute(text('ALTER TABLE availability_exception ADD COLUMN google_event_id VARCHAR(255)'))
+    _create_indexes(conn, AvailabilityException.__table__, 'ix_availability_exception_user_event')
+
+
+@migration(4, 'Add background sync queue columns to calendar_sync_state')
+def _add_calendar_sync_queue(conn):
+    from models import CalendarSyncState
+    columns = {column['name'] for column in inspect(conn).get_columns('calendar_sync_state')}
+    for name, ddl in [
+        ('status', 'VARCHAR(20)'),
+        ('next_sync_at', 'TIMESTAMP'),
+        ('sync_started_at', 'TIMESTAMP'),
+        ('attempts', 'INTEGER DEFAULT 0'),
+        ('last_error', 'TEXT'),
+    ]:
+        if name not in columns:
+            conn.execute(text(f'ALTER TABLE calendar_sync_state ADD COLUMN {name} {ddl}'))
+    _create_indexes(conn, CalendarSyncState.__table__, 'ix_calendar_sync_state_next_sync')
+
+
+@migration(5, 'Add Booking meeting room expiry columns and provisioning indexes')
+def _add_meeting_room_expiry(conn):
+    from models import Booking
+    columns = {column['name'] for column in inspect(conn).get_columns('booking')}
+    for name in ['meeting_room_expires_at', 'meeting_room_deleted_at']:
+        if name not in columns:
+            conn.execute(text(f'ALTER TABLE booking ADD COLUMN {name} TIMESTAMP'))
+    _create_indexes(conn, Booking.__table__, 'ix_booking_status_start', 'ix_booking_room_expires')
+
+
+@migration(6, 'Add user.stripe_account_id index for Connect account webhooks')
+def _add_user_stripe_account_index(conn):
+    from models import User
+    _create_indexes(conn, User.__table__, 'ix_user_stripe_account')
+
+
+@migration(7, 'Add payout.payout_window for scheduled payouts')
+def _add_payout_window(conn):
+    from models import Payout
+    columns = {column['name'] for column in inspect(conn).get_columns('payout')}
+    if 'payout_window' not in columns:
+        conn.execute(text('ALTER TABLE payout ADD COLUMN payout_window VARCHAR(32)'))
+    _create_indexes(conn, Payout.__table__, 'ix_payout_user_window')
+
+
+def applied_versions(conn):
+    return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def pending_migrations():
+    """Sorted (version, description) pairs not yet applied"""
+    with db.engine.begin() as conn:
+        schema_migrations.create(bind=conn, checkfirst=True)
+        applied = applied_versions(conn)
+    return [(version, MIGRATIONS[version][0]) for version in sorted(MIGRATIONS) if version not in applied]
+
+
+def run_migrations():
+    """Apply every pending migration in version order; returns how many ran"""
+    applied = 0
+    for version, description in pending_migrations():
+        fn = MIGRATIONS[version][1]
+        with db.engine.begin() as conn:
+            # Another worker may have applied it since we looked
+            if version in applied_versions(conn):
+                continue
+            fn(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=version, description=description, applied_at=datetime.utcnow()
+            ))
+        print(f"[Migrations] Applied {version}: {description}")
+        applied += 1
+    return applied
+
+
+def init_migrations(app):
+    """Bring the schema up to date at startup and register the migration CLI"""
+    with app.app_context():
+        try:
+            run_migrations()
+        except Exception as e:
+            print(f"⚠️  Warning: Could not apply schema migrations: {e}")
+
+    @app.cli.command('db-upgrade')
+    def db_upgrade_command():
+        """Apply pending schema migrations."""
+        count = run_migrations()
+        click.echo(f"Applied {count} migration(s)")
+
+    @app.cli.command('db-status')
+    def db_status_command():
+        """List schema migrations and whether they have been applied."""
+        pending = {version for version, _ in pending_migrations()}
+        for version in sorted(MIGRATIONS):
+            state = 'pending' if version in pending else 'applied'
+            click.echo(f"{version:>4}  {state:<8} {MIGRATIONS[version][0]}")
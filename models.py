@@ -5,9 +5,25 @@ from datetime import datetime, timezone, timedelta
 
 # Configure timezone to Eastern Time
 EASTERN_TIMEZONE = timezone(timedelta(hours=-4))  # EDT (UTC-4)
-from sqlalchemy import func
+from sqlalchemy import func, event
+from categories import categorize_user
+from semantic_search import embed_user, vector_to_blob, blob_to_vector
+from sqlalchemy.orm import deferred, load_only, undefer_group
+from types import SimpleNamespace
 import json
-# import numpy as np
+
+# Deferred column groups on User. List views never load them; accessing any
+# column in a group loads the whole group in one query, and detail views
+# undefer a group up front with User.detail_options().
+PROFILE_TEXT_GROUP = 'profile_text'  # long free-text profile fields
+OAUTH_GROUP = 'oauth_tokens'  # Google Calendar credentials
+EMBEDDING_GROUP = 'embedding'  # semantic search vector
+
+# Columns a profile card (discover grid, browse, homepage) renders
+CARD_COLUMNS = [
+    'id', 'username', 'full_name', 'profession', 'skills', 'location', 'hourly_rate',
+    'rating', 'profile_picture', 'is_featured_user', 'category',
+]
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -16,7 +32,7 @@ class User(UserMixin, db.Model):
     password_hash = db.Column(db.String(256))
     full_name = db.Column(db.String(100))
     phone = db.Column(db.String(20))
-    bio = db.Column(db.Text)
+    bio = deferred(db.Column(db.Text), group=PROFILE_TEXT_GROUP)
     industry = db.Column(db.String(100))
     profession = db.Column(db.String(100))
     skills = db.Column(db.String(200))  # Legacy field - keeping for backward compatibility
@@ -32,7 +48,7 @@ class User(UserMixin, db.Model):
     is_available = db.Column(db.Boolean, default=True)
     is_featured_user = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.now(EASTERN_TIMEZONE))
-    specialty_tags = db.Column(db.Text)  # JSON string of specialty tags
+    specialty_tags = deferred(db.Column(db.Text), group=PROFILE_TEXT_GROUP)  # JSON string of specialty tags
     profile_picture = db.Column(db.String(255))  # Path to profile picture
     background_color = db.Column(db.String(7), default='#f7faff')  # Hex color code
     primary_color = db.Column(db.String(7), default='#667eea')  # Primary brand color
@@ -40,8 +56,8 @@ class User(UserMixin, db.Model):
     font_family = db.Column(db.String(50), default='Inter')  # Font family preference
     font_size = db.Column(db.Integer, default=16)  # Font size preference
     profile_layout = db.Column(db.String(20), default='modern')  # Layout preference
-    donation_text = db.Column(db.Text)  # Text for donation/booking info
-    embedding = db.Column(db.LargeBinary)  # Store numpy array as binary
+    donation_text = deferred(db.Column(db.Text), group=PROFILE_TEXT_GROUP)  # Text for donation/booking info
+    embedding = deferred(db.Column(db.LargeBinary), group=EMBEDDING_GROUP)  # float32 vector, see semantic_search.py
     # Social media URLs
     linkedin_url = db.Column(db.String(200))
     twitter_url = db.Column(db.String(200))
@@ -67,15 +83,15 @@ class User(UserMixin, db.Model):
     email_notifications = db.Column(db.Boolean, default=True)  # Email notifications preference
     
     # Content and service fields
-    service_description = db.Column(db.Text)  # Description of 1-on-1 sessions
+    service_description = deferred(db.Column(db.Text), group=PROFILE_TEXT_GROUP)  # Description of 1-on-1 sessions
     session_duration = db.Column(db.Integer, default=30)  # Session duration in minutes
-    content_description = db.Column(db.Text)  # Description of premium content
+    content_description = deferred(db.Column(db.Text), group=PROFILE_TEXT_GROUP)  # Description of premium content
     content_categories = db.Column(db.String(200))  # Categories of content offered
     
     # Google Calendar integration
     google_calendar_connected = db.Column(db.Boolean, default=False)  # Whether user has connected Google Calendar
-    google_calendar_token = db.Column(db.Text)  # Encrypted Google Calendar access token
-    google_calendar_refresh_token = db.Column(db.Text)  # Encrypted Google Calendar refresh token
+    google_calendar_token = deferred(db.Column(db.Text), group=OAUTH_GROUP)  # Encrypted Google Calendar access token
+    google_calendar_refresh_token = deferred(db.Column(db.Text), group=OAUTH_GROUP)  # Encrypted Google Calendar refresh token
     google_calendar_id = db.Column(db.String(100))  # Primary Google Calendar ID to sync with
 
     # Referral system fields
@@ -84,6 +100,24 @@ class User(UserMixin, db.Model):
     total_referral_earnings = db.Column(db.Float, default=0.0)  # Total earnings from referrals
     referral_count = db.Column(db.Integer, default=0)  # Number of successful referrals
 
+    # Browse category, derived from profession and skills on every save
+    category = db.Column(db.String(32))
+
+    __table_args__ = (
+        db.Index('ix_user_category_available', 'category', 'is_available'),
+        db.Index('ix_user_stripe_account', 'stripe_account_id'),
+    )
+
+    @classmethod
+    def card_options(cls, *extra_columns):
+        """Loader option for list views: card columns only, everything else deferred"""
+        return load_only(*(getattr(cls, column) for column in CARD_COLUMNS + list(extra_columns)))
+
+    @classmethod
+    def detail_options(cls):
+        """Loader option for profile pages: undefer the long profile text"""
+        return undefer_group(PROFILE_TEXT_GROUP)
+
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
     
@@ -99,14 +133,13 @@ class User(UserMixin, db.Model):
         self.specialty_tags = json.dumps(tags)
     
     def set_embedding(self, embedding_array):
-        """Store numpy array as binary - Temporarily disabled"""
-        # self.embedding = embedding_array.tobytes()
-        pass
+        """Store a sequence of floats as a float32 binary blob"""
+        self.embedding = vector_to_blob(embedding_array)
     
     def get_embedding(self):
-        """Retrieve numpy array from binary - Temporarily disabled"""
-        # if self.embedding:
-        #     return np.frombuffer(self.embedding, dtype=np.float32)
+        """Retrieve the float32 embedding as an array('f'), or None"""
+        if self.embedding:
+            return blob_to_vector(self.embedding)
         return None
     
     def get_location_display(self):
@@ -136,11 +169,42 @@ class User(UserMixin, db.Model):
         from flask import url_for
         if not self.referral_code:
             self.generate_referral_code()
-        return f"{url_for('homepage', _external=True)}?ref={self.referral_code}"
+        return f"{url_for('main.homepage', _external=True)}?ref={self.referral_code}"
 
     def __repr__(self):
         return f'<User {self.username}>'
 
+def flush_field_values(connection, target, fields):
+    """Read fields of a User being flushed without lazy-loading through the session.
+
+    Deferred columns that were never loaded are fetched on the flush's own
+    connection, which is the safe way to read them inside mapper events.
+    """
+    state = db.inspect(target)
+    values = {field: getattr(target, field) for field in fields if field not in state.unloaded}
+    missing = [field for field in fields if field not in values]
+    if missing and not state.pending:
+        row = connection.execute(
+            db.select(*(getattr(User, field) for field in missing)).where(User.id == target.id)
+        ).first()
+        values.update(zip(missing, row or [None] * len(missing)))
+    return SimpleNamespace(**{field: values.get(field) for field in fields})
+
+# Only profession and skills feed the rules, so bio edits leave the category alone
+CATEGORY_FIELDS = ['profession', 'skills']
+
+@event.listens_for(User, 'before_insert')
+@event.listens_for(User, 'before_update')
+def _assign_user_category(mapper, connection, target):
+    """Keep User.category in sync with the profile fields it is derived from"""
+    state = db.inspect(target)
+    if state.pending or any(state.attrs[field].history.has_changes() for field in CATEGORY_FIELDS):
+        target.category = categorize_user(flush_field_values(connection, target, CATEGORY_FIELDS))
+
+# Re-embed profiles for semantic search when their text changes
+event.listen(User, 'before_insert', embed_user)
+event.listen(User, 'before_update', embed_user)
+
 class Favorite(db.Model):
     """Track user favorites - which users users have favorited"""
     id = db.Column(db.Integer, primary_key=True)
@@ -196,11 +260,17 @@ class AvailabilityException(db.Model):
     end = db.Column(db.DateTime, nullable=False)
     reason = db.Column(db.String(255))
     is_blocked = db.Column(db.Boolean, default=True)  # True = blocked time, False = available time
+    google_event_id = db.Column(db.String(255))  # Set for blocks synced from Google Calendar
     created_at = db.Column(db.DateTime, default=datetime.now(EASTERN_TIMEZONE))
     
     # Relationships
     user = db.relationship('User', backref='availability_exceptions')
     
+    __table_args__ = (
+        # Calendar sync upserts by event id
+        db.Index('ix_availability_exception_user_event', 'user_id', 'google_event_id', unique=True),
+    )
+    
     def __repr__(self):
         return f'<AvailabilityException {self.start}-{self.end} ({self.reason})>'
 
@@ -229,7 +299,23 @@ class Booking(db.Model):
     meeting_ended_at = db.Column(db.DateTime)  # When the meeting ended
     meeting_duration = db.Column(db.Integer)  # Actual meeting duration in minutes
     recording_url = db.Column(db.String(500))  # URL to meeting recording if available
-    
+    meeting_room_expires_at = db.Column(db.DateTime)  # Daily.co room expiry (see meeting_jobs.py)
+    meeting_room_deleted_at = db.Column(db.DateTime)  # When the expired room was deleted
+    
+    __table_args__ = (
+        # Slot generation, conflict checks and provider earnings
+        db.Index('ix_booking_provider_status_start', 'provider_id', 'status', 'start_time'),
+        # Client and expert booking lists (paid bookings by start time)
+        db.Index('ix_booking_user_payment_start', 'user_id', 'payment_status', 'start_time'),
+        db.Index('ix_booking_provider_payment_start', 'provider_id', 'payment_status', 'start_time'),
+        # update_past_bookings
+        db.Index('ix_booking_status_end', 'status', 'end_time'),
+        # Meeting room provisioning and garbage collection; existing databases
+        # get these from migration 5, after it adds the room expiry columns
+        db.Index('ix_booking_status_start', 'status', 'start_time'),
+        db.Index('ix_booking_room_expires', 'meeting_room_expires_at'),
+    )
+
     # Relationships
     user = db.relationship('User', foreign_keys=[user_id], backref='bookings_as_user')
     provider = db.relationship('User', foreign_keys=[provider_id], backref='bookings_as_provider')
@@ -304,10 +390,16 @@ class Payout(db.Model):
     status = db.Column(db.String(20), default='pending')  # pending, paid, failed
     created_at = db.Column(db.DateTime, default=datetime.now(EASTERN_TIMEZONE))
     paid_at = db.Column(db.DateTime)  # When payout was actually paid
+    payout_window = db.Column(db.String(32))  # e.g. 'weekly:2026-W42' for scheduled payouts (scheduled_payouts.py)
     
     # Relationships
     user = db.relationship('User', backref='payouts')
     
+    __table_args__ = (
+        # One scheduled payout per user and schedule window
+        db.Index('ix_payout_user_window', 'user_id', 'payout_window', unique=True),
+    )
+    
     def __repr__(self):
         return f'<Payout {self.id} - ${self.amount/100:.2f} - {self.status}>'
 
@@ -496,3 +588,128 @@ class AIMatch(db.Model):
         return f'<AIMatch {self.id} - User {self.user_id} matched with User {self.matched_user_id} (score: {self.match_score})>'
 
 
+
+
+class JobRun(db.Model):
+    """History of scheduled job executions (see scheduler.py)"""
+    id = db.Column(db.Integer, primary_key=True)
+    job_name = db.Column(db.String(100), nullable=False)
+    worker = db.Column(db.String(100))  # host:pid of the scheduler leader
+    status = db.Column(db.String(20), default='running')  # running, success, failed
+    started_at = db.Column(db.DateTime, nullable=False)
+    finished_at = db.Column(db.DateTime)
+    duration_ms = db.Column(db.Integer)
+    rows_affected = db.Column(db.Integer)
+    error = db.Column(db.Text)
+
+    __table_args__ = (
+        db.Index('ix_job_run_name_started', 'job_name', 'started_at'),
+    )
+
+    def __repr__(self):
+        return f'<JobRun {self.id} - {self.job_name} ({self.status})>'
+
+
+class CalendarSyncState(db.Model):
+    """Incremental Google Calendar sync position for a user (see calendar_sync.py)"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    calendar_id = db.Column(db.String(255))  # Calendar the sync token belongs to
+    sync_token = db.Column(db.Text)  # nextSyncToken from the last completed sync
+    last_synced_at = db.Column(db.DateTime)
+    last_full_sync_at = db.Column(db.DateTime)
+    # Background sync queue (see calendar_queue.py)
+    status = db.Column(db.String(20))  # queued, syncing, ok, failed, idle
+    next_sync_at = db.Column(db.DateTime)  # When the calendar is next due
+    sync_started_at = db.Column(db.DateTime)  # When the current claim was taken
+    attempts = db.Column(db.Integer, default=0)  # Consecutive failures
+    last_error = db.Column(db.Text)
+
+    __table_args__ = (
+        db.Index('ix_calendar_sync_state_next_sync', 'next_sync_at'),
+    )
+
+    def __repr__(self):
+        return f'<CalendarSyncState {self.user_id} ({self.calendar_id})>'
+
+
+class StripeEvent(db.Model):
+    """Stripe webhook event, stored on receipt and processed in the background (see stripe_events.py)"""
+    id = db.Column(db.String(255), primary_key=True)  # Stripe event ID (evt_...)
+    type = db.Column(db.String(100), nullable=False)
+    account = db.Column(db.String(100))  # Connect account the event came from, if any
+    payload = db.Column(db.Text, nullable=False)  # Raw event JSON as Stripe sent it
+    status = db.Column(db.String(20), default='received')  # received, processing, processed, failed
+    attempts = db.Column(db.Integer, default=0)
+    received_at = db.Column(db.DateTime, nullable=False)
+    processing_started_at = db.Column(db.DateTime)  # When the current claim was taken
+    next_attempt_at = db.Column(db.DateTime)  # When a failed event is retried
+    processed_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+
+    __table_args__ = (
+        db.Index('ix_stripe_event_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+    def __repr__(self):
+        return f'<StripeEvent {self.id} - {self.type} ({self.status})>'
+
+
+class EarningsEntry(db.Model):
+    """Append-only provider earnings ledger (see earnings_ledger.py)"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)  # The provider
+    kind = db.Column(db.String(20), nullable=False)  # payment, earned, refund, payout, payout_reversal
+    entry_key = db.Column(db.String(100), nullable=False, unique=True)  # e.g. payment:booking:12
+    booking_id = db.Column(db.Integer, db.ForeignKey('booking.id'))
+    payout_id = db.Column(db.Integer, db.ForeignKey('payout.id'))
+    gross_amount = db.Column(db.Float, default=0.0)  # Change to total_earnings (before platform fees)
+    amount = db.Column(db.Float, nullable=False)  # Change to pending_balance
+    balance_after = db.Column(db.Float, nullable=False)  # pending_balance after this entry
+    earnings_after = db.Column(db.Float, nullable=False)  # total_earnings after this entry
+    payouts_after = db.Column(db.Float, nullable=False)  # total_payouts after this entry
+    created_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_earnings_entry_user_created', 'user_id', 'created_at'),
+    )
+
+    def __repr__(self):
+        return f'<EarningsEntry {self.id} - {self.kind} ${self.amount:.2f} (user {self.user_id})>'
+
+
+class StripeAccountState(db.Model):
+    """Cached Stripe Connect account state (see stripe_accounts.py)"""
+    account_id = db.Column(db.String(100), primary_key=True)  # Stripe Connect account ID (acct_...)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    charges_enabled = db.Column(db.Boolean, default=False)
+    payouts_enabled = db.Column(db.Boolean, default=False)
+    details_submitted = db.Column(db.Boolean, default=False)
+    disabled_reason = db.Column(db.String(100))  # requirements.disabled_reason, if Stripe restricted it
+    external_account_id = db.Column(db.String(100))  # Default bank account or card for payouts
+    bank_name = db.Column(db.String(100))
+    last4 = db.Column(db.String(4))
+    stripe_updated_at = db.Column(db.Integer)  # Unix time of the newest Stripe data applied
+    synced_at = db.Column(db.DateTime)  # When the state was last written
+
+    __table_args__ = (
+        db.Index('ix_stripe_account_state_user', 'user_id'),
+        db.Index('ix_stripe_account_state_synced', 'synced_at'),
+    )
+
+    def __repr__(self):
+        return f'<StripeAccountState {self.account_id} (user {self.user_id})>'
+
+
+class EarningsDay(db.Model):
+    """Per-user daily payout totals, kept current on every Payout change (see earnings_stats.py)"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)  # Payout.created_at date
+    paid_amount = db.Column(db.Float, default=0.0)  # In cents, like Payout.amount
+    paid_count = db.Column(db.Integer, default=0)
+    pending_amount = db.Column(db.Float, default=0.0)
+    pending_count = db.Column(db.Integer, default=0)
+    failed_amount = db.Column(db.Float, default=0.0)
+    failed_count = db.Column(db.Integer, default=0)
+
+    def __repr__(self):
+        return f'<EarningsDay {self.user_id} {self.day}>'
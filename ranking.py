@@ -0,0 +1,93 @@
+"""SQL-side ranking and keyset pagination for /discover.
+
+The old ai_match_score ran in Python over every matching expert. Here the
+same ordering - featured experts first, then search relevance, then
+experts with a rate set - is a sort key evaluated by the database, and
+pages are fetched with a keyset cursor (the sort key of the last row
+served), so each request reads one page no matter how large the catalog is.
+"""
+import base64
+import json
+import math
+
+from sqlalchemy import case, literal, tuple_
+
+from models import User
+
+DISCOVER_PAGE_SIZE = 24
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def _is_flag(value):
+    return type(value) is int and value in (0, 1)
+
+
+def _is_number(value):
+    return type(value) in (int, float) and math.isfinite(value)
+
+
+def decode_cursor(cursor):
+    """Parse a cursor from the client; returns None if it is missing or malformed.
+
+    The cursor comes back from the client, so each element is checked
+    against the sort key: featured flag, relevance, has-rate flag, user id.
+    """
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != 4:
+        return None
+    featured, relevance, has_rate, user_id = values
+    if not (_is_flag(featured) and _is_number(relevance) and _is_flag(has_rate) and type(user_id) is int):
+        return None
+    return values
+
+
+class DiscoverRanking:
+    """Orders a User query by the discover sort key and pages through it.
+
+    ``rankings`` are ranked ``(user_id, rank)`` subqueries from the search
+    backend (see fulltext.py); each is joined in and their ranks summed
+    into the relevance component.
+    """
+
+    def __init__(self, query, rankings=()):
+        relevance = literal(0.0)
+        for ranked in rankings:
+            if ranked is None:
+                continue
+            query = query.join(ranked, ranked.c.user_id == User.id)
+            relevance = relevance + ranked.c.rank
+
+        # Every component sorts descending so the key compares as one tuple
+        self.sort_key = [
+            case((User.is_featured_user == True, 1), else_=0),
+            relevance,
+            case((User.hourly_rate > 0, 1), else_=0),
+            User.id,
+        ]
+        self.query = query.add_columns(*self.sort_key).order_by(
+            *(expression.desc() for expression in self.sort_key)
+        )
+
+    def page(self, cursor=None, page_size=DISCOVER_PAGE_SIZE):
+        """Return (users, next_cursor); next_cursor is None on the last page"""
+        query = self.query
+        after = decode_cursor(cursor)
+        if after is not None:
+            query = query.filter(tuple_(*self.sort_key) < tuple_(*after))
+
+        # One extra row tells us whether another page exists
+        rows = query.limit(page_size + 1).all()
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        users = [row[0] for row in rows]
+        next_cursor = encode_cursor(list(rows[-1][1:])) if has_more else None
+        return users, next_cursor
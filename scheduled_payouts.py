@@ -0,0 +1,233 @@
+"""Scheduled provider payouts.
+
+Payouts used to happen only when a provider clicked "Request payout",
+one ``stripe.Payout.create`` per click; User.payout_schedule (daily,
+weekly or monthly) was stored and shown but never acted on.
+``run_scheduled_payouts`` now pays out each schedule once per window:
+
+* daily   - every day
+* weekly  - each ISO week, from PAYOUT_WEEKDAY on (0 = Monday)
+* monthly - each month, from PAYOUT_MONTH_DAY on
+
+A run selects, in one query, every provider on a due schedule with
+payouts enabled, a pending balance of at least PAYOUT_MINIMUM and no
+payout yet for that window; pending_balance is the earnings ledger's
+running balance (earnings_ledger.py). Each payout then goes through two
+steps:
+
+1. Reserve - the Payout rows (status pending, no stripe_payout_id yet)
+   are added together with their amounts and window and debited from
+   the ledger, in one transaction, before Stripe is called.
+2. Submit - the Stripe calls go out on a bounded thread pool, each with
+   the idempotency key ``payout:<Payout.id>``, and the returned payout
+   IDs are stored.
+
+Because the amount is fixed in the row before the first call, a retry
+always sends the same parameters, and Stripe returns the payout it
+already made instead of a second one. A reserved payout that was never
+confirmed - the run died, or Stripe could not be reached - is submitted
+again by the next run; Stripe keeps idempotency keys for 24 hours, so
+after SUBMIT_RETRY_WINDOW it is left for someone to check by hand
+(``flask scheduled-payouts``). A payout Stripe rejects is marked failed,
+its ledger debit reversed and its window freed, so a later run in the
+same window can try again.
+
+The "Request payout" button goes through the same two steps, with a
+``manual:<time>`` window so that an unconfirmed request is resubmitted
+like a scheduled one rather than left debited with nothing sent.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import click
+import stripe
+from sqlalchemy import and_, case, exists, func, select
+
+import earnings_ledger
+from environment import is_production_environment
+from extensions import db
+from models import Payout, User
+from scheduler import scheduled_job
+
+EASTERN_TIMEZONE = timezone(timedelta(hours=-4))  # EDT (UTC-4)
+PAYOUT_WEEKDAY = int(os.environ.get('PAYOUT_WEEKDAY', 0))
+PAYOUT_MONTH_DAY = int(os.environ.get('PAYOUT_MONTH_DAY', 1))
+PAYOUT_MINIMUM = float(os.environ.get('PAYOUT_MINIMUM', 1.00))  # dollars
+PAYOUT_CONCURRENCY = int(os.environ.get('PAYOUT_CONCURRENCY', 4))
+PAYOUT_BATCH_SIZE = 100
+DEFAULT_SCHEDULE = 'weekly'
+# Stripe forgets idempotency keys after 24 hours; stop resubmitting well before
+SUBMIT_RETRY_WINDOW = timedelta(hours=23)
+# Errors that mean Stripe did not and will not make this payout
+REJECTED_ERRORS = (stripe.error.InvalidRequestError, stripe.error.CardError, stripe.error.PermissionError)
+
+
+def _now():
+    return datetime.now(EASTERN_TIMEZONE).replace(tzinfo=None)
+
+
+def due_windows(now=None):
+    """{schedule: window} for every schedule whose window has opened"""
+    today = (now or _now()).date()
+    windows = {'daily': f'daily:{today:%Y-%m-%d}'}
+    if today.weekday() >= PAYOUT_WEEKDAY:
+        year, week, _ = today.isocalendar()
+        windows['weekly'] = f'weekly:{year}-W{week:02d}'
+    if today.day >= PAYOUT_MONTH_DAY:
+        windows['monthly'] = f'monthly:{today:%Y-%m}'
+    return windows
+
+
+def manual_window(now=None):
+    """Window for a payout the provider asked for; one per provider per second"""
+    return f'manual:{now or _now():%Y-%m-%dT%H:%M:%S}'
+
+
+def eligible_payouts(windows, after_id=0, limit=PAYOUT_BATCH_SIZE):
+    """(user_id, cents, window) owed a payout in these windows, by user id"""
+    schedule = func.coalesce(User.payout_schedule, DEFAULT_SCHEDULE)
+    window = case(windows, value=schedule)
+    query = (
+        select(User.id, User.pending_balance, window)
+        .where(
+            User.id > after_id,
+            schedule.in_(list(windows)),
+            User.stripe_account_id.isnot(None),
+            User.payout_enabled.is_(True),
+            User.pending_balance >= PAYOUT_MINIMUM,
+            ~exists().where(and_(Payout.user_id == User.id, Payout.payout_window == window)),
+        )
+        .order_by(User.id)
+        .limit(limit)
+    )
+    return [(user_id, int(round(balance * 100)), payout_window)
+            for user_id, balance, payout_window in db.session.execute(query)]
+
+
+def reserve_payouts(items, now=None):
+    """Add the Payout rows and debit the ledger before calling Stripe; returns their ids"""
+    now = now or _now()
+    records = [
+        Payout(user_id=user_id, amount=cents, currency='usd', status='pending',
+               payout_window=window, created_at=now)
+        for user_id, cents, window in items
+    ]
+    db.session.add_all(records)
+    db.session.flush()
+    for record in records:
+        earnings_ledger.record_payout(record, now)
+    db.session.commit()
+    return [record.id for record in records]
+
+
+def unsubmitted_payout_ids(now=None):
+    """Reserved payouts Stripe has not confirmed, still safe to resubmit"""
+    cutoff = (now or _now()) - SUBMIT_RETRY_WINDOW
+    return list(db.session.execute(
+        select(Payout.id).where(
+            Payout.payout_window.isnot(None),
+            Payout.stripe_payout_id.is_(None),
+            Payout.status == 'pending',
+            Payout.created_at >= cutoff,
+        ).order_by(Payout.id)
+    ).scalars())
+
+
+def _submit(submission):
+    """(payout id, stripe payout id or None, rejected) - runs on the pool, no DB access"""
+    payout_id, user_id, account_id, cents, currency = submission
+    try:
+        payout = stripe.Payout.create(
+            amount=int(cents),
+            currency=currency or 'usd',
+            stripe_account=account_id,
+            idempotency_key=f'payout:{payout_id}',
+            metadata={'payout_id': str(payout_id), 'user_id': str(user_id)},
+        )
+        return payout_id, payout['id'], False
+    except stripe.error.StripeError as e:
+        rejected = isinstance(e, REJECTED_ERRORS)
+        print(f"[Payouts] Payout {payout_id} of {cents / 100:.2f} to user {user_id} "
+              f"{'rejected' if rejected else 'not confirmed, will retry'}: {e}")
+        return payout_id, None, rejected
+
+
+def submit_payouts(payout_ids):
+    """Send reserved payouts to Stripe and store the result; returns how many Stripe accepted"""
+    if not payout_ids:
+        return 0
+    submissions = db.session.execute(
+        select(Payout.id, Payout.user_id, User.stripe_account_id, Payout.amount, Payout.currency)
+        .join(User, User.id == Payout.user_id)
+        .where(Payout.id.in_(payout_ids))
+    ).all()
+    with ThreadPoolExecutor(max_workers=PAYOUT_CONCURRENCY) as pool:
+        results = list(pool.map(_submit, submissions))
+
+    accepted = 0
+    for payout_id, stripe_payout_id, rejected in results:
+        record = db.session.get(Payout, payout_id)
+        if stripe_payout_id is not None:
+            # A webhook may have matched it by metadata first
+            record.stripe_payout_id = record.stripe_payout_id or stripe_payout_id
+            accepted += 1
+        elif rejected:
+            record.status = 'failed'
+            record.payout_window = None  # let a later run in the window try again
+            earnings_ledger.record_payout_failure(record)
+    db.session.commit()
+    return accepted
+
+
+def run_payouts(now=None):
+    """Pay out every provider due in the current windows; returns how many Stripe accepted"""
+    if not stripe.api_key or (is_production_environment() and stripe.api_key.startswith('sk_test_')):
+        return 0
+    # Anything a previous run reserved but could not confirm goes first
+    paid = submit_payouts(unsubmitted_payout_ids())
+    windows = due_windows(now)
+    after_id = 0
+    while True:
+        items = eligible_payouts(windows, after_id)
+        if not items:
+            break
+        paid += submit_payouts(reserve_payouts(items))
+        after_id = items[-1][0]
+    if paid:
+        print(f"[Payouts] Sent {paid} scheduled payout(s) for {', '.join(sorted(windows.values()))}")
+    return paid
+
+
+@scheduled_job('run_scheduled_payouts', hours=1)
+def run_scheduled_payouts():
+    return run_payouts()
+
+
+def init_scheduled_payouts(app):
+    """Register the payout CLI"""
+
+    @app.cli.command('scheduled-payouts')
+    @click.option('--dry-run', is_flag=True, help='List who would be paid without paying.')
+    def scheduled_payouts_command(dry_run):
+        """Pay out providers whose payout schedule is due."""
+        if not dry_run:
+            click.echo(f"Sent {run_payouts()} payout(s)")
+        else:
+            windows = due_windows()
+            after_id = 0
+            while True:
+                items = eligible_payouts(windows, after_id)
+                if not items:
+                    break
+                for user_id, cents, window in items:
+                    click.echo(f"user {user_id:<8} ${cents / 100:>10.2f}  {window}")
+                after_id = items[-1][0]
+        # Reserved and debited, but Stripe never confirmed them in time to retry safely
+        stuck = Payout.query.filter(
+            Payout.payout_window.isnot(None), Payout.stripe_payout_id.is_(None),
+            Payout.status == 'pending', Payout.created_at < _now() - SUBMIT_RETRY_WINDOW
+        ).order_by(Payout.id)
+        for payout in stuck:
+            click.echo(f"NEEDS CHECKING: payout {payout.id} user {payout.user_id} "
+                       f"${payout.amount / 100:.2f} {payout.payout_window} reserved {payout.created_at}")
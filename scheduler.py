@@ -0,0 +1,243 @@
+"""Periodic jobs, run by a single elected leader process.
+
+app.py used to start a BackgroundScheduler at import time, so every
+gunicorn worker ran every job. Now request workers never schedule
+anything; periodic work runs in one process started with
+``flask scheduler`` (or in-process when SCHEDULER_EMBEDDED=1, e.g. the
+dev server). Leadership is a lock held for the life of the process:
+
+* PostgreSQL - a session-level advisory lock on a dedicated connection.
+* Anything else - an exclusive flock on ``instance/scheduler.lock``.
+
+A second ``flask scheduler`` started elsewhere waits as a standby and
+takes over when the leader's lock is released. Every run is recorded in
+the JobRun table.
+
+Jobs are registered with ``@scheduled_job`` in the modules listed in
+JOB_MODULES and return the number of rows they touched (or None).
+"""
+import importlib
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta, timezone
+
+import click
+
+from extensions import db
+
+EASTERN_TIMEZONE = timezone(timedelta(hours=-4))  # EDT (UTC-4)
+
+# Modules whose @scheduled_job functions the scheduler runs
+JOB_MODULES = ['booking_jobs', 'calendar_queue', 'meeting_jobs', 'stripe_events',
+               'stripe_accounts', 'scheduled_payouts']
+ADVISORY_LOCK_KEY = 0x64726F70  # 'drop'
+LOCK_FILE_NAME = 'scheduler.lock'
+LEADER_RETRY_SECONDS = 30
+JOB_HISTORY_DAYS = 14
+
+# name -> (function, interval trigger kwargs)
+JOBS = {}
+
+
+def scheduled_job(name, **interval):
+    """Register a function to run on an interval, e.g. ``minutes=5``"""
+    def register(fn):
+        JOBS[name] = (fn, interval)
+        return fn
+    return register
+
+
+def load_jobs():
+    for module in JOB_MODULES:
+        importlib.import_module(module)
+    return JOBS
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _now():
+    return datetime.now(EASTERN_TIMEZONE).replace(tzinfo=None)
+
+
+# -- leader election -------------------------------------------------------
+
+class AdvisoryLock:
+    """PostgreSQL session advisory lock held on its own connection"""
+
+    def __init__(self, engine, key=ADVISORY_LOCK_KEY):
+        self.engine = engine
+        self.key = key
+        self._conn = None
+
+    def acquire(self):
+        from sqlalchemy import text
+        conn = self.engine.connect()
+        acquired = conn.execute(text('SELECT pg_try_advisory_lock(:key)'), {'key': self.key}).scalar()
+        # Leave the transaction so the connection can sit idle holding the lock
+        conn.commit()
+        if acquired:
+            self._conn = conn
+        else:
+            conn.close()
+        return bool(acquired)
+
+    def release(self):
+        if self._conn is not None:
+            from sqlalchemy import text
+            try:
+                self._conn.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': self.key})
+            finally:
+                self._conn.close()
+                self._conn = None
+
+
+class FileLock:
+    """Exclusive flock on a file; released by the OS if the process dies"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def acquire(self):
+        import fcntl
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        lock_file = open(self.path, 'a+')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(worker_name())
+        lock_file.flush()
+        self._file = lock_file
+        return True
+
+    def release(self):
+        if self._file is not None:
+            import fcntl
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+def leader_lock(app):
+    if db.engine.dialect.name == 'postgresql':
+        return AdvisoryLock(db.engine)
+    return FileLock(os.path.join(app.instance_path, LOCK_FILE_NAME))
+
+
+# -- job execution ---------------------------------------------------------
+
+def run_job(app, name):
+    """Run one registered job inside an app context and record a JobRun"""
+    from models import JobRun
+    fn = load_jobs()[name][0]
+    with app.app_context():
+        run = JobRun(job_name=name, worker=worker_name(), status='running', started_at=_now())
+        db.session.add(run)
+        db.session.commit()
+        run_id = run.id
+
+        started = time.perf_counter()
+        try:
+            rows = fn()
+            status, error = 'success', None
+        except Exception:
+            db.session.rollback()
+            rows, status, error = None, 'failed', traceback.format_exc()
+            print(f"[Scheduler] Job {name} failed:\n{error}")
+
+        db.session.query(JobRun).filter_by(id=run_id).update({
+            'status': status,
+            'finished_at': _now(),
+            'duration_ms': int((time.perf_counter() - started) * 1000),
+            'rows_affected': rows,
+            'error': error,
+        })
+        db.session.commit()
+        return status
+
+
+@scheduled_job('prune_job_runs', hours=24)
+def prune_job_runs():
+    """Drop job history older than JOB_HISTORY_DAYS"""
+    from models import JobRun
+    cutoff = _now() - timedelta(days=JOB_HISTORY_DAYS)
+    deleted = JobRun.query.filter(JobRun.started_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+def build_scheduler(app, scheduler_class):
+    scheduler = scheduler_class(job_defaults={'coalesce': True, 'max_instances': 1})
+    for name, (_, interval) in load_jobs().items():
+        scheduler.add_job(run_job, 'interval', args=[app, name], id=name, name=name, **interval)
+    return scheduler
+
+
+def start_embedded_scheduler(app):
+    """Run jobs on background threads of this process once it wins leadership.
+
+    A daemon thread keeps retrying the lock, so if the current leader exits
+    (e.g. a recycled worker) another embedded process takes over.
+    """
+    from apscheduler.schedulers.background import BackgroundScheduler
+
+    def lead():
+        with app.app_context():
+            lock = leader_lock(app)
+            while not lock.acquire():
+                time.sleep(LEADER_RETRY_SECONDS)
+        scheduler = build_scheduler(app, BackgroundScheduler)
+        # Keep the lock referenced for as long as the scheduler lives
+        scheduler.leader_lock = lock
+        scheduler.start()
+        print(f"[Scheduler] Leader {worker_name()} running {len(JOBS)} jobs in-process")
+
+    threading.Thread(target=lead, name='scheduler-leader', daemon=True).start()
+
+
+def init_scheduler(app):
+    """Register the scheduler CLI; start in-process only when SCHEDULER_EMBEDDED=1"""
+    if os.environ.get('SCHEDULER_EMBEDDED') == '1':
+        start_embedded_scheduler(app)
+
+    @app.cli.command('scheduler')
+    def scheduler_command():
+        """Run periodic jobs in the foreground (waits as standby if not leader)."""
+        from apscheduler.schedulers.blocking import BlockingScheduler
+        lock = leader_lock(app)
+        while not lock.acquire():
+            click.echo(f"Another scheduler holds the leader lock; retrying in {LEADER_RETRY_SECONDS}s")
+            time.sleep(LEADER_RETRY_SECONDS)
+        click.echo(f"Scheduler leader {worker_name()}: {', '.join(sorted(load_jobs()))}")
+        try:
+            build_scheduler(app, BlockingScheduler).start()
+        except (KeyboardInterrupt, SystemExit):
+            pass
+        finally:
+            lock.release()
+
+    @app.cli.command('run-job')
+    @click.argument('name')
+    def run_job_command(name):
+        """Run one scheduled job now and record it in the job history."""
+        if name not in load_jobs():
+            raise click.BadParameter(f"unknown job; choose from {', '.join(sorted(JOBS))}")
+        click.echo(f"{name}: {run_job(app, name)}")
+
+    @app.cli.command('job-history')
+    @click.option('--limit', default=20, help='Number of runs to show.')
+    def job_history_command(limit):
+        """Show the most recent scheduled job runs."""
+        from models import JobRun
+        for run in JobRun.query.order_by(JobRun.started_at.desc()).limit(limit):
+            click.echo(f"{run.started_at:%Y-%m-%d %H:%M:%S}  {run.job_name:<28} {run.status:<8} "
+                       f"{run.duration_ms or 0:>6}ms  rows={run.rows_affected}  {run.worker}")
@@ -0,0 +1,276 @@
+"""In-memory n-gram index for /api/search-suggestions.
+
+Autocomplete used to load every available User row per keystroke and
+substring-scan it in Python. This module keeps a per-process index of the
+few fields the suggestion dropdown needs, built once at startup and kept in
+sync through SQLAlchemy session events, so suggestion lookups never touch
+the database.
+
+Every REFRESH_SECONDS the index is rebuilt to pick up other workers'
+writes. The rebuild runs on a background thread, one at a time per
+process, and builds fresh postings before swapping them in, so requests
+keep searching the old index meanwhile instead of waiting on the scan.
+Commits that land while it runs are applied to the live index and also
+recorded, then replayed onto the fresh one just before the swap, so an
+edit made after the scan read its row is not lost.
+"""
+import heapq
+import random
+import threading
+import time
+from collections import namedtuple
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Grams of length 1..NGRAM_SIZE are indexed; longer queries intersect trigrams
+NGRAM_SIZE = 3
+# Full rebuild interval so other gunicorn workers' writes are picked up
+REFRESH_SECONDS = 300
+PENDING_KEY = 'search_index_pending'
+
+# Lightweight stand-in for a User row - only the fields suggestions render
+IndexedUser = namedtuple('IndexedUser', [
+    'id', 'username', 'full_name', 'profession', 'skills',
+    'location', 'hourly_rate', 'rating',
+])
+
+
+def _ngrams(text):
+    """Return every gram of length 1..NGRAM_SIZE in text"""
+    grams = set()
+    for size in range(1, NGRAM_SIZE + 1):
+        for i in range(len(text) - size + 1):
+            grams.add(text[i:i + size])
+    return grams
+
+
+def _is_indexable(user):
+    """Only available users with a name show up in suggestions"""
+    return user.full_name is not None and user.is_available == True
+
+
+def _entry_from_user(user):
+    return IndexedUser(
+        id=user.id,
+        username=user.username,
+        full_name=user.full_name,
+        profession=user.profession,
+        skills=user.skills,
+        location=user.location,
+        hourly_rate=user.hourly_rate,
+        rating=user.rating,
+    )
+
+
+class SearchIndex:
+    """Thread-safe n-gram index over full_name, profession and skills"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()  # one rebuild at a time per process
+        self._entries = {}      # user_id -> IndexedUser
+        self._haystacks = {}    # user_id -> lowercased searchable fields
+        self._postings = {}     # gram -> set of user_ids
+        self._built_at = None
+        self._changes = None    # (user_id, entry or None) seen during a build
+
+    # -- maintenance -------------------------------------------------------
+
+    def build(self):
+        """(Re)build the whole index from the database"""
+        with self._build_lock:
+            return self._build()
+
+    def _build(self):
+        from models import User
+        with self._lock:
+            self._changes = []
+        try:
+            return self._build_and_swap(User)
+        finally:
+            with self._lock:
+                self._changes = None
+
+    def _build_and_swap(self, User):
+        users = User.query.with_entities(
+            User.id, User.username, User.full_name, User.profession,
+            User.skills, User.location, User.hourly_rate, User.rating,
+        ).filter(
+            User.full_name.isnot(None),
+            User.is_available == True
+        ).all()
+
+        # Index into a fresh instance and swap, so searches never wait on it
+        fresh = SearchIndex()
+        for row in users:
+            fresh._add(IndexedUser(*row))
+        with self._lock:
+            # Commits since the scan started may be missing from its rows
+            for user_id, entry in self._changes:
+                fresh._remove(user_id)
+                if entry is not None:
+                    fresh._add(entry)
+            self._entries = fresh._entries
+            self._haystacks = fresh._haystacks
+            self._postings = fresh._postings
+            self._built_at = time.monotonic()
+        print(f"[SearchIndex] Indexed {len(users)} users")
+        return len(users)
+
+    def refresh_if_stale(self):
+        """Build now if nothing is indexed yet, else rebuild in the background when stale.
+
+        While a rebuild runs, other requests keep using the current index.
+        """
+        if self._built_at is None:
+            with self._build_lock:
+                if self._built_at is None:
+                    self._build()
+            return
+        if time.monotonic() - self._built_at <= REFRESH_SECONDS:
+            return
+        if not self._build_lock.acquire(blocking=False):
+            return
+        app = current_app._get_current_object()
+        try:
+            threading.Thread(target=self._background_build, args=(app,), daemon=True,
+                             name='search-index-build').start()
+        except Exception:
+            self._build_lock.release()
+            raise
+
+    def _background_build(self, app):
+        try:
+            with app.app_context():
+                self._build()
+        except Exception as e:
+            print(f"⚠️  Warning: Search index rebuild failed: {e}")
+        finally:
+            self._build_lock.release()
+
+    def upsert(self, entry):
+        with self._lock:
+            self._remove(entry.id)
+            self._add(entry)
+            if self._changes is not None:
+                self._changes.append((entry.id, entry))
+
+    def remove(self, user_id):
+        with self._lock:
+            self._remove(user_id)
+            if self._changes is not None:
+                self._changes.append((user_id, None))
+
+    def _add(self, entry):
+        haystacks = tuple(
+            (value or '').lower()
+            for value in (entry.full_name, entry.profession, entry.skills)
+        )
+        self._entries[entry.id] = entry
+        self._haystacks[entry.id] = haystacks
+        for gram in set().union(*(_ngrams(h) for h in haystacks)):
+            self._postings.setdefault(gram, set()).add(entry.id)
+
+    def _remove(self, user_id):
+        haystacks = self._haystacks.pop(user_id, None)
+        self._entries.pop(user_id, None)
+        if haystacks is None:
+            return
+        for gram in set().union(*(_ngrams(h) for h in haystacks)):
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(user_id)
+                if not ids:
+                    del self._postings[gram]
+
+    # -- queries -----------------------------------------------------------
+
+    def __len__(self):
+        return len(self._entries)
+
+    def sample(self, k):
+        """Random sample of indexed users for the homepage animation"""
+        with self._lock:
+            entries = list(self._entries.values())
+        return random.sample(entries, min(k, len(entries)))
+
+    def search(self, query, limit=6):
+        """Users whose name, profession or skills contain query.
+
+        Ordered like the old scan: names starting with the query first,
+        then alphabetically by name.
+        """
+        query_lower = query.lower()
+        if not query_lower:
+            return []
+
+        with self._lock:
+            if len(query_lower) <= NGRAM_SIZE:
+                candidates = self._postings.get(query_lower, set())
+            else:
+                grams = [query_lower[i:i + NGRAM_SIZE]
+                         for i in range(len(query_lower) - NGRAM_SIZE + 1)]
+                postings = [self._postings.get(gram) for gram in grams]
+                if not all(postings):
+                    return []
+                postings.sort(key=len)
+                candidates = set(postings[0]).intersection(*postings[1:])
+                # Trigram hits are only candidates - confirm the full substring
+                candidates = [
+                    user_id for user_id in candidates
+                    if any(query_lower in h for h in self._haystacks[user_id])
+                ]
+
+            def sort_key(user_id):
+                name_lower = self._haystacks[user_id][0]
+                return (0 if name_lower.startswith(query_lower) else 1, name_lower)
+
+            top_ids = heapq.nsmallest(limit, candidates, key=sort_key)
+            return [self._entries[user_id] for user_id in top_ids]
+
+
+search_index = SearchIndex()
+
+
+def init_search_index(app):
+    """Build the index at startup; failures fall back to lazy build"""
+    with app.app_context():
+        try:
+            search_index.build()
+        except Exception as e:
+            print(f"⚠️  Warning: Could not build search index: {e}")
+
+
+# -- incremental updates ---------------------------------------------------
+# Changes are staged at flush time and applied only once the transaction
+# commits, so a rolled-back profile edit never leaks into suggestions.
+
+@event.listens_for(Session, 'after_flush')
+def _stage_user_changes(session, flush_context):
+    from models import User
+    pending = session.info.setdefault(PENDING_KEY, {})
+    for obj in session.new.union(session.dirty):
+        if isinstance(obj, User) and obj.id is not None:
+            pending[obj.id] = _entry_from_user(obj) if _is_indexable(obj) else None
+    for obj in session.deleted:
+        if isinstance(obj, User) and obj.id is not None:
+            pending[obj.id] = None
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_user_changes(session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if not pending or search_index._built_at is None:
+        return
+    for user_id, entry in pending.items():
+        if entry is None:
+            search_index.remove(user_id)
+        else:
+            search_index.upsert(entry)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_user_changes(session):
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,525 @@
+"""Semantic expert search over User.embedding.
+
+Profiles are embedded with a pluggable local encoder and stored as float32
+blobs in ``user.embedding``. Nearest experts come from an exact cosine scan
+over the vectors held in memory - a matrix product when numpy is
+installed, otherwise a dot product over the query's non-zero dimensions
+(hashing queries touch only a few dozen of them). The vectors are
+persisted to disk, so a restart only re-embeds profiles whose text
+changed since the last save.
+
+Edits made through this process reach the index when they commit. Every
+REFRESH_SECONDS a search also starts a background sync, on its own
+connection, that picks up what other processes changed.
+
+Encoders (``EMBEDDING_ENCODER`` env var):
+
+* ``hashing`` (default) - feature hashing of words, word bigrams, character
+  trigrams and browse-category concepts. Needs no model download; related
+  word forms ("developer"/"development") and category synonyms ("coding"/
+  "software") land near each other.
+* ``sentence-transformers`` - ``EMBEDDING_MODEL`` (all-MiniLM-L6-v2 by
+  default), used only if the package is installed.
+"""
+import base64
+import heapq
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+import zlib
+from array import array
+from collections import Counter
+from operator import itemgetter, mul
+
+from flask import current_app
+from sqlalchemy import bindparam, case, event, false, literal, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, object_session
+
+try:
+    import numpy as np
+except ImportError:  # optional; the pure-Python scan is used instead
+    np = None
+
+from categories import CATEGORY_SEARCH_TERMS
+from extensions import db
+
+EMBEDDING_DIM = 256
+DEFAULT_MODEL = 'all-MiniLM-L6-v2'
+# Profile fields that feed the embedding
+PROFILE_FIELDS = ['full_name', 'profession', 'skills', 'skills_1', 'skills_2', 'skills_3', 'bio', 'specialty_tags']
+
+DEFAULT_TOP_K = 20
+# Matches below this cosine similarity are noise, not meaning
+MIN_SIMILARITY = 0.05
+# Searches this long are treated as natural language rather than keywords
+NATURAL_LANGUAGE_MIN_WORDS = 4
+REFRESH_SECONDS = 300
+SAVE_INTERVAL_SECONDS = 60
+PENDING_KEY = 'semantic_index_pending'
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'get', 'help', 'how', 'i', 'in',
+    'is', 'it', 'looking', 'me', 'my', 'need', 'of', 'on', 'or', 'someone', 'the', 'to', 'who',
+    'want', 'with', 'can', 'would', 'like', 'find', 'expert',
+}
+
+
+def vector_to_blob(vector):
+    return array('f', vector).tobytes()
+
+
+def blob_to_vector(blob):
+    vector = array('f')
+    vector.frombytes(blob)
+    return vector
+
+
+def profile_text(user):
+    """Text describing a profile, from a User or a row with PROFILE_FIELDS"""
+    return ' '.join(str(getattr(user, field, None) or '') for field in PROFILE_FIELDS)
+
+
+def is_natural_language(query_text):
+    return len(query_text.split()) >= NATURAL_LANGUAGE_MIN_WORDS
+
+
+def _stem(word):
+    """Crude plural folding so "taxes"/"tax" and "coaches"/"coach" match"""
+    if len(word) > 4 and word.endswith('es') and word[-3] in 'sxz':
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def _normalize(vector):
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm == 0:
+        return vector
+    return [v / norm for v in vector]
+
+
+class HashingEncoder:
+    """Signed feature hashing into EMBEDDING_DIM dimensions"""
+
+    WORD_WEIGHT = 1.0
+    BIGRAM_WEIGHT = 0.5
+    TRIGRAM_WEIGHT = 0.3
+    CONCEPT_WEIGHT = 1.5
+
+    def __init__(self, dim=EMBEDDING_DIM):
+        self.dim = dim
+        self.name = f'hashing-{dim}'
+        # word -> browse category, used as a shared "concept" feature
+        self._concepts = {}
+        for category, terms in CATEGORY_SEARCH_TERMS.items():
+            for term in terms:
+                for word in _TOKEN_RE.findall(term):
+                    self._concepts.setdefault(_stem(word), category)
+
+    def _features(self, text):
+        words = [_stem(w) for w in _TOKEN_RE.findall(text.lower()) if w not in _STOPWORDS]
+        features = Counter()
+        for word in words:
+            features['w:' + word] += self.WORD_WEIGHT
+            padded = f'#{word}#'
+            for i in range(len(padded) - 2):
+                features['c:' + padded[i:i + 3]] += self.TRIGRAM_WEIGHT
+            concept = self._concepts.get(word)
+            if concept:
+                features['k:' + concept] += self.CONCEPT_WEIGHT
+        for first, second in zip(words, words[1:]):
+            features[f'b:{first} {second}'] += self.BIGRAM_WEIGHT
+        return features
+
+    def encode(self, text):
+        vector = [0.0] * self.dim
+        for feature, weight in self._features(text).items():
+            digest = zlib.crc32(feature.encode())
+            sign = 1.0 if digest & 1 else -1.0
+            # Sublinear weighting so repeated words do not dominate
+            vector[(digest >> 1) % self.dim] += sign * math.log1p(weight)
+        return _normalize(vector)
+
+
+class SentenceTransformerEncoder:
+    def __init__(self, model_name=DEFAULT_MODEL):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f'st-{model_name}'
+
+    def encode(self, text):
+        return self.model.encode(text, normalize_embeddings=True).tolist()
+
+
+_encoder = None
+
+
+def get_encoder():
+    """The configured encoder; falls back to hashing if the model can't load"""
+    global _encoder
+    if _encoder is None:
+        if os.environ.get('EMBEDDING_ENCODER', 'hashing') == 'sentence-transformers':
+            try:
+                _encoder = SentenceTransformerEncoder(os.environ.get('EMBEDDING_MODEL', DEFAULT_MODEL))
+            except Exception as e:
+                print(f"⚠️  Warning: Could not load sentence-transformers encoder, using hashing: {e}")
+        if _encoder is None:
+            _encoder = HashingEncoder()
+    return _encoder
+
+
+class VectorIndex:
+    """Exact cosine search over unit vectors (array('f')) held in memory"""
+
+    def __init__(self, dim):
+        self.dim = dim
+        self.vectors = {}  # id -> array('f')
+        self._matrix = None  # (ids, numpy matrix), rebuilt after changes
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def add(self, item_id, vector):
+        self.vectors[item_id] = vector
+        self._matrix = None
+
+    def remove(self, item_id):
+        if self.vectors.pop(item_id, None) is not None:
+            self._matrix = None
+
+    def query(self, vector, k=DEFAULT_TOP_K):
+        """Top-k (id, cosine similarity) pairs, best first"""
+        if not self.vectors:
+            return []
+        if np is not None:
+            return self._query_numpy(vector, k)
+        dims = [d for d, value in enumerate(vector) if value]
+        if not dims:
+            return []
+        weights = [vector[d] for d in dims]
+        pick = itemgetter(*dims) if len(dims) > 1 else (lambda stored, d=dims[0]: (stored[d],))
+        best = heapq.nlargest(k, (
+            (sum(map(mul, weights, pick(stored))), item_id) for item_id, stored in self.vectors.items()
+        ))
+        return [(item_id, score) for score, item_id in best if score > 0]
+
+    def _query_numpy(self, vector, k):
+        if self._matrix is None:
+            ids = list(self.vectors)
+            matrix = np.frombuffer(b''.join(self.vectors[i].tobytes() for i in ids), dtype=np.float32)
+            self._matrix = (ids, matrix.reshape(len(ids), self.dim))
+        ids, matrix = self._matrix
+        scores = matrix @ np.asarray(vector, dtype=np.float32)
+        top = np.argpartition(-scores, min(k, len(ids)) - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(ids[i], float(scores[i])) for i in top if scores[i] > 0]
+
+
+class SemanticIndex:
+    """Embeddings for available experts, kept in a VectorIndex and on disk"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()  # one sync at a time per process
+        self.path = None
+        self._encoder = None
+        self._vectors = None
+        self._checksums = {}  # user_id -> crc32 of the profile text embedded
+        self._synced_at = None
+        self._saved_at = 0.0
+        self._dirty = False
+
+    @property
+    def encoder(self):
+        if self._encoder is None:
+            self._encoder = get_encoder()
+        return self._encoder
+
+    def _reset(self):
+        self._vectors = VectorIndex(self.encoder.dim)
+        self._checksums = {}
+
+    # -- persistence -------------------------------------------------------
+
+    def load(self):
+        """Load the saved index; a missing or stale file leaves it empty"""
+        with self._lock:
+            self._reset()
+            if not self.path or not os.path.exists(self.path):
+                return 0
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Warning: Could not read semantic index {self.path}: {e}")
+                return 0
+            if data.get('encoder') != self.encoder.name:
+                print(f"[SemanticIndex] Saved index uses {data.get('encoder')}, re-embedding with {self.encoder.name}")
+                return 0
+            for user_id, (checksum, blob) in data['entries'].items():
+                self._vectors.add(int(user_id), blob_to_vector(base64.b64decode(blob)))
+                self._checksums[int(user_id)] = checksum
+            return len(self._vectors)
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = {
+                'encoder': self.encoder.name,
+                'entries': {
+                    str(user_id): [self._checksums[user_id], base64.b64encode(vector.tobytes()).decode()]
+                    for user_id, vector in self._vectors.vectors.items()
+                },
+            }
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        # Every worker saves; each writes its own temp file and swaps it in whole
+        with tempfile.NamedTemporaryFile('w', dir=directory, prefix='.semantic_index.', suffix='.tmp',
+                                         delete=False) as f:
+            json.dump(data, f)
+        try:
+            os.replace(f.name, self.path)
+        except OSError:
+            os.unlink(f.name)
+            raise
+
+    def save_if_dirty(self):
+        if self._dirty and time.monotonic() - self._saved_at > SAVE_INTERVAL_SECONDS:
+            try:
+                self.save()
+            except OSError as e:
+                print(f"⚠️  Warning: Could not save semantic index: {e}")
+
+    # -- sync with the database --------------------------------------------
+
+    def sync(self):
+        """Bring the index up to date with the database.
+
+        Only profiles whose text checksum changed are re-embedded, and their
+        new blobs are written back to user.embedding. Reads and writes go
+        through a connection of its own, never the caller's session, and
+        embedding happens outside the index lock so searches keep being
+        served meanwhile.
+        """
+        with self._sync_lock:
+            return self._sync()
+
+    def _sync(self):
+        from models import User
+        if self._vectors is None:
+            self.load()
+
+        columns = [User.__table__.c[field] for field in ['id', *PROFILE_FIELDS]]
+        with db.engine.connect() as conn:
+            rows = conn.execute(
+                select(*columns).where(User.__table__.c.full_name.isnot(None),
+                                       User.__table__.c.is_available == True)
+            ).all()
+
+            with self._lock:
+                known = dict(self._checksums)
+            embedded = {}
+            for row in rows:
+                text = profile_text(row)
+                checksum = zlib.crc32(text.encode())
+                if known.get(row.id) != checksum:
+                    embedded[row.id] = (array('f', self.encoder.encode(text)), checksum)
+            live_ids = {row.id for row in rows}
+
+            changed = []
+            with self._lock:
+                for user_id, (vector, checksum) in embedded.items():
+                    # A commit in this process may have indexed a newer edit meanwhile
+                    if self._checksums.get(user_id) == known.get(user_id):
+                        self._vectors.add(user_id, vector)
+                        self._checksums[user_id] = checksum
+                        changed.append({'b_id': user_id, 'b_embedding': vector.tobytes()})
+                removed = [user_id for user_id in known if user_id not in live_ids
+                           and self._checksums.get(user_id) == known[user_id]]
+                for user_id in removed:
+                    self._vectors.remove(user_id)
+                    del self._checksums[user_id]
+                self._synced_at = time.monotonic()
+                if changed or removed:
+                    self._dirty = True
+
+            if changed:
+                table = User.__table__
+                try:
+                    conn.execute(
+                        update(table).where(table.c.id == bindparam('b_id'))
+                        .values(embedding=bindparam('b_embedding')),
+                        changed
+                    )
+                    conn.commit()
+                except SQLAlchemyError as e:
+                    conn.rollback()
+                    # Searches use the new vectors; the next sync writes the blobs again
+                    with self._lock:
+                        for entry in changed:
+                            self._checksums[entry['b_id']] = None
+                    print(f"⚠️  Warning: Could not store {len(changed)} profile embeddings: {e}")
+                print(f"[SemanticIndex] Embedded {len(changed)} profiles")
+        self.save_if_dirty()
+        return len(changed)
+
+    def refresh_if_stale(self):
+        """Sync now if nothing is loaded yet, else in the background when stale.
+
+        Searches keep using the current vectors while a background sync
+        runs; at most one runs per process.
+        """
+        if self._vectors is None:
+            self.sync()
+            return
+        if self._synced_at is not None and time.monotonic() - self._synced_at <= REFRESH_SECONDS:
+            return
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        app = current_app._get_current_object()
+        try:
+            threading.Thread(target=self._background_sync, args=(app,), daemon=True,
+                             name='semantic-index-sync').start()
+        except Exception:
+            self._sync_lock.release()
+            raise
+
+    def _background_sync(self, app):
+        try:
+            with app.app_context():
+                self._sync()
+        except Exception as e:
+            print(f"⚠️  Warning: Semantic index sync failed: {e}")
+        finally:
+            self._sync_lock.release()
+
+    def upsert(self, user_id, vector, checksum):
+        with self._lock:
+            if self._vectors is None:
+                return
+            self._vectors.add(user_id, vector)
+            self._checksums[user_id] = checksum
+            self._dirty = True
+
+    def remove(self, user_id):
+        with self._lock:
+            if self._vectors is None:
+                return
+            self._vectors.remove(user_id)
+            self._checksums.pop(user_id, None)
+            self._dirty = True
+
+    # -- queries -----------------------------------------------------------
+
+    def search(self, query_text, k=DEFAULT_TOP_K):
+        """Top-k (user_id, similarity) for a natural-language query"""
+        self.refresh_if_stale()
+        vector = self.encoder.encode(query_text)
+        with self._lock:
+            matches = self._vectors.query(vector, k)
+        return [(user_id, score) for user_id, score in matches if score >= MIN_SIMILARITY]
+
+    def ranked_ids(self, query_text, k=DEFAULT_TOP_K, name='semantic'):
+        """Nearest experts as a (user_id, rank) subquery, like fulltext backends"""
+        from models import User
+        matches = self.search(query_text, k)
+        if not matches:
+            # Nothing similar - an empty result rather than no filter
+            return select(User.id.label('user_id'), literal(0.0).label('rank')).where(false()).subquery(name)
+        scores = {user_id: score for user_id, score in matches}
+        return select(
+            User.id.label('user_id'),
+            case(scores, value=User.id, else_=0.0).label('rank')
+        ).where(User.id.in_(list(scores))).subquery(name)
+
+
+semantic_index = SemanticIndex()
+
+
+def init_semantic_search(app, warm=True):
+    """Point the index at its file; with warm, load it and embed changed profiles now"""
+    semantic_index.path = os.environ.get(
+        'SEMANTIC_INDEX_PATH', os.path.join(app.instance_path, 'semantic_index.json')
+    )
+    if not warm:
+        return
+    with app.app_context():
+        try:
+            loaded = semantic_index.load()
+            semantic_index.sync()
+            print(f"[SemanticIndex] Loaded {loaded} saved embeddings, {len(semantic_index._vectors)} indexed")
+        except Exception as e:
+            print(f"⚠️  Warning: Could not build semantic index: {e}")
+
+
+# -- incremental updates ---------------------------------------------------
+# Embeddings are recomputed when a profile's text changes (before the row is
+# written, so the blob is saved with it) and pushed into the ANN index once
+# the transaction commits, so a rolled-back edit never reaches the index.
+
+EMBEDDED_KEY = 'semantic_index_embedded'
+
+
+def _text_changed(state):
+    return any(state.attrs[field].history.has_changes() for field in PROFILE_FIELDS)
+
+
+def embed_user(mapper, connection, target):
+    """before_insert/before_update hook: refresh User.embedding when its text changes"""
+    from models import flush_field_values
+    state = db.inspect(target)
+    if not (state.pending or _text_changed(state)):
+        return
+    text = profile_text(flush_field_values(connection, target, PROFILE_FIELDS))
+    vector = array('f', semantic_index.encoder.encode(text))
+    target.embedding = vector.tobytes()
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(EMBEDDED_KEY, {})[id(target)] = (vector, zlib.crc32(text.encode()))
+
+
+@event.listens_for(Session, 'after_flush')
+def _stage_embedding_changes(session, flush_context):
+    from models import User
+    embedded = session.info.pop(EMBEDDED_KEY, {})
+    pending = session.info.setdefault(PENDING_KEY, {})
+    for obj in session.new.union(session.dirty):
+        if not isinstance(obj, User) or obj.id is None:
+            continue
+        if obj.full_name is None or obj.is_available != True:
+            pending[obj.id] = None
+        elif id(obj) in embedded:
+            pending[obj.id] = embedded[id(obj)]
+    for obj in session.deleted:
+        if isinstance(obj, User) and obj.id is not None:
+            pending[obj.id] = None
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_embedding_changes(session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if not pending:
+        return
+    for user_id, entry in pending.items():
+        if entry is None:
+            semantic_index.remove(user_id)
+        else:
+            semantic_index.upsert(user_id, *entry)
+    semantic_index.save_if_dirty()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_embedding_changes(session):
+    session.info.pop(PENDING_KEY, None)
+    session.info.pop(EMBEDDED_KEY, None)
@@ -0,0 +1,136 @@
+"""Batched availability slot generation.
+
+generate_available_slots_for_date used to re-query AvailabilityRule for
+every day and run one Booking query per 30-minute slot. ProviderSchedule
+instead loads a provider's rules, blocked exceptions and bookings for a
+whole date window in three queries, merges the busy times into sorted
+intervals and answers each slot with a binary search, so the number of
+queries per page no longer depends on how many days or slots are shown.
+Live Google Calendar busy times are whatever the free/busy cache
+(freebusy.py) already holds, merged in the same way; loading a schedule
+never waits on Google.
+
+A slot is free only if nothing busy overlaps it. The old check matched
+a booking only when it started exactly at the slot, so an hour-long
+booking left its second half-hour open, and blocked exceptions were not
+consulted at all; now a booking, blocked exception or Google busy period
+takes every slot it touches. Intervals that merely meet (one ends as the
+next starts) do not overlap.
+
+Booking and exception times are stored naive in the provider's local
+time, the same convention the old per-slot booking check relied on.
+"""
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from freebusy import busy_intervals
+from models import AvailabilityRule, AvailabilityException, Booking
+
+SLOT_MINUTES = 30
+DEFAULT_TIMEZONE = 'America/New_York'
+# Bookings in these states make a slot unavailable
+BLOCKING_BOOKING_STATUSES = ['confirmed', 'pending']
+
+
+def _merge_intervals(intervals):
+    """Sort and merge overlapping (start, end) pairs"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class ProviderSchedule:
+    """A provider's weekly rules plus busy intervals for one date window"""
+
+    def __init__(self, provider, rules_by_weekday, busy_intervals):
+        self.provider = provider
+        self.provider_timezone = provider.timezone or DEFAULT_TIMEZONE
+        self.rules_by_weekday = rules_by_weekday
+        self._busy = _merge_intervals(busy_intervals)
+        self._busy_ends = [end for _, end in self._busy]
+
+    @classmethod
+    def load(cls, provider, start_date, days):
+        """Load everything needed for [start_date, start_date + days) in one pass"""
+        window_start = datetime.combine(start_date, datetime.min.time())
+        # Pad a day either side: display-timezone slots can cross midnight
+        window_end = window_start + timedelta(days=days + 1)
+        window_start -= timedelta(days=1)
+
+        rules_by_weekday = defaultdict(list)
+        rules = AvailabilityRule.query.with_entities(
+            AvailabilityRule.weekday, AvailabilityRule.start, AvailabilityRule.end
+        ).filter_by(user_id=provider.id, is_active=True).all()
+        for rule in rules:
+            rules_by_weekday[rule.weekday].append(rule)
+
+        bookings = Booking.query.with_entities(
+            Booking.start_time, Booking.end_time
+        ).filter(
+            Booking.provider_id == provider.id,
+            Booking.status.in_(BLOCKING_BOOKING_STATUSES),
+            Booking.start_time < window_end,
+            Booking.end_time > window_start
+        ).all()
+
+        exceptions = AvailabilityException.query.with_entities(
+            AvailabilityException.start, AvailabilityException.end
+        ).filter(
+            AvailabilityException.user_id == provider.id,
+            AvailabilityException.is_blocked == True,
+            AvailabilityException.start < window_end,
+            AvailabilityException.end > window_start
+        ).all()
+
+        busy = [
+            (start.replace(tzinfo=None), end.replace(tzinfo=None))
+            for start, end in bookings + exceptions
+        ]
+        busy += busy_intervals([provider], window_start, (window_end - window_start).days)[provider.id]
+        return cls(provider, rules_by_weekday, busy)
+
+    def is_busy(self, start, end):
+        """True if [start, end) overlaps any booking or blocked exception"""
+        # First busy interval ending after start is the only one that can overlap
+        i = bisect_right(self._busy_ends, start)
+        return i < len(self._busy) and self._busy[i][0] < end
+
+    def slots_for_date(self, date, display_timezone=None):
+        """Free slots for one date, shaped like generate_available_slots_for_date"""
+        provider_tz = ZoneInfo(self.provider_timezone)
+        display_tz = ZoneInfo(display_timezone or self.provider_timezone)
+        slot_length = timedelta(minutes=SLOT_MINUTES)
+
+        available_slots = []
+        for rule in self.rules_by_weekday.get(date.weekday(), []):
+            start_display = datetime.combine(date, rule.start).replace(tzinfo=provider_tz).astimezone(display_tz)
+            end_display = datetime.combine(date, rule.end).replace(tzinfo=provider_tz).astimezone(display_tz)
+
+            current_time = start_display
+            while current_time + slot_length <= end_display:
+                provider_time = current_time.astimezone(provider_tz)
+                naive_start = provider_time.replace(tzinfo=None)
+                if not self.is_busy(naive_start, naive_start + slot_length):
+                    available_slots.append({
+                        'start_time': current_time,
+                        'end_time': current_time + slot_length,
+                        'provider_time': provider_time,
+                        'formatted_time': current_time.strftime('%I:%M %p'),
+                        'date': date
+                    })
+                current_time += slot_length
+        return available_slots
+
+    def slots_for_range(self, start_date, days, display_timezone=None):
+        """Free slots for each of the next `days` dates, in date order"""
+        slots = []
+        for i in range(days):
+            slots.extend(self.slots_for_date(start_date + timedelta(days=i), display_timezone))
+        return slots
@@ -71,15 +71,19 @@ function submitSearchForm() {
             const parser = new DOMParser();
             const doc = parser.parseFromString(html, 'text/html');
             
-            // Extract the user cards section
-            const newUserCards = doc.querySelector('.row.mt-4.g-4.justify-content-center');
-            const currentUserCards = document.querySelector('.row.mt-4.g-4.justify-content-center');
+            // Extract the user cards section (discover renders #experts-grid)
+            const cardsSelector = '#experts-grid, .row.mt-4.g-4.justify-content-center';
+            const newUserCards = doc.querySelector(cardsSelector);
+            const currentUserCards = document.querySelector(cardsSelector);
             
             if (newUserCards && currentUserCards) {
                 // Replace the content with smooth animation
                 currentUserCards.style.opacity = '0';
                 setTimeout(() => {
                     currentUserCards.innerHTML = newUserCards.innerHTML;
+                    if (newUserCards.dataset.nextCursor !== undefined) {
+                        currentUserCards.dataset.nextCursor = newUserCards.dataset.nextCursor;
+                    }
                     currentUserCards.style.opacity = '1';
                     
                     // Re-initialize feather icons
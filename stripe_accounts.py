@@ -0,0 +1,216 @@
+"""Cached Stripe Connect account state.
+
+payment_setup, payment_dashboard, complete_verification and
+expert_payout_details each called ``stripe.Account.retrieve`` on every
+load, so every payment page waited on a Stripe round trip and showed an
+error whenever Stripe was slow. The parts of the account those pages
+use now live in StripeAccountState and are kept current by:
+
+* ``account.updated`` and ``account.external_account.*`` webhooks,
+  applied by stripe_events.py
+* ``reconcile_stripe_accounts``, which every few minutes reads accounts
+  that have no cached state yet (e.g. just onboarded) or were not
+  refreshed within STRIPE_ACCOUNT_RECONCILE_HOURS, on a small thread
+  pool, in case a webhook was missed.
+
+Applying an account also sets User.stripe_account_status and
+payout_enabled, which the pages and request_payout read. Account data
+older than what is already stored (an out-of-order webhook) is ignored.
+
+STRIPE_API_BASE points the stripe library elsewhere, e.g. the local stub
+in benchmarks/stripe_stub.py.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import stripe
+from sqlalchemy import or_, select, update
+
+from extensions import db
+from models import StripeAccountState, User
+from scheduler import scheduled_job
+
+EASTERN_TIMEZONE = timezone(timedelta(hours=-4))  # EDT (UTC-4)
+RECONCILE_INTERVAL = timedelta(hours=int(os.environ.get('STRIPE_ACCOUNT_RECONCILE_HOURS', 24)))
+RECONCILE_CONCURRENCY = int(os.environ.get('STRIPE_ACCOUNT_RECONCILE_CONCURRENCY', 4))
+RECONCILE_BATCH_SIZE = 100
+
+
+def _now():
+    return datetime.now(EASTERN_TIMEZONE).replace(tzinfo=None)
+
+
+def account_status(charges_enabled, payouts_enabled, details_submitted):
+    """User.stripe_account_status for a Connect account's capabilities"""
+    if charges_enabled and payouts_enabled:
+        return 'active'
+    if details_submitted and not charges_enabled:
+        return 'pending_verification'
+    if details_submitted:
+        return 'pending'
+    return 'incomplete'
+
+
+def account_state(account_id):
+    """The cached state for a Connect account, or None if not synced yet"""
+    if not account_id:
+        return None
+    return db.session.get(StripeAccountState, account_id)
+
+
+def payout_method(state):
+    """'Bank ••••1234' for the account's payout destination, if known"""
+    if state is None or not state.external_account_id:
+        return None
+    if state.bank_name and state.last4:
+        return f"{state.bank_name} ••••{state.last4}"
+    return state.external_account_id
+
+
+def _set_external_account(state, external_account):
+    if external_account is None:
+        state.external_account_id = state.bank_name = state.last4 = None
+        return
+    state.external_account_id = external_account['id']
+    # Bank accounts have bank_name, debit cards a brand
+    state.bank_name = external_account.get('bank_name') or external_account.get('brand')
+    state.last4 = external_account.get('last4')
+
+
+def _sync_user(state):
+    """Copy the account's status onto its user (through the ORM, so user_cache sees it)"""
+    user = db.session.get(User, state.user_id) if state.user_id else None
+    if user is None:
+        return
+    status = account_status(state.charges_enabled, state.payouts_enabled, state.details_submitted)
+    if user.stripe_account_status != status:
+        user.stripe_account_status = status
+    if user.payout_enabled != state.payouts_enabled:
+        user.payout_enabled = state.payouts_enabled
+
+
+def _state_for(account_id, updated_at):
+    """The state row to write, created if needed; None if ours is newer.
+
+    Claims the row with a conditional UPDATE first, so two events for the
+    same account applied at once are serialized and the newer one wins.
+    """
+    claimed = db.session.execute(
+        update(StripeAccountState)
+        .where(
+            StripeAccountState.account_id == account_id,
+            or_(StripeAccountState.stripe_updated_at.is_(None),
+                StripeAccountState.stripe_updated_at <= updated_at)
+        )
+        .values(stripe_updated_at=updated_at),
+        execution_options={'synchronize_session': False}
+    ).rowcount
+    if claimed:
+        state = db.session.execute(
+            select(StripeAccountState).where(StripeAccountState.account_id == account_id)
+            .execution_options(populate_existing=True)
+        ).scalar_one()
+    elif db.session.get(StripeAccountState, account_id) is not None:
+        return None
+    else:
+        state = StripeAccountState(account_id=account_id, stripe_updated_at=updated_at)
+        db.session.add(state)
+    if state.user_id is None:
+        state.user_id = db.session.execute(
+            select(User.id).where(User.stripe_account_id == account_id)
+        ).scalar()
+    return state
+
+
+def apply_account(account, updated_at):
+    """Store an Account (a dict as Stripe sends it) seen at unix time updated_at.
+
+    Returns False if newer data is already stored. Does not commit.
+    """
+    state = _state_for(account['id'], updated_at)
+    if state is None:
+        return False
+    state.charges_enabled = bool(account.get('charges_enabled'))
+    state.payouts_enabled = bool(account.get('payouts_enabled'))
+    state.details_submitted = bool(account.get('details_submitted'))
+    state.disabled_reason = (account.get('requirements') or {}).get('disabled_reason')
+    # Only present when Stripe includes the list, which it does for our accounts
+    if account.get('external_accounts') is not None:
+        external_accounts = account['external_accounts'].get('data') or []
+        default = next((ext for ext in external_accounts if ext.get('default_for_currency')), None)
+        _set_external_account(state, default or (external_accounts[0] if external_accounts else None))
+    state.synced_at = _now()
+    _sync_user(state)
+    return True
+
+
+def apply_external_account(external_account, updated_at, deleted=False):
+    """Track the payout destination from an account.external_account.* event"""
+    state = db.session.get(StripeAccountState, external_account.get('account'))
+    if state is None:
+        return False  # the reconciler reads the whole account soon
+    if deleted:
+        if state.external_account_id == external_account['id']:
+            _set_external_account(state, None)
+    elif external_account.get('default_for_currency') or state.external_account_id in (None, external_account['id']):
+        _set_external_account(state, external_account)
+    state.synced_at = _now()
+    return True
+
+
+# -- reconciliation --------------------------------------------------------
+
+def stale_account_ids(limit=RECONCILE_BATCH_SIZE):
+    """Connect accounts with no cached state, or not refreshed recently"""
+    cutoff = _now() - RECONCILE_INTERVAL
+    query = (
+        select(User.stripe_account_id)
+        .outerjoin(StripeAccountState, StripeAccountState.account_id == User.stripe_account_id)
+        .where(
+            User.stripe_account_id.isnot(None),
+            or_(StripeAccountState.account_id.is_(None), StripeAccountState.synced_at < cutoff)
+        )
+        .order_by(StripeAccountState.synced_at)
+        .limit(limit)
+    )
+    return list(dict.fromkeys(db.session.execute(query).scalars()))
+
+
+def _fetch(account_id):
+    """(account_id, account dict or None, fetched at) - runs on the pool, no DB access"""
+    fetched_at = int(time.time())
+    try:
+        return account_id, stripe.Account.retrieve(account_id).to_dict(), fetched_at
+    except stripe.error.StripeError as e:
+        print(f"[StripeAccounts] Could not read account {account_id}: {e}")
+        return account_id, None, fetched_at
+
+
+def reconcile_accounts(limit=RECONCILE_BATCH_SIZE):
+    """Refresh stale accounts from Stripe; returns how many were updated"""
+    account_ids = stale_account_ids(limit)
+    if not account_ids:
+        return 0
+    with ThreadPoolExecutor(max_workers=RECONCILE_CONCURRENCY) as pool:
+        results = list(pool.map(_fetch, account_ids))
+
+    updated = 0
+    for account_id, account, fetched_at in results:
+        if account is not None:
+            updated += apply_account(account, fetched_at)
+            continue
+        # Leave it until the next interval rather than retrying every run
+        state = db.session.get(StripeAccountState, account_id)
+        if state is None:
+            state = StripeAccountState(account_id=account_id)
+            db.session.add(state)
+        state.synced_at = _now()
+    db.session.commit()
+    return updated
+
+
+@scheduled_job('reconcile_stripe_accounts', minutes=5)
+def reconcile_stripe_accounts():
+    return reconcile_accounts()
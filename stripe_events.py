@@ -0,0 +1,333 @@
+"""Durable, idempotent Stripe webhook processing.
+
+``POST /stripe/webhook`` used to apply every event inline: look up the
+booking, then the provider, committing twice per event, with nothing
+recording which events had already been seen. Stripe redelivers an event
+whenever a response is slow or lost, so a retried
+``checkout.session.completed`` credited the provider's total_earnings
+and pending_balance a second time.
+
+The webhook now only verifies the signature and inserts the raw event
+into the StripeEvent table, keyed by the Stripe event ID, and answers
+200. A duplicate delivery hits the primary key and is dropped. Events are
+then applied on a bounded thread pool:
+
+* The web process hands each new event to a small pool straight away.
+* The scheduler leader runs ``process_stripe_events`` every minute for
+  anything the web pool missed (a restart, a failure being retried).
+
+An event is claimed with a conditional UPDATE, and its handler's changes
+commit in the same transaction that marks it processed - which only
+succeeds while the claim is still this worker's - so each event is
+applied exactly once however often it is delivered or retried, even if
+a slow handler's claim times out and the sweep picks the event up again.
+Payments, refunds and failed payouts are recorded in the earnings
+ledger (earnings_ledger.py), whose entry keys dedupe them a second time.
+Failures are retried with exponential backoff plus jitter.
+"""
+import json
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+import earnings_ledger
+import stripe_accounts
+from extensions import db
+from models import Booking, Payout, StripeEvent
+from scheduler import scheduled_job
+
+EASTERN_TIMEZONE = timezone(timedelta(hours=-4))  # EDT (UTC-4)
+STRIPE_EVENT_WORKERS = int(os.environ.get('STRIPE_EVENT_WORKERS', 4))
+STRIPE_EVENT_WEB_WORKERS = int(os.environ.get('STRIPE_EVENT_WEB_WORKERS', 2))
+STRIPE_EVENT_RETENTION_DAYS = int(os.environ.get('STRIPE_EVENT_RETENTION_DAYS', 30))
+STRIPE_EVENT_BATCH = 200
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = timedelta(seconds=30)
+BACKOFF_MAX = timedelta(hours=1)
+# New events belong to the web pool for this long before the sweep takes them
+RECEIVE_GRACE = timedelta(seconds=30)
+# A claim older than this belongs to a process that died mid-event
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+# event type -> handler(object, event)
+HANDLERS = {}
+
+
+def handles(*event_types):
+    """Register a handler for one or more Stripe event types"""
+    def register(fn):
+        for event_type in event_types:
+            HANDLERS[event_type] = fn
+        return fn
+    return register
+
+
+def _now():
+    return datetime.now(EASTERN_TIMEZONE).replace(tzinfo=None)
+
+
+def backoff_delay(attempts):
+    """Exponential backoff with jitter for the given number of failures"""
+    delay = min(BACKOFF_BASE * (2 ** max(attempts - 1, 0)), BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+
+# -- handlers --------------------------------------------------------------
+# Each runs inside the transaction that marks its event processed and must
+# not commit; the payloads are plain dicts parsed from the stored JSON.
+
+@handles('checkout.session.completed')
+def _checkout_completed(session, event):
+    booking_id = (session.get('metadata') or {}).get('booking_id')
+    booking = db.session.get(Booking, int(booking_id)) if booking_id else None
+    if booking is None:
+        return
+    booking.payment_status = 'paid'
+    earnings_ledger.record_payment(booking)
+
+
+@handles('payout.paid', 'payout.failed')
+def _payout_finished(payout, event):
+    records = Payout.query.filter_by(stripe_payout_id=payout['id']).all()
+    payout_id = (payout.get('metadata') or {}).get('payout_id')
+    if not records and payout_id:
+        # A scheduled payout whose Stripe ID was not stored yet (scheduled_payouts.py)
+        record = db.session.get(Payout, int(payout_id))
+        if record is not None and record.stripe_payout_id in (None, payout['id']):
+            record.stripe_payout_id = payout['id']
+            records = [record]
+    for record in records:
+        if event['type'] == 'payout.paid':
+            record.status = 'paid'
+            record.paid_at = _now()
+        else:
+            record.status = 'failed'
+            earnings_ledger.record_payout_failure(record)
+
+
+@handles('charge.refunded')
+def _charge_refunded(charge, event):
+    booking_id = (charge.get('metadata') or {}).get('booking_id')
+    booking = db.session.get(Booking, int(booking_id)) if booking_id else None
+    if booking is not None:
+        booking.payment_status = 'refunded'
+        earnings_ledger.record_refund(booking)
+
+
+@handles('account.updated')
+def _account_updated(account, event):
+    stripe_accounts.apply_account(account, event['created'])
+
+
+@handles('account.external_account.created', 'account.external_account.updated',
+         'account.external_account.deleted')
+def _external_account_changed(external_account, event):
+    stripe_accounts.apply_external_account(
+        external_account, event['created'], deleted=event['type'].endswith('.deleted')
+    )
+
+
+# -- intake and processing -------------------------------------------------
+
+def record_event(event, payload):
+    """Store a verified webhook event; False if it was already received"""
+    now = _now()
+    db.session.add(StripeEvent(
+        id=event['id'],
+        type=event['type'],
+        account=getattr(event, 'account', None),
+        payload=payload.decode('utf-8') if isinstance(payload, bytes) else payload,
+        status='received',
+        attempts=0,
+        received_at=now,
+        next_attempt_at=now + RECEIVE_GRACE,
+    ))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return False
+    return True
+
+
+def claim(event_id):
+    """Atomically mark an event as processing; the claim time, or None if it is done or taken"""
+    now = _now()
+    result = db.session.execute(
+        update(StripeEvent)
+        .where(
+            StripeEvent.id == event_id,
+            or_(
+                StripeEvent.status.in_(['received', 'failed']),
+                (StripeEvent.status == 'processing') & (StripeEvent.processing_started_at < now - CLAIM_TIMEOUT)
+            )
+        )
+        .values(status='processing', processing_started_at=now),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.commit()
+    return now if result.rowcount == 1 else None
+
+
+def _release(event_id, claimed_at, **values):
+    """Move a claimed event out of processing; False if our claim was taken over.
+
+    A handler that outlives CLAIM_TIMEOUT can be re-claimed by the sweep,
+    so the transition only applies while the claim is still ours.
+    """
+    result = db.session.execute(
+        update(StripeEvent)
+        .where(
+            StripeEvent.id == event_id,
+            StripeEvent.status == 'processing',
+            StripeEvent.processing_started_at == claimed_at
+        )
+        .values(**values),
+        execution_options={'synchronize_session': False}
+    )
+    return result.rowcount == 1
+
+
+def process_event(event_id):
+    """Claim and apply one stored event; True if it was applied"""
+    claimed_at = claim(event_id)
+    if claimed_at is None:
+        return False
+    event = db.session.get(StripeEvent, event_id)
+    event_type = event.type
+    try:
+        data = json.loads(event.payload)
+        handler = HANDLERS.get(event_type)
+        if handler is not None:
+            handler(data['data']['object'], data)
+        # The handler's changes commit only with the status change
+        if not _release(event_id, claimed_at, status='processed' if handler is not None else 'ignored',
+                        processed_at=_now(), next_attempt_at=None, last_error=None):
+            db.session.rollback()
+            print(f"[StripeEvents] {event_type} {event_id}: claim taken over; discarding this run")
+            return False
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        event = db.session.get(StripeEvent, event_id)
+        attempts = (event.attempts or 0) + 1
+        # Give up after MAX_ATTEMPTS; `flask stripe-events --retry` re-queues
+        if _release(event_id, claimed_at, status='failed', attempts=attempts, last_error=str(e)[:1000],
+                    next_attempt_at=_now() + backoff_delay(attempts) if attempts < MAX_ATTEMPTS else None):
+            db.session.commit()
+            print(f"[StripeEvents] {event_type} {event_id} failed (attempt {attempts}): {e}")
+        else:
+            db.session.rollback()
+        return False
+    return True
+
+
+def due_event_ids(limit=STRIPE_EVENT_BATCH):
+    """Events not yet applied whose turn has come, oldest first"""
+    now = _now()
+    query = (
+        select(StripeEvent.id)
+        .where(or_(
+            StripeEvent.status.in_(['received', 'failed']) & (StripeEvent.next_attempt_at <= now),
+            (StripeEvent.status == 'processing') & (StripeEvent.processing_started_at < now - CLAIM_TIMEOUT)
+        ))
+        .order_by(StripeEvent.received_at)
+        .limit(limit)
+    )
+    return list(db.session.execute(query).scalars())
+
+
+class EventPool:
+    """Bounded pool of event workers that skips events already in flight"""
+
+    def __init__(self, max_workers, name):
+        self.max_workers = max_workers
+        self.name = name
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = set()
+
+    def submit(self, app, event_id):
+        with self._lock:
+            if event_id in self._in_flight:
+                return None
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+            self._in_flight.add(event_id)
+        return self._executor.submit(self._run, app, event_id)
+
+    def _run(self, app, event_id):
+        try:
+            with app.app_context():
+                return process_event(event_id)
+        except Exception as e:
+            print(f"[StripeEvents] Worker error for event {event_id}: {e}")
+            return False
+        finally:
+            with self._lock:
+                self._in_flight.discard(event_id)
+
+
+scheduler_pool = EventPool(STRIPE_EVENT_WORKERS, 'stripe-events')
+web_pool = EventPool(STRIPE_EVENT_WEB_WORKERS, 'stripe-events-web')
+
+
+def enqueue_event(event_id):
+    """Apply a just-recorded event in the background of this web process"""
+    web_pool.submit(current_app._get_current_object(), event_id)
+
+
+@scheduled_job('process_stripe_events', minutes=1)
+def process_stripe_events():
+    """Apply every due event on the pool; returns how many were applied"""
+    app = current_app._get_current_object()
+    futures = [f for f in (scheduler_pool.submit(app, event_id) for event_id in due_event_ids()) if f]
+    done, _ = wait(futures)
+    applied = sum(1 for future in done if future.result())
+    if futures:
+        print(f"[StripeEvents] Applied {applied}/{len(futures)} due events")
+    return applied
+
+
+@scheduled_job('prune_stripe_events', hours=24)
+def prune_stripe_events():
+    """Drop applied events older than STRIPE_EVENT_RETENTION_DAYS.
+
+    Stripe redelivers for up to three days, so the retention has to stay
+    longer than that for duplicates to be recognised.
+    """
+    cutoff = _now() - timedelta(days=STRIPE_EVENT_RETENTION_DAYS)
+    deleted = StripeEvent.query.filter(
+        StripeEvent.status.in_(['processed', 'ignored']),
+        StripeEvent.received_at < cutoff
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+def init_stripe_events(app):
+    """Register the Stripe event CLI"""
+    import click
+
+    @app.cli.command('stripe-events')
+    @click.option('--retry', is_flag=True, help='Re-queue events that ran out of attempts.')
+    def stripe_events_command(retry):
+        """Show Stripe webhook events that are pending or failed."""
+        if retry:
+            count = StripeEvent.query.filter(
+                StripeEvent.status == 'failed', StripeEvent.next_attempt_at.is_(None)
+            ).update({'next_attempt_at': _now(), 'attempts': 0}, synchronize_session=False)
+            db.session.commit()
+            click.echo(f"Re-queued {count} event(s)")
+        pending = StripeEvent.query.filter(
+            StripeEvent.status.in_(['received', 'processing', 'failed'])
+        ).order_by(StripeEvent.received_at).limit(50)
+        for event in pending:
+            click.echo(f"{event.received_at:%Y-%m-%d %H:%M:%S}  {event.id:<32} {event.type:<30} "
+                       f"{event.status:<10} attempts={event.attempts or 0}  {event.last_error or ''}")
@@ -0,0 +1,124 @@
+"""Shared fixtures: an app on a throwaway SQLite database, and the local
+Stripe, Google Calendar and Daily.co stubs from benchmarks/ on free ports.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'benchmarks')]
+os.environ['ENABLE_AGENTS'] = '0'
+
+
+def make_app(tmp_path, database='test.db', **config):
+    import fulltext
+    from app import create_app
+    from dashboard_stats import dashboard_cache
+    from search_index import search_index
+    from semantic_search import semantic_index
+    # The search indexes, backend and caches are per process; start each app afresh
+    search_index.__init__()
+    semantic_index.__init__()
+    fulltext._backend = None
+    dashboard_cache.clear()
+    os.environ['SEMANTIC_INDEX_PATH'] = str(tmp_path / 'semantic_index.json')
+    return create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / database}",
+        'STRIPE_SECRET_KEY': 'sk_test_stub',
+        **config,
+    })
+
+
+@pytest.fixture
+def app(tmp_path):
+    from extensions import db
+    app = make_app(tmp_path)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def make_user(app):
+    from extensions import db
+    from models import User
+    count = iter(range(1, 10_000))
+
+    def make(**fields):
+        n = next(count)
+        user = User(username=f'user{n}', email=f'user{n}@example.com', **fields)
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make
+
+
+def _serve(start):
+    server = start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope='session')
+def stripe_stub_url():
+    import stripe_stub
+    yield from _serve(lambda: stripe_stub.start_stub(port=0, latency_ms=0))
+
+
+@pytest.fixture
+def stripe_stub(stripe_stub_url, monkeypatch):
+    """The Stripe stub module, with the stripe library pointed at it"""
+    import stripe
+    import stripe_stub
+    monkeypatch.setattr(stripe, 'api_base', stripe_stub_url)
+    monkeypatch.setattr(stripe, 'api_key', 'sk_test_stub')
+    stripe_stub.ACCOUNTS.clear()
+    stripe_stub.PAYOUTS.clear()
+    for key in stripe_stub.STATS:
+        stripe_stub.STATS[key] = 0
+    return stripe_stub
+
+
+@pytest.fixture
+def google_stub(monkeypatch):
+    """The Google stub module, with google_calendar pointed at a fresh instance"""
+    import google_calendar
+    import google_stub
+    from freebusy import freebusy_cache
+    server = google_stub.start_stub(port=0, latency_ms=0)
+    url = f'http://127.0.0.1:{server.server_address[1]}/'
+    monkeypatch.setattr(google_calendar, 'API_ROOT', url)
+    monkeypatch.setattr(google_calendar, 'TOKEN_URI', f'{url}token')
+    monkeypatch.setattr(google_calendar, '_service', None)
+    google_calendar.calendar_clients._entries.clear()
+    freebusy_cache.clear()
+    google_stub.CHANGES.clear()
+    google_stub.EXPIRED_TOKENS.clear()
+    for key in google_stub.STATS:
+        google_stub.STATS[key] = 0
+    yield google_stub
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def daily_stub():
+    """Start Daily.co stubs with the given faults: start(**faults) -> url"""
+    import daily_stub
+    servers = []
+    daily_stub.ROOMS.clear()
+    for key in daily_stub.STATS:
+        daily_stub.STATS[key] = 0
+
+    def start(**faults):
+        server = daily_stub.start_stub(port=0, **{'latency_ms': 0, **faults})
+        servers.append(server)
+        return f'http://127.0.0.1:{server.server_address[1]}'
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,294 @@
+-- Schema created by db.create_all() in the baseline app, before versioned
+-- migrations existed; tests/test_migrations.py upgrades a database made from it.
+CREATE TABLE user (
+	id INTEGER NOT NULL, 
+	username VARCHAR(64) NOT NULL, 
+	email VARCHAR(120) NOT NULL, 
+	password_hash VARCHAR(256), 
+	full_name VARCHAR(100), 
+	phone VARCHAR(20), 
+	bio TEXT, 
+	industry VARCHAR(100), 
+	profession VARCHAR(100), 
+	skills VARCHAR(200), 
+	skills_1 VARCHAR(100), 
+	skills_2 VARCHAR(100), 
+	skills_3 VARCHAR(100), 
+	location VARCHAR(100), 
+	background_image_url VARCHAR(500), 
+	hourly_rate FLOAT, 
+	currency VARCHAR(3), 
+	rating FLOAT, 
+	rating_count INTEGER, 
+	is_available BOOLEAN, 
+	is_featured_user BOOLEAN, 
+	created_at DATETIME, 
+	specialty_tags TEXT, 
+	profile_picture VARCHAR(255), 
+	background_color VARCHAR(7), 
+	primary_color VARCHAR(7), 
+	secondary_color VARCHAR(7), 
+	font_family VARCHAR(50), 
+	font_size INTEGER, 
+	profile_layout VARCHAR(20), 
+	donation_text TEXT, 
+	embedding BLOB, 
+	linkedin_url VARCHAR(200), 
+	twitter_url VARCHAR(200), 
+	github_url VARCHAR(200), 
+	instagram_url VARCHAR(200), 
+	facebook_url VARCHAR(200), 
+	youtube_url VARCHAR(200), 
+	snapchat_url VARCHAR(200), 
+	website_url VARCHAR(200), 
+	stripe_account_id VARCHAR(100), 
+	stripe_account_status VARCHAR(50), 
+	payout_enabled BOOLEAN, 
+	payout_schedule VARCHAR(20), 
+	total_earnings FLOAT, 
+	total_payouts FLOAT, 
+	pending_balance FLOAT, 
+	language VARCHAR(10), 
+	timezone VARCHAR(50), 
+	email_notifications BOOLEAN, 
+	service_description TEXT, 
+	session_duration INTEGER, 
+	content_description TEXT, 
+	content_categories VARCHAR(200), 
+	google_calendar_connected BOOLEAN, 
+	google_calendar_token TEXT, 
+	google_calendar_refresh_token TEXT, 
+	google_calendar_id VARCHAR(100), 
+	referral_code VARCHAR(20), 
+	referred_by INTEGER, 
+	total_referral_earnings FLOAT, 
+	referral_count INTEGER, 
+	PRIMARY KEY (id), 
+	UNIQUE (username), 
+	UNIQUE (email), 
+	UNIQUE (referral_code), 
+	FOREIGN KEY(referred_by) REFERENCES user (id)
+);
+
+CREATE TABLE category (
+	id INTEGER NOT NULL, 
+	name VARCHAR(100) NOT NULL, 
+	category_type VARCHAR(20) NOT NULL, 
+	is_active BOOLEAN, 
+	PRIMARY KEY (id), 
+	UNIQUE (name)
+);
+
+CREATE TABLE favorite (
+	id INTEGER NOT NULL, 
+	user_id INTEGER NOT NULL, 
+	favorited_user_id INTEGER NOT NULL, 
+	created_at DATETIME, 
+	PRIMARY KEY (id), 
+	CONSTRAINT _user_favorited_user_favorite_uc UNIQUE (user_id, favorited_user_id), 
+	FOREIGN KEY(user_id) REFERENCES user (id), 
+	FOREIGN KEY(favorited_user_id) REFERENCES user (id)
+);
+
+CREATE TABLE user_interaction (
+	id INTEGER NOT NULL, 
+	user_id INTEGER NOT NULL, 
+	target_user_id INTEGER NOT NULL, 
+	interaction_type VARCHAR(50) NOT NULL, 
+	created_at DATETIME, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(user_id) REFERENCES user (id), 
+	FOREIGN KEY(target_user_id) REFERENCES user (id)
+);
+
+CREATE TABLE availability_rule (
+	id INTEGER NOT NULL, 
+	user_id INTEGER NOT NULL, 
+	weekday INTEGER NOT NULL, 
+	start TIME NOT NULL, 
+	"end" TIME NOT NULL, 
+	is_active BOOLEAN, 
+	created_at DATETIME, 
+	updated_at DATETIME, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(user_id) REFERENCES user (id)
+);
+
+CREATE TABLE availability_exception (
+	id INTEGER NOT NULL, 
+	user_id INTEGER NOT NULL, 
+	start DATETIME NOT NULL, 
+	"end" DATETIME NOT NULL, 
+	reason VARCHAR(255), 
+	is_blocked BOOLEAN, 
+	created_at DATETIME, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(user_id) REFERENCES user (id)
+);
+
+CREATE TABLE booking (
+	id INTEGER NOT NULL, 
+	user_id INTEGER NOT NULL, 
+	provider_id INTEGER NOT NULL, 
+	start_time DATETIME NOT NULL, 
+	end_time DATETIME NOT NULL, 
+	duration INTEGER NOT NULL, 
+	status VARCHAR(32), 
+	created_at DATETIME, 
+	payment_status VARCHAR(20), 
+	payment_amount FLOAT, 
+	stripe_payment_intent_id VARCHAR(100), 
+	stripe_session_id VARCHAR(100), 
+	client_name VARCHAR(100), 
+	client_email VARCHAR(120), 
+	client_message TEXT, 
+	meeting_room_id VARCHAR(100), 
+	meeting_url VARCHAR(500), 
+	meeting_started_at DATETIME, 
+	meeting_ended_at DATETIME, 
+	meeting_duration INTEGER, 
+	recording_url VARCHAR(500), 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(user_id) REFERENCES user (id), 
+	FOREIGN KEY(provider_id) REFERENCES user (id)
+);
+
+CREATE TABLE payout (
+	id INTEGER NOT NULL, 
+	user_id INTEGER NOT NULL, 
+	amount FLOAT NOT NULL, 
+	currency VARCHAR(3), 
+	stripe_transfer_id VARCHAR(100), 
+	stripe_payout_id VARCHAR(100), 
+	status VARCHAR(20), 
+	created_at DATETIME, 
+	paid_at DATETIME, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(user_id) REFERENCES user (id)
+);
+
+CREATE TABLE referral (
+	id INTEGER NOT NULL, 
+	referrer_id INTEGER NOT NULL, 
+	referred_user_id INTEGER NOT NULL, 
+	referral_code VARCHAR(20) NOT NULL, 
+	created_at DATETIME, 
+	status VARCHAR(20), 
+	PRIMARY KEY (id), 
+	CONSTRAINT _referrer_referred_uc UNIQUE (referrer_id, referred_user_id), 
+	FOREIGN KEY(referrer_id) REFERENCES user (id), 
+	FOREIGN KEY(referred_user_id) REFERENCES user (id)
+);
+
+CREATE TABLE content (
+	id INTEGER NOT NULL, 
+	user_id INTEGER NOT NULL, 
+	title VARCHAR(200) NOT NULL, 
+	description TEXT, 
+	content_type VARCHAR(20) NOT NULL, 
+	price FLOAT NOT NULL, 
+	file_path VARCHAR(500), 
+	file_size INTEGER, 
+	thumbnail_path VARCHAR(500), 
+	preview_available BOOLEAN, 
+	preview_path VARCHAR(500), 
+	status VARCHAR(20), 
+	views INTEGER, 
+	purchases INTEGER, 
+	earnings FLOAT, 
+	created_at DATETIME, 
+	updated_at DATETIME, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(user_id) REFERENCES user (id)
+);
+
+CREATE TABLE dropin_session (
+	id INTEGER NOT NULL, 
+	host_id INTEGER NOT NULL, 
+	topic VARCHAR(200) NOT NULL, 
+	description TEXT, 
+	max_participants INTEGER, 
+	current_participants INTEGER, 
+	is_active BOOLEAN, 
+	is_anonymous BOOLEAN, 
+	session_code VARCHAR(10) NOT NULL, 
+	created_at DATETIME, 
+	started_at DATETIME, 
+	ended_at DATETIME, 
+	duration_minutes INTEGER, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(host_id) REFERENCES user (id), 
+	UNIQUE (session_code)
+);
+
+CREATE TABLE ai_match (
+	id INTEGER NOT NULL, 
+	user_id INTEGER NOT NULL, 
+	matched_user_id INTEGER NOT NULL, 
+	"query" TEXT NOT NULL, 
+	match_score FLOAT NOT NULL, 
+	match_reasons TEXT, 
+	created_at DATETIME, 
+	is_viewed BOOLEAN, 
+	is_acted_upon BOOLEAN, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(user_id) REFERENCES user (id), 
+	FOREIGN KEY(matched_user_id) REFERENCES user (id)
+);
+
+CREATE TABLE referral_reward (
+	id INTEGER NOT NULL, 
+	referrer_id INTEGER NOT NULL, 
+	referred_user_id INTEGER NOT NULL, 
+	booking_id INTEGER NOT NULL, 
+	reward_amount FLOAT NOT NULL, 
+	reward_type VARCHAR(20), 
+	status VARCHAR(20), 
+	created_at DATETIME, 
+	paid_at DATETIME, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(referrer_id) REFERENCES user (id), 
+	FOREIGN KEY(referred_user_id) REFERENCES user (id), 
+	FOREIGN KEY(booking_id) REFERENCES booking (id)
+);
+
+CREATE TABLE content_purchase (
+	id INTEGER NOT NULL, 
+	buyer_id INTEGER NOT NULL, 
+	content_id INTEGER NOT NULL, 
+	amount_paid FLOAT NOT NULL, 
+	payment_status VARCHAR(20), 
+	stripe_payment_intent_id VARCHAR(100), 
+	created_at DATETIME, 
+	PRIMARY KEY (id), 
+	CONSTRAINT _buyer_content_purchase_uc UNIQUE (buyer_id, content_id), 
+	FOREIGN KEY(buyer_id) REFERENCES user (id), 
+	FOREIGN KEY(content_id) REFERENCES content (id)
+);
+
+CREATE TABLE dropin_participant (
+	id INTEGER NOT NULL, 
+	session_id INTEGER NOT NULL, 
+	user_id INTEGER, 
+	anonymous_name VARCHAR(50), 
+	joined_at DATETIME, 
+	left_at DATETIME, 
+	is_active BOOLEAN, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(session_id) REFERENCES dropin_session (id), 
+	FOREIGN KEY(user_id) REFERENCES user (id)
+);
+
+CREATE TABLE dropin_message (
+	id INTEGER NOT NULL, 
+	session_id INTEGER NOT NULL, 
+	participant_id INTEGER NOT NULL, 
+	message_type VARCHAR(20), 
+	content TEXT NOT NULL, 
+	is_anonymous BOOLEAN, 
+	created_at DATETIME, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(session_id) REFERENCES dropin_session (id), 
+	FOREIGN KEY(participant_id) REFERENCES dropin_participant (id)
+);
+
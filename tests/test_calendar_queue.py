@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import calendar_queue
+from calendar_queue import claim, due_user_ids, request_sync, sync_calendar
+from extensions import db
+from models import AvailabilityException, CalendarSyncState
+
+
+@pytest.fixture
+def calendar_user(make_user):
+    return make_user(google_calendar_connected=True, google_calendar_id='primary',
+                     google_calendar_token='stub-token', google_calendar_refresh_token='stub-refresh')
+
+
+def state(user):
+    db.session.expire_all()
+    return db.session.get(CalendarSyncState, user.id)
+
+
+def test_a_claimed_calendar_cannot_be_claimed_again_until_the_claim_times_out(app, calendar_user):
+    assert claim(calendar_user.id)
+    assert not claim(calendar_user.id)
+    db.session.execute(db.update(CalendarSyncState).values(
+        sync_started_at=datetime.now() - calendar_queue.CLAIM_TIMEOUT - timedelta(seconds=1)))
+    db.session.commit()
+    assert claim(calendar_user.id)
+
+
+def test_sync_runs_full_then_incremental(app, google_stub, calendar_user):
+    assert due_user_ids() == [calendar_user.id]
+    first = sync_calendar(calendar_user.id)
+    assert first.full_sync and first.upserted >= 29
+    assert AvailabilityException.query.filter_by(user_id=calendar_user.id).count() == first.upserted
+    synced = state(calendar_user)
+    assert (synced.status, synced.attempts, synced.sync_token) == ('ok', 0, 'stub-sync-token')
+    assert synced.next_sync_at > datetime.now() + calendar_queue.CALENDAR_SYNC_INTERVAL - timedelta(minutes=1)
+    assert due_user_ids() == []
+
+    assert not sync_calendar(calendar_user.id).full_sync
+
+
+def test_failed_sync_backs_off_and_a_request_waits_for_the_rate_limit(app, google_stub, calendar_user,
+                                                                      monkeypatch):
+    import google_calendar
+    stub_root = google_calendar.API_ROOT
+    monkeypatch.setattr(google_calendar, 'API_ROOT', 'http://127.0.0.1:9/')  # nothing listens
+    monkeypatch.setattr(google_calendar, '_service', None)
+    for attempts in (1, 2):
+        started = datetime.now()
+        assert sync_calendar(calendar_user.id) is None
+        failed = state(calendar_user)
+        assert (failed.status, failed.attempts) == ('failed', attempts)
+        delay = calendar_queue.BACKOFF_BASE * 2 ** (attempts - 1)
+        assert started + delay / 2 <= failed.next_sync_at <= datetime.now() + delay
+
+    monkeypatch.setattr(google_calendar, 'API_ROOT', stub_root)
+    monkeypatch.setattr(google_calendar, '_service', None)
+    assert sync_calendar(calendar_user.id) is not None
+    # Just synced: a manual request is pushed back to the minimum interval
+    due = request_sync(calendar_user.id)
+    assert due == state(calendar_user).last_synced_at + calendar_queue.CALENDAR_SYNC_MIN_INTERVAL
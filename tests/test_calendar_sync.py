@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import calendar_sync
+from calendar_sync import GOOGLE_EVENT_REASON, sync_user_calendar
+from extensions import db
+from models import AvailabilityException, CalendarSyncState
+
+
+@pytest.fixture
+def calendar_user(make_user, google_stub, monkeypatch):
+    monkeypatch.setattr(calendar_sync, 'PAGE_SIZE', 7)
+    return make_user(google_calendar_connected=True, google_calendar_id='primary', timezone='UTC',
+                     google_calendar_token='stub-token', google_calendar_refresh_token='stub-refresh')
+
+
+def blocks(user):
+    db.session.expire_all()
+    return {exception.google_event_id: exception
+            for exception in AvailabilityException.query.filter_by(user_id=user.id)}
+
+
+def event(event_id, start, status='confirmed'):
+    return {'id': event_id, 'status': status,
+            'start': {'dateTime': start.isoformat()},
+            'end': {'dateTime': (start + timedelta(hours=1)).isoformat()}}
+
+
+def test_first_sync_lists_every_page_and_replaces_old_blocks(app, calendar_user):
+    # Left behind by the old delete-and-reinsert sync: no event id
+    db.session.add(AvailabilityException(user_id=calendar_user.id, reason=GOOGLE_EVENT_REASON, is_blocked=True,
+                                         start=datetime(2030, 1, 1, 9), end=datetime(2030, 1, 1, 10)))
+    db.session.commit()
+
+    result = sync_user_calendar(calendar_user)
+    assert (result.full_sync, result.pages) == (True, 5)  # 30 events, 7 a page
+    stored = blocks(calendar_user)
+    assert None not in stored
+    assert len(stored) == result.upserted >= 29  # today's may have ended already
+    assert db.session.get(CalendarSyncState, calendar_user.id).sync_token == 'stub-sync-token'
+
+
+def test_incremental_sync_applies_only_the_changes(app, calendar_user, google_stub):
+    sync_user_calendar(calendar_user)
+    before = blocks(calendar_user)
+    moved_to = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=40)
+    google_stub.CHANGES['primary'] = [
+        event('primary-5', moved_to),
+        event('primary-6', moved_to, status='cancelled'),
+        event('new-1', moved_to + timedelta(hours=2)),
+    ]
+
+    result = sync_user_calendar(calendar_user)
+    assert (result.full_sync, result.upserted, result.deleted, result.pages) == (False, 2, 1, 1)
+    after = blocks(calendar_user)
+    assert set(after) == set(before) - {'primary-6'} | {'new-1'}
+    assert after['primary-5'].start == moved_to.replace(tzinfo=None)
+
+
+def test_expired_sync_token_falls_back_to_a_full_sync(app, calendar_user, google_stub):
+    sync_user_calendar(calendar_user)
+    google_stub.EXPIRED_TOKENS.add('stub-sync-token')
+    google_stub.CHANGES['primary'] = [event('never-applied', datetime.now(timezone.utc) + timedelta(days=3))]
+
+    result = sync_user_calendar(calendar_user)
+    assert (result.full_sync, result.pages) == (True, 5)
+    assert 'never-applied' not in blocks(calendar_user)
+    assert db.session.get(CalendarSyncState, calendar_user.id).last_full_sync_at is not None
@@ -0,0 +1,25 @@
+from categories import backfill_user_categories
+from extensions import db
+from models import User
+
+
+def test_category_follows_profession_and_skills(make_user):
+    user = make_user(profession='Software Engineer', bio='Also a yoga teacher')
+    assert user.category == 'technology'
+
+    user.bio = 'Now a full-time nurse'
+    db.session.commit()
+    assert user.category == 'technology'
+
+    user.profession, user.skills = 'Consultant', 'nutrition, wellness'
+    db.session.commit()
+    assert user.category == 'health'
+
+
+def test_backfill_recomputes_stored_categories(make_user):
+    user = make_user(profession='Illustrator')
+    db.session.execute(db.update(User).values(category=None))
+    db.session.commit()
+    assert backfill_user_categories() == 1
+    db.session.expire_all()
+    assert db.session.get(User, user.id).category == 'creative'
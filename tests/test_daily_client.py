@@ -0,0 +1,87 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import daily_client as daily
+from daily_client import CircuitBreaker, DailyClient, DailyError, DailyUnavailable
+from extensions import db
+from models import Booking
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(daily, 'BACKOFF_BASE', 0.01)
+    monkeypatch.setattr(daily, 'DAILY_READ_TIMEOUT', 0.2)
+    monkeypatch.setattr(daily, 'DAILY_DEADLINE', 1.0)
+
+
+def test_breaker_opens_after_threshold_and_probes_once():
+    breaker = CircuitBreaker(threshold=2, reset_after=0.1)
+    breaker.record_failure()
+    assert breaker.state == 'closed' and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open' and not breaker.allow()
+
+    time.sleep(0.15)
+    assert breaker.state == 'half-open'
+    assert breaker.allow()
+    assert not breaker.allow()  # one probe at a time
+    breaker.record_failure()
+    assert breaker.state == 'open'  # a failed probe reopens at once
+
+    time.sleep(0.15)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed' and breaker.allow()
+
+
+def test_room_lifecycle_against_the_stub(daily_stub):
+    client = DailyClient('test', daily_stub())
+    room = client.create_room('droply-1', {'exp': 1})
+    assert room['url'] == 'https://stub.daily.co/droply-1'
+    # A retried create finds the room it already made
+    assert client.create_room('droply-1')['name'] == 'droply-1'
+    assert client.delete_room('droply-1') is True
+    assert client.delete_room('droply-1') is False
+    with pytest.raises(DailyError) as error:
+        client.get_room('droply-1')
+    assert error.value.status == 404
+
+
+def test_failing_api_is_retried_then_trips_the_breaker(daily_stub):
+    import daily_stub as stub
+    client = DailyClient('test', daily_stub(fail_rate=1.0), CircuitBreaker(threshold=2, reset_after=60))
+    for _ in range(2):
+        with pytest.raises(DailyUnavailable):
+            client.create_room('droply-2')
+    assert stub.STATS['requests'] == 2 * (daily.DAILY_MAX_RETRIES + 1)
+
+    with pytest.raises(DailyUnavailable, match='circuit breaker is open'):
+        client.create_room('droply-2')
+    assert stub.STATS['requests'] == 2 * (daily.DAILY_MAX_RETRIES + 1)
+
+
+def test_hung_api_is_bounded_by_the_deadline(daily_stub):
+    client = DailyClient('test', daily_stub(hang=5))
+    started = time.monotonic()
+    with pytest.raises(DailyUnavailable):
+        client.create_room('droply-3')
+    assert time.monotonic() - started < daily.DAILY_DEADLINE + 0.5
+
+
+def test_join_falls_back_to_a_simple_room_when_daily_is_down(app, make_user, daily_stub, monkeypatch):
+    from views.meetings import create_meeting_room
+    monkeypatch.setattr(daily, 'DAILY_API_KEY', 'test')
+    monkeypatch.setattr(daily, '_client', DailyClient('test', daily_stub(fail_rate=1.0)))
+    client, expert = make_user(), make_user()
+    start = datetime.now() + timedelta(minutes=5)
+    booking = Booking(user_id=client.id, provider_id=expert.id, start_time=start,
+                      end_time=start + timedelta(minutes=30), duration=30, status='confirmed')
+    db.session.add(booking)
+    db.session.commit()
+
+    room, error = create_meeting_room(booking.id)
+    assert error is None
+    assert room['url'].startswith('/meeting-room/droply-')
+    assert db.session.get(Booking, booking.id).meeting_url == room['url']
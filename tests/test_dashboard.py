@@ -0,0 +1,80 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from dashboard_stats import EASTERN_TIMEZONE, get_dashboard_stats
+from extensions import db
+from models import AvailabilityRule, Booking, Content, Payout
+
+
+def test_dashboard_renders_for_a_signed_in_user(app, make_user):
+    user = make_user()
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user.id)
+    response = client.get('/dashboard')
+    assert response.status_code == 200
+    assert b'+0 this week' in response.data
+
+
+@pytest.fixture
+def account(make_user):
+    """A user with known bookings, content, availability and a payout"""
+    user, other = make_user(), make_user()
+    now = datetime.now(EASTERN_TIMEZONE).replace(tzinfo=None)
+
+    def booking(client, provider, amount, status, start, created=timedelta(days=1)):
+        db.session.add(Booking(user_id=client.id, provider_id=provider.id, start_time=start,
+                               end_time=start + timedelta(minutes=30), duration=30, status=status,
+                               payment_amount=amount, created_at=now - created))
+    booking(user, other, 100.0, 'confirmed', now)                           # today
+    booking(user, other, 40.0, 'completed', now - timedelta(days=30))
+    booking(user, other, 25.0, 'confirmed', now + timedelta(days=3))        # this week
+    booking(other, user, 70.0, 'confirmed', now + timedelta(days=3))        # as provider
+    booking(user, other, 10.0, 'cancelled', now + timedelta(days=30), created=timedelta(days=30))
+    db.session.add_all([
+        Content(user_id=user.id, title='Published', content_type='video', status='published',
+                views=10, earnings=5.5),
+        Content(user_id=user.id, title='Draft', content_type='video', views=3),
+        AvailabilityRule(user_id=user.id, weekday=0, start=time(9), end=time(17)),
+        Payout(user_id=user.id, amount=5000, status='paid'),
+    ])
+    db.session.commit()
+    return user
+
+
+def test_stats_match_known_bookings_and_content(app, account):
+    assert get_dashboard_stats(account.id, use_cache=False) == {
+        'total_bookings': 4,
+        'recent_bookings': 4,
+        'this_week_bookings': 3,
+        'today_bookings': 1,
+        'total_earnings': 125.0,
+        'completed_earnings': 40.0,
+        'this_week_earnings': 125.0,
+        'content_count': 2,
+        'published_content': 1,
+        'total_content_earnings': 5.5,
+        'total_content_views': 13,
+        'availability_count': 1,
+    }
+
+
+def test_commit_in_this_process_invalidates_the_cache(app, account):
+    assert get_dashboard_stats(account.id)['total_bookings'] == 4
+    # Another process's write: straight to the database, no session hooks
+    with db.engine.begin() as conn:
+        conn.execute(update(Booking.__table__).values(payment_amount=0))
+    assert get_dashboard_stats(account.id)['total_earnings'] == 125.0
+
+    booking = Booking.query.filter_by(user_id=account.id, status='cancelled').one()
+    booking.status = 'confirmed'
+    db.session.flush()
+    db.session.rollback()
+    assert get_dashboard_stats(account.id)['total_earnings'] == 125.0
+
+    db.session.add(AvailabilityRule(user_id=account.id, weekday=1, start=time(9), end=time(17)))
+    db.session.commit()
+    stats = get_dashboard_stats(account.id)
+    assert (stats['availability_count'], stats['total_earnings']) == (2, 0)
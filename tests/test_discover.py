@@ -0,0 +1,50 @@
+import pytest
+
+from ranking import decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def experts(make_user):
+    return [make_user(full_name=f'Expert {n}', is_available=True, hourly_rate=50 * (n % 2),
+                      is_featured_user=n < 2)
+            for n in range(7)]
+
+
+def test_api_discover_pages_through_every_expert(app, experts):
+    client = app.test_client()
+    seen, cursor = [], None
+    while True:
+        response = client.get('/api/discover', query_string={'page_size': 3, **({'cursor': cursor} if cursor else {})})
+        assert response.status_code == 200
+        seen += [user['id'] for user in response.json['users']]
+        cursor = response.json['next_cursor']
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(user.id for user in experts)
+    assert len(seen) == len(set(seen))
+
+
+@pytest.mark.parametrize('values', [
+    [1, 0.0, 1],                  # wrong length
+    [{'a': 1}, 0.0, 1, 5],        # not a flag
+    [1, 'x', 1, 5],               # relevance not a number
+    [1, 0.0, 2, 5],               # flag out of range
+    [1, 0.0, 1, '5'],             # id not an int
+    [True, 0.0, 1, 5],            # bools are not flags
+    [1, [0.0], 1, 5],
+    {'featured': 1},
+])
+def test_tampered_cursor_is_rejected(app, experts, values):
+    cursor = encode_cursor(values)
+    assert decode_cursor(cursor) is None
+    assert app.test_client().get('/api/discover', query_string={'cursor': cursor}).status_code == 400
+
+
+@pytest.mark.parametrize('cursor', ['not base64!', 'eyJ', encode_cursor(None)])
+def test_garbage_cursor_is_rejected(app, cursor):
+    assert decode_cursor(cursor) is None
+    assert app.test_client().get('/api/discover', query_string={'cursor': cursor}).status_code == 400
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor([1, 2.5, 0, 42])) == [1, 2.5, 0, 42]
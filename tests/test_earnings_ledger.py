@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import earnings_ledger
+from booking_jobs import complete_past_bookings
+from extensions import db
+from models import Booking, EarningsEntry, User
+
+START = datetime(2026, 10, 1, 10)
+
+
+@pytest.fixture
+def booking(make_user):
+    client, expert = make_user(), make_user()
+
+    def make(amount=100.0, status='confirmed', hours=0):
+        start = START + timedelta(hours=hours)
+        booking = Booking(user_id=client.id, provider_id=expert.id, start_time=start,
+                          end_time=start + timedelta(minutes=30), duration=30,
+                          status=status, payment_status='paid', payment_amount=amount)
+        db.session.add(booking)
+        db.session.commit()
+        return booking
+    make.expert = expert
+    return make
+
+
+def balances(user):
+    db.session.expire_all()
+    user = db.session.get(User, user.id)
+    return user.pending_balance, user.total_earnings, user.total_payouts
+
+
+def test_append_is_idempotent_per_entry_key(booking):
+    paid = booking()
+    assert earnings_ledger.record_payment(paid) is not None
+    assert earnings_ledger.record_payment(paid) is None
+    assert earnings_ledger._append(paid.provider_id, 'payment', f'payment:booking:{paid.id}', 5.0) is None
+    db.session.commit()
+    assert EarningsEntry.query.count() == 1
+    assert balances(booking.expert) == (90.0, 0.0, 0.0)
+
+
+def test_total_earnings_counts_completed_sessions_only(booking):
+    past, upcoming = booking(100.0), booking(40.0, hours=24 * 365)
+    for paid in (past, upcoming):
+        earnings_ledger.record_payment(paid)
+    db.session.commit()
+    assert balances(booking.expert) == (126.0, 0.0, 0.0)
+
+    assert complete_past_bookings(now=START + timedelta(days=1)).updated == 1
+    assert balances(booking.expert) == (126.0, 100.0, 0.0)
+    entry = EarningsEntry.query.filter_by(kind='earned').one()
+    assert (entry.booking_id, entry.amount, entry.earnings_after) == (past.id, 0.0, 100.0)
+
+
+def test_late_payment_on_a_completed_booking_is_earned_at_once(booking):
+    paid = booking(status='completed')
+    earnings_ledger.record_payment(paid)
+    db.session.commit()
+    assert balances(booking.expert) == (90.0, 100.0, 0.0)
+
+
+def test_refund_reverses_payment_and_earned(booking):
+    upcoming, completed = booking(), booking(50.0, status='completed', hours=1)
+    for paid in (upcoming, completed):
+        earnings_ledger.record_payment(paid)
+    db.session.commit()
+
+    earnings_ledger.record_refund(upcoming)
+    db.session.commit()
+    assert balances(booking.expert) == (45.0, 50.0, 0.0)
+    earnings_ledger.record_refund(completed)
+    earnings_ledger.record_refund(completed)
+    db.session.commit()
+    assert balances(booking.expert) == (0.0, 0.0, 0.0)
+    assert EarningsEntry.query.filter_by(kind='refund').count() == 2
+
+
+def test_rebuild_matches_the_old_dashboard(booking):
+    booking(100.0, status='completed')
+    booking(40.0, hours=1)
+    booking(10.0, status='cancelled', hours=2)
+    assert earnings_ledger.rebuild_ledger() == 2
+    assert balances(booking.expert) == (126.0, 100.0, 0.0)
+    assert earnings_ledger.rebuild_ledger() == 0
+    assert balances(booking.expert) == (126.0, 100.0, 0.0)
@@ -0,0 +1,109 @@
+from datetime import date, datetime
+
+import pytest
+
+from earnings_stats import chart_series, earnings_summary, rebuild_earnings_days
+from extensions import db
+from models import EarningsDay, Payout
+
+TODAY = date(2026, 10, 14)  # a Wednesday
+
+
+@pytest.fixture
+def expert(make_user):
+    return make_user()
+
+
+def payout(user, amount, status='pending', created_at=datetime(2026, 10, 13, 9)):
+    record = Payout(user_id=user.id, amount=amount, currency='usd', status=status, created_at=created_at)
+    db.session.add(record)
+    db.session.commit()
+    return record
+
+
+def days(user):
+    """{day: {column: value}} of the user's non-empty roll-up rows"""
+    db.session.expire_all()
+    columns = ['paid_amount', 'paid_count', 'pending_amount', 'pending_count', 'failed_amount', 'failed_count']
+    rows = {}
+    for row in EarningsDay.query.filter_by(user_id=user.id):
+        values = {column: getattr(row, column) for column in columns if getattr(row, column)}
+        if values:
+            rows[row.day] = values
+    return rows
+
+
+def test_insert_and_status_changes_move_amounts_between_columns(expert):
+    record = payout(expert, 5000)
+    assert days(expert) == {date(2026, 10, 13): {'pending_amount': 5000, 'pending_count': 1}}
+
+    record.status = 'paid'
+    db.session.commit()
+    assert days(expert) == {date(2026, 10, 13): {'paid_amount': 5000, 'paid_count': 1}}
+
+    # The row is expired after the commit: the old status has to be loaded to subtract it
+    db.session.expire_all()
+    db.session.get(Payout, record.id).status = 'failed'
+    db.session.commit()
+    assert days(expert) == {date(2026, 10, 13): {'failed_amount': 5000, 'failed_count': 1}}
+
+
+def test_amount_and_day_changes_and_deletes(expert):
+    record = payout(expert, 5000, 'paid')
+    payout(expert, 1000, 'paid')
+    record.amount = 7000
+    db.session.commit()
+    assert days(expert) == {date(2026, 10, 13): {'paid_amount': 8000, 'paid_count': 2}}
+
+    record.created_at = datetime(2026, 10, 14, 9)
+    db.session.commit()
+    assert days(expert) == {date(2026, 10, 13): {'paid_amount': 1000, 'paid_count': 1},
+                            date(2026, 10, 14): {'paid_amount': 7000, 'paid_count': 1}}
+
+    db.session.delete(db.session.get(Payout, record.id))
+    db.session.commit()
+    assert days(expert) == {date(2026, 10, 13): {'paid_amount': 1000, 'paid_count': 1}}
+
+
+def test_rebuild_matches_the_incremental_roll_up(expert, make_user):
+    other = make_user()
+    first = payout(expert, 5000, 'paid', datetime(2026, 9, 2, 23, 30))
+    payout(expert, 2500, 'pending')
+    payout(other, 1200, 'failed', datetime(2025, 12, 31, 8))
+    first.status = 'failed'
+    db.session.commit()
+    removed = payout(expert, 900, 'paid', datetime(2026, 8, 1))
+    db.session.delete(removed)
+    db.session.commit()
+
+    incremental = days(expert), days(other)
+    assert rebuild_earnings_days() == 3
+    assert (days(expert), days(other)) == incremental
+
+
+def test_summary_and_chart_series(expert):
+    payout(expert, 5000, 'paid', datetime(2026, 10, 13, 9))
+    payout(expert, 2000, 'paid', datetime(2026, 10, 14, 9))
+    payout(expert, 1000, 'paid', datetime(2026, 9, 30, 9))
+    payout(expert, 3000, 'paid', datetime(2025, 11, 5, 9))
+    payout(expert, 700, 'pending', datetime(2026, 10, 14, 10))
+
+    summary = earnings_summary(expert.id, today=TODAY)
+    assert (summary['total_earned'], summary['paid_count'], summary['pending_total']) == (11000, 4, 700)
+    assert (summary['monthly_earned'], summary['weekly_earned']) == (7000, 7000)
+
+    labels, data = chart_series(expert.id, '7d', today=TODAY)
+    assert labels == ['Thu', 'Fri', 'Sat', 'Sun', 'Mon', 'Tue', 'Wed']
+    assert data == [0, 0, 0, 0, 0, 50.0, 20.0]
+
+    labels, data = chart_series(expert.id, '30d', today=TODAY)
+    assert (len(data), labels[-1], sum(data)) == (30, '10/14', 80.0)
+
+    labels, data = chart_series(expert.id, '1y', today=TODAY)
+    assert (labels[0], labels[-1]) == ('Nov 25', 'Oct 26')
+    assert (data[0], data[-2], data[-1], sum(data)) == (30.0, 10.0, 70.0, 110.0)
+
+    labels, data = chart_series(expert.id, 'all', today=TODAY)
+    assert (len(labels), labels[0], data[0]) == (12, 'Nov 25', 30.0)
+
+    assert chart_series(expert.id, 'bogus', today=TODAY)[0] == chart_series(expert.id, '7d', today=TODAY)[0]
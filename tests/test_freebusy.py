@@ -0,0 +1,121 @@
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import freebusy
+from freebusy import FreeBusyCache, busy_intervals, freebusy_cache
+
+DAY = date(2026, 10, 19)
+
+
+@pytest.fixture
+def calendar_user(make_user):
+    def make(**fields):
+        return make_user(google_calendar_connected=True, google_calendar_id='primary',
+                         google_calendar_token='stub-token', google_calendar_refresh_token='stub-refresh',
+                         **fields)
+    return make
+
+
+def at(day, hour):
+    return datetime.combine(day, datetime.min.time()).replace(hour=hour)
+
+
+def wait_for_cache(keys):
+    for _ in range(100):
+        if len(freebusy_cache.get_many(keys)) == len(keys):
+            return
+        time.sleep(0.05)
+    raise AssertionError('free/busy was never fetched')
+
+
+def test_cache_expires_and_evicts_least_recently_used():
+    cache = FreeBusyCache(ttl=60, max_entries=2)
+    cache.set_many({(1, DAY): ['a'], (2, DAY): ['b']})
+    cache.get_many([(1, DAY)])  # 1 is now the most recent
+    cache.set_many({(3, DAY): ['c']})
+    assert cache.get_many([(1, DAY), (2, DAY), (3, DAY)]) == {(1, DAY): ['a'], (3, DAY): ['c']}
+
+    cache.set_many({(1, DAY): ['a']}, ttl=0.05)
+    time.sleep(0.1)
+    assert cache.get_many([(1, DAY)]) == {}
+    cache.invalidate(3)
+    assert cache.get_many([(3, DAY)]) == {}
+
+
+def test_refresh_batches_providers_in_one_request(app, google_stub, calendar_user, make_user):
+    providers = [calendar_user(), calendar_user(timezone='America/Los_Angeles'), make_user()]
+    assert freebusy.refresh([(provider, DAY, 3) for provider in providers]) == 2
+    assert google_stub.STATS['batches'] == 1
+    assert google_stub.STATS['freebusy'] == 2  # not the provider without a calendar
+
+    cached = freebusy_cache.get_many([(providers[1].id, DAY + timedelta(days=i)) for i in range(3)])
+    assert list(cached.values()) == [[(at(DAY + timedelta(days=i), 16), at(DAY + timedelta(days=i), 17))]
+                                     for i in range(3)]
+
+
+def test_pages_read_the_cache_and_fetch_misses_in_the_background(app, google_stub, calendar_user,
+                                                                   monkeypatch):
+    provider = calendar_user()
+    fetch_threads = []
+    fetch = freebusy._fetch
+
+    def recording_fetch(requests):
+        fetch_threads.append(threading.current_thread())
+        return fetch(requests)
+    monkeypatch.setattr(freebusy, '_fetch', recording_fetch)
+
+    # A miss is free time for now
+    assert busy_intervals([provider], DAY, 3) == {provider.id: []}
+    wait_for_cache([(provider.id, DAY + timedelta(days=i)) for i in range(freebusy.FREEBUSY_PREFETCH_DAYS)])
+    assert fetch_threads and threading.current_thread() not in fetch_threads
+
+    assert busy_intervals([provider], DAY, 3)[provider.id] == [
+        (at(DAY + timedelta(days=i), 16), at(DAY + timedelta(days=i), 17)) for i in range(3)]
+    # Later days were prefetched with the first lookup
+    later = DAY + timedelta(days=freebusy.FREEBUSY_PREFETCH_DAYS - 2)
+    assert len(busy_intervals([provider], later, 2)[provider.id]) == 2
+    assert google_stub.STATS['batches'] == 1
+
+
+def test_slot_page_never_waits_on_google(app, google_stub, calendar_user, monkeypatch):
+    from slot_engine import ProviderSchedule
+    provider = calendar_user()
+    release = threading.Event()
+    fetch = freebusy._fetch
+
+    def slow_fetch(requests):
+        release.wait(5)
+        return fetch(requests)
+    monkeypatch.setattr(freebusy, '_fetch', slow_fetch)
+
+    started = time.monotonic()
+    schedule = ProviderSchedule.load(provider, DAY, 60)
+    assert time.monotonic() - started < 1
+    assert not schedule.is_busy(at(DAY, 16), at(DAY, 17))
+    release.set()
+    wait_for_cache([(provider.id, DAY)])
+
+
+def test_calendar_sync_warms_the_cache(app, google_stub, calendar_user):
+    from calendar_queue import sync_calendar
+    provider = calendar_user()
+    assert sync_calendar(provider.id) is not None
+    today = datetime.now(freebusy.ZoneInfo(freebusy.DEFAULT_TIMEZONE)).date()
+    keys = [(provider.id, today + timedelta(days=i)) for i in range(60)]
+    assert len(freebusy_cache.get_many(keys)) == 60
+
+
+def test_failed_lookup_is_cached_briefly_as_free(app, google_stub, calendar_user, monkeypatch):
+    import google_calendar
+    provider = calendar_user()
+    monkeypatch.setattr(google_calendar, 'API_ROOT', 'http://127.0.0.1:9/')  # nothing listens
+    monkeypatch.setattr(google_calendar, '_service', None)
+    monkeypatch.setattr(freebusy, 'FREEBUSY_ERROR_TTL', 0.05)
+
+    assert freebusy.refresh([(provider, DAY, 1)]) == 0
+    assert freebusy_cache.get_many([(provider.id, DAY)]) == {(provider.id, DAY): []}
+    time.sleep(0.1)
+    assert freebusy_cache.get_many([(provider.id, DAY)]) == {}
@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy import select
+
+import fulltext
+from extensions import db
+from models import User
+
+
+@pytest.fixture
+def people(make_user):
+    return {
+        'name': make_user(full_name='Python Pete', profession='Chef'),
+        'skills': make_user(full_name='Sam Smith', skills='python, django'),
+        'bio': make_user(full_name='Bo Jones', bio='Writes some python on weekends'),
+        'other': make_user(full_name='Alex Doe', profession='Pastry chef', skills='baking'),
+    }
+
+
+def ranked(backend, *terms, match_all=True):
+    subquery = backend.ranked_ids(list(terms), match_all=match_all)
+    rows = db.session.execute(
+        select(subquery.c.user_id).order_by(subquery.c.rank.desc(), subquery.c.user_id)
+    ).scalars()
+    return list(rows)
+
+
+def test_sqlite_fts_ranks_by_field_weight_and_follows_writes(app, people):
+    backend = fulltext.get_search_backend()
+    assert backend.name == 'sqlite-fts5'
+    ids = {key: user.id for key, user in people.items()}
+    assert ranked(backend, 'python') == [ids['name'], ids['skills'], ids['bio']]
+    assert ranked(backend, 'pyth') == ranked(backend, 'python')  # the last word is a prefix
+    assert ranked(backend, 'python', 'chef') == [ids['name']]
+    assert set(ranked(backend, 'django', 'baking', match_all=False)) == {ids['skills'], ids['other']}
+
+    # The triggers keep the index in step with inserts, updates and deletes
+    people['other'].skills = 'python, baking'
+    db.session.commit()
+    assert ids['other'] in ranked(backend, 'python')
+    db.session.delete(people['name'])
+    db.session.commit()
+    assert ranked(backend, 'python')[0] == ids['skills']
+    newcomer = User(username='newcomer', email='new@example.com', full_name='Python Paula')
+    db.session.add(newcomer)
+    db.session.commit()
+    assert ranked(backend, 'python')[0] == newcomer.id
+    assert backend.ranked_ids(['!!']) is None
+
+
+def test_like_backend_ranks_the_same_way(app, people):
+    backend = fulltext.LikeBackend()
+    ids = {key: user.id for key, user in people.items()}
+    assert ranked(backend, 'python') == [ids['name'], ids['skills'], ids['bio']]
+    assert ranked(backend, 'python', 'chef') == [ids['name']]
+    assert set(ranked(backend, 'django', 'baking', match_all=False)) == {ids['skills'], ids['other']}
+    assert backend.ranked_ids(['  ']) is None
+
+
+def test_failed_setup_falls_back_to_like(app, monkeypatch):
+    def broken(self):
+        raise RuntimeError('no fts5 here')
+    monkeypatch.setattr(fulltext.SqliteFTSBackend, 'setup', broken)
+    monkeypatch.setattr(fulltext, '_backend', None)
+    assert fulltext.get_search_backend().name == 'like'
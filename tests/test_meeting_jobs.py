@@ -0,0 +1,86 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import daily_client as daily
+import meeting_jobs
+from daily_client import DailyClient
+from extensions import db
+from models import Booking
+
+NOW = datetime(2026, 10, 14, 9, 0)
+
+
+@pytest.fixture
+def stub(daily_stub, monkeypatch):
+    import daily_stub as stub
+    monkeypatch.setattr(daily, 'DAILY_API_KEY', 'test')
+    monkeypatch.setattr(daily, '_client', DailyClient('test', daily_stub()))
+    return stub
+
+
+@pytest.fixture
+def booking(make_user):
+    client, expert = make_user(), make_user()
+
+    def make(minutes=30, status='confirmed'):
+        start = NOW + timedelta(minutes=minutes)
+        booking = Booking(user_id=client.id, provider_id=expert.id, start_time=start,
+                          end_time=start + timedelta(minutes=30), duration=30, status=status)
+        db.session.add(booking)
+        db.session.commit()
+        return booking
+    return make
+
+
+def test_room_name_does_not_depend_on_the_host_timezone(monkeypatch):
+    names = set()
+    for tz in ('UTC', 'Asia/Tokyo', 'America/Los_Angeles'):
+        monkeypatch.setenv('TZ', tz)
+        time.tzset()
+        names.add(meeting_jobs.room_name(7, NOW))
+    monkeypatch.undo()
+    time.tzset()
+    # 09:00 Eastern (UTC-4) is 13:00 UTC
+    utc_start = datetime(2026, 10, 14, 13, tzinfo=timezone.utc)
+    assert names == {f'droply-7-{int(utc_start.timestamp())}'}
+
+
+def test_provision_creates_rooms_for_bookings_starting_soon(app, booking, stub):
+    soon, later, pending = booking(30), booking(180), booking(20, status='pending')
+    assert meeting_jobs.provision_meeting_rooms(now=NOW) == 1
+    db.session.expire_all()
+    assert soon.meeting_room_id == meeting_jobs.room_name(soon.id, soon.start_time)
+    assert soon.meeting_url == f'https://stub.daily.co/{soon.meeting_room_id}'
+    assert soon.meeting_room_expires_at == soon.end_time + meeting_jobs.ROOM_GRACE
+    assert later.meeting_room_id is None and pending.meeting_room_id is None
+    expires = datetime(2026, 10, 14, 15, 0, tzinfo=timezone.utc)
+    assert stub.ROOMS[soon.meeting_room_id]['config'] == {'exp': int(expires.timestamp())}
+    # Nothing left to do on the next run
+    assert meeting_jobs.provision_meeting_rooms(now=NOW) == 0
+    assert len(stub.ROOMS) == 1
+
+
+def test_provision_leaves_rooms_to_join_time_when_daily_is_down(app, booking, daily_stub, monkeypatch):
+    monkeypatch.setattr(daily, 'DAILY_API_KEY', 'test')
+    monkeypatch.setattr(daily, 'BACKOFF_BASE', 0.01)
+    monkeypatch.setattr(daily, '_client', DailyClient('test', daily_stub(fail_rate=1.0)))
+    soon = booking(30)
+    assert meeting_jobs.provision_meeting_rooms(now=NOW) == 0
+    db.session.expire_all()
+    assert soon.meeting_room_id is None
+
+
+def test_gc_deletes_expired_rooms_once(app, booking, stub):
+    ended, upcoming = booking(-120), booking(30)
+    assert meeting_jobs.provision_meeting_rooms(now=NOW - timedelta(minutes=150)) == 1
+    assert meeting_jobs.provision_meeting_rooms(now=NOW) == 1
+    assert len(stub.ROOMS) == 2
+
+    assert meeting_jobs.gc_meeting_rooms(now=NOW) == 1
+    db.session.expire_all()
+    assert ended.meeting_room_deleted_at == NOW
+    assert upcoming.meeting_room_deleted_at is None
+    assert list(stub.ROOMS) == [upcoming.meeting_room_id]
+    assert meeting_jobs.gc_meeting_rooms(now=NOW) == 0
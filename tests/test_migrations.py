@@ -0,0 +1,75 @@
+import sqlite3
+from pathlib import Path
+
+from sqlalchemy import inspect
+
+from conftest import make_app
+
+BASELINE_SCHEMA = Path(__file__).parent / 'fixtures' / 'baseline_schema.sql'
+
+
+def _schema(engine):
+    inspector = inspect(engine)
+    return {
+        table: ({column['name'] for column in inspector.get_columns(table)},
+                {index['name'] for index in inspector.get_indexes(table)})
+        for table in inspector.get_table_names() if not table.startswith('user_fts')
+    }
+
+
+def test_upgrade_from_baseline_schema(tmp_path):
+    with sqlite3.connect(tmp_path / 'baseline.db') as conn:
+        conn.executescript(BASELINE_SCHEMA.read_text())
+        conn.execute("INSERT INTO user (id, username, email) VALUES (1, 'client', 'c@example.com'), "
+                     "(2, 'expert', 'e@example.com')")
+        conn.execute("INSERT INTO booking (user_id, provider_id, start_time, end_time, duration, status, "
+                     "payment_status, payment_amount) VALUES (1, 2, '2026-01-05 10:00:00', "
+                     "'2026-01-05 10:30:00', 30, 'completed', 'paid', 100.0)")
+
+    from extensions import db
+    from migrations import pending_migrations
+    from models import Booking, EarningsEntry, User
+
+    app = make_app(tmp_path, 'baseline.db')
+    with app.app_context():
+        assert pending_migrations() == []
+        assert Booking.query.count() == 1
+        # The ledger backfill runs after the migrations, on the new columns
+        assert EarningsEntry.query.filter_by(user_id=2, kind='payment').count() == 1
+        assert db.session.get(User, 2).pending_balance == 90.0
+        upgraded = _schema(db.engine)
+        db.session.remove()
+        db.engine.dispose()
+
+    fresh = make_app(tmp_path, 'fresh.db')
+    with fresh.app_context():
+        assert upgraded == _schema(db.engine)
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_migrations_are_idempotent(app):
+    from migrations import MIGRATIONS
+    from extensions import db
+    with db.engine.begin() as conn:
+        for _, fn in MIGRATIONS.values():
+            fn(conn)
+
+
+def test_booking_index_migration_runs_before_room_expiry_columns(tmp_path):
+    """Migration 2 must not touch the indexes migration 5 adds with its columns"""
+    from sqlalchemy import create_engine
+    from migrations import MIGRATIONS
+
+    with sqlite3.connect(tmp_path / 'baseline.db') as conn:
+        conn.executescript(BASELINE_SCHEMA.read_text())
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as conn:
+        MIGRATIONS[2][1](conn)
+        indexes = {index['name'] for index in inspect(conn).get_indexes('booking')}
+        assert 'ix_booking_provider_status_start' in indexes
+        assert 'ix_booking_room_expires' not in indexes
+        MIGRATIONS[5][1](conn)
+        indexes = {index['name'] for index in inspect(conn).get_indexes('booking')}
+        assert {'ix_booking_status_start', 'ix_booking_room_expires'} <= indexes
+    engine.dispose()
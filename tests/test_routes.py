@@ -0,0 +1,24 @@
+import re
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+URL_FOR = re.compile(r"""url_for\(\s*['"]([\w.]+)['"]""")
+
+
+def test_every_url_for_names_a_registered_endpoint(app):
+    endpoints = {rule.endpoint for rule in app.url_map.iter_rules()}
+    sources = [*ROOT.glob('*.py'), *ROOT.glob('views/*.py'), *ROOT.glob('templates/**/*.html')]
+    unknown = {
+        f'{path.relative_to(ROOT)}: {name}'
+        for path in sources
+        for name in URL_FOR.findall(path.read_text())
+        if name not in endpoints
+    }
+    assert unknown == set()
+
+
+def test_referral_link_points_at_the_homepage(app, make_user):
+    user = make_user()
+    with app.test_request_context():
+        link = user.get_referral_link()
+    assert link.endswith(f'://localhost/?ref={user.referral_code}')
@@ -0,0 +1,186 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import earnings_ledger
+import scheduled_payouts
+from extensions import db
+from models import Booking, EarningsEntry, Payout, User
+
+TUESDAY = datetime(2026, 10, 13, 9)  # ISO week 42, 13th of the month
+
+
+@pytest.fixture
+def stub(stripe_stub, monkeypatch):
+    import stripe
+    monkeypatch.setattr(stripe, 'max_network_retries', 0)
+    return stripe_stub
+
+
+@pytest.fixture
+def provider(make_user):
+    def make(schedule='weekly', earned=100.0, **fields):
+        fields.setdefault('payout_enabled', True)
+        user = make_user(payout_schedule=schedule, **fields)
+        if user.stripe_account_id is None:
+            user.stripe_account_id = f'acct_{user.id:08d}'
+        if earned:
+            pay(user, earned)
+        db.session.commit()
+        return user
+    return make
+
+
+def pay(user, amount):
+    """Credit the provider for a paid booking worth `amount`"""
+    start = datetime(2026, 10, 1, 10) + timedelta(hours=Booking.query.count())
+    booking = Booking(user_id=user.id, provider_id=user.id, start_time=start,
+                      end_time=start + timedelta(minutes=30), duration=30,
+                      status='confirmed', payment_status='paid', payment_amount=amount)
+    db.session.add(booking)
+    db.session.flush()
+    earnings_ledger.record_payment(booking)
+    db.session.commit()
+
+
+def balance(user):
+    db.session.expire_all()
+    return db.session.get(User, user.id).pending_balance
+
+
+def test_pays_each_due_provider_once_per_window(stub, provider, monkeypatch):
+    monkeypatch.setattr(scheduled_payouts, 'PAYOUT_MONTH_DAY', 20)
+    daily = provider('daily')
+    weekly = provider('weekly')
+    monthly = provider('monthly')  # its window opens on the 20th
+    disabled = provider('daily', payout_enabled=False)
+    small = provider('daily', earned=0.5)
+
+    assert scheduled_payouts.run_payouts(TUESDAY) == 2
+    assert scheduled_payouts.run_payouts(TUESDAY) == 0
+
+    payouts = {payout.user_id: payout for payout in Payout.query}
+    assert set(payouts) == {daily.id, weekly.id}
+    assert payouts[daily.id].payout_window == 'daily:2026-10-13'
+    assert payouts[weekly.id].payout_window == 'weekly:2026-W42'
+    assert payouts[weekly.id].amount == 9000
+    assert payouts[weekly.id].stripe_payout_id.startswith('po_stub_')
+    assert balance(weekly) == 0.0
+    assert balance(monthly) == balance(disabled) == 90.0
+    assert balance(small) == pytest.approx(0.45)
+
+    # The next day is a new daily window but the same week
+    pay(daily, 10.0)
+    pay(weekly, 10.0)
+    assert scheduled_payouts.run_payouts(TUESDAY + timedelta(days=1)) == 1
+    assert Payout.query.filter_by(user_id=daily.id).count() == 2
+    assert balance(weekly) == 9.0
+
+
+def test_payout_confirmed_by_a_later_run_is_not_sent_twice(stub, provider):
+    """The run died after Stripe accepted the payout, and more money came in since"""
+    user = provider('daily')
+    [payout_id] = scheduled_payouts.reserve_payouts(scheduled_payouts.eligible_payouts(
+        scheduled_payouts.due_windows(TUESDAY)))
+    submission = (payout_id, user.id, user.stripe_account_id, 9000, 'usd')
+    _, stripe_payout_id, _ = scheduled_payouts._submit(submission)  # accepted, never stored
+    pay(user, 50.0)
+
+    assert scheduled_payouts.run_payouts(TUESDAY) == 1
+    payout = db.session.get(Payout, payout_id)
+    assert payout.stripe_payout_id == stripe_payout_id
+    assert len(stub.PAYOUTS) == 1
+    assert Payout.query.count() == 1
+    # Debited once, at reservation; the new payment waits for the next window
+    assert EarningsEntry.query.filter_by(kind='payout').count() == 1
+    assert balance(user) == 45.0
+
+
+def test_unconfirmed_payout_is_resubmitted(stub, provider):
+    user = provider('daily')
+    stub.FAIL_NEXT['count'] = 1
+    assert scheduled_payouts.run_payouts(TUESDAY) == 0
+    payout = Payout.query.one()
+    assert payout.stripe_payout_id is None and payout.status == 'pending'
+    assert balance(user) == 0.0  # reserved
+
+    assert scheduled_payouts.run_payouts(TUESDAY) == 1
+    db.session.expire_all()
+    assert Payout.query.one().stripe_payout_id is not None
+    assert len(stub.PAYOUTS) == 1
+
+
+def test_unconfirmed_payout_is_left_alone_after_the_retry_window(stub, provider):
+    provider('daily')
+    stub.FAIL_NEXT['count'] = 1
+    scheduled_payouts.run_payouts(TUESDAY)
+    payout = Payout.query.one()
+    payout.created_at -= scheduled_payouts.SUBMIT_RETRY_WINDOW + timedelta(minutes=1)
+    db.session.commit()
+    assert scheduled_payouts.unsubmitted_payout_ids() == []
+
+
+def test_rejected_payout_is_reversed_and_retried_in_the_window(stub, provider):
+    user = provider('daily')
+    stub.ACCOUNTS[user.stripe_account_id] = stub.make_account(user.stripe_account_id, payouts_enabled=False)
+
+    assert scheduled_payouts.run_payouts(TUESDAY) == 0
+    failed = Payout.query.one()
+    assert failed.status == 'failed' and failed.payout_window is None
+    assert balance(user) == 90.0
+
+    stub.ACCOUNTS[user.stripe_account_id]['payouts_enabled'] = True
+    assert scheduled_payouts.run_payouts(TUESDAY) == 1
+    assert balance(user) == 0.0
+
+
+def test_payout_webhook_matches_an_unconfirmed_payout_by_metadata(stub, provider):
+    import stripe_events
+    user = provider('daily')
+    [payout_id] = scheduled_payouts.reserve_payouts(scheduled_payouts.eligible_payouts(
+        scheduled_payouts.due_windows(TUESDAY)))
+    stripe_events._payout_finished(
+        {'id': 'po_hook', 'metadata': {'payout_id': str(payout_id)}}, {'type': 'payout.paid'})
+    db.session.commit()
+    payout = db.session.get(Payout, payout_id)
+    assert (payout.stripe_payout_id, payout.status) == ('po_hook', 'paid')
+    assert balance(user) == 0.0
+
+
+def request_payout(app, user):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user.id)
+    response = client.post('/expert/request-payout')
+    assert response.status_code == 302
+    with client.session_transaction() as session:
+        return [message for _, message in session.get('_flashes', [])]
+
+
+def test_requested_payout_is_reserved_before_stripe_is_called(app, stub, provider):
+    user = provider('daily')
+    assert request_payout(app, user) == ['Payout of $90.00 requested successfully!']
+    payout = Payout.query.one()
+    assert payout.payout_window.startswith('manual:')
+    assert stub.PAYOUTS[f'payout:{payout.id}'][1]['id'] == payout.stripe_payout_id
+    assert balance(user) == 0.0
+    assert request_payout(app, user) == ['No pending balance to payout']
+
+
+def test_unconfirmed_requested_payout_is_resubmitted_by_the_next_run(app, stub, provider):
+    user = provider('daily')
+    stub.FAIL_NEXT['count'] = 1
+    assert request_payout(app, user) == ['Payout of $90.00 requested; it will be sent shortly']
+    assert balance(user) == 0.0
+    assert scheduled_payouts.run_payouts() == 1
+    db.session.expire_all()
+    assert Payout.query.one().stripe_payout_id is not None
+    assert len(stub.PAYOUTS) == 1
+
+
+def test_rejected_requested_payout_restores_the_balance(app, stub, provider):
+    user = provider('daily')
+    stub.ACCOUNTS[user.stripe_account_id] = stub.make_account(user.stripe_account_id, payouts_enabled=False)
+    assert request_payout(app, user) == ['Stripe declined the payout; your balance has been restored']
+    assert Payout.query.one().status == 'failed'
+    assert balance(user) == 90.0
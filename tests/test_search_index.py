@@ -0,0 +1,91 @@
+import threading
+import time
+
+from sqlalchemy import update
+
+import search_index as search_index_module
+from extensions import db
+from models import User
+from search_index import search_index
+
+
+def names(query):
+    return [user.full_name for user in search_index.search(query)]
+
+
+def test_suggestions_follow_committed_changes(app, make_user):
+    search_index.build()
+    ada = make_user(full_name='Ada Coder', profession='Software Engineer', is_available=True)
+    make_user(full_name='Bob Coder', is_available=False)
+    assert names('coder') == ['Ada Coder']
+    assert names('soft') == ['Ada Coder']
+
+    ada.full_name = 'Ada Lovelace'
+    db.session.commit()
+    assert names('coder') == []
+
+    ada.full_name = 'Ada Rolledback'
+    db.session.flush()
+    db.session.rollback()
+    assert names('lovelace') == ['Ada Lovelace']
+
+
+def test_stale_index_rebuilds_in_the_background(app, make_user, monkeypatch):
+    make_user(full_name='Ada Coder', is_available=True)
+    search_index.refresh_if_stale()  # first request builds inline
+    assert names('ada') == ['Ada Coder']
+    # Another worker's write: straight to the database, no session hooks
+    with db.engine.begin() as conn:
+        conn.execute(update(User.__table__).values(full_name='Ada Lovelace'))
+
+    started = threading.Event()
+    release = threading.Event()
+    build = search_index._build
+    builds = []
+
+    def slow_build():
+        builds.append(1)
+        started.set()
+        release.wait(5)
+        return build()
+    monkeypatch.setattr(search_index, '_build', slow_build)
+    monkeypatch.setattr(search_index, '_built_at',
+                        time.monotonic() - search_index_module.REFRESH_SECONDS - 1)
+
+    # Requests keep the old index while one rebuild runs
+    for _ in range(3):
+        search_index.refresh_if_stale()
+        assert names('ada') == ['Ada Coder']
+    assert started.wait(5)
+    assert len(builds) == 1
+
+    release.set()
+    for _ in range(100):
+        if not search_index._build_lock.locked():
+            break
+        time.sleep(0.05)
+    assert names('ada') == ['Ada Lovelace']
+
+
+def test_commits_during_a_rebuild_survive_the_swap(app, make_user, monkeypatch):
+    ada = make_user(full_name='Ada Coder', is_available=True)
+    bob = make_user(full_name='Bob Coder', is_available=True)
+    search_index.build()
+    add = search_index_module.SearchIndex._add
+    edited = []
+
+    def add_then_commit(index, entry):
+        # Edits committed after the scan read its rows, before the swap
+        if index is not search_index and not edited:
+            edited.append(1)
+            ada.full_name = 'Ada Lovelace'
+            bob.is_available = False
+            db.session.commit()
+        add(index, entry)
+    monkeypatch.setattr(search_index_module.SearchIndex, '_add', add_then_commit)
+
+    assert search_index.build() == 2
+    assert edited
+    assert names('coder') == []
+    assert names('lovelace') == ['Ada Lovelace']
+    assert search_index._changes is None
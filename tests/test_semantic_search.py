@@ -0,0 +1,112 @@
+import json
+import os
+import random
+import threading
+import time
+from array import array
+
+import pytest
+from sqlalchemy import update
+
+import semantic_search
+from extensions import db
+from models import User
+from semantic_search import VectorIndex, get_encoder, semantic_index
+
+
+@pytest.fixture
+def experts(make_user):
+    return [
+        make_user(full_name='Ada Coder', profession='Software Engineer', skills='python, web apps',
+                  is_available=True),
+        make_user(full_name='Jo Lift', profession='Personal Trainer', skills='fitness, weight loss',
+                  is_available=True),
+        make_user(full_name='Sam Ledger', profession='Accountant', skills='tax, bookkeeping',
+                  is_available=True),
+    ]
+
+
+def test_vector_index_matches_brute_force():
+    encoder = get_encoder()
+    rng = random.Random(7)
+    words = ['python', 'fitness', 'coach', 'tax', 'design', 'marketing', 'guitar', 'data', 'cloud', 'yoga']
+    index = VectorIndex(encoder.dim)
+    vectors = {}
+    for item_id in range(300):
+        vectors[item_id] = array('f', encoder.encode(' '.join(rng.choices(words, k=6))))
+        index.add(item_id, vectors[item_id])
+    index.remove(0)
+    del vectors[0]
+
+    query = encoder.encode('I want a python data coach')
+    exact = sorted(((sum(a * b for a, b in zip(query, v)), i) for i, v in vectors.items()), reverse=True)
+    expected = [i for score, i in exact if score > 0][:20]
+    assert [item_id for item_id, _ in index.query(query, 20)] == expected
+
+
+def test_search_finds_experts_by_meaning(app, experts):
+    matches = semantic_index.search('I need someone to help me lose weight and get fit')
+    assert matches[0][0] == experts[1].id
+
+
+def test_sync_does_not_commit_the_callers_session(app, experts):
+    db.session.add(User(username='uncommitted', email='u@example.com', full_name='Pending Person',
+                        is_available=True))
+    assert semantic_index.sync() == 3
+    db.session.rollback()
+    assert User.query.filter_by(username='uncommitted').count() == 0
+
+
+def test_stale_index_refreshes_in_the_background(app, experts, monkeypatch):
+    semantic_index.search('fitness coach')  # loads and syncs
+    # A change from another process: straight to the database, no session hooks
+    with db.engine.begin() as conn:
+        conn.execute(update(User.__table__).where(User.__table__.c.id == experts[2].id)
+                     .values(profession='Yoga Teacher', skills='yoga, meditation'))
+
+    started = threading.Event()
+    release = threading.Event()
+    sync = semantic_index._sync
+
+    def slow_sync():
+        started.set()
+        release.wait(5)
+        return sync()
+    monkeypatch.setattr(semantic_index, '_sync', slow_sync)
+    monkeypatch.setattr(semantic_index, '_synced_at', time.monotonic() - semantic_search.REFRESH_SECONDS - 1)
+
+    # Served from the current vectors while the sync runs; only one sync starts
+    before = semantic_index.search('yoga and meditation teacher')
+    assert started.wait(5)
+    semantic_index.search('yoga and meditation teacher')
+    assert semantic_index._sync_lock.locked()
+    assert experts[2].id not in [user_id for user_id, _ in before][:1]
+
+    release.set()
+    for _ in range(100):
+        if not semantic_index._sync_lock.locked():
+            break
+        time.sleep(0.05)
+    assert semantic_index.search('yoga and meditation teacher')[0][0] == experts[2].id
+
+
+def test_concurrent_saves_leave_a_complete_file(app, experts, tmp_path):
+    semantic_index.sync()
+    errors = []
+
+    def save():
+        try:
+            for _ in range(20):
+                semantic_index.save()
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=save) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with open(semantic_index.path) as f:
+        assert len(json.load(f)['entries']) == 3
+    assert [name for name in os.listdir(tmp_path) if name.endswith('.tmp')] == []
@@ -0,0 +1,74 @@
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from extensions import db
+from models import AvailabilityException, AvailabilityRule, Booking
+from slot_engine import ProviderSchedule
+
+DAY = date(2026, 10, 19)  # a Monday
+
+
+def at(hour, minute=0, day=DAY):
+    return datetime.combine(day, time(hour, minute))
+
+
+def schedule_with(*busy):
+    return ProviderSchedule(SimpleNamespace(timezone='America/New_York'), {}, list(busy))
+
+
+def test_busy_interval_edges_do_not_overlap():
+    schedule = schedule_with((at(10), at(10, 30)))
+    assert not schedule.is_busy(at(9, 30), at(10))
+    assert schedule.is_busy(at(10), at(10, 30))
+    assert schedule.is_busy(at(10, 15), at(10, 45))
+    assert schedule.is_busy(at(9, 45), at(10, 15))
+    assert not schedule.is_busy(at(10, 30), at(11))
+
+
+def test_adjacent_and_overlapping_intervals_are_merged():
+    schedule = schedule_with((at(11), at(11, 30)), (at(9), at(10)), (at(10), at(10, 30)), (at(9, 15), at(9, 45)))
+    assert schedule._busy == [[at(9), at(10, 30)], [at(11), at(11, 30)]]
+    assert schedule.is_busy(at(10), at(11))
+    assert not schedule.is_busy(at(10, 30), at(11))
+    assert schedule.is_busy(at(10, 45), at(11, 15))
+    assert not schedule.is_busy(at(11, 30), at(12))
+
+
+@pytest.fixture
+def provider(make_user):
+    user = make_user(timezone='America/New_York')
+    db.session.add(AvailabilityRule(user_id=user.id, weekday=DAY.weekday(), start=time(9), end=time(13)))
+    db.session.commit()
+    return user
+
+
+def book(provider, client, start, minutes, status='confirmed'):
+    db.session.add(Booking(user_id=client.id, provider_id=provider.id, start_time=start,
+                           end_time=start + timedelta(minutes=minutes), duration=minutes, status=status))
+
+
+def starts(slots):
+    return [slot['provider_time'].strftime('%H:%M') for slot in slots]
+
+
+def test_slots_skip_every_slot_a_booking_or_exception_overlaps(app, provider, make_user):
+    client = make_user()
+    book(provider, client, at(9), 60)                    # covers 9:00 and 9:30
+    book(provider, client, at(10, 30), 30, 'pending')    # pending bookings block too
+    book(provider, client, at(11), 30, 'cancelled')      # cancelled ones don't
+    db.session.add(AvailabilityException(user_id=provider.id, start=at(11, 40), end=at(12, 10), is_blocked=True))
+    db.session.add(AvailabilityException(user_id=provider.id, start=at(10), end=at(10, 30), is_blocked=False))
+    db.session.commit()
+
+    slots = ProviderSchedule.load(provider, DAY, 1).slots_for_date(DAY)
+    assert starts(slots) == ['10:00', '11:00', '12:30']
+
+
+def test_slots_in_another_display_timezone(app, provider):
+    slots = ProviderSchedule.load(provider, DAY, 1).slots_for_date(DAY, 'America/Los_Angeles')
+    assert [slot['formatted_time'] for slot in slots[:2]] == ['06:00 AM', '06:30 AM']
+    assert starts(slots[:1]) == ['09:00'] and len(slots) == 8
+    # Nothing on days without a rule
+    assert ProviderSchedule.load(provider, DAY + timedelta(days=1), 1).slots_for_date(DAY + timedelta(days=1)) == []
@@ -0,0 +1,73 @@
+import pytest
+
+import stripe_accounts
+import stripe_events
+from extensions import db
+from models import StripeAccountState, User
+
+
+@pytest.fixture
+def expert(make_user):
+    user = make_user()
+    user.stripe_account_id = f'acct_{user.id:08d}'
+    db.session.commit()
+    return user
+
+
+def signed_in(app, user):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user.id)
+    return client
+
+
+def test_reconciler_caches_new_accounts_once(app, stripe_stub, expert):
+    assert stripe_accounts.reconcile_accounts() == 1
+    state = stripe_accounts.account_state(expert.stripe_account_id)
+    assert stripe_accounts.payout_method(state) == 'STRIPE TEST BANK ••••6789'
+    db.session.expire_all()
+    user = db.session.get(User, expert.id)
+    assert (user.stripe_account_status, user.payout_enabled) == ('active', True)
+
+    assert stripe_accounts.reconcile_accounts() == 0
+    assert stripe_stub.STATS['accounts'] == 1
+
+
+def test_older_account_data_is_ignored(app, stripe_stub, expert):
+    account_id = expert.stripe_account_id
+    assert stripe_accounts.apply_account(stripe_stub.make_account(account_id), 200)
+    stale = stripe_stub.make_account(account_id, charges_enabled=False, payouts_enabled=False)
+    assert not stripe_accounts.apply_account(stale, 100)
+    db.session.commit()
+    assert db.session.get(StripeAccountState, account_id).payouts_enabled
+
+
+def test_external_account_events_track_the_payout_destination(app, stripe_stub, expert):
+    account_id = expert.stripe_account_id
+    stripe_accounts.apply_account(stripe_stub.make_account(account_id), 100)
+    card = {'id': 'card_1', 'account': account_id, 'brand': 'Visa', 'last4': '4242',
+            'default_for_currency': True}
+    stripe_accounts.apply_external_account(card, 200)
+    state = stripe_accounts.account_state(account_id)
+    assert stripe_accounts.payout_method(state) == 'Visa ••••4242'
+    stripe_accounts.apply_external_account(card, 300, deleted=True)
+    assert stripe_accounts.payout_method(state) is None
+
+
+def test_account_webhook_updates_the_cache_and_pages_skip_stripe(app, stripe_stub, expert, monkeypatch):
+    monkeypatch.setenv('STRIPE_WEBHOOK_SECRET', 'whsec_test')
+    monkeypatch.setattr(stripe_events, 'enqueue_event', lambda event_id: None)
+    account = stripe_stub.make_account(expert.stripe_account_id, payouts_enabled=False)
+    body, headers = stripe_stub.signed_event('evt_1', 'account.updated', account, 'whsec_test',
+                                             account=expert.stripe_account_id)
+    client = signed_in(app, expert)
+    assert client.post('/stripe/webhook', data=body, headers=headers).status_code == 200
+    assert stripe_events.process_event('evt_1')
+
+    db.session.expire_all()
+    user = db.session.get(User, expert.id)
+    assert (user.stripe_account_status, user.payout_enabled) == ('pending', False)
+    details = client.get('/expert/payout-details').get_json()
+    assert details['payout_method'] == 'STRIPE TEST BANK ••••6789'
+    assert client.get('/payment/dashboard').status_code == 200
+    assert stripe_stub.STATS['requests'] == 0
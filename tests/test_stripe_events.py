@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+import stripe_events
+from extensions import db
+from models import Booking, StripeEvent, User
+
+SECRET = 'whsec_test'
+
+
+@pytest.fixture
+def webhook(app, stripe_stub, monkeypatch):
+    """post(event_id, type, object) -> response; events are queued, not applied"""
+    monkeypatch.setenv('STRIPE_WEBHOOK_SECRET', SECRET)
+    queued = []
+    monkeypatch.setattr(stripe_events, 'enqueue_event', queued.append)
+    client = app.test_client()
+
+    def post(event_id, event_type, obj):
+        body, headers = stripe_stub.signed_event(event_id, event_type, obj, SECRET)
+        return client.post('/stripe/webhook', data=body, headers=headers)
+    post.queued = queued
+    return post
+
+
+@pytest.fixture
+def booking(make_user):
+    client, expert = make_user(), make_user()
+    start = datetime(2026, 10, 20, 10)
+    booking = Booking(user_id=client.id, provider_id=expert.id, start_time=start,
+                      end_time=start + timedelta(minutes=30), duration=30,
+                      status='confirmed', payment_status='pending', payment_amount=100.0)
+    db.session.add(booking)
+    db.session.commit()
+    return booking
+
+
+def checkout(booking):
+    return {'id': 'cs_1', 'object': 'checkout.session', 'metadata': {'booking_id': str(booking.id)}}
+
+
+def stored(event_id):
+    db.session.expire_all()
+    return db.session.get(StripeEvent, event_id)
+
+
+def pending_balance(user_id):
+    db.session.expire_all()
+    return db.session.get(User, user_id).pending_balance
+
+
+def test_webhook_stores_the_event_and_answers_without_applying_it(webhook, booking):
+    response = webhook('evt_1', 'checkout.session.completed', checkout(booking))
+    assert (response.status_code, webhook.queued) == (200, ['evt_1'])
+    assert stored('evt_1').status == 'received'
+    assert db.session.get(Booking, booking.id).payment_status == 'pending'
+
+
+def test_redelivered_checkout_credits_the_provider_once(webhook, booking):
+    for _ in range(3):
+        assert webhook('evt_1', 'checkout.session.completed', checkout(booking)).status_code == 200
+    assert webhook.queued == ['evt_1']  # duplicates are dropped on receipt
+    assert stripe_events.process_event('evt_1')
+    assert not stripe_events.process_event('evt_1')
+    assert stored('evt_1').status == 'processed'
+    assert pending_balance(booking.provider_id) == 90.0
+
+
+def test_record_event_rejects_a_duplicate(app):
+    event = {'id': 'evt_2', 'type': 'charge.refunded'}
+    assert stripe_events.record_event(event, b'{}')
+    assert not stripe_events.record_event(event, b'{}')
+    assert StripeEvent.query.count() == 1
+
+
+def test_failing_handler_is_retried_with_backoff(webhook, booking, monkeypatch):
+    def broken(obj, event):
+        raise RuntimeError('boom')
+    monkeypatch.setitem(stripe_events.HANDLERS, 'checkout.session.completed', broken)
+    webhook('evt_1', 'checkout.session.completed', checkout(booking))
+
+    before = stripe_events._now()
+    assert not stripe_events.process_event('evt_1')
+    event = stored('evt_1')
+    assert (event.status, event.attempts, event.last_error) == ('failed', 1, 'boom')
+    assert before + stripe_events.BACKOFF_BASE / 2 <= event.next_attempt_at
+    assert stripe_events.due_event_ids() == []  # not before its backoff
+    assert pending_balance(booking.provider_id) in (None, 0.0)
+
+
+def test_stale_claim_is_picked_up_again(webhook, booking):
+    webhook('evt_1', 'checkout.session.completed', checkout(booking))
+    assert stripe_events.claim('evt_1') is not None
+    assert stripe_events.claim('evt_1') is None
+    assert stripe_events.due_event_ids() == []
+
+    db.session.execute(update(StripeEvent).values(
+        processing_started_at=stripe_events._now() - stripe_events.CLAIM_TIMEOUT - timedelta(seconds=1)))
+    db.session.commit()
+    assert stripe_events.due_event_ids() == ['evt_1']
+    assert stripe_events.process_event('evt_1')
+    assert pending_balance(booking.provider_id) == 90.0
+
+
+def test_run_that_lost_its_claim_is_discarded(webhook, booking, monkeypatch):
+    handler = stripe_events.HANDLERS['checkout.session.completed']
+
+    def slow(obj, event):
+        # Meanwhile the claim timed out and the sweep re-claimed the event
+        with db.engine.begin() as conn:
+            conn.execute(update(StripeEvent.__table__).values(processing_started_at=taken_at))
+        handler(obj, event)
+    taken_at = datetime(2030, 1, 1)
+    monkeypatch.setitem(stripe_events.HANDLERS, 'checkout.session.completed', slow)
+    webhook('evt_1', 'checkout.session.completed', checkout(booking))
+
+    assert not stripe_events.process_event('evt_1')
+    # The status change, the handler's booking update and ledger credit all rolled back
+    event = stored('evt_1')
+    assert (event.status, event.processing_started_at) == ('processing', taken_at)
+    assert db.session.get(Booking, booking.id).payment_status == 'pending'
+    assert pending_balance(booking.provider_id) in (None, 0.0)
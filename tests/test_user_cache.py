@@ -0,0 +1,37 @@
+from sqlalchemy import update
+
+from extensions import db
+from models import User
+from user_cache import load_session_user, user_cache
+
+
+def change_elsewhere(user_id, **values):
+    """A write committed by another process: no session hooks run here"""
+    with db.engine.begin() as conn:
+        conn.execute(update(User.__table__).where(User.__table__.c.id == user_id).values(**values))
+
+
+def test_session_user_is_cached_but_stripe_columns_are_read_fresh(app, make_user):
+    user_cache.clear()
+    user_id = make_user(full_name='Before').id
+    db.session.remove()
+    load_session_user(user_id)
+    db.session.remove()
+
+    change_elsewhere(user_id, full_name='After', stripe_account_id='acct_new',
+                     stripe_account_status='active', payout_enabled=True)
+    user = load_session_user(user_id)
+    assert user.full_name == 'Before'  # served from this process's cache
+    assert (user.stripe_account_id, user.stripe_account_status, user.payout_enabled) == \
+        ('acct_new', 'active', True)
+
+
+def test_commit_in_this_process_invalidates_the_entry(app, make_user):
+    user_cache.clear()
+    user_id = make_user(full_name='Before').id
+    load_session_user(user_id)
+    db.session.get(User, user_id).full_name = 'After'
+    db.session.commit()
+    assert user_cache.get(user_id) is None
+    db.session.remove()
+    assert load_session_user(user_id).full_name == 'After'
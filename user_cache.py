@@ -0,0 +1,127 @@
+"""Cached session-user loading for Flask-Login.
+
+load_user used to run ``User.query.get`` on every authenticated request,
+hydrating all ~60 User columns including bio, OAuth tokens and the
+embedding blob. Here the loader reads only SESSION_COLUMNS, keeps those
+values in a per-process TTL cache, and rebuilds the User from the cache
+without a query. Columns outside the projection stay unloaded and are
+fetched on first access, so pages that never touch them never pay for
+them.
+
+Entries are dropped as soon as a transaction that modified the user
+commits in this process; other workers see the change within
+USER_CACHE_TTL seconds.
+"""
+import os
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, load_only, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from extensions import db
+
+# Fields the sidebar, navigation and most handlers read from current_user.
+# The Stripe account columns are left out on purpose: payment views act on
+# them (create an account, send a payout) and webhooks change them in the
+# scheduler process, so they are always read fresh.
+SESSION_COLUMNS = [
+    'id', 'username', 'email', 'full_name', 'profession', 'industry', 'location',
+    'profile_picture', 'timezone', 'language', 'is_available', 'hourly_rate',
+    'currency', 'session_duration', 'google_calendar_connected', 'google_calendar_id',
+    'referral_code', 'created_at',
+]
+
+USER_CACHE_TTL = float(os.environ.get('USER_CACHE_TTL', 30))
+USER_CACHE_MAX_ENTRIES = 10000
+PENDING_KEY = 'user_cache_invalidate'
+
+
+class UserCache:
+    """Thread-safe TTL cache of SESSION_COLUMNS values keyed by user id"""
+
+    def __init__(self, ttl=USER_CACHE_TTL, max_entries=USER_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = {}  # user_id -> (expires_at, values)
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[user_id]
+                return None
+            return entry[1]
+
+    def set(self, user_id, values):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Drop the entry closest to expiry to make room
+                oldest = min(self._entries, key=lambda key: self._entries[key][0])
+                del self._entries[oldest]
+            self._entries[user_id] = (time.monotonic() + self.ttl, values)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+def _from_cached_values(values):
+    """Rebuild a persistent User from cached values without a query"""
+    from models import User
+    user = User()
+    for column, value in values.items():
+        set_committed_value(user, column, value)
+    # Every column we did not set becomes expired, i.e. lazily loaded
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+def load_session_user(user_id):
+    """Flask-Login user_loader body: cached projection, falling back to one query"""
+    from models import User
+    values = user_cache.get(user_id)
+    if values is not None:
+        return _from_cached_values(values)
+
+    user = User.query.options(
+        load_only(*(getattr(User, column) for column in SESSION_COLUMNS))
+    ).filter_by(id=user_id).first()
+    if user is not None:
+        user_cache.set(user_id, {column: getattr(user, column) for column in SESSION_COLUMNS})
+    return user
+
+
+# -- invalidation ----------------------------------------------------------
+
+@event.listens_for(Session, 'after_flush')
+def _stage_invalidation(session, flush_context):
+    from models import User
+    ids = session.info.setdefault(PENDING_KEY, set())
+    for obj in session.dirty.union(session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            ids.add(obj.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_invalidation(session):
+    for user_id in session.info.pop(PENDING_KEY, ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_invalidation(session):
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,401 @@
+"""Registration, onboarding, login/logout and Google sign-in."""
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask_login import login_user, logout_user, login_required, current_user
+from extensions import db, oauth
+from models import User
+from forms import RegistrationForm, OnboardingForm
+import json
+from views.helpers import setup_default_availability
+
+bp = Blueprint('auth', __name__)
+
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    """User registration"""
+    print(f"Register route accessed. Method: {request.method}")
+    form = RegistrationForm()
+    
+    if request.method == 'POST':
+        print(f"Form data: {request.form}")
+        print(f"Form validation: {form.validate()}")
+        if form.errors:
+            print(f"Form errors: {form.errors}")
+    
+    if form.validate_on_submit():
+        # Check if email already exists
+        existing_user = User.query.filter_by(email=form.email.data).first()
+        
+        if existing_user:
+            flash('Email already exists.', 'error')
+            return render_template('register.html', form=form)
+        
+        # Generate username from email
+        username = form.email.data.split('@')[0]
+        # Ensure username is unique
+        base_username = username
+        counter = 1
+        while User.query.filter_by(username=username).first():
+            username = f"{base_username}{counter}"
+            counter += 1
+        
+        # Create new user
+        user = User(
+            username=username,
+            email=form.email.data,
+            full_name=form.email.data.split('@')[0]  # Use email prefix as full name
+        )
+        user.set_password(form.password.data)
+        
+        db.session.add(user)
+        db.session.commit()
+        
+        # Set up default availability (9-5 weekdays only)
+        setup_default_availability(user)
+        
+        # Log in user but redirect to onboarding
+        login_user(user)
+        print(f"New user registered: {user.email}, redirecting to onboarding")
+        flash('Registration successful! Please complete your profile.', 'success')
+        return redirect(url_for('auth.onboarding'))
+    
+    return render_template('register.html', form=form)
+
+@bp.route('/onboarding', methods=['GET', 'POST'])
+@login_required
+def onboarding():
+    """Multi-step onboarding process"""
+    print(f"Onboarding accessed by user: {current_user.email}")
+    print(f"Request method: {request.method}")
+    print(f"User profession: {current_user.profession}")
+    print(f"User bio: {current_user.bio}")
+    print(f"User industry: {current_user.industry}")
+    
+    if request.method == 'POST':
+        try:
+            # Handle JSON data from the new onboarding flow
+            if request.is_json:
+                data = request.get_json()
+                
+                # Handle username step
+                if data.get('step') == 'username':
+                    username = data.get('username', '').strip().lower()
+                    if not username:
+                        return jsonify({'success': False, 'message': 'Username is required'})
+                    
+                    # Check if username is available
+                    existing_user = User.query.filter_by(username=username).first()
+                    if existing_user and existing_user.id != current_user.id:
+                        return jsonify({'success': False, 'message': 'Username is already taken'})
+                    
+                    # Update username
+                    current_user.username = username
+                    db.session.commit()
+                    
+                    return jsonify({
+                        'success': True,
+                        'message': 'Username set successfully!'
+                    })
+                
+                # Handle profile completion step
+                elif data.get('step') == 'profile':
+                    # Update user profile with onboarding data
+                    current_user.profession = data.get('profession', '')
+                    current_user.bio = data.get('bio', '')
+                    current_user.hourly_rate = data.get('hourly_rate', 0)
+                    current_user.industry = data.get('industry', '')
+                    current_user.is_available = True  # Set as available by default
+                    
+                    # Handle skills tags
+                    skills = data.get('skills', [])
+                    if skills:
+                        current_user.specialty_tags = json.dumps(skills)
+                    else:
+                        current_user.specialty_tags = json.dumps([])
+                    
+                    db.session.commit()
+                    
+                    return jsonify({
+                        'success': True,
+                        'message': 'Profile setup complete!'
+                    })
+            
+            # Handle traditional form submission (fallback)
+            form = OnboardingForm()
+            if form.validate_on_submit():
+                current_user.profession = form.profession.data
+                current_user.bio = form.bio.data
+                current_user.hourly_rate = form.hourly_rate.data or 0
+                current_user.industry = form.industry.data
+                current_user.is_available = True
+                
+                # Handle specialties from form data
+                specialties = request.form.get('specialties')
+                if specialties:
+                    try:
+                        specialties_list = json.loads(specialties)
+                        current_user.specialty_tags = json.dumps(specialties_list)
+                    except (json.JSONDecodeError, TypeError) as e:
+                        print(f"DEBUG: Error parsing specialties: {e}")
+                        current_user.specialty_tags = json.dumps([])
+                else:
+                    current_user.specialty_tags = json.dumps([])
+                
+                db.session.commit()
+                flash('Profile setup complete!', 'success')
+                return redirect(url_for('main.dashboard'))
+        
+        except Exception as e:
+            print(f"Error in onboarding: {e}")
+            return jsonify({
+                'success': False,
+                'message': 'An error occurred while saving your profile.'
+            })
+    
+    # GET request - show the onboarding form
+    print("Rendering onboarding template")
+    print(f"User profile data: profession={current_user.profession}, bio={current_user.bio}, industry={current_user.industry}")
+    form = OnboardingForm()
+    return render_template('onboarding.html', form=form, skills_mapping=SKILLS_MAPPING)
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    """User login - handles both modal form and direct access"""
+    if request.method == 'POST':
+        # Handle form submission from modal
+        email = request.form.get('email')
+        password = request.form.get('password')
+        password_confirm = request.form.get('passwordConfirm')
+        
+        # Check if this is a signup (has password confirmation)
+        if password_confirm:
+            # Handle signup
+            if password != password_confirm:
+                flash('Passwords do not match.', 'error')
+                return redirect(url_for('main.homepage'))
+            
+            # Check if user already exists
+            existing_user = User.query.filter_by(email=email).first()
+            if existing_user:
+                flash('User with this email already exists.', 'error')
+                return redirect(url_for('main.homepage'))
+            
+            # Create new user
+            try:
+                new_user = User(
+                    email=email,
+                    username=email.split('@')[0],  # Use email prefix as username
+                    full_name=''
+                )
+                new_user.set_password(password)
+                db.session.add(new_user)
+                db.session.commit()
+                
+                login_user(new_user)
+                flash('Account created successfully!', 'success')
+                return redirect(url_for('main.dashboard'))
+            except Exception as e:
+                db.session.rollback()
+                flash('Error creating account. Please try again.', 'error')
+                return redirect(url_for('main.homepage'))
+        else:
+            # Handle login
+            user = User.query.filter_by(email=email).first()
+            if not user:
+                user = User.query.filter_by(username=email).first()
+            
+            if user and user.check_password(password):
+                login_user(user)
+                next_page = request.args.get('next')
+                flash('Login successful!', 'success')
+                return redirect(next_page) if next_page else redirect(url_for('main.dashboard'))
+            else:
+                flash('Invalid email/username or password.', 'error')
+                return redirect(url_for('main.homepage'))
+    
+    # For GET requests, redirect to homepage (modal will handle login)
+    return redirect(url_for('main.homepage'))
+
+@bp.route('/logout')
+@login_required
+def logout():
+    """User logout"""
+    logout_user()
+    flash('You have been logged out.', 'info')
+    return redirect(url_for('main.homepage'))
+
+# Skills tag mapping
+SKILLS_MAPPING = {
+    'python': 'Python',
+    'javascript': 'JavaScript',
+    'react': 'React',
+    'ai': 'AI/ML',
+    'webdev': 'Web Development',
+    'mobile': 'Mobile Development',
+    'data': 'Data Science',
+    'cybersecurity': 'Cybersecurity',
+    'strategy': 'Strategy',
+    'startups': 'Startups',
+    'fundraising': 'Fundraising',
+    'operations': 'Operations',
+    'leadership': 'Leadership',
+    'finance': 'Finance',
+    'trading': 'Trading',
+    'money': 'Money Management',
+    'digital': 'Digital Marketing',
+    'social': 'Social Media',
+    'seo': 'SEO',
+    'content': 'Content Marketing',
+    'branding': 'Branding',
+    'coaching': 'Life Coaching',
+    'fitness': 'Fitness',
+    'nutrition': 'Nutrition',
+    'wellness': 'Wellness',
+    'therapy': 'Therapy',
+    'counseling': 'Counseling',
+    'education': 'Education',
+    'teaching': 'Teaching',
+    'tutoring': 'Tutoring',
+    'mentoring': 'Mentoring',
+    'training': 'Training',
+    'consulting': 'Consulting',
+    'design': 'Design',
+    'ui': 'UI/UX Design',
+    'graphic': 'Graphic Design',
+    'creative': 'Creative',
+    'writing': 'Writing',
+    'editing': 'Editing',
+    'translation': 'Translation'
+}
+
+def get_skills_display_name(tag):
+    """Get the display name for a skills tag"""
+    return SKILLS_MAPPING.get(tag, tag.title())
+
+@bp.route('/auth/google')
+def auth_google():
+    # Manually construct redirect URI to ensure HTTPS for production
+    if 'localhost' in request.host:
+        # Local development - use HTTP
+        redirect_uri = f"http://{request.host}/auth/google/callback"
+    elif 'droply.live' in request.host:
+        # Production - force HTTPS for droply.live
+        redirect_uri = "https://droply.live/auth/google/callback"
+    else:
+        # Fallback - force HTTPS
+        redirect_uri = f"https://{request.host}/auth/google/callback"
+    
+    print(f"DEBUG: Google OAuth redirect_uri = {redirect_uri}")
+    return oauth.google.authorize_redirect(redirect_uri, scope='openid email profile https://www.googleapis.com/auth/calendar.readonly')
+
+@bp.route('/auth/google/callback')
+def auth_google_callback():
+    print(f"DEBUG: Google OAuth callback - Request URL = {request.url}")
+    print(f"DEBUG: Google OAuth callback - Request args = {dict(request.args)}")
+    print(f"DEBUG: Google OAuth callback - Request headers = {dict(request.headers)}")
+    try:
+        token = oauth.google.authorize_access_token()
+        user_info = oauth.google.userinfo()
+        print(f"DEBUG: Google OAuth callback - Token received successfully")
+    except Exception as e:
+        print(f"DEBUG: Google OAuth callback - Error: {str(e)}")
+        flash(f'Google authentication failed: {str(e)}', 'error')
+        return redirect(url_for('auth.login'))
+    email = user_info.get('email')
+    username = user_info.get('name') or email.split('@')[0]
+    if not email:
+        flash('Google account did not return an email.', 'error')
+        return redirect(url_for('auth.login'))
+    
+    # Check if user exists
+    user = User.query.filter_by(email=email).first()
+    is_new_user = False
+    
+    if not user:
+        # Register new user
+        user = User(username=username, email=email, full_name=user_info.get('name'))
+        db.session.add(user)
+        db.session.commit()
+        is_new_user = True
+        print(f"New Google user registered: {user.email}")
+        
+        # Set up default availability (9-5 weekdays only)
+        setup_default_availability(user)
+    
+    # Automatically connect Google Calendar if calendar scope is present
+    print(f"DEBUG: Token scope: {token.get('scope', '')}")
+    print(f"DEBUG: Token keys: {list(token.keys())}")
+    print(f"DEBUG: Full token: {token}")
+    if 'calendar' in token.get('scope', ''):
+        print(f"DEBUG: Calendar integration detected. Scope: {token.get('scope', '')}")
+        try:
+            # Store the calendar tokens for the current user
+            user.google_calendar_connected = True
+            user.google_calendar_token = token.get('access_token')
+            user.google_calendar_refresh_token = token.get('refresh_token')
+            print(f"DEBUG: Stored calendar tokens for user {user.id}")
+            print(f"DEBUG: google_calendar_connected set to: {user.google_calendar_connected}")
+            
+            # Get the primary calendar ID
+            from google_calendar import forget_user_calendar, user_calendar
+            
+            # Fresh grant: don't reuse a client built from the previous tokens
+            forget_user_calendar(user.id)
+            client = user_calendar(user, token=token.get('access_token'),
+                                   refresh_token=token.get('refresh_token'))
+            calendar_list = client.execute(client.service.calendarList().list())
+            print(f"DEBUG: Retrieved {len(calendar_list.get('items', []))} calendars")
+            
+            # Find calendar that matches user's email address
+            user_email_calendar = None
+            user_email = user.email.lower()
+            
+            for calendar in calendar_list.get('items', []):
+                calendar_id = calendar.get('id', '').lower()
+                # Check if calendar ID matches user's email
+                if user_email in calendar_id or calendar_id == user_email:
+                    user_email_calendar = calendar
+                    break
+            
+            # If no email-matching calendar found, fall back to primary calendar
+            if not user_email_calendar:
+                for calendar in calendar_list.get('items', []):
+                    if calendar.get('primary'):
+                        user_email_calendar = calendar
+                        break
+            
+            if user_email_calendar:
+                user.google_calendar_id = user_email_calendar['id']
+                print(f"DEBUG: Set calendar ID: {user_email_calendar['id']} (email: {user_email_calendar.get('summary', 'Unknown')})")
+            else:
+                print("DEBUG: No matching calendar found, using first calendar")
+                if calendar_list.get('items'):
+                    user.google_calendar_id = calendar_list['items'][0]['id']
+            
+            db.session.commit()
+            print("DEBUG: Calendar integration completed successfully")
+            flash('Google Calendar connected automatically!', 'success')
+            
+        except Exception as e:
+            print(f"ERROR: Failed to connect Google Calendar: {e}")
+            import traceback
+            traceback.print_exc()
+            flash('Failed to connect Google Calendar automatically. You can connect it later in your availability settings.', 'warning')
+    
+    login_user(user)
+    
+    # Check if there's a redirect parameter
+    redirect_to = request.args.get('redirect_to', 'dashboard')
+    
+    if is_new_user:
+        flash('Welcome! Please complete your profile setup.', 'success')
+        return redirect(url_for('auth.onboarding'))
+    else:
+        # Only show generic login message if calendar wasn't connected
+        if 'calendar' not in token.get('scope', ''):
+            flash('Logged in with Google!', 'success')
+        
+        # Redirect to the specified page or dashboard
+        if redirect_to == 'availability':
+            return redirect(url_for('availability.availability'))
+        else:
+            return redirect(url_for('main.dashboard'))
@@ -0,0 +1,703 @@
+"""Availability rules, exceptions, slots and Google Calendar connection."""
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask_login import login_required, current_user
+from extensions import db, oauth
+from models import User, AvailabilityRule, AvailabilityException, Booking
+import time
+from datetime import datetime, timedelta
+from views.helpers import setup_default_availability
+
+bp = Blueprint('availability', __name__)
+
+@bp.route('/fix-availability', methods=['POST'])
+@login_required
+def fix_user_availability():
+    """Fix availability for current user if they don't have any rules"""
+    try:
+        existing_rules = AvailabilityRule.query.filter_by(user_id=current_user.id).count()
+        if existing_rules == 0:
+            setup_default_availability(current_user)
+            return jsonify({'success': True, 'message': 'Default availability set to 9-5 weekdays'})
+        else:
+            return jsonify({'success': False, 'message': 'User already has availability rules'})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@bp.route('/setup-availability/<username>', methods=['POST'])
+@login_required
+def setup_availability_for_user(username):
+    """Set up default availability for a specific user"""
+    try:
+        user = User.query.filter_by(username=username).first_or_404()
+        
+        # Check if user already has availability rules
+        existing_rules = AvailabilityRule.query.filter_by(user_id=user.id).count()
+        if existing_rules > 0:
+            return jsonify({'success': True, 'message': f'User {username} already has {existing_rules} availability rules'})
+        
+        # Set up default availability
+        setup_default_availability(user)
+        
+        return jsonify({'success': True, 'message': f'Default availability set up successfully for {username}'})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/connected-calendar')
+@login_required
+def get_connected_calendar():
+    """Get information about the user's connected Google Calendar"""
+    try:
+        print(f"DEBUG: Checking calendar connection for user {current_user.id}")
+        print(f"DEBUG: google_calendar_connected: {current_user.google_calendar_connected}")
+        print(f"DEBUG: google_calendar_id: {current_user.google_calendar_id}")
+        print(f"DEBUG: has_token: {bool(current_user.google_calendar_token)}")
+        print(f"DEBUG: has_refresh_token: {bool(current_user.google_calendar_refresh_token)}")
+        
+        # Check if user has calendar connection set up
+        if not current_user.google_calendar_connected:
+            return jsonify({'connected': False, 'message': 'No calendar connected'})
+        
+        if not current_user.google_calendar_id:
+            return jsonify({'connected': False, 'message': 'No calendar ID found'})
+        
+        if not current_user.google_calendar_token:
+            print("DEBUG: No Google Calendar token found")
+            return jsonify({'connected': False, 'message': 'No calendar token found'})
+        
+        # Get calendar name from Google Calendar API
+        from google_calendar import user_calendar
+        from google.auth.exceptions import RefreshError
+        
+        client = user_calendar(current_user)
+        
+        print(f"DEBUG: Getting calendar info for ID: {current_user.google_calendar_id}")
+        calendar = client.execute(client.service.calendars().get(calendarId=current_user.google_calendar_id))
+        
+        print(f"DEBUG: Successfully retrieved calendar: {calendar.get('summary', 'Unknown')}")
+        
+        return jsonify({
+            'connected': True,
+            'calendar_id': current_user.google_calendar_id,
+            'calendar_name': calendar.get('summary', 'Unknown Calendar'),
+            'calendar_email': calendar.get('id', '')
+        })
+        
+    except RefreshError as e:
+        print(f"ERROR: Token refresh failed: {e}")
+        # Mark calendar as disconnected due to invalid tokens
+        current_user.google_calendar_connected = False
+        db.session.commit()
+        return jsonify({'connected': False, 'message': 'Calendar access expired. Please reconnect.'})
+        
+    except Exception as e:
+        print(f"ERROR: Failed to get connected calendar info: {e}")
+        import traceback
+        traceback.print_exc()
+        
+        # Check if it's a specific Google API error
+        error_message = str(e)
+        if 'invalid_grant' in error_message:
+            # Token is invalid, mark as disconnected
+            current_user.google_calendar_connected = False
+            db.session.commit()
+            return jsonify({'connected': False, 'message': 'Calendar access expired. Please reconnect.'})
+        elif 'insufficient authentication' in error_message:
+            return jsonify({'connected': False, 'message': 'Calendar permissions required. Please reconnect.'})
+        else:
+            return jsonify({'connected': False, 'error': 'Unable to access calendar. Please try reconnecting.'})
+
+def convert_availability_to_user_timezone(availability_rules, provider_timezone, user_timezone):
+    """Convert provider's availability from their timezone to user's timezone"""
+    from zoneinfo import ZoneInfo
+    from datetime import datetime
+    
+    if not availability_rules:
+        return []
+    
+    provider_tz = ZoneInfo(provider_timezone)
+    user_tz = ZoneInfo(user_timezone)
+    
+    converted_rules = []
+    
+    for rule in availability_rules:
+        # Create datetime objects in provider's timezone for today
+        today = datetime.now(provider_tz).date()
+        start_dt = datetime.combine(today, rule.start).replace(tzinfo=provider_tz)
+        end_dt = datetime.combine(today, rule.end).replace(tzinfo=provider_tz)
+        
+        # Convert to user's timezone
+        start_user = start_dt.astimezone(user_tz)
+        end_user = end_dt.astimezone(user_tz)
+        
+        # Create new rule with converted times
+        converted_rule = {
+            'weekday': rule.weekday,
+            'start': start_user.time(),
+            'end': end_user.time(),
+            'is_active': rule.is_active,
+            'original_start': rule.start,
+            'original_end': rule.end
+        }
+        converted_rules.append(converted_rule)
+    
+    return converted_rules
+
+@bp.route('/availability')
+@login_required
+def availability():
+    """Availability management page"""
+    print(f"DEBUG: Availability page - User {current_user.id}")
+    print(f"DEBUG: google_calendar_token: {bool(current_user.google_calendar_token)}")
+    print(f"DEBUG: google_calendar_connected: {current_user.google_calendar_connected}")
+    
+    # Allow users to access availability page even without Google Calendar connected
+    # The frontend will handle showing the connection status and options
+    return render_template('availability.html')
+
+@bp.route('/api/availability/rules', methods=['GET', 'POST'])
+@login_required
+def api_availability_rules():
+    if request.method == 'GET':
+        username = request.args.get('username')
+        if username:
+            user = User.query.filter_by(username=username).first()
+            if not user:
+                return jsonify([])
+            user_id = user.id
+        else:
+            user_id = current_user.id
+        
+        print(f"Loading availability rules for user_id: {user_id}")
+        rules = AvailabilityRule.query.filter_by(user_id=user_id).all()
+        print(f"Found {len(rules)} availability rules")
+        
+        result = [
+            {
+                'id': r.id,
+                'weekday': r.weekday,
+                'start': r.start.strftime('%H:%M'),
+                'end': r.end.strftime('%H:%M'),
+                'is_active': r.is_active
+            } for r in rules
+        ]
+        print(f"Returning availability rules: {result}")
+        return jsonify(result)
+    else:
+        data = request.get_json()
+        rules = data.get('rules', [])
+        print(f"Saving availability rules for user {current_user.id}: {rules}")
+        
+        # Delete existing rules
+        deleted_count = AvailabilityRule.query.filter_by(user_id=current_user.id).delete()
+        print(f"Deleted {deleted_count} existing rules")
+        
+        # Add new rules
+        for r in rules:
+            if r.get('enabled'):
+                new_rule = AvailabilityRule(
+                    user_id=current_user.id,
+                    weekday=r['weekday'],
+                    start=datetime.strptime(r['start'], '%H:%M').time(),
+                    end=datetime.strptime(r['end'], '%H:%M').time(),
+                    is_active=True
+                )
+                db.session.add(new_rule)
+                print(f"Added rule: weekday={r['weekday']}, start={r['start']}, end={r['end']}")
+        
+        db.session.commit()
+        print(f"Successfully saved {len([r for r in rules if r.get('enabled')])} rules")
+        return jsonify({'success': True})
+
+@bp.route('/api/availability/exceptions', methods=['GET', 'POST'])
+@login_required
+def api_availability_exceptions():
+    if request.method == 'GET':
+        username = request.args.get('username')
+        if username:
+            user = User.query.filter_by(username=username).first()
+            if not user:
+                return jsonify([])
+            user_id = user.id
+        else:
+            user_id = current_user.id
+        exceptions = AvailabilityException.query.filter_by(user_id=user_id).all()
+        return jsonify([
+            {
+                'id': e.id,
+                'start': e.start.isoformat(),
+                'end': e.end.isoformat(),
+                'reason': e.reason
+            } for e in exceptions
+        ])
+    else:
+        data = request.get_json()
+        ex = AvailabilityException(
+            user_id=current_user.id,
+            start=datetime.fromisoformat(data['start']),
+            end=datetime.fromisoformat(data['end']),
+            reason=data.get('reason', '')
+        )
+        db.session.add(ex)
+        db.session.commit()
+        return jsonify({'success': True})
+
+@bp.route('/api/availability/exceptions/<int:exception_id>', methods=['DELETE'])
+@login_required
+def api_availability_exception_delete(exception_id):
+    ex = AvailabilityException.query.filter_by(id=exception_id, user_id=current_user.id).first()
+    if ex:
+        db.session.delete(ex)
+        db.session.commit()
+        return jsonify({'success': True})
+    return jsonify({'success': False, 'error': 'Not found'}), 404
+
+@bp.route('/api/availability/sync-calendar', methods=['POST'])
+@login_required
+def api_sync_google_calendar():
+    """Sync Google Calendar events to create availability exceptions"""
+    if not current_user.google_calendar_connected:
+        return jsonify({'success': False, 'error': 'Google Calendar not connected'}), 400
+    
+    try:
+        from calendar_queue import enqueue_sync
+        
+        # Runs on a background pool; poll calendar-status for the outcome
+        due = enqueue_sync(current_user.id)
+        
+        return jsonify({
+            'success': True,
+            'queued': True,
+            'sync_at': due.isoformat(),
+            'message': 'Calendar sync started'
+        }), 202
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error queueing Google Calendar sync: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/availability/calendar-status', methods=['GET'])
+@login_required
+def api_calendar_status():
+    """Get Google Calendar connection status"""
+    print(f"DEBUG: Calendar status check for user {current_user.id}: connected={current_user.google_calendar_connected}")
+    
+    # Check if user has Google tokens but calendar is not connected
+    # This happens when users logged in before calendar scope was added
+    needs_reauth = False
+    if current_user.google_calendar_token and not current_user.google_calendar_connected:
+        needs_reauth = True
+    
+    from calendar_queue import sync_status
+    
+    return jsonify({
+        'connected': current_user.google_calendar_connected,
+        'calendar_id': current_user.google_calendar_id,
+        'needs_reauth': needs_reauth,
+        'sync': sync_status(current_user.id)
+    })
+
+@bp.route('/api/availability/monthly-data', methods=['GET'])
+@login_required
+def api_monthly_availability_data():
+    """Get monthly availability data for calendar display"""
+    try:
+        year = request.args.get('year', type=int)
+        month = request.args.get('month', type=int)
+        
+        if not year or not month:
+            return jsonify({'success': False, 'error': 'Year and month required'}), 400
+        
+        # Get availability rules
+        rules = AvailabilityRule.query.filter_by(user_id=current_user.id).all()
+        availability_rules = {}
+        for rule in rules:
+            availability_rules[rule.weekday] = {
+                'start': rule.start.strftime('%H:%M'),
+                'end': rule.end.strftime('%H:%M'),
+                'enabled': rule.is_active
+            }
+        
+        # Get availability exceptions for the month
+        start_date = datetime(year, month, 1)
+        if month == 12:
+            end_date = datetime(year + 1, 1, 1)
+        else:
+            end_date = datetime(year, month + 1, 1)
+        
+        exceptions = AvailabilityException.query.filter(
+            AvailabilityException.user_id == current_user.id,
+            AvailabilityException.start >= start_date,
+            AvailabilityException.start < end_date
+        ).all()
+        
+        exceptions_data = []
+        for ex in exceptions:
+            exceptions_data.append({
+                'date': ex.start.strftime('%Y-%m-%d'),
+                'start': ex.start.strftime('%H:%M'),
+                'end': ex.end.strftime('%H:%M'),
+                'is_blocked': ex.is_blocked,
+                'reason': ex.reason
+            })
+        
+        return jsonify({
+            'success': True,
+            'availability_rules': availability_rules,
+            'exceptions': exceptions_data
+        })
+        
+    except Exception as e:
+        print(f"Error getting monthly availability data: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/availability/time-slots', methods=['GET'])
+@login_required
+def api_availability_time_slots():
+    """Get available time slots for a specific date"""
+    try:
+        date_str = request.args.get('date')
+        if not date_str:
+            return jsonify({'success': False, 'error': 'Date required'}), 400
+        
+        target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        weekday = target_date.weekday()
+        
+        # Get availability rule for this weekday
+        rule = AvailabilityRule.query.filter_by(
+            user_id=current_user.id, 
+            weekday=weekday
+        ).first()
+        
+        if not rule or not rule.is_active:
+            return jsonify({
+                'success': True,
+                'time_slots': [],
+                'message': 'No availability set for this day'
+            })
+        
+        # Generate time slots
+        time_slots = []
+        start_time = rule.start
+        end_time = rule.end
+        duration_minutes = 60  # Default 1 hour sessions
+        
+        current_time = datetime.combine(target_date, start_time)
+        end_datetime = datetime.combine(target_date, end_time)
+        
+        while current_time < end_datetime:
+            slot_end = current_time + timedelta(minutes=duration_minutes)
+            if slot_end <= end_datetime:
+                time_slots.append({
+                    'start': current_time.strftime('%H:%M'),
+                    'end': slot_end.strftime('%H:%M'),
+                    'start_datetime': current_time.isoformat(),
+                    'end_datetime': slot_end.isoformat(),
+                    'available': True
+                })
+            current_time += timedelta(minutes=duration_minutes)
+        
+        # Check for exceptions (blocked times)
+        exceptions = AvailabilityException.query.filter(
+            AvailabilityException.user_id == current_user.id,
+            AvailabilityException.start >= datetime.combine(target_date, time(0, 0)),
+            AvailabilityException.start < datetime.combine(target_date, time(23, 59))
+        ).all()
+        
+        # Mark slots as unavailable if they conflict with exceptions
+        for exception in exceptions:
+            for slot in time_slots:
+                slot_start = datetime.fromisoformat(slot['start_datetime'])
+                slot_end = datetime.fromisoformat(slot['end_datetime'])
+                
+                if (slot_start < exception.end and slot_end > exception.start):
+                    slot['available'] = False
+                    slot['blocked_reason'] = exception.reason
+        
+        return jsonify({
+            'success': True,
+            'time_slots': time_slots,
+            'date': date_str,
+            'weekday': weekday
+        })
+        
+    except Exception as e:
+        print(f"Error getting time slots: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/availability/next-7-days', methods=['GET', 'POST'])
+@login_required
+def api_next_7_days():
+    """Get or update Next 7 Days availability"""
+    if request.method == 'GET':
+        try:
+            # Get the next 7 days starting from today
+            today = datetime.now().date()
+            next_7_days = []
+            
+            for i in range(7):
+                date = today + timedelta(days=i)
+                weekday = date.weekday()
+                
+                # Get typical availability for this weekday
+                rule = AvailabilityRule.query.filter_by(
+                    user_id=current_user.id, 
+                    weekday=weekday, 
+                    enabled=True
+                ).first()
+                
+                day_data = {
+                    'date': date.isoformat(),
+                    'weekday': weekday,
+                    'day_name': date.strftime('%A'),
+                    'typical_availability': {
+                        'start': rule.start if rule else '09:00',
+                        'end': rule.end if rule else '17:00',
+                        'enabled': rule.enabled if rule else False
+                    },
+                    'exceptions': [],
+                    'removed_slots': []
+                }
+                
+                # Get exceptions for this specific date
+                exceptions = AvailabilityException.query.filter_by(
+                    user_id=current_user.id,
+                    date=date
+                ).all()
+                
+                for exception in exceptions:
+                    day_data['exceptions'].append({
+                        'id': exception.id,
+                        'start': exception.start,
+                        'end': exception.end,
+                        'type': exception.exception_type
+                    })
+                
+                next_7_days.append(day_data)
+            
+            return jsonify({
+                'success': True,
+                'days': next_7_days
+            })
+            
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+    
+    elif request.method == 'POST':
+        try:
+            data = request.get_json()
+            date_str = data.get('date')
+            removed_slots = data.get('removed_slots', [])
+            
+            if not date_str:
+                return jsonify({'success': False, 'error': 'Date required'}), 400
+            
+            target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+            
+            # Remove existing exceptions for this date
+            AvailabilityException.query.filter_by(
+                user_id=current_user.id,
+                date=target_date,
+                exception_type='removed_slot'
+            ).delete()
+            
+            # Add new removed slots as exceptions
+            for slot in removed_slots:
+                exception = AvailabilityException(
+                    user_id=current_user.id,
+                    date=target_date,
+                    start=slot['start'],
+                    end=slot['end'],
+                    exception_type='removed_slot'
+                )
+                db.session.add(exception)
+            
+            db.session.commit()
+            
+            return jsonify({'success': True})
+            
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/availability/calendar-events', methods=['GET'])
+@login_required
+def api_calendar_events():
+    """Get Google Calendar events for a date range"""
+    if not current_user.google_calendar_connected:
+        return jsonify({'success': False, 'error': 'Google Calendar not connected'}), 400
+    
+    try:
+        from google_calendar import user_calendar
+        
+        # Get date range from query parameters
+        start_date = request.args.get('start')
+        end_date = request.args.get('end')
+        
+        if not start_date or not end_date:
+            return jsonify({'success': False, 'error': 'Start and end dates required'}), 400
+        
+        client = user_calendar(current_user)
+        
+        # Get events for the date range
+        events_result = client.execute(client.service.events().list(
+            calendarId=current_user.google_calendar_id,
+            timeMin=start_date,
+            timeMax=end_date,
+            singleEvents=True,
+            orderBy='startTime'
+        ))
+        
+        events = events_result.get('items', [])
+        
+        # Format events for frontend
+        formatted_events = []
+        for event in events:
+            start = event['start'].get('dateTime', event['start'].get('date'))
+            end = event['end'].get('dateTime', event['end'].get('date'))
+            
+            formatted_events.append({
+                'id': event['id'],
+                'title': event.get('summary', 'No Title'),
+                'start': start,
+                'end': end,
+                'description': event.get('description', ''),
+                'location': event.get('location', '')
+            })
+        
+        return jsonify({
+            'success': True,
+            'events': formatted_events
+        })
+        
+    except Exception as e:
+        print(f"ERROR: Failed to fetch calendar events: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/availability/times', methods=['GET'])
+def api_availability_times():
+    """Get available times for a user, with default 9-5 availability if no rules set"""
+    username = request.args.get('username')
+    if not username:
+        return jsonify({'error': 'Username required'}), 400
+    
+    user = User.query.filter_by(username=username).first()
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    # Check if user is available for bookings
+    if not user.is_available:
+        return jsonify({'available': False, 'message': 'User is currently unavailable'})
+    
+    # Get existing bookings for this user (as expert) to exclude booked times
+    now = datetime.now()
+    existing_bookings = Booking.query.filter(
+        (Booking.provider_id == user.id) &
+        (Booking.start_time >= now) &
+        (Booking.status == 'confirmed')
+    ).all()
+    
+    # Create a set of booked time slots for quick lookup
+    booked_slots = set()
+    for booking in existing_bookings:
+        start_time = booking.start_time
+        end_time = booking.end_time
+        current = start_time
+        while current < end_time:
+            booked_slots.add(current.replace(second=0, microsecond=0))
+            current += timedelta(minutes=30)
+    
+    # Busy time from the provider's Google Calendar (cached free/busy)
+    from freebusy import busy_intervals
+    for start_time, end_time in busy_intervals([user], now, 7)[user.id]:
+        current = start_time.replace(minute=(start_time.minute // 30) * 30, second=0, microsecond=0)
+        while current < end_time:
+            booked_slots.add(current)
+            current += timedelta(minutes=30)
+    
+    # Get explicit availability rules
+    rules = AvailabilityRule.query.filter_by(user_id=user.id).all()
+    
+    # If no explicit rules, provide default 9-5 availability for all weekdays
+    if not rules:
+        default_times = []
+        for day_offset in range(7):
+            date = now + timedelta(days=day_offset)
+            if date.weekday() < 5:  # Monday to Friday
+                for hour in range(9, 17):  # 9 AM to 5 PM
+                    for minute in [0, 30]:
+                        time_slot = date.replace(hour=hour, minute=minute, second=0, microsecond=0)
+                        if time_slot > now and time_slot not in booked_slots:
+                            default_times.append({
+                                'date': time_slot.strftime('%Y-%m-%d'),
+                                'time': time_slot.strftime('%H:%M'),
+                                'datetime': time_slot.isoformat(),
+                                'day_name': time_slot.strftime('%A'),
+                                'formatted': time_slot.strftime('%I:%M %p'),
+                                'duration': 30
+                            })
+        return jsonify({
+            'available': True,
+            'has_rules': False,
+            'times': default_times[:20]
+        })
+    else:
+        available_times = []
+        for rule in rules:
+            for day_offset in range(7):
+                date = now + timedelta(days=day_offset)
+                if date.weekday() == rule.weekday:
+                    current_time = datetime.combine(date.date(), rule.start)
+                    end_time = datetime.combine(date.date(), rule.end)
+                    while current_time < end_time:
+                        if current_time > now and current_time not in booked_slots:
+                            available_times.append({
+                                'date': current_time.strftime('%Y-%m-%d'),
+                                'time': current_time.strftime('%H:%M'),
+                                'datetime': current_time.isoformat(),
+                                'day_name': current_time.strftime('%A'),
+                                'formatted': current_time.strftime('%I:%M %p'),
+                                'duration': 30
+                            })
+                        current_time += timedelta(minutes=30)
+        return jsonify({
+            'available': True,
+            'has_rules': True,
+            'times': available_times[:20]
+        })
+
+# Google Calendar Integration Routes
+@bp.route('/auth/google-calendar')
+@login_required
+def auth_google_calendar():
+    """Connect Google Calendar for availability sync"""
+    # Use the same redirect URI as regular OAuth to avoid redirect_uri_mismatch
+    if 'localhost' in request.host:
+        # Local development - use HTTP
+        redirect_uri = f"http://{request.host}/auth/google/callback"
+    elif 'droply.live' in request.host:
+        # Production - force HTTPS for droply.live
+        redirect_uri = "https://droply.live/auth/google/callback"
+    else:
+        # Fallback - force HTTPS
+        redirect_uri = f"https://{request.host}/auth/google/callback"
+    
+    # Request calendar scope in addition to basic profile
+    return oauth.google.authorize_redirect(redirect_uri, scope='openid email profile https://www.googleapis.com/auth/calendar.readonly')
+
+@bp.route('/disconnect-google-calendar', methods=['POST'])
+@login_required
+def disconnect_google_calendar():
+    """Disconnect Google Calendar integration"""
+    current_user.google_calendar_connected = False
+    current_user.google_calendar_token = None
+    current_user.google_calendar_refresh_token = None
+    current_user.google_calendar_id = None
+    
+    db.session.commit()
+    from google_calendar import forget_user_calendar
+    forget_user_calendar(current_user.id)
+    flash('Google Calendar disconnected successfully.', 'success')
+    return redirect(url_for('profiles.account'))
@@ -0,0 +1,877 @@
+"""Booking flow: time selection, checkout, confirmation and cancellation."""
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask_login import login_required, current_user
+from extensions import db
+from models import User, AvailabilityRule, Booking
+from slot_engine import ProviderSchedule
+from booking_jobs import complete_past_bookings
+import earnings_ledger
+import stripe
+from datetime import datetime, timezone, timedelta
+from environment import is_production_environment
+from views.helpers import setup_default_availability, YOUR_DOMAIN
+
+EASTERN_TIMEZONE = timezone(timedelta(hours=-4))  # EDT (UTC-4)
+
+bp = Blueprint('bookings', __name__)
+
+def convert_to_local_time(dt, user_timezone='America/New_York'):
+    """Convert timezone-naive datetime to user's local timezone"""
+    if dt is None:
+        return None
+    # Assume the datetime is in UTC if it's naive
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    
+    # Convert to EDT (UTC-4) for simplicity
+    edt_offset = timezone(timedelta(hours=-4))
+    return dt.astimezone(edt_offset)
+
+BOOKING_WINDOW_DAYS = 60
+
+@bp.route('/user/<username>/book')
+@login_required
+def user_booking_times(username):
+    """Select available booking times for a user"""
+    try:
+        user = User.query.filter_by(username=username).first_or_404()
+        
+        # Get user's availability rules
+        availability_rules = AvailabilityRule.query.filter_by(user_id=user.id).all()
+        
+        # If user has no availability rules, set up default 9-5 weekdays
+        if not availability_rules:
+            print(f"User {user.username} has no availability rules, setting up default 9-5 weekdays")
+            setup_default_availability(user)
+            db.session.commit()
+            # Refresh availability rules
+            availability_rules = AvailabilityRule.query.filter_by(user_id=user.id).all()
+        
+        # Get current user's timezone for display
+        current_user_timezone = current_user.timezone or 'America/New_York'
+        user_timezone = user.timezone or 'America/New_York'
+        
+        # Get available times for the next BOOKING_WINDOW_DAYS days
+        available_times = []
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        if availability_rules:
+            try:
+                # One pass over rules, exceptions and bookings for the whole window
+                schedule = ProviderSchedule.load(user, today, BOOKING_WINDOW_DAYS)
+                slots = schedule.slots_for_range(today, BOOKING_WINDOW_DAYS, current_user_timezone)
+            except Exception as e:
+                print(f"Error generating slots for {user.username}: {e}")
+                slots = []
+            
+            now = datetime.now()
+            for slot in slots:
+                # Only include future slots
+                if slot['start_time'].replace(tzinfo=None) > now:
+                    available_times.append({
+                        'datetime': slot['start_time'].replace(tzinfo=None),
+                        'formatted_date': slot['date'].strftime('%B %d, %Y'),
+                        'formatted_time': slot['formatted_time'],
+                        'iso_datetime': slot['start_time'].replace(tzinfo=None).isoformat(),
+                        'user_time': slot['provider_time']
+                    })
+        
+        return render_template('user_booking_times.html', 
+                             user=user, 
+                             available_times=available_times,
+                             has_availability=bool(availability_rules),
+                             current_user_timezone=current_user_timezone,
+                             user_timezone=user_timezone)
+    except Exception as e:
+        print(f"Error in user_booking_times: {e}")
+        flash('An error occurred while loading booking times. Please try again.', 'error')
+        return redirect(url_for('profiles.user_profile', username=username))
+
+
+@bp.route('/user/<username>/book-immediate')
+@login_required
+def book_immediate_meeting(username):
+    """Book an immediate meeting with a user"""
+    user = User.query.filter_by(username=username).first_or_404()
+    
+    # Check if user is available
+    if not user.is_available:
+        flash('This user is not currently available for immediate meetings.', 'error')
+        return redirect(url_for('profiles.user_profile', username=username))
+    
+    # Create immediate meeting time (starts in 5 minutes)
+    from datetime import datetime, timedelta
+    now = datetime.now()
+    meeting_start = now + timedelta(minutes=5)  # Start in 5 minutes
+    meeting_end = meeting_start + timedelta(minutes=30)  # 30 minute session
+    
+    # Format for the booking confirmation URL (same format as regular time slots)
+    datetime_str = meeting_start.isoformat()
+    
+    # Debug logging
+    print(f"DEBUG: Book Now - User: {user.username}")
+    print(f"DEBUG: Book Now - Meeting start: {meeting_start}")
+    print(f"DEBUG: Book Now - Datetime string: {datetime_str}")
+    
+    # Redirect to the normal booking confirmation flow
+    return redirect(url_for('bookings.booking_confirmation', 
+                          expert=user.username, 
+                          datetime=datetime_str, 
+                          duration=30))
+
+# @bp.route('/calendar/add', methods=['GET', 'POST'])
+# @login_required
+# def add_time_slot():
+#     """Add new time slot - Temporarily disabled due to missing TimeSlot model"""
+#     return redirect(url_for('main.dashboard'))
+
+# @bp.route('/booking/<int:slot_id>', methods=['GET', 'POST'])
+# def book_session(slot_id):
+#     """Book a session - Temporarily disabled due to missing TimeSlot model"""
+#     flash('Booking functionality is temporarily unavailable.', 'error')
+#     return redirect(url_for('main.homepage'))
+
+@bp.route('/create-checkout-session/<int:booking_id>', methods=['POST', 'GET'])
+def create_checkout_session(booking_id):
+    """Create Stripe checkout session"""
+    print(f"DEBUG: create_checkout_session called with booking_id: {booking_id}")
+    print(f"DEBUG: Stripe API key configured: {bool(stripe.api_key)}")
+    print(f"DEBUG: YOUR_DOMAIN: {YOUR_DOMAIN}")
+    print(f"DEBUG: Request method: {request.method}")
+    print(f"DEBUG: Request args: {dict(request.args)}")
+    print(f"DEBUG: Request form: {dict(request.form)}")
+    
+    # Production safeguard
+    if is_production_environment() and stripe.api_key.startswith('sk_test_'):
+        print("DEBUG: Production environment with test keys detected")
+        flash('Payment system temporarily unavailable. Please try again later.', 'error')
+        return redirect(url_for('main.homepage'))
+    
+    booking = Booking.query.get_or_404(booking_id)
+    print(f"DEBUG: Booking found - ID: {booking.id}, Amount: {booking.payment_amount}, Status: {booking.status}")
+    
+    try:
+        # Get expert details for the checkout session
+        expert = User.query.get(booking.provider_id)
+        if not expert:
+            print("DEBUG: Expert not found for booking")
+            flash('Expert not found', 'error')
+            return redirect(url_for('main.homepage'))
+        
+        print(f"DEBUG: Expert found - {expert.username}, Rate: {expert.hourly_rate}")
+        
+        # Validate payment amount
+        if not booking.payment_amount or booking.payment_amount <= 0:
+            print(f"DEBUG: Invalid payment amount: {booking.payment_amount}")
+            flash('Invalid payment amount', 'error')
+            return redirect(url_for('profiles.user_profile', username=expert.username))
+        
+        print(f"DEBUG: Creating Stripe checkout session...")
+        checkout_session = stripe.checkout.Session.create(
+            payment_method_types=['card'],
+            line_items=[{
+                'price_data': {
+                    'currency': 'usd',  # Default to USD for now
+                    'product_data': {
+                        'name': f'Session with {expert.full_name or expert.username}',
+                        'description': f'{booking.duration}-minute video consultation on {booking.start_time.strftime("%B %d, %Y at %I:%M %p")}',
+                    },
+                    'unit_amount': int(booking.payment_amount * 100),  # Amount in cents
+                },
+                'quantity': 1,
+            }],
+            mode='payment',
+            success_url=f'{YOUR_DOMAIN}/booking/success/{booking.id}',
+            cancel_url=f'{YOUR_DOMAIN}/user/{expert.username}',
+            metadata={
+                'booking_id': booking.id
+            }
+        )
+        
+        print(f"DEBUG: Stripe checkout session created successfully: {checkout_session.id}")
+        print(f"DEBUG: Checkout URL: {checkout_session.url}")
+        
+        booking.stripe_session_id = checkout_session.id
+        db.session.commit()
+        
+        print(f"DEBUG: Redirecting to Stripe checkout...")
+        return redirect(checkout_session.url, code=303)
+        
+    except stripe.error.StripeError as e:
+        print(f"DEBUG: Stripe error: {str(e)}")
+        flash(f'Payment system error: {str(e)}', 'error')
+        return redirect(url_for('profiles.user_profile', username=expert.username if expert else 'unknown'))
+    except Exception as e:
+        print(f"DEBUG: General error in create_checkout_session: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        flash(f'Payment error: {str(e)}', 'error')
+        return redirect(url_for('profiles.user_profile', username=expert.username if expert else 'unknown'))
+
+@bp.route('/booking/success/<int:booking_id>')
+def booking_success(booking_id):
+    """Booking success page - redirects to bookings with success message"""
+    booking = Booking.query.get_or_404(booking_id)
+    booking.payment_status = 'paid'
+    booking.status = 'confirmed'  # Auto-confirm for immediate meetings
+    db.session.commit()
+    
+    print(f"DEBUG: Booking {booking_id} updated - payment_status: {booking.payment_status}, status: {booking.status}")
+    
+    flash('🎉 Payment successful! Your booking is confirmed.', 'success')
+    return redirect(url_for('bookings.bookings'))
+
+@bp.route('/booking/cancel/<int:booking_id>')
+def booking_cancel(booking_id):
+    """Handle booking cancellation from Stripe checkout"""
+    booking = Booking.query.get_or_404(booking_id)
+    
+    # If payment was never completed, just delete the booking and redirect to expert profile
+    if booking.payment_status in ['pending', 'cancelled']:
+        expert = User.query.get(booking.provider_id)
+        expert_username = expert.username if expert else 'unknown'
+        
+        # Delete the incomplete booking
+        db.session.delete(booking)
+        db.session.commit()
+        
+        # Redirect back to user profile
+        return redirect(url_for('profiles.user_profile', username=expert_username))
+    
+    # If payment was completed, show the cancel page (this shouldn't happen from Stripe cancel)
+    booking.status = 'cancelled'
+    booking.payment_status = 'cancelled'
+    db.session.commit()
+    
+    return render_template('cancel.html', booking=booking)
+
+@bp.route('/export/calendar/<username>')
+def export_calendar(username):
+    """Export user calendar as iCal"""
+    user = User.query.filter_by(username=username).first_or_404()
+    
+    # For now, just redirect to the user's profile
+    # In the future, this could generate an actual iCal file
+    flash('Calendar export feature coming soon!', 'info')
+    return redirect(url_for('profiles.user_profile', username=username))
+
+@bp.route('/bookings')
+@login_required
+def bookings():
+    """View user's bookings and calendar"""
+    from models import Booking
+    from datetime import datetime, timedelta
+    
+    now = datetime.now(EASTERN_TIMEZONE)
+    
+    # Bookings where the user is the booker (client) - only show paid bookings
+    # Use a more flexible time comparison to handle timezone issues
+    upcoming_as_client = Booking.query.filter(
+        (Booking.user_id == current_user.id) &
+        (Booking.start_time >= now.replace(tzinfo=None) - timedelta(hours=1)) &  # Allow 1 hour buffer
+        (Booking.payment_status == 'paid')
+    ).order_by(Booking.start_time.asc()).all()
+    
+    past_as_client = Booking.query.filter(
+        (Booking.user_id == current_user.id) &
+        (Booking.start_time < now.replace(tzinfo=None) - timedelta(hours=1)) &  # Allow 1 hour buffer
+        (Booking.payment_status == 'paid')
+    ).order_by(Booking.start_time.desc()).all()
+    
+    # Bookings where the user is the expert (provider) - only show paid bookings
+    upcoming_as_expert = Booking.query.filter(
+        (Booking.provider_id == current_user.id) &
+        (Booking.start_time >= now.replace(tzinfo=None) - timedelta(hours=1)) &  # Allow 1 hour buffer
+        (Booking.payment_status == 'paid')
+    ).order_by(Booking.start_time.asc()).all()
+    
+    past_as_expert = Booking.query.filter(
+        (Booking.provider_id == current_user.id) &
+        (Booking.start_time < now.replace(tzinfo=None) - timedelta(hours=1)) &  # Allow 1 hour buffer
+        (Booking.payment_status == 'paid')
+    ).order_by(Booking.start_time.desc()).all()
+    
+    # Debug prints
+    print(f"DEBUG: Current user ID: {current_user.id}")
+    print(f"DEBUG: Current time: {now}")
+    print(f"DEBUG: Upcoming as client count: {len(upcoming_as_client)}")
+    print(f"DEBUG: Upcoming as expert count: {len(upcoming_as_expert)}")
+    print(f"DEBUG: Past as client count: {len(past_as_client)}")
+    print(f"DEBUG: Past as expert count: {len(past_as_expert)}")
+    for booking in upcoming_as_client:
+        print(f"DEBUG: Upcoming client booking ID {booking.id}, start_time: {booking.start_time}, status: {booking.status}")
+    for booking in upcoming_as_expert:
+        print(f"DEBUG: Upcoming expert booking ID {booking.id}, start_time: {booking.start_time}, status: {booking.status}")
+    
+    # Convert times to local timezone for display
+    def convert_booking_times(booking_list):
+        for booking in booking_list:
+            booking.start_time_local = convert_to_local_time(booking.start_time)
+            booking.end_time_local = convert_to_local_time(booking.end_time)
+        return booking_list
+    
+    upcoming_as_client = convert_booking_times(upcoming_as_client)
+    past_as_client = convert_booking_times(past_as_client)
+    upcoming_as_expert = convert_booking_times(upcoming_as_expert)
+    past_as_expert = convert_booking_times(past_as_expert)
+    
+    print("🚨🚨🚨 BOOKINGS ROUTE CALLED - TEMPLATE SHOULD BE UPDATED 🚨🚨🚨")
+    return render_template('bookings.html', 
+                         user=current_user, 
+                         upcoming_as_client=upcoming_as_client,
+                         past_as_client=past_as_client,
+                         upcoming_as_expert=upcoming_as_expert,
+                         past_as_expert=past_as_expert,
+                         now=now)
+
+@bp.route('/booking/accept/<int:booking_id>')
+@login_required
+def accept_booking(booking_id):
+    """Accept a booking request"""
+    booking = Booking.query.get_or_404(booking_id)
+    if booking.provider_id != current_user.id:
+        flash('You are not authorized to accept this booking.', 'error')
+        return redirect(url_for('bookings.bookings'))
+    if booking.status != 'pending':
+        flash('This booking cannot be accepted.', 'error')
+        return redirect(url_for('bookings.bookings'))
+    booking.status = 'confirmed'
+    db.session.commit()
+    flash('✅ Booking accepted! The client has been notified.', 'success')
+    return redirect(url_for('bookings.bookings'))
+
+@bp.route('/booking/decline/<int:booking_id>')
+@login_required
+def decline_booking(booking_id):
+    """Decline a booking request"""
+    booking = Booking.query.get_or_404(booking_id)
+    if booking.provider_id != current_user.id:
+        flash('You are not authorized to decline this booking.', 'error')
+        return redirect(url_for('bookings.bookings'))
+    if booking.status != 'pending':
+        flash('This booking cannot be declined.', 'error')
+        return redirect(url_for('bookings.bookings'))
+    
+    try:
+        # Process full refund if payment was made
+        if booking.payment_status == 'paid' and booking.stripe_session_id:
+            # Get the payment intent from the session
+            session = stripe.checkout.Session.retrieve(booking.stripe_session_id)
+            if session.payment_intent:
+                # Full refund for expert decline
+                refund_amount = int(booking.payment_amount * 100)  # Convert to cents
+                
+                # Process the refund through Stripe
+                refund = stripe.Refund.create(
+                    payment_intent=session.payment_intent,
+                    amount=refund_amount,
+                    reason='requested_by_customer',
+                    metadata={
+                        'booking_id': booking.id,
+                        'refund_reason': 'declined_by_expert',
+                        'cancelled_by': 'expert'
+                    }
+                )
+                
+                booking.status = 'declined'
+                booking.payment_status = 'refunded'
+                earnings_ledger.record_refund(booking)
+                flash(f'❌ Booking declined. Full refund of ${refund_amount/100:.2f} processed.', 'warning')
+            else:
+                booking.status = 'declined'
+                booking.payment_status = 'refunded'
+                flash('❌ Booking declined but refund could not be processed.', 'warning')
+        else:
+            # No payment to refund
+            booking.status = 'declined'
+            booking.payment_status = 'cancelled'
+            flash('❌ Booking declined successfully.', 'warning')
+        
+        db.session.commit()
+        
+    except Exception as e:
+        db.session.rollback()
+        flash(f'❌ Error processing decline: {str(e)}', 'error')
+        return redirect(url_for('bookings.bookings'))
+    
+    return redirect(url_for('bookings.bookings'))
+
+@bp.route('/booking/cancel-by-client/<int:booking_id>')
+@login_required
+def cancel_booking_by_client(booking_id):
+    """Cancel a booking by the client who made it"""
+    print(f"[DEBUG] Cancel booking by client called for booking {booking_id}")
+    booking = Booking.query.get_or_404(booking_id)
+    
+    print(f"[DEBUG] Booking found: {booking.id}, Status: {booking.status}")
+    print(f"[DEBUG] Current user: {current_user.id}, Booking user: {booking.user_id}")
+    
+    if booking.user_id != current_user.id:
+        print(f"[DEBUG] User not authorized to cancel booking")
+        flash('You are not authorized to cancel this booking.', 'error')
+        return redirect(url_for('bookings.bookings'))
+    if booking.status not in ['pending', 'confirmed']:
+        print(f"[DEBUG] Booking cannot be cancelled - status: {booking.status}")
+        flash('This booking cannot be cancelled.', 'error')
+        return redirect(url_for('bookings.bookings'))
+    
+    from datetime import datetime, timedelta
+    now = datetime.now()
+    time_until_booking = booking.start_time - now
+    
+    print(f"[DEBUG] Time until booking: {time_until_booking}")
+    print(f"[DEBUG] 24 hour check: {time_until_booking < timedelta(hours=24)}")
+    
+    # Check 24-hour cancellation policy
+    if time_until_booking < timedelta(hours=24):
+        print(f"[DEBUG] Cancellation blocked - within 24 hours")
+        flash('Bookings cannot be cancelled within 24 hours of the session.', 'error')
+        return redirect(url_for('bookings.bookings'))
+    
+    try:
+        # Process refund if payment was made
+        if booking.payment_status == 'paid' and booking.stripe_session_id:
+            # Get the payment intent from the session
+            session = stripe.checkout.Session.retrieve(booking.stripe_session_id)
+            if session.payment_intent:
+                # Calculate refund amount based on cancellation policy
+                if time_until_booking >= timedelta(hours=24):
+                    # Full refund if cancelled 24+ hours before
+                    refund_amount = int(booking.payment_amount * 100)  # Convert to cents
+                    refund_reason = 'cancelled_by_client_full'
+                else:
+                    # Partial refund (platform fee is non-refundable)
+                    platform_fee = max(5.0, booking.payment_amount * 0.10)
+                    refund_amount = int((booking.payment_amount - platform_fee) * 100)
+                    refund_reason = 'cancelled_by_client_partial'
+                
+                # Process the refund through Stripe
+                refund = stripe.Refund.create(
+                    payment_intent=session.payment_intent,
+                    amount=refund_amount,
+                    reason='requested_by_customer',
+                    metadata={
+                        'booking_id': booking.id,
+                        'refund_reason': refund_reason,
+                        'cancelled_by': 'client'
+                    }
+                )
+                
+                # Update booking status
+                booking.status = 'cancelled'
+                booking.payment_status = 'refunded'
+                
+                # Claw back the expert's share if they were credited for it
+                earnings_ledger.record_refund(booking)
+                
+                flash(f'✅ Booking cancelled successfully. Refund of ${refund_amount/100:.2f} processed.', 'success')
+            else:
+                flash('❌ Booking cancelled but refund could not be processed.', 'warning')
+        else:
+            # No payment to refund
+            print(f"[DEBUG] No payment to refund, cancelling booking")
+            booking.status = 'cancelled'
+            booking.payment_status = 'cancelled'
+            flash('❌ Booking cancelled successfully.', 'success')
+        
+        print(f"[DEBUG] Committing cancellation to database")
+        db.session.commit()
+        print(f"[DEBUG] Cancellation completed successfully")
+        
+    except Exception as e:
+        db.session.rollback()
+        flash(f'❌ Error processing cancellation: {str(e)}', 'error')
+        return redirect(url_for('bookings.bookings'))
+    
+    return redirect(url_for('bookings.bookings'))
+
+@bp.route('/api/booking/cancel-by-client/<int:booking_id>', methods=['POST'])
+@login_required
+def cancel_booking_by_client_ajax(booking_id):
+    """Cancel a booking by the client who made it - AJAX endpoint"""
+    print(f"[DEBUG] AJAX Cancel booking by client called for booking {booking_id}")
+    booking = Booking.query.get_or_404(booking_id)
+    
+    print(f"[DEBUG] Booking found: {booking.id}, Status: {booking.status}")
+    print(f"[DEBUG] Current user: {current_user.id}, Booking user: {booking.user_id}")
+    
+    if booking.user_id != current_user.id:
+        print(f"[DEBUG] User not authorized to cancel booking")
+        return jsonify({
+            'success': False,
+            'message': 'You are not authorized to cancel this booking.',
+            'type': 'error'
+        }), 403
+    
+    if booking.status not in ['pending', 'confirmed']:
+        print(f"[DEBUG] Booking cannot be cancelled - status: {booking.status}")
+        return jsonify({
+            'success': False,
+            'message': 'This booking cannot be cancelled.',
+            'type': 'error'
+        }), 400
+    
+    from datetime import datetime, timedelta
+    now = datetime.now()
+    time_until_booking = booking.start_time - now
+    
+    print(f"[DEBUG] Time until booking: {time_until_booking}")
+    print(f"[DEBUG] 24 hour check: {time_until_booking < timedelta(hours=24)}")
+    
+    # Check 24-hour cancellation policy
+    if time_until_booking < timedelta(hours=24):
+        print(f"[DEBUG] Cancellation blocked - within 24 hours")
+        return jsonify({
+            'success': False,
+            'message': 'Bookings cannot be cancelled within 24 hours of the session.',
+            'type': 'error'
+        }), 400
+    
+    try:
+        # Process refund if payment was made
+        if booking.payment_status == 'paid' and booking.stripe_session_id:
+            session = stripe.checkout.Session.retrieve(booking.stripe_session_id)
+            if session.payment_intent:
+                refund_amount = int(booking.payment_amount * 100)
+                refund = stripe.Refund.create(
+                    payment_intent=session.payment_intent,
+                    amount=refund_amount,
+                    reason='requested_by_customer',
+                    metadata={
+                        'booking_id': booking.id,
+                        'refund_reason': 'cancelled_by_client_full',
+                        'cancelled_by': 'client'
+                    }
+                )
+                booking.status = 'cancelled'
+                booking.payment_status = 'refunded'
+                
+                # Claw back the expert's share if they were credited for it
+                earnings_ledger.record_refund(booking)
+                
+                print(f"[DEBUG] Committing cancellation to database")
+                db.session.commit()
+                print(f"[DEBUG] Cancellation completed successfully")
+                
+                return jsonify({
+                    'success': True,
+                    'message': f'✅ Booking cancelled successfully. Refund of ${refund_amount/100:.2f} processed.',
+                    'type': 'success'
+                })
+            else:
+                return jsonify({
+                    'success': False,
+                    'message': '❌ Booking cancelled but refund could not be processed.',
+                    'type': 'warning'
+                })
+        else:
+            print(f"[DEBUG] No payment to refund, cancelling booking")
+            booking.status = 'cancelled'
+            booking.payment_status = 'cancelled'
+            print(f"[DEBUG] Committing cancellation to database")
+            db.session.commit()
+            print(f"[DEBUG] Cancellation completed successfully")
+            
+            return jsonify({
+                'success': True,
+                'message': '❌ Booking cancelled successfully.',
+                'type': 'success'
+            })
+            
+    except Exception as e:
+        db.session.rollback()
+        print(f"[DEBUG] Error processing cancellation: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'❌ Error processing cancellation: {str(e)}',
+            'type': 'error'
+        }), 500
+
+@bp.route('/api/booking/cancel-by-provider/<int:booking_id>', methods=['POST'])
+@login_required
+def cancel_booking_by_provider_ajax(booking_id):
+    """Cancel a booking by the expert - AJAX endpoint"""
+    print(f"[DEBUG] AJAX Cancel booking by expert called for booking {booking_id}")
+    booking = Booking.query.get_or_404(booking_id)
+    
+    if booking.provider_id != current_user.id:
+        return jsonify({
+            'success': False,
+            'message': 'You are not authorized to cancel this booking.',
+            'type': 'error'
+        }), 403
+    
+    if booking.status != 'confirmed':
+        return jsonify({
+            'success': False,
+            'message': 'This booking cannot be cancelled.',
+            'type': 'error'
+        }), 400
+    
+    try:
+        # Process full refund if payment was made
+        if booking.payment_status == 'paid' and booking.stripe_session_id:
+            session = stripe.checkout.Session.retrieve(booking.stripe_session_id)
+            if session.payment_intent:
+                refund_amount = int(booking.payment_amount * 100)
+                refund = stripe.Refund.create(
+                    payment_intent=session.payment_intent,
+                    amount=refund_amount,
+                    reason='requested_by_customer',
+                    metadata={
+                        'booking_id': booking.id,
+                        'refund_reason': 'cancelled_by_expert_full',
+                        'cancelled_by': 'expert'
+                    }
+                )
+                booking.status = 'cancelled'
+                booking.payment_status = 'refunded'
+                
+                # Claw back the expert's share if they were credited for it
+                earnings_ledger.record_refund(booking)
+                
+                db.session.commit()
+                
+                return jsonify({
+                    'success': True,
+                    'message': f'✅ Booking cancelled successfully. Full refund of ${refund_amount/100:.2f} processed for client.',
+                    'type': 'success'
+                })
+            else:
+                return jsonify({
+                    'success': False,
+                    'message': '❌ Booking cancelled but refund could not be processed.',
+                    'type': 'warning'
+                })
+        else:
+            booking.status = 'cancelled'
+            booking.payment_status = 'cancelled'
+            db.session.commit()
+            
+            return jsonify({
+                'success': True,
+                'message': '❌ Booking cancelled successfully.',
+                'type': 'success'
+            })
+            
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': f'❌ Error processing cancellation: {str(e)}',
+            'type': 'error'
+        }), 500
+
+@bp.route('/booking/cancel-by-provider/<int:booking_id>')
+@login_required
+def cancel_booking_by_provider(booking_id):
+    """Cancel a booking by the expert (gives full refund to client)"""
+    booking = Booking.query.get_or_404(booking_id)
+    if booking.provider_id != current_user.id:
+        flash('You are not authorized to cancel this booking.', 'error')
+        return redirect(url_for('bookings.bookings'))
+    if booking.status != 'confirmed':
+        flash('This booking cannot be cancelled.', 'error')
+        return redirect(url_for('bookings.bookings'))
+    
+    try:
+        # Process full refund if payment was made
+        if booking.payment_status == 'paid' and booking.stripe_session_id:
+            # Get the payment intent from the session
+            session = stripe.checkout.Session.retrieve(booking.stripe_session_id)
+            if session.payment_intent:
+                # Full refund for expert cancellation
+                refund_amount = int(booking.payment_amount * 100)  # Convert to cents
+                
+                # Process the refund through Stripe
+                refund = stripe.Refund.create(
+                    payment_intent=session.payment_intent,
+                    amount=refund_amount,
+                    reason='requested_by_customer',
+                    metadata={
+                        'booking_id': booking.id,
+                        'refund_reason': 'cancelled_by_expert',
+                        'cancelled_by': 'expert'
+                    }
+                )
+                
+                # Update booking status
+                booking.status = 'cancelled'
+                booking.payment_status = 'refunded'
+                
+                # Claw back the expert's share if they were credited for it
+                earnings_ledger.record_refund(booking)
+                
+                flash(f'❌ Booking cancelled. Full refund of ${refund_amount/100:.2f} processed.', 'warning')
+            else:
+                booking.status = 'cancelled'
+                booking.payment_status = 'refunded'
+                flash('❌ Booking cancelled but refund could not be processed.', 'warning')
+        else:
+            # No payment to refund
+            booking.status = 'cancelled'
+            booking.payment_status = 'cancelled'
+            flash('❌ Booking cancelled successfully.', 'warning')
+        
+        db.session.commit()
+        
+    except Exception as e:
+        db.session.rollback()
+        flash(f'❌ Error processing cancellation: {str(e)}', 'error')
+        return redirect(url_for('bookings.bookings'))
+    
+    return redirect(url_for('bookings.bookings'))
+
+@bp.route('/booking/confirm', methods=['GET', 'POST'])
+@login_required
+def booking_confirmation():
+    print(f"DEBUG: booking_confirmation called - Method: {request.method}")
+    print(f"DEBUG: booking_confirmation - Args: {dict(request.args)}")
+    print(f"DEBUG: booking_confirmation - Form: {dict(request.form)}")
+    print(f"DEBUG: Stripe API key configured: {bool(stripe.api_key)}")
+    print(f"DEBUG: YOUR_DOMAIN: {YOUR_DOMAIN}")
+    """Booking confirmation page with payment"""
+    print(f"DEBUG: Current user: {current_user.is_authenticated if current_user else 'No user'}")
+    print(f"DEBUG: Request URL: {request.url}")
+    print(f"DEBUG: Request method: {request.method}")
+    print(f"DEBUG: Request args: {dict(request.args)}")
+    if request.method == 'GET':
+        # Get booking details from query parameters
+        expert_username = request.args.get('expert')
+        datetime_str = request.args.get('datetime')
+        duration = request.args.get('duration', 30)
+        
+        if not expert_username or not datetime_str:
+            flash('Missing booking information', 'error')
+            return redirect(url_for('main.homepage'))
+        
+        # Get expert details
+        expert = User.query.filter_by(username=expert_username).first()
+        if not expert:
+            flash('Expert not found', 'error')
+            return redirect(url_for('main.homepage'))
+        
+        # Parse datetime
+        try:
+            booking_datetime = datetime.fromisoformat(datetime_str)
+        except ValueError:
+            flash('Invalid date/time format', 'error')
+            return redirect(url_for('main.homepage'))
+        
+        # Calculate pricing
+        duration = int(duration)
+        session_price = expert.hourly_rate or 0  # This field now stores session price directly
+        # All sessions are 30 minutes, so session fee equals the session price
+        session_fee = session_price
+        platform_fee = max(5.0, session_fee * 0.10)  # 10% platform fee, minimum $5
+        total_amount = session_fee + platform_fee
+        
+        return render_template('booking_confirmation.html',
+                             user=expert,
+                             booking_date=booking_datetime.strftime('%B %d, %Y'),
+                             booking_time=booking_datetime.strftime('%I:%M %p'),
+                             duration=duration,
+                             session_fee=f"{session_fee:.2f}",
+                             platform_fee=f"{platform_fee:.2f}",
+                             total_amount=f"{total_amount:.2f}")
+    
+    else:
+        # Handle POST request - create booking and redirect to Stripe
+        try:
+            print("DEBUG: Starting booking confirmation POST handling")
+            
+            expert_username = request.args.get('expert')
+            datetime_str = request.args.get('datetime')
+            duration = int(request.args.get('duration', 30))
+            
+            # Debug logging
+            print(f"DEBUG: Booking confirmation POST - Expert: {expert_username}")
+            print(f"DEBUG: Booking confirmation POST - Datetime: {datetime_str}")
+            print(f"DEBUG: Booking confirmation POST - Duration: {duration}")
+            
+            if not expert_username or not datetime_str:
+                print("DEBUG: Missing booking information")
+                flash('Missing booking information', 'error')
+                return redirect(url_for('main.homepage'))
+            
+            expert = User.query.filter_by(username=expert_username).first()
+            if not expert:
+                print("DEBUG: Expert not found")
+                flash('Expert not found', 'error')
+                return redirect(url_for('main.homepage'))
+            
+            print(f"DEBUG: Expert found: {expert.username}")
+            
+            start_time = datetime.fromisoformat(datetime_str)
+            end_time = start_time + timedelta(minutes=duration)
+            
+            print(f"DEBUG: Booking confirmation POST - Start time: {start_time}")
+            print(f"DEBUG: Booking confirmation POST - End time: {end_time}")
+            
+        except Exception as e:
+            print(f"DEBUG: Exception in booking confirmation POST: {e}")
+            flash(f'Error processing booking: {str(e)}', 'error')
+            return redirect(url_for('main.homepage'))
+        
+        # Prevent double booking: check for any overlapping bookings
+        print("DEBUG: Checking for booking conflicts")
+        conflict = Booking.query.filter(
+            (Booking.provider_id == expert.id) &
+            (Booking.status == 'confirmed') &
+            (
+                ((start_time >= Booking.start_time) & (start_time < Booking.end_time)) |
+                ((end_time > Booking.start_time) & (end_time <= Booking.end_time)) |
+                ((start_time <= Booking.start_time) & (end_time >= Booking.end_time))
+            )
+        ).first()
+        
+        if conflict:
+            print("DEBUG: Booking conflict found")
+            flash('This time slot has already been booked. Please choose another time.', 'error')
+            return redirect(url_for('bookings.bookings'))
+        
+        print("DEBUG: No booking conflicts found")
+        
+        # Calculate pricing
+        print("DEBUG: Calculating pricing")
+        session_price = expert.hourly_rate or 0  # This field now stores session price directly
+        # All sessions are 30 minutes, so session fee equals the session price
+        session_fee = session_price
+        platform_fee = max(5.0, session_fee * 0.10)
+        total_amount = session_fee + platform_fee
+        
+        print(f"DEBUG: Pricing calculated - Session fee: {session_fee}, Platform fee: {platform_fee}, Total: {total_amount}")
+        
+        # Create booking with pending payment status
+        print("DEBUG: Creating booking")
+        booking = Booking(
+            user_id=current_user.id,
+            provider_id=expert.id,
+            start_time=start_time,
+            end_time=end_time,
+            duration=duration,
+            status='pending',
+            payment_status='pending',
+            payment_amount=total_amount
+        )
+        
+        db.session.add(booking)
+        db.session.commit()
+        
+        print(f"DEBUG: Booking created with ID: {booking.id}")
+        
+        # Redirect to Stripe checkout
+        print(f"DEBUG: Redirecting to Stripe checkout for booking ID: {booking.id}")
+        print(f"DEBUG: Redirect URL: {url_for('bookings.create_checkout_session', booking_id=booking.id)}")
+        return redirect(url_for('bookings.create_checkout_session', booking_id=booking.id))
+
+@bp.route('/admin/update-bookings-status')
+def update_bookings_status():
+    """Update all bookings whose end_time is in the past and status is 'confirmed' to 'completed'."""
+    result = complete_past_bookings()
+    return jsonify({
+        'updated': result.updated,
+        'batches': result.batches,
+        'elapsed_ms': round(result.seconds * 1000, 1),
+        'message': f'{result.updated} bookings updated to completed.'
+    })
@@ -0,0 +1,494 @@
+"""Debug and manual test pages."""
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, jsonify
+from flask_login import login_required, current_user
+from extensions import db
+from models import User, AvailabilityRule, Booking
+import os
+from datetime import timezone, timedelta
+from views.helpers import generate_available_slots_for_date
+from views.meetings import create_meeting_room, get_meeting_token
+
+EASTERN_TIMEZONE = timezone(timedelta(hours=-4))  # EDT (UTC-4)
+
+bp = Blueprint('debug', __name__)
+
+@bp.route('/test-account')
+def test_account():
+    """Test account page without authentication"""
+    # Create a simple test template
+    return '''
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Test Account Page</title>
+        <style>
+            body { font-family: Arial, sans-serif; padding: 20px; }
+            .test-content { background: #f0f0f0; padding: 20px; border: 1px solid #ccc; }
+        </style>
+    </head>
+    <body>
+        <h1>Test Account Page</h1>
+        <div class="test-content">
+            <p>This is a test to see if the account page template renders correctly.</p>
+            <p>If you can see this, the basic template structure is working.</p>
+        </div>
+    </body>
+    </html>
+    '''
+
+@bp.route('/debug-user')
+@login_required
+def debug_user():
+    """Debug endpoint to check user status"""
+    return jsonify({
+        'user_id': current_user.id,
+        'email': current_user.email,
+        'has_google_token': bool(current_user.google_calendar_token),
+        'google_calendar_connected': current_user.google_calendar_connected,
+        'google_calendar_id': current_user.google_calendar_id
+    })
+
+@bp.route('/debug/booking/<int:booking_id>')
+@login_required
+def debug_booking(booking_id):
+    """Debug booking status"""
+    booking = Booking.query.get_or_404(booking_id)
+    return f"""
+    <h3>Booking Debug Info</h3>
+    <p>ID: {booking.id}</p>
+    <p>Status: {booking.status}</p>
+    <p>Payment Status: {booking.payment_status}</p>
+    <p>Start Time: {booking.start_time}</p>
+    <p>End Time: {booking.end_time}</p>
+    <p>User ID: {booking.user_id}</p>
+    <p>Provider ID: {booking.provider_id}</p>
+    <p>Can Join: {booking.can_join_meeting()}</p>
+    <p>Is Ongoing: {booking.is_ongoing()}</p>
+    <p>Payment Amount: {booking.payment_amount}</p>
+    <p><a href="/fix-booking/{booking_id}">Fix Payment Status</a></p>
+    """
+
+@bp.route('/fix-booking/<int:booking_id>')
+@login_required
+def fix_booking(booking_id):
+    """Manually fix booking payment status"""
+    booking = Booking.query.get_or_404(booking_id)
+    booking.payment_status = 'paid'
+    booking.status = 'confirmed'
+    db.session.commit()
+    return redirect(url_for('bookings.bookings'))
+
+@bp.route('/debug/calendar/<username>')
+@login_required
+def debug_calendar(username):
+    """Debug calendar booking issues for a specific user"""
+    try:
+        user = User.query.filter_by(username=username).first_or_404()
+        
+        # Check basic user info
+        user_info = {
+            'username': user.username,
+            'full_name': user.full_name,
+            'is_available': user.is_available,
+            'timezone': user.timezone,
+            'has_availability_rules': False,
+            'availability_rules': [],
+            'available_times_count': 0,
+            'sample_available_times': []
+        }
+        
+        # Check availability rules
+        availability_rules = AvailabilityRule.query.filter_by(user_id=user.id).all()
+        user_info['has_availability_rules'] = len(availability_rules) > 0
+        user_info['availability_rules'] = [
+            {
+                'weekday': rule.weekday,
+                'start': rule.start.strftime('%H:%M'),
+                'end': rule.end.strftime('%H:%M'),
+                'is_active': rule.is_active
+            } for rule in availability_rules
+        ]
+        
+        # Test slot generation for today and tomorrow
+        from datetime import datetime, timedelta
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        tomorrow = today + timedelta(days=1)
+        
+        # Get current user's timezone
+        current_user_timezone = current_user.timezone or 'America/New_York'
+        
+        # Test slot generation
+        test_dates = [today, tomorrow]
+        all_available_times = []
+        
+        for test_date in test_dates:
+            try:
+                slots = generate_available_slots_for_date(test_date, user, current_user_timezone)
+                for slot in slots:
+                    if slot['start_time'].replace(tzinfo=None) > datetime.now():
+                        all_available_times.append({
+                            'date': test_date.strftime('%Y-%m-%d'),
+                            'datetime': slot['start_time'].replace(tzinfo=None),
+                            'formatted_time': slot['formatted_time'],
+                            'iso_datetime': slot['start_time'].replace(tzinfo=None).isoformat()
+                        })
+            except Exception as e:
+                print(f"Error generating slots for {test_date}: {e}")
+        
+        user_info['available_times_count'] = len(all_available_times)
+        user_info['sample_available_times'] = all_available_times[:10]  # First 10 times
+        
+        return jsonify(user_info)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/debug/oauth')
+def debug_oauth():
+    """Debug endpoint to check OAuth configuration"""
+    debug_info = {
+        'google_client_id': current_app.config.get('GOOGLE_CLIENT_ID', 'NOT_SET'),
+        'google_client_secret_set': current_app.config.get('GOOGLE_CLIENT_SECRET', 'NOT_SET') != 'YOUR_GOOGLE_CLIENT_SECRET',
+        'redirect_uri': url_for('auth.auth_google_callback', _external=True),
+        'request_url': request.url,
+        'request_host': request.host,
+        'request_headers': dict(request.headers),
+        'flask_env': os.environ.get('FLASK_ENV', 'NOT_SET'),
+        'environment': os.environ.get('ENVIRONMENT', 'NOT_SET'),
+    }
+    return jsonify(debug_info)
+
+@bp.route('/test-deployment')
+def test_deployment():
+    return "Deployment test successful - code changes are active!"
+
+@bp.route('/test-meeting/<int:booking_id>')
+def test_meeting(booking_id):
+    """Temporary test route for video calling - bypasses authentication"""
+    try:
+        booking = Booking.query.get_or_404(booking_id)
+        
+        # Create meeting room if it doesn't exist
+        if not booking.meeting_room_id:
+            room_info, error = create_meeting_room(booking_id)
+            if error:
+                print(f"Error creating meeting room: {error}")
+                # Fall back to simple meeting
+                booking.meeting_room_id = f"test-room-{booking_id}"
+                booking.meeting_url = f"https://droply-test.daily.co/test-room-{booking_id}"
+                db.session.commit()
+        
+        # Generate meeting token
+        token, error = get_meeting_token(booking.meeting_room_id, 1, True)
+        if error:
+            print(f"Error generating token: {error}")
+            # Use a simple token
+            token = "test-token"
+        
+        # Determine the other participant
+        other_user = booking.provider
+        
+        # Use Daily.co template
+        template_name = 'meeting.html'
+        
+        return render_template(template_name, 
+                             booking=booking, 
+                             token=token, 
+                             room_name=booking.meeting_room_id,
+                             other_user=other_user)
+                             
+    except Exception as e:
+        print(f"Error in test_meeting: {e}")
+        return f"Error: {str(e)}", 500
+
+@bp.route('/simple-test-meeting/<int:booking_id>')
+def simple_test_meeting(booking_id):
+    """Simple test route that bypasses Daily.co entirely"""
+    try:
+        booking = Booking.query.get_or_404(booking_id)
+        
+        # Set up simple meeting data
+        booking.meeting_room_id = f"simple-test-{booking_id}"
+        booking.meeting_url = f"https://meet.daily.co/simple-test-{booking_id}"
+        db.session.commit()
+        
+        # Determine the other participant
+        other_user = booking.provider
+        
+        # Always use simple template
+        return render_template('meeting_simple.html', 
+                             booking=booking, 
+                             token="simple-token",
+                             other_user=other_user)
+                             
+    except Exception as e:
+        print(f"Error in simple_test_meeting: {e}")
+        return f"Error: {str(e)}", 500
+
+@bp.route('/force-simple-meeting/<int:booking_id>')
+@login_required
+def force_simple_meeting(booking_id):
+    """Force use of simple WebRTC meeting with controls"""
+    try:
+        booking = Booking.query.get_or_404(booking_id)
+        
+        # Check if user is authorized to join this meeting
+        if booking.user_id != current_user.id and booking.provider_id != current_user.id:
+            flash('You are not authorized to join this meeting.', 'error')
+            return redirect(url_for('bookings.bookings'))
+        
+        # Determine the other participant
+        if current_user.id == booking.user_id:
+            other_user = booking.provider
+        else:
+            other_user = booking.user
+        
+        # Force use simple template with controls
+        return render_template('meeting_simple.html', 
+                             booking=booking, 
+                             other_user=other_user)
+                             
+    except Exception as e:
+        print(f"Error in force_simple_meeting: {e}")
+        return f"Error: {str(e)}", 500
+
+@bp.route('/test-booking/<username>')
+@login_required
+def test_booking(username):
+    """Create a test booking without payment for testing"""
+    try:
+        expert = User.query.filter_by(username=username).first_or_404()
+        
+        # Create a test booking for immediate use
+        from datetime import datetime, timedelta
+        now = datetime.now()
+        start_time = now + timedelta(minutes=1)  # 1 minute from now
+        end_time = start_time + timedelta(minutes=30)
+        
+        booking = Booking(
+            user_id=current_user.id,
+            provider_id=expert.id,
+            start_time=start_time,
+            end_time=end_time,
+            duration=30,
+            status='confirmed',  # Skip payment for testing
+            payment_status='paid',
+            payment_amount=5.00
+        )
+        
+        db.session.add(booking)
+        db.session.commit()
+        
+        flash('Test booking created successfully!', 'success')
+        return redirect(url_for('meetings.join_meeting', booking_id=booking.id))
+        
+    except Exception as e:
+        print(f"Error creating test booking: {e}")
+        flash(f'Error creating test booking: {str(e)}', 'error')
+        return redirect(url_for('profiles.user_profile', username=username))
+
+@bp.route('/daily-test/<int:booking_id>')
+def daily_test(booking_id):
+    """Simple Daily.co test route"""
+    try:
+        booking = Booking.query.get_or_404(booking_id)
+        
+        # Create a simple Daily.co room
+        room_name = f"droply-test-{booking_id}"
+        room_url = f"https://droply-test.daily.co/{room_name}"
+        
+        # Update booking with room info
+        booking.meeting_room_id = room_name
+        booking.meeting_url = room_url
+        db.session.commit()
+        
+        # Determine the other participant
+        other_user = booking.provider
+        
+        return render_template('meeting.html', 
+                             booking=booking, 
+                             token="test-token", 
+                             room_name=room_name,
+                             other_user=other_user)
+                             
+    except Exception as e:
+        print(f"Error in daily_test: {e}")
+        return f"Error: {str(e)}", 500
+
+@bp.route('/simple-daily-test/<int:booking_id>')
+def simple_daily_test(booking_id):
+    """Very simple Daily.co test route"""
+    try:
+        booking = Booking.query.get_or_404(booking_id)
+        
+        # Create meeting room if it doesn't exist
+        if not booking.meeting_room_id or not booking.meeting_url:
+            room_info, error = create_meeting_room(booking_id)
+            if error:
+                return f"Error creating room: {error}", 500
+            # Refresh booking to get updated room info
+            db.session.refresh(booking)
+        
+        # Return simple HTML with Daily.co iframe
+        html = f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>Daily.co Test</title>
+            <script src="https://unpkg.com/@daily-co/daily-js"></script>
+        </head>
+        <body>
+            <h1>Daily.co Video Call Test</h1>
+            <p>Room: {booking.meeting_room_id}</p>
+            <p>URL: {booking.meeting_url}</p>
+            <div id="video-container" style="width: 100%; height: 500px;"></div>
+            <script>
+                const callObject = DailyIframe.createFrame(document.getElementById('video-container'), {{
+                    iframeStyle: {{
+                        width: '100%',
+                        height: '100%',
+                        border: '0'
+                    }}
+                }});
+                callObject.join({{
+                    url: '{booking.meeting_url}'
+                }});
+            </script>
+        </body>
+        </html>
+        """
+        
+        return html
+                             
+    except Exception as e:
+        print(f"Error in simple_daily_test: {e}")
+        return f"Error: {str(e)}", 500
+
+@bp.route('/test-meeting-auth/<int:booking_id>')
+def test_meeting_auth(booking_id):
+    """Temporary test route that bypasses authentication for Daily.co testing"""
+    try:
+        booking = Booking.query.get_or_404(booking_id)
+        
+        # Create meeting room if it doesn't exist
+        if not booking.meeting_room_id or not booking.meeting_url:
+            room_info, error = create_meeting_room(booking_id)
+            if error:
+                return f"Error creating room: {error}", 500
+            # Refresh booking to get updated room info
+            db.session.refresh(booking)
+        
+        # Get the other participant
+        other_user = booking.provider
+        
+        # Use the working Daily.co template
+        return render_template('meeting_daily.html', 
+                             booking=booking, 
+                             room_name=booking.meeting_room_id,
+                             room_url=booking.meeting_url,
+                             other_user=other_user,
+                             is_owner=True)
+                             
+    except Exception as e:
+        print(f"Error in test_meeting_auth: {e}")
+        return f"Error: {str(e)}", 500
+
+@bp.route('/debug-bookings')
+@login_required
+def debug_bookings():
+    """Debug route to check bookings query"""
+    from models import Booking
+    from datetime import datetime
+    from sqlalchemy import func
+    
+    now = datetime.now(EASTERN_TIMEZONE)
+    
+    # Get all bookings for current user as expert
+    all_bookings = Booking.query.filter(
+        Booking.provider_id == current_user.id
+    ).order_by(Booking.start_time.desc()).all()
+    
+    # Test the upcoming query
+    upcoming_as_expert = Booking.query.filter(
+        (Booking.provider_id == current_user.id) &
+        (func.datetime(Booking.start_time) >= now.replace(tzinfo=None))
+    ).order_by(Booking.start_time.asc()).all()
+    
+    debug_info = {
+        'current_time_utc': str(now),
+        'current_time_naive': str(now.replace(tzinfo=None)),
+        'total_bookings': len(all_bookings),
+        'upcoming_bookings': len(upcoming_as_expert),
+        'all_bookings': [
+            {
+                'id': b.id,
+                'start_time': str(b.start_time),
+                'status': b.status,
+                'is_future': b.start_time > now.replace(tzinfo=None)
+            } for b in all_bookings[:5]
+        ],
+        'upcoming_bookings_detail': [
+            {
+                'id': b.id,
+                'start_time': str(b.start_time),
+                'status': b.status
+            } for b in upcoming_as_expert
+        ]
+    }
+    
+    return jsonify(debug_info)
+
+@bp.route('/test-bookings')
+@login_required
+def test_bookings():
+    """Simple test route to debug bookings query"""
+    from models import Booking
+    from datetime import datetime
+    
+    now = datetime.now(EASTERN_TIMEZONE)
+    
+    # Simple query without timezone complexity
+    all_bookings = Booking.query.filter(
+        Booking.provider_id == current_user.id
+    ).all()
+    
+    # Manual filtering in Python
+    upcoming = []
+    past = []
+    
+    for booking in all_bookings:
+        if booking.start_time > now.replace(tzinfo=None):
+            upcoming.append(booking)
+        else:
+            past.append(booking)
+    
+    result = {
+        'current_user_id': current_user.id,
+        'current_time': str(now),
+        'total_bookings': len(all_bookings),
+        'upcoming_count': len(upcoming),
+        'past_count': len(past),
+        'upcoming_bookings': [
+            {
+                'id': b.id,
+                'start_time': str(b.start_time),
+                'status': b.status
+            } for b in upcoming
+        ]
+    }
+    
+    return jsonify(result)
+
+@bp.route('/debug-auth')
+def debug_auth():
+    """Debug route to check authentication status"""
+    from flask_login import current_user
+    
+    debug_info = {
+        'is_authenticated': current_user.is_authenticated,
+        'user_id': current_user.id if current_user.is_authenticated else None,
+        'username': current_user.username if current_user.is_authenticated else None,
+        'email': current_user.email if current_user.is_authenticated else None
+    }
+    
+    return jsonify(debug_info)
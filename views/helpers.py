@@ -0,0 +1,79 @@
+"""Helpers shared by several blueprints."""
+from extensions import db
+from models import User, AvailabilityRule
+from slot_engine import ProviderSchedule
+import os
+import time
+
+def setup_default_availability(user):
+    """Set up default 9-5 availability for weekdays only for new users"""
+    try:
+        # Check if user already has availability rules
+        existing_rules = AvailabilityRule.query.filter_by(user_id=user.id).count()
+        if existing_rules > 0:
+            print(f"User {user.username} already has {existing_rules} availability rules, skipping setup")
+            return
+        
+        # Detect user's current timezone
+        import tzlocal
+        try:
+            # Get the system's local timezone
+            local_timezone = tzlocal.get_localzone()
+            default_timezone = str(local_timezone)
+        except:
+            # Fallback to Eastern Time if detection fails
+            default_timezone = 'America/New_York'
+        
+        # Set user's default timezone
+        user.timezone = default_timezone
+        
+        # Create availability rules for weekdays (Monday=1 to Friday=5)
+        # Sunday=0, Monday=1, Tuesday=2, Wednesday=3, Thursday=4, Friday=5, Saturday=6
+        weekdays = [1, 2, 3, 4, 5]  # Monday to Friday
+        
+        for weekday in weekdays:
+            availability_rule = AvailabilityRule(
+                user_id=user.id,
+                weekday=weekday,
+                start=time(9, 0),  # 9:00 AM
+                end=time(17, 0),   # 5:00 PM
+                is_active=True
+            )
+            db.session.add(availability_rule)
+        
+        db.session.commit()
+        print(f"Set up default 9-5 availability for weekdays for user {user.username}")
+        
+    except Exception as e:
+        print(f"Error setting up default availability for user {user.username}: {e}")
+        db.session.rollback()
+
+def fix_all_users_default_availability():
+    """Fix all existing users who don't have default availability"""
+    try:
+        users = User.query.all()
+        fixed_count = 0
+        
+        for user in users:
+            existing_rules = AvailabilityRule.query.filter_by(user_id=user.id).count()
+            if existing_rules == 0:
+                setup_default_availability(user)
+                fixed_count += 1
+        
+        print(f"Fixed default availability for {fixed_count} users")
+        return fixed_count
+        
+    except Exception as e:
+        print(f"Error fixing default availability for all users: {e}")
+        return 0
+
+def generate_available_slots_for_date(date, provider, user_timezone=None):
+    """Generate available time slots for a specific date, converting to user's timezone"""
+    try:
+        schedule = ProviderSchedule.load(provider, date, 1)
+        return schedule.slots_for_date(date, user_timezone)
+    except Exception as e:
+        print(f"Error in generate_available_slots_for_date: {e}")
+        return []
+# For local development, use localhost. For production, use the actual domain
+YOUR_DOMAIN = os.environ.get('YOUR_DOMAIN', 'http://localhost:5001')
@@ -0,0 +1,916 @@
+"""Public pages, discover/search and the dashboard."""
+from flask import Blueprint, render_template, request, redirect, url_for, jsonify
+from flask_login import login_required, current_user
+from sqlalchemy import or_, and_
+from extensions import db
+from models import User, Booking, Favorite, UserInteraction
+from search_index import search_index
+from categories import CATEGORY_SEARCH_TERMS
+from fulltext import get_search_backend
+from ranking import DiscoverRanking, DISCOVER_PAGE_SIZE, decode_cursor
+from semantic_search import semantic_index, is_natural_language, DEFAULT_TOP_K as SEMANTIC_TOP_K
+from dashboard_stats import get_dashboard_stats
+from datetime import datetime, timezone, timedelta
+
+EASTERN_TIMEZONE = timezone(timedelta(hours=-4))  # EDT (UTC-4)
+
+bp = Blueprint('main', __name__)
+
+# Template filter to convert naive datetime to Eastern Time
+@bp.app_template_filter('to_eastern')
+def to_eastern(dt):
+    """Convert naive datetime to Eastern Time"""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=EASTERN_TIMEZONE)
+    return dt
+
+# Template filter to format datetime for display
+@bp.app_template_filter('format_datetime')
+def format_datetime(dt):
+    """Format datetime for display, treating naive datetime as Eastern Time"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=EASTERN_TIMEZONE)
+    return dt.strftime('%b %d, %Y %I:%M %p')
+
+# Template filter to get current time in Eastern Time
+@bp.app_template_filter('now_eastern')
+def now_eastern():
+    """Get current time in Eastern Time"""
+    return datetime.now(EASTERN_TIMEZONE)
+
+def is_sequential_match(query, text):
+    """Check if query letters appear in sequence in text"""
+    if not query:
+        return True
+    
+    # Remove spaces and convert to lowercase for matching
+    text_clean = text.replace(' ', '').lower()
+    query_lower = query.lower()
+    
+    # Simple approach: check if query is a substring
+    return query_lower in text_clean
+
+@bp.route('/api/search-suggestions')
+def search_suggestions():
+    """API endpoint for smart search suggestions - only real people"""
+    query = request.args.get('q', '').strip()
+    
+    # Served from the in-memory index - no table scan per keystroke
+    search_index.refresh_if_stale()
+    
+    print(f"Search suggestions API called with query: '{query}', {len(search_index)} users indexed")
+    
+    # If no query, return a sample of users for homepage animation
+    if not query or len(query) < 1:
+        # Return up to 10 random users for homepage animation
+        if len(search_index) == 0:
+            # No users in database, return fallback suggestions
+            suggestions = [
+                {'text': 'Find users...', 'value': 'Find users...', 'subtitle': 'Search for skills', 'icon': '🔍'},
+                {'text': 'Search for skills...', 'value': 'Search for skills...', 'subtitle': 'Discover talent', 'icon': '💡'},
+                {'text': 'Discover talent...', 'value': 'Discover talent...', 'subtitle': 'Find professionals', 'icon': '👥'}
+            ]
+        else:
+            sample_users = search_index.sample(10)
+            suggestions = []
+            for user in sample_users:
+                suggestions.append({
+                    'text': user.full_name,
+                    'value': user.full_name,
+                    'subtitle': user.profession or 'Expert',
+                    'icon': '👤',
+                    'user_id': user.id,
+                    'username': user.username
+                })
+        return jsonify(suggestions)
+    
+    # Substring match on name, profession or skills; name-prefix matches first
+    users = search_index.search(query, limit=6)
+    
+    suggestions = []
+    for user in users:
+        # Build person info
+        person_info = []
+        if user.profession:
+            person_info.append(user.profession)
+        if user.location:
+            person_info.append(user.location)
+        if user.hourly_rate and user.hourly_rate > 0:
+            person_info.append(f"${user.hourly_rate:.0f}/hr")
+        
+        subtitle = " • ".join(person_info) if person_info else "Available Expert"
+        
+        # Determine category and icon
+        profession_lower = (user.profession or '').lower()
+        category = 'person'
+        icon = '👤'
+        
+        if any(word in profession_lower for word in ['trainer', 'fitness', 'coach', 'personal trainer', 'yoga', 'pilates']):
+            category = 'fitness'
+            icon = '💪'
+        elif any(word in profession_lower for word in ['marketing', 'digital marketing', 'social media', 'seo', 'advertising']):
+            category = 'marketing'
+            icon = '📈'
+        elif any(word in profession_lower for word in ['designer', 'design', 'graphic', 'ui', 'ux', 'creative']):
+            category = 'design'
+            icon = '🎨'
+        elif any(word in profession_lower for word in ['developer', 'engineer', 'programmer', 'software', 'tech', 'coding']):
+            category = 'tech'
+            icon = '💻'
+        elif any(word in profession_lower for word in ['consultant', 'advisor', 'business', 'strategy']):
+            category = 'business'
+            icon = '💼'
+        elif any(word in profession_lower for word in ['writer', 'content', 'blogger', 'journalist', 'author']):
+            category = 'writing'
+            icon = '✍️'
+        elif any(word in profession_lower for word in ['teacher', 'educator', 'instructor', 'tutor', 'mentor']):
+            category = 'education'
+            icon = '📚'
+        elif any(word in profession_lower for word in ['doctor', 'nurse', 'therapist', 'health', 'medical']):
+            category = 'health'
+            icon = '🏥'
+        elif any(word in profession_lower for word in ['photographer', 'videographer', 'filmmaker', 'camera']):
+            category = 'media'
+            icon = '📸'
+        elif any(word in profession_lower for word in ['chef', 'cook', 'culinary', 'food']):
+            category = 'culinary'
+            icon = '👨‍🍳'
+        
+        suggestions.append({
+            'text': user.full_name,
+            'type': category,
+            'subtitle': subtitle,
+            'value': user.full_name,
+            'profession': user.profession or 'Expert',
+            'location': user.location or 'Remote',
+            'rate': f"${user.hourly_rate:.0f}/hr" if user.hourly_rate and user.hourly_rate > 0 else None,
+            'rating': user.rating if user.rating > 0 else None,
+            'icon': icon,
+            'category': category,
+            'user_id': user.id,
+            'username': user.username
+        })
+    
+    return jsonify(suggestions)
+
+BROWSE_PAGE_SIZE = 100
+
+@bp.route('/api/browse-users')
+def browse_users():
+    """API endpoint for browsing users by category"""
+    category = request.args.get('category', 'all').strip().lower()
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', BROWSE_PAGE_SIZE, type=int), 1), BROWSE_PAGE_SIZE)
+    
+    # Get all available users; bio is the only long field the browse UI filters on
+    query = User.query.options(User.card_options('bio')).filter(
+        and_(
+            User.full_name.isnot(None),
+            User.is_available == True
+        )
+    )
+    
+    # Category is precomputed on profile save, so this is an indexed lookup
+    if category != 'all':
+        query = query.filter(User.category == category)
+    
+    # Fetch one extra row to know whether another page exists
+    users = query.order_by(User.id).offset((page - 1) * per_page).limit(per_page + 1).all()
+    has_more = len(users) > per_page
+    users = users[:per_page]
+    user_data = []
+    
+    for user in users:
+        user_data.append({
+            'id': user.id,
+            'username': user.username,
+            'full_name': user.full_name,
+            'profession': user.profession,
+            'skills': user.skills,
+            'bio': user.bio,
+            'hourly_rate': user.hourly_rate,
+            'profile_picture': user.profile_picture,
+            'location': user.location,
+            'category': user.category
+        })
+    
+    response = jsonify(user_data)
+    if has_more:
+        response.headers['X-Next-Page'] = str(page + 1)
+    return response
+
+@bp.route('/')
+def homepage():
+    # Get search query and filters
+    search_query = request.args.get('search', '').strip()
+    category = request.args.get('category', '').strip().lower()
+    view_type = request.args.get('view', '').strip()
+    
+    # If view parameter is provided, redirect to discover page
+    if view_type:
+        return redirect(url_for('main.discover', view=view_type))
+    
+    # Base query for available users - card columns only
+    query = User.query.options(User.card_options()).filter(
+        User.is_available == True, 
+        User.full_name.isnot(None)
+    )
+    
+    # Apply search filter if provided (same logic as discover page)
+    search_backend = get_search_backend()
+    ranked = None
+    if search_query:
+        ranked = search_backend.search_text(search_query)
+    
+    # Apply category filter if provided
+    elif category in CATEGORY_SEARCH_TERMS:
+        ranked = search_backend.ranked_ids(CATEGORY_SEARCH_TERMS[category], match_all=False)
+    
+    if ranked is not None:
+        query = query.join(ranked, ranked.c.user_id == User.id).order_by(ranked.c.rank.desc())
+    
+    # Get results
+    users = query.limit(20).all()
+    
+    return render_template('homepage.html', users=users, search_query=search_query, category=category)
+
+
+@bp.route('/watch')
+@login_required
+def watch():
+    """Display the Watch feed with video content"""
+    # Generate video data for the feed
+    video_feed = [
+        {
+            'id': 1,
+            'title': 'Dashboard Demo',
+            'description': 'Learn how to navigate the Droply dashboard and maximize your productivity',
+            'video_url': '/static/videos/dashboard-demo.mp4',
+            'thumbnail': 'https://images.unsplash.com/photo-1460925895917-afdab827c52f?w=400&h=600&fit=crop',
+            'duration': '2:30',
+            'views': 1250,
+            'likes': 89,
+            'author': 'Droply Team',
+            'author_avatar': 'https://images.unsplash.com/photo-1472099645785-5658abf4ff4e?w=100&h=100&fit=crop&crop=face'
+        },
+        {
+            'id': 2,
+            'title': 'Expert Tips: Building Your Profile',
+            'description': 'Professional advice on creating an attractive expert profile that gets bookings',
+            'video_url': 'https://sample-videos.com/zip/10/mp4/SampleVideo_1280x720_1mb.mp4',
+            'thumbnail': 'https://images.unsplash.com/photo-1507003211169-0a1dd7228f2d?w=400&h=600&fit=crop',
+            'duration': '3:45',
+            'views': 2100,
+            'likes': 156,
+            'author': 'Sarah Chen',
+            'author_avatar': 'https://images.unsplash.com/photo-1494790108755-2616b612b786?w=100&h=100&fit=crop&crop=face'
+        },
+        {
+            'id': 3,
+            'title': 'Marketing Strategies That Work',
+            'description': 'Discover proven marketing techniques from industry experts',
+            'video_url': 'https://sample-videos.com/zip/10/mp4/SampleVideo_1280x720_2mb.mp4',
+            'thumbnail': 'https://images.unsplash.com/photo-1438761681033-6461ffad8d80?w=400&h=600&fit=crop',
+            'duration': '4:20',
+            'views': 3200,
+            'likes': 234,
+            'author': 'Marcus Johnson',
+            'author_avatar': 'https://images.unsplash.com/photo-1507003211169-0a1dd7228f2d?w=100&h=100&fit=crop&crop=face'
+        },
+        {
+            'id': 4,
+            'title': 'Product Management Insights',
+            'description': 'Essential skills for successful product management in tech companies',
+            'video_url': 'https://sample-videos.com/zip/10/mp4/SampleVideo_1280x720_5mb.mp4',
+            'thumbnail': 'https://images.unsplash.com/photo-1472099645785-5658abf4ff4e?w=400&h=600&fit=crop',
+            'duration': '5:15',
+            'views': 1800,
+            'likes': 178,
+            'author': 'Emily Rodriguez',
+            'author_avatar': 'https://images.unsplash.com/photo-1438761681033-6461ffad8d80?w=100&h=100&fit=crop&crop=face'
+        },
+        {
+            'id': 5,
+            'title': 'Coding Best Practices',
+            'description': 'Clean code principles and development workflows that scale',
+            'video_url': 'https://sample-videos.com/zip/10/mp4/SampleVideo_1280x720_10mb.mp4',
+            'thumbnail': 'https://images.unsplash.com/photo-1544005313-94ddf0286df2?w=400&h=600&fit=crop',
+            'duration': '6:30',
+            'views': 4500,
+            'likes': 312,
+            'author': 'David Kim',
+            'author_avatar': 'https://images.unsplash.com/photo-1472099645785-5658abf4ff4e?w=100&h=100&fit=crop&crop=face'
+        },
+        {
+            'id': 6,
+            'title': 'Data Science Fundamentals',
+            'description': 'Introduction to data analysis and machine learning concepts',
+            'video_url': 'https://sample-videos.com/zip/10/mp4/SampleVideo_1280x720_30mb.mp4',
+            'thumbnail': 'https://images.unsplash.com/photo-1500648767791-00dcc994a43e?w=400&h=600&fit=crop',
+            'duration': '7:45',
+            'views': 2800,
+            'likes': 198,
+            'author': 'Lisa Thompson',
+            'author_avatar': 'https://images.unsplash.com/photo-1544005313-94ddf0286df2?w=100&h=100&fit=crop&crop=face'
+        },
+        {
+            'id': 7,
+            'title': 'Content Creation Masterclass',
+            'description': 'Tips for creating engaging video content and building your audience',
+            'video_url': 'https://sample-videos.com/zip/10/mp4/SampleVideo_1280x720_1mb.mp4',
+            'thumbnail': 'https://images.unsplash.com/photo-1487412720507-e7ab37603c6f?w=400&h=600&fit=crop',
+            'duration': '8:20',
+            'views': 3600,
+            'likes': 267,
+            'author': 'Alex Morgan',
+            'author_avatar': 'https://images.unsplash.com/photo-1500648767791-00dcc994a43e?w=100&h=100&fit=crop&crop=face'
+        },
+        {
+            'id': 8,
+            'title': 'Brand Strategy Workshop',
+            'description': 'Building memorable brands that connect with your target audience',
+            'video_url': 'https://sample-videos.com/zip/10/mp4/SampleVideo_1280x720_2mb.mp4',
+            'thumbnail': 'https://images.unsplash.com/photo-1506794778202-cad84cf45f1d?w=400&h=600&fit=crop',
+            'duration': '9:15',
+            'views': 1900,
+            'likes': 145,
+            'author': 'Zoe Williams',
+            'author_avatar': 'https://images.unsplash.com/photo-1487412720507-e7ab37603c6f?w=100&h=100&fit=crop&crop=face'
+        }
+    ]
+    
+    return render_template('watch.html', videos=video_feed)
+
+# Duplicate route removed - using the first definition
+
+# @bp.route('/search')  # REMOVED - now using discover page
+# @login_required
+# def search():
+    # """Search users page for signed-in users"""  # REMOVED
+    # Get search query and category
+    search_query = request.args.get('search', '').strip()
+    category = request.args.get('category', '').strip().lower()
+    
+    # Base query for available users - exclude current user
+    query = User.query.filter(
+        User.is_available == True, 
+        User.full_name.isnot(None),
+        User.id != current_user.id  # Exclude current user from results
+    )
+    
+    # Apply category filter if provided
+    if category:
+        # Map category names to search terms
+        category_mapping = {
+            'top': [],  # Special case for top experts - will be handled separately
+            'favorites': [],  # Special case for favorites - will be handled separately
+            'home': ['home', 'interior', 'design', 'decor', 'renovation', 'construction', 'architecture', 'furniture', 'decorating'],
+            'business': ['business', 'consulting', 'strategy', 'management', 'entrepreneur', 'startup', 'finance', 'marketing', 'sales'],
+            'design': ['design', 'ui', 'ux', 'graphic', 'visual', 'creative', 'art', 'branding', 'illustration', 'style', 'beauty', 'fashion'],
+            'marketing': ['marketing', 'digital marketing', 'social media', 'seo', 'advertising', 'brand', 'growth', 'content'],
+            'finance': ['finance', 'accounting', 'investment', 'financial', 'tax', 'budget', 'money', 'wealth'],
+            'health': ['health', 'fitness', 'wellness', 'nutrition', 'medical', 'therapy', 'coaching', 'mental health'],
+            'education': ['education', 'teaching', 'tutoring', 'training', 'learning', 'academic', 'course', 'mentor', 'astrology', 'spiritual']
+        }
+        
+        if category in category_mapping:
+            if category == 'top':
+                # Special case for featured users - filter by is_featured_user flag
+                query = query.filter(User.is_featured_user == True)
+            elif category == 'favorites':
+                # Special case for favorites - filter by user's favorites
+                favorites = Favorite.query.filter_by(user_id=current_user.id).all()
+                expert_ids = [f.favorited_user_id for f in favorites]
+                
+                if expert_ids:
+                    query = query.filter(User.id.in_(expert_ids))
+                else:
+                    # Return empty list if no favorites
+                    experts = []
+                    from datetime import datetime, timedelta
+                    return render_template('search.html', 
+                                         users=experts, 
+                                         now=datetime.now(), 
+                                         timedelta=timedelta,
+                                         current_user_favorites=[])
+            else:
+                search_terms = category_mapping[category]
+                category_conditions = []
+                for term in search_terms:
+                    category_conditions.append(
+                        or_(
+                            User.skills.ilike(f'%{term}%'),
+                            User.profession.ilike(f'%{term}%'),
+                            User.industry.ilike(f'%{term}%'),
+                            User.bio.ilike(f'%{term}%'),
+                            User.specialty_tags.ilike(f'%{term}%')
+                        )
+                    )
+                if category_conditions:
+                    query = query.filter(or_(*category_conditions))
+    
+    # Apply semantic search if provided
+    if search_query:
+        # Split search query into keywords for better matching
+        search_keywords = search_query.lower().split()
+        
+        # Create search conditions for each keyword
+        search_conditions = []
+        for keyword in search_keywords:
+            if len(keyword) > 2:  # Only search for keywords with 3+ characters
+                keyword_term = f'%{keyword}%'
+                search_conditions.append(
+                    or_(
+                        User.username.ilike(keyword_term),
+                        User.full_name.ilike(keyword_term),
+                        User.skills.ilike(keyword_term),
+                        User.profession.ilike(keyword_term),
+                        User.industry.ilike(keyword_term),
+                        User.bio.ilike(keyword_term),
+                        User.specialty_tags.ilike(keyword_term),
+                        User.location.ilike(keyword_term)
+                    )
+                )
+        
+        if search_conditions:
+            query = query.filter(or_(*search_conditions))
+    
+    # Get all experts and sort by relevance
+    experts = query.all()
+    
+    # Sort experts by relevance and priority
+    def sort_score(expert):
+        score = 0
+        
+        # Top experts get highest priority
+        if expert.is_featured_user:
+            score += 1000
+        
+        # If there's a search query, add relevance score
+        if search_query:
+            search_lower = search_query.lower()
+            
+            # Check exact matches first
+            if search_lower in (expert.full_name or '').lower():
+                score += 10
+            if search_lower in (expert.skills or '').lower():
+                score += 8
+            if search_lower in (expert.profession or '').lower():
+                score += 6
+            if search_lower in (expert.bio or '').lower():
+                score += 4
+            
+            # Check keyword matches
+            for keyword in search_query.lower().split():
+                if len(keyword) > 2:
+                    if keyword in (expert.full_name or '').lower():
+                        score += 3
+                    if keyword in (expert.skills or '').lower():
+                        score += 2
+                    if keyword in (expert.profession or '').lower():
+                        score += 2
+                    if keyword in (expert.bio or '').lower():
+                        score += 1
+        
+        return score
+    
+    experts = sorted(experts, key=sort_score, reverse=True)
+    
+    # Import datetime for template
+    from datetime import datetime, timedelta
+    
+    # Get current user's favorites for template
+    current_user_favorites = []
+    if current_user.is_authenticated:
+        favorites = Favorite.query.filter_by(user_id=current_user.id).all()
+        current_user_favorites = [f.favorited_user_id for f in favorites]
+
+    
+    # Redirect to discover page instead
+    return redirect(url_for('main.discover'))
+
+
+def build_discover_ranking(search_query, category, view_type, semantic=False):
+    """Filter and rank experts for discover.
+
+    Natural-language searches (or ``semantic=True``) are matched by meaning
+    through the embedding index; short keyword searches use full-text.
+    Returns (ranking, empty_state); empty_state is a dict of template flags
+    when the view has nothing to show (no recent views / no favorites).
+    """
+    # Base query for available users - card columns only
+    query = User.query.options(User.card_options()).filter(
+        User.is_available == True, 
+        User.full_name.isnot(None)
+    )
+    
+    # Exclude current user from results if authenticated
+    if current_user.is_authenticated:
+        query = query.filter(User.id != current_user.id)
+    
+    if view_type == 'recent' and current_user.is_authenticated:
+        # Get recently viewed users
+        recent_interactions = UserInteraction.query.filter_by(
+            user_id=current_user.id, 
+            interaction_type='view'
+        ).order_by(UserInteraction.created_at.desc()).limit(20).all()
+        
+        if recent_interactions:
+            recent_user_ids = [interaction.target_user_id for interaction in recent_interactions]
+            query = query.filter(User.id.in_(recent_user_ids))
+        else:
+            # No recent views, return empty results with a message
+            return None, {'view_type': view_type, 'no_recent_views': True}
+    
+    elif view_type == 'favorites' and current_user.is_authenticated:
+        # Get user's favorites
+        favorites = Favorite.query.filter_by(user_id=current_user.id).all()
+        expert_ids = [f.favorited_user_id for f in favorites]
+        
+        if expert_ids:
+            query = query.filter(User.id.in_(expert_ids))
+        else:
+            # No favorites, return empty results with a message
+            return None, {'view_type': view_type, 'no_favorites': True}
+    
+    elif view_type == 'browse_all':
+        # Browse all users without any filters - just get all available users
+        pass  # Use the base query as is
+    
+    # Apply category filter if provided
+    elif category == 'top':
+        query = query.filter(User.is_featured_user == True)
+    
+    elif category == 'favorites':
+        favorites = Favorite.query.filter_by(user_id=current_user.id).all()
+        expert_ids = [f.favorited_user_id for f in favorites]
+        
+        if expert_ids:
+            query = query.filter(User.id.in_(expert_ids))
+        else:
+            return None, {'active_dropin_sessions': []}
+    
+    # Full-text matching for keyword categories and the search box
+    search_backend = get_search_backend()
+    rankings = []
+    if view_type not in ('recent', 'favorites', 'browse_all') and category in CATEGORY_SEARCH_TERMS:
+        rankings.append(search_backend.ranked_ids(CATEGORY_SEARCH_TERMS[category], match_all=False, name='category_fts'))
+    if search_query and (semantic or is_natural_language(search_query)):
+        rankings.append(semantic_index.ranked_ids(search_query, name='search_semantic'))
+    elif search_query:
+        rankings.append(search_backend.search_text(search_query, name='search_fts'))
+    
+    # Ranked like the old ai_match_score: featured first, then relevance,
+    # then experts with a rate set - all evaluated in SQL
+    return DiscoverRanking(query, rankings), None
+
+@bp.route('/discover')
+def discover():
+    """AI-powered discover page with matching engine and Drop-in sessions"""
+    # Get search query and filters
+    search_query = request.args.get('search', '').strip()
+    # search.js sends free-text questions as ?query=, matched by meaning
+    nlp_query = request.args.get('query', '').strip()
+    category = request.args.get('category', '').strip().lower()
+    session_type = request.args.get('type', 'all')  # 'all', 'dropin', 'booked'
+    view_type = request.args.get('view', '')  # 'recent', 'favorites', 'browse_all'
+    
+    # Handle special view types first (require authentication)
+    if not current_user.is_authenticated and view_type in ['recent', 'favorites']:
+        # Redirect to login for authenticated features
+        return redirect(url_for('auth.login', next=request.url))
+    
+    ranking, empty_state = build_discover_ranking(search_query or nlp_query, category, view_type, semantic=bool(nlp_query))
+    if ranking is None:
+        return render_template('discover.html', 
+                             users=[],
+                             now=datetime.now(), 
+                             timedelta=timedelta,
+                             current_user_favorites=[],
+                             **empty_state)
+    
+    # First page only; the rest streams in from /api/discover
+    experts, next_cursor = ranking.page()
+    
+    # Handle favorites for authenticated users only
+    current_user_favorites = []
+    if current_user.is_authenticated:
+        favorites = Favorite.query.filter_by(user_id=current_user.id).all()
+        current_user_favorites = [f.favorited_user_id for f in favorites]
+    
+    return render_template('discover.html', 
+                         users=experts,
+                         next_cursor=next_cursor,
+                         now=datetime.now(), 
+                         timedelta=timedelta,
+                         current_user_favorites=current_user_favorites,
+                         view_type=view_type)
+
+@bp.route('/api/discover')
+def api_discover():
+    """Next page of discover results for infinite scroll"""
+    search_query = request.args.get('search', '').strip()
+    nlp_query = request.args.get('query', '').strip()
+    category = request.args.get('category', '').strip().lower()
+    view_type = request.args.get('view', '')
+    cursor = request.args.get('cursor')
+    page_size = min(max(request.args.get('page_size', DISCOVER_PAGE_SIZE, type=int), 1), DISCOVER_PAGE_SIZE)
+    
+    if not current_user.is_authenticated and view_type in ['recent', 'favorites']:
+        return jsonify({'error': 'Login required'}), 401
+    if cursor and decode_cursor(cursor) is None:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    ranking, empty_state = build_discover_ranking(search_query or nlp_query, category, view_type, semantic=bool(nlp_query))
+    if ranking is None:
+        return jsonify({'users': [], 'next_cursor': None})
+    
+    experts, next_cursor = ranking.page(cursor, page_size)
+    
+    user_data = []
+    for user in experts:
+        user_data.append({
+            'id': user.id,
+            'username': user.username,
+            'full_name': user.full_name,
+            'profession': user.profession,
+            'hourly_rate': user.hourly_rate,
+            'profile_picture': user.profile_picture,
+            'profile_url': url_for('profiles.user_profile', username=user.username)
+        })
+    
+    return jsonify({'users': user_data, 'next_cursor': next_cursor})
+
+@bp.route('/api/semantic-search')
+def api_semantic_search():
+    """Experts closest in meaning to a natural-language query"""
+    query_text = request.args.get('q', '').strip()
+    k = min(max(request.args.get('k', SEMANTIC_TOP_K, type=int), 1), SEMANTIC_TOP_K)
+    if not query_text:
+        return jsonify([])
+    
+    matches = semantic_index.search(query_text, k)
+    users = {user.id: user for user in User.query.options(User.card_options()).filter(User.id.in_([user_id for user_id, _ in matches])).all()}
+    
+    results = []
+    for user_id, score in matches:
+        user = users.get(user_id)
+        if not user:
+            continue
+        results.append({
+            'id': user.id,
+            'username': user.username,
+            'full_name': user.full_name,
+            'profession': user.profession,
+            'hourly_rate': user.hourly_rate,
+            'profile_picture': user.profile_picture,
+            'score': round(score, 4)
+        })
+    
+    return jsonify(results)
+
+
+# Drop-in functionality removed
+
+@bp.route('/track_interaction', methods=['POST'])
+@login_required
+def track_interaction():
+    """Track user interactions (views, clicks, etc.)"""
+    data = request.get_json()
+    target_user_id = data.get('target_user_id')
+    interaction_type = data.get('interaction_type', 'view')
+    
+    if not target_user_id:
+        return jsonify({'error': 'Missing target_user_id'}), 400
+    
+    # Check if interaction already exists for this user-target pair in the last hour
+    from datetime import datetime, timedelta
+    one_hour_ago = datetime.now(EASTERN_TIMEZONE) - timedelta(hours=1)
+    
+    existing_interaction = UserInteraction.query.filter_by(
+        user_id=current_user.id,
+        target_user_id=target_user_id,
+        interaction_type=interaction_type
+    ).filter(UserInteraction.created_at > one_hour_ago).first()
+    
+    if not existing_interaction:
+        # Create new interaction
+        interaction = UserInteraction(
+            user_id=current_user.id,
+            target_user_id=target_user_id,
+            interaction_type=interaction_type
+        )
+        db.session.add(interaction)
+        db.session.commit()
+    
+    return jsonify({'success': True})
+
+
+@bp.route('/dashboard')
+@login_required
+def dashboard():
+    """User dashboard with comprehensive statistics and status information"""
+    from datetime import datetime
+    
+    # Get current time in Eastern Time
+    now = datetime.now(EASTERN_TIMEZONE)
+    
+    # === BOOKING & EARNINGS STATISTICS ===
+    # Counts and sums come from two aggregate queries (see dashboard_stats.py)
+    stats = get_dashboard_stats(current_user.id)
+
+    # Upcoming bookings (next 10); the provider and client lists have always
+    # shared the same user_id query, so run it once
+    provider_bookings = Booking.query.filter_by(user_id=current_user.id).filter(
+        Booking.start_time >= now
+    ).order_by(Booking.start_time.asc()).limit(10).all()
+    client_bookings = provider_bookings
+    
+    total_provider_bookings = stats['total_bookings']
+    total_client_bookings = stats['total_bookings']
+    recent_bookings = stats['recent_bookings']
+    this_week_bookings = stats['this_week_bookings']
+    
+    total_earnings = stats['total_earnings']
+    completed_earnings = stats['completed_earnings']
+    this_week_earnings = stats['this_week_earnings']
+    
+    # === PROFILE & SETUP STATUS ===
+    # Calculate profile completion percentage
+    profile_fields = [
+        current_user.full_name,
+        current_user.profession,
+        current_user.bio,
+        current_user.hourly_rate,
+        current_user.profile_picture,
+        current_user.skills_1,
+        current_user.location
+    ]
+    completed_fields = sum(1 for field in profile_fields if field)
+    profile_completion = int((completed_fields / len(profile_fields)) * 100)
+    
+    # Availability setup
+    availability_count = stats['availability_count']
+    has_availability = availability_count > 0
+    
+    # Google Calendar integration status
+    google_calendar_connected = current_user.google_calendar_connected
+    
+    # Stripe Connect status (for experts)
+    stripe_setup_complete = bool(current_user.stripe_account_id)
+    stripe_account_status = current_user.stripe_account_status or 'not_setup'
+    
+    # === RATING & REVIEWS ===
+    user_rating = current_user.rating or 0
+    rating_count = current_user.rating_count or 0
+    
+    # === CONTENT STATISTICS ===
+    # User's content
+    content_count = stats['content_count']
+    published_content = stats['published_content']
+    total_content_earnings = stats['total_content_earnings']
+    total_content_views = stats['total_content_views']
+    
+    # === DROP-IN SESSIONS ===
+    # Active drop-in sessions (if DropinSession model exists)
+    try:
+        from models import DropinSession
+        active_dropin_sessions = DropinSession.query.filter_by(
+            host_id=current_user.id,
+            is_active=True
+        ).filter(DropinSession.ended_at.is_(None)).all()
+    except ImportError:
+        active_dropin_sessions = []
+    
+    # === QUICK STATUS INDICATORS ===
+    # Today's bookings
+    today_bookings = stats['today_bookings']
+    
+    # Next booking
+    next_booking = Booking.query.filter(
+        or_(
+            Booking.provider_id == current_user.id,
+            Booking.user_id == current_user.id
+        )
+    ).filter(Booking.start_time >= now).order_by(Booking.start_time.asc()).first()
+    
+    # === PENDING ACTIONS ===
+    pending_actions = []
+    
+    # Profile completion
+    if profile_completion < 100:
+        pending_actions.append({
+            'type': 'profile',
+            'message': f'Complete your profile ({profile_completion}%)',
+            'url': url_for('profiles.profile'),
+            'priority': 'high' if profile_completion < 50 else 'medium'
+        })
+    
+    # Availability setup
+    if not has_availability:
+        pending_actions.append({
+            'type': 'availability',
+            'message': 'Set your availability',
+            'url': url_for('availability.availability'),
+            'priority': 'high'
+        })
+    
+    # Stripe setup for experts
+    if current_user.hourly_rate > 0 and not stripe_setup_complete:
+        pending_actions.append({
+            'type': 'stripe',
+            'message': 'Set up payments to receive earnings',
+            'url': url_for('payments.user_stripe_onboarding'),
+            'priority': 'high'
+        })
+    
+    # Google Calendar
+    if not google_calendar_connected:
+        pending_actions.append({
+            'type': 'calendar',
+            'message': 'Connect Google Calendar',
+            'url': url_for('availability.availability'),
+            'priority': 'medium'
+        })
+    
+    # === SUMMARY STATS ===
+    upcoming_count = len(provider_bookings) + len(client_bookings)
+    total_sessions = total_provider_bookings + total_client_bookings
+    
+    return render_template('dashboard.html', 
+                         # Bookings
+                         provider_bookings=provider_bookings,
+                         client_bookings=client_bookings,
+                         total_provider_bookings=total_provider_bookings,
+                         total_client_bookings=total_client_bookings,
+                         total_sessions=total_sessions,
+                         recent_bookings=recent_bookings,
+                         this_week_bookings=this_week_bookings,
+                         upcoming_count=upcoming_count,
+                         today_bookings=today_bookings,
+                         next_booking=next_booking,
+                         
+                         # Earnings
+                         total_earnings=total_earnings,
+                         completed_earnings=completed_earnings,
+                         this_week_earnings=this_week_earnings,
+                         
+                         # Profile & Setup
+                         profile_completion=profile_completion,
+                         availability_count=availability_count,
+                         has_availability=has_availability,
+                         google_calendar_connected=google_calendar_connected,
+                         stripe_setup_complete=stripe_setup_complete,
+                         stripe_account_status=stripe_account_status,
+                         
+                         # Ratings
+                         user_rating=user_rating,
+                         rating_count=rating_count,
+                         
+                         # Content
+                         content_count=content_count,
+                         published_content=published_content,
+                         total_content_earnings=total_content_earnings,
+                         total_content_views=total_content_views,
+                         
+                         # Drop-in sessions
+                         active_dropin_sessions=active_dropin_sessions,
+                         
+                         # Actions
+                         pending_actions=pending_actions,
+                         
+                         # Current time for display
+                         now=now)
+
+@bp.app_errorhandler(404)
+def not_found(error):
+    return render_template('404.html'), 404
+
+@bp.app_errorhandler(500)
+def internal_error(error):
+    db.session.rollback()
+    return render_template('500.html'), 500
+
+
+
+
+# Privacy Policy and Terms of Service routes
+@bp.route('/privacy-policy')
+def privacy_policy():
+    """Display the privacy policy page"""
+    return render_template('privacy_policy.html')
+
+@bp.route('/terms-of-service')
+def terms_of_service():
+    """Display the terms of service page"""
+    return render_template('terms_of_service.html')
+
+@bp.route('/dashboard/privacy-policy')
+def dashboard_privacy_policy():
+    """Display the privacy policy within the dashboard"""
+    return render_template('dashboard_privacy_policy.html')
+
+@bp.route('/dashboard/terms-of-service')
+def dashboard_terms_of_service():
+    """Display the terms of service within the dashboard"""
+    return render_template('dashboard_terms_of_service.html')
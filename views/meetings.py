@@ -0,0 +1,219 @@
+"""Daily.co meeting rooms and the in-call pages."""
+from flask import Blueprint, render_template, redirect, url_for, flash, jsonify
+from flask_login import login_required, current_user
+from extensions import db
+from models import Booking
+import daily_client as daily
+from meeting_jobs import room_expires_at, room_properties
+import uuid
+from datetime import datetime, timezone, timedelta
+
+EASTERN_TIMEZONE = timezone(timedelta(hours=-4))  # EDT (UTC-4)
+
+bp = Blueprint('meetings', __name__)
+
+# Daily.co API access (similar to what Intro.co uses) lives in daily_client.py
+
+# Fallback video calling (simple WebRTC)
+def create_simple_meeting_room(booking_id):
+    """Create a simple meeting room using WebRTC when Daily.co is not available"""
+    try:
+        booking = Booking.query.get(booking_id)
+        if not booking:
+            return None, "Booking not found"
+        
+        # Generate a simple room ID
+        room_id = f"droply-{booking_id}-{uuid.uuid4().hex[:8]}"
+        
+        # For simple WebRTC, we'll use a basic room URL
+        meeting_url = f"/meeting-room/{room_id}"
+        
+        booking.meeting_room_id = room_id
+        booking.meeting_url = meeting_url
+        db.session.commit()
+        
+        return {'name': room_id, 'url': meeting_url}, None
+        
+    except Exception as e:
+        return None, f"Error creating meeting room: {str(e)}"
+
+def create_meeting_room(booking_id):
+    """Create a Daily.co meeting room for a booking"""
+    # Check if Daily.co API key is configured
+    if not daily.is_configured():
+        print(f"[DEBUG] Daily.co API key not configured, using fallback")
+        return create_simple_meeting_room(booking_id)
+    
+    # Generate a unique room name with timestamp to avoid conflicts
+    timestamp = int(datetime.now().timestamp())
+    room_name = f"droply-{booking_id}-{timestamp}"
+    
+    booking = Booking.query.get(booking_id)
+    expires_at = room_expires_at(booking.end_time) if booking else None
+    try:
+        room_info = daily.daily_client().create_room(room_name, room_properties(expires_at) if expires_at else None)
+    except daily.DailyUnavailable as e:
+        # Daily.co is down or slow: don't leave the participants waiting
+        print(f"[Daily] {e}; using simple meeting room for booking {booking_id}")
+        return create_simple_meeting_room(booking_id)
+    except daily.DailyError as e:
+        print(f"[DEBUG] {e}")
+        return None, str(e)
+    
+    # Update the booking with room info
+    if booking:
+        booking.meeting_room_id = room_info.get('name', room_name)
+        booking.meeting_url = room_info.get('url')
+        booking.meeting_room_expires_at = expires_at
+        db.session.commit()
+    return room_info, None
+
+def get_meeting_token(room_name, user_id, is_owner=False):
+    """Generate a meeting token for a user"""
+    # For now, just return a simple token since Daily.co token generation is complex
+    # In production, you'd want to implement proper token generation
+    return f"simple-token-{user_id}-{is_owner}", None
+
+@bp.route('/meeting/<int:booking_id>')
+@login_required
+def join_meeting(booking_id):
+    """Join a video meeting"""
+    print(f"[DEBUG] Join meeting called for booking {booking_id}")
+    booking = Booking.query.get_or_404(booking_id)
+    
+    print(f"[DEBUG] Booking found: {booking.id}, Status: {booking.status}")
+    print(f"[DEBUG] Current user: {current_user.id}, Booking user: {booking.user_id}, Expert: {booking.provider_id}")
+    
+    # Check if user is authorized to join this meeting
+    if booking.user_id != current_user.id and booking.provider_id != current_user.id:
+        print(f"[DEBUG] User not authorized to join meeting")
+        flash('You are not authorized to join this meeting.', 'error')
+        return redirect(url_for('bookings.bookings'))
+    
+    # Check if meeting time is within 30 minutes before or after (more flexible for immediate bookings)
+    from datetime import datetime
+    now = datetime.now(EASTERN_TIMEZONE)
+    meeting_time = booking.start_time
+    # Handle timezone-naive datetimes by assuming they're Eastern Time
+    if meeting_time.tzinfo is None:
+        meeting_time = meeting_time.replace(tzinfo=EASTERN_TIMEZONE)
+    time_diff = abs((meeting_time - now).total_seconds() / 60)
+    
+    print(f"[DEBUG] Meeting time: {meeting_time}, Current time: {now}, Time diff: {time_diff} minutes")
+    
+    # Allow joining up to 30 minutes before or after the scheduled time
+    if time_diff > 30:
+        print(f"[DEBUG] Meeting not available - time difference too large")
+        flash('Meeting is not available yet or has already ended.', 'warning')
+        return redirect(url_for('bookings.bookings'))
+    
+    # Rooms are normally pre-created by the provision_meeting_rooms job;
+    # create one now if that hasn't happened
+    if not booking.meeting_room_id or not booking.meeting_url:
+        print(f"[DEBUG] No meeting room exists, creating one...")
+        room_info, error = create_meeting_room(booking_id)
+        if error:
+            print(f"[DEBUG] Error creating meeting room: {error}")
+            flash(f'Error setting up meeting: {error}', 'error')
+            return redirect(url_for('bookings.bookings'))
+        # Refresh booking to get updated room info
+        db.session.refresh(booking)
+        print(f"[DEBUG] Meeting room created successfully")
+    else:
+        print(f"[DEBUG] Meeting room already exists: {booking.meeting_room_id}")
+    
+    # Determine the other participant
+    if current_user.id == booking.user_id:
+        other_user = booking.provider
+        is_owner = False
+    else:
+        other_user = booking.user
+        is_owner = True
+    
+    print(f"[DEBUG] Other user: {other_user.username}, Is owner: {is_owner}")
+    print(f"[DEBUG] Room URL: {booking.meeting_url}")
+    
+    # Simple WebRTC when Daily.co isn't configured or the room is a fallback one
+    if not daily.is_configured() or not booking.meeting_url.startswith('http'):
+        print(f"[DEBUG] Daily.co not configured, using simple WebRTC")
+        return render_template('meeting_simple.html', 
+                             booking=booking, 
+                             other_user=other_user)
+    
+    # Use Daily.co for enhanced video calling features
+    print(f"[DEBUG] Using Daily.co for enhanced video calling")
+    return render_template('meeting_daily.html', 
+                         booking=booking, 
+                         other_user=other_user,
+                         room_url=booking.meeting_url,
+                         room_name=booking.meeting_room_id,
+                         is_owner=is_owner)
+    
+    # Use the Daily.co template for video calling (commented out for now)
+    # return render_template('meeting_daily.html', 
+    #                      booking=booking, 
+    #                      room_name=booking.meeting_room_id,
+    #                      room_url=booking.meeting_url,
+    #                      other_user=other_user,
+    #                      is_owner=is_owner)
+
+@bp.route('/meeting/<int:booking_id>/start')
+@login_required
+def start_meeting(booking_id):
+    """Mark meeting as started"""
+    booking = Booking.query.get_or_404(booking_id)
+    
+    if booking.provider_id != current_user.id:
+        flash('Only the expert can start the meeting.', 'error')
+        return redirect(url_for('bookings.bookings'))
+    
+    if not booking.can_join_meeting():
+        flash('Meeting cannot be started at this time.', 'error')
+        return redirect(url_for('bookings.bookings'))
+    
+    booking.meeting_started_at = datetime.now(EASTERN_TIMEZONE)
+    db.session.commit()
+    
+    return redirect(url_for('meetings.join_meeting', booking_id=booking_id))
+
+@bp.route('/meeting/<int:booking_id>/end')
+@login_required
+def end_meeting(booking_id):
+    """Mark meeting as ended"""
+    booking = Booking.query.get_or_404(booking_id)
+    
+    if booking.provider_id != current_user.id:
+        flash('Only the expert can end the meeting.', 'error')
+        return redirect(url_for('bookings.bookings'))
+    
+    booking.meeting_ended_at = datetime.now(EASTERN_TIMEZONE)
+    if booking.meeting_started_at:
+        duration = (booking.meeting_ended_at - booking.meeting_started_at).total_seconds() / 60
+        booking.meeting_duration = int(duration)
+    db.session.commit()
+    
+    flash('Meeting ended successfully.', 'success')
+    return redirect(url_for('bookings.bookings'))
+
+@bp.route('/api/meeting/<int:booking_id>/status')
+@login_required
+def meeting_status(booking_id):
+    """Get meeting status"""
+    booking = Booking.query.get_or_404(booking_id)
+    
+    # Check if user is authorized to view this meeting
+    if booking.user_id != current_user.id and booking.provider_id != current_user.id:
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    # Determine if user can join the meeting
+    can_join = booking.can_join_meeting()
+    
+    return jsonify({
+        'booking_id': booking.id,
+        'status': booking.status,
+        'can_join': can_join,
+        'meeting_room_id': booking.meeting_room_id,
+        'meeting_url': booking.meeting_url,
+        'start_time': booking.start_time.isoformat() if booking.start_time else None,
+        'end_time': booking.end_time.isoformat() if booking.end_time else None
+    })
@@ -0,0 +1,320 @@
+"""Stripe Connect onboarding, payouts, earnings and the Stripe webhook."""
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask_login import login_required, current_user
+from extensions import db
+from models import Booking, Payout
+import earnings_stats
+import scheduled_payouts
+import stripe_accounts
+import stripe_events
+import os
+import stripe
+from datetime import timezone, timedelta
+from environment import is_production_environment
+from views.helpers import YOUR_DOMAIN
+
+EASTERN_TIMEZONE = timezone(timedelta(hours=-4))  # EDT (UTC-4)
+
+bp = Blueprint('payments', __name__)
+
+# ============================================================================
+# STRIPE CONNECT ROUTES FOR EXPERT PAYOUTS
+# ============================================================================
+
+@bp.route('/payment/setup', methods=['GET', 'POST'])
+@login_required
+def payment_setup():
+    """Set up payment processing for user payouts"""
+    # Production safeguard
+    if is_production_environment() and stripe.api_key.startswith('sk_test_'):
+        flash('Payout setup temporarily unavailable. Please try again later.', 'error')
+        return redirect(url_for('payments.payment_dashboard'))
+    
+    # If user already has a Stripe account, redirect to Stripe dashboard
+    if current_user.stripe_account_id:
+        try:
+            # Account status is kept current by webhooks (see stripe_accounts.py)
+            # Create login link for existing account
+            login_link = stripe.Account.create_login_link(
+                current_user.stripe_account_id,
+                redirect_url=f'{YOUR_DOMAIN}/payment/dashboard'
+            )
+            return redirect(login_link.url)
+            
+        except stripe.error.StripeError as e:
+            flash(f'Error accessing Stripe account: {str(e)}', 'error')
+            return redirect(url_for('payments.payment_dashboard'))
+    
+    if request.method == 'GET':
+        return render_template('payment_setup.html')
+    
+    try:
+        # Debug: Print the URL being constructed
+        profile_url = f'{YOUR_DOMAIN}/profile/{current_user.username}'
+        print(f"DEBUG: Constructing profile URL: {profile_url}")
+        print(f"DEBUG: YOUR_DOMAIN = {YOUR_DOMAIN}")
+        print(f"DEBUG: username = {current_user.username}")
+        
+        # Create Stripe Connect Express account
+        account = stripe.Account.create(
+            type='express',
+            country='US',  # You can make this dynamic based on user location
+            email=current_user.email,
+            capabilities={
+                'card_payments': {'requested': True},
+                'transfers': {'requested': True},
+            },
+            business_type='individual',
+            # Temporarily remove business_profile to avoid URL validation issues
+            # business_profile={
+            #     'url': profile_url,
+            #     'mcc': '7399',  # Business Services - Not Elsewhere Classified
+            # },
+        )
+        
+        # Update user with Stripe account info
+        current_user.stripe_account_id = account.id
+        current_user.stripe_account_status = account.charges_enabled and 'active' or 'pending'
+        db.session.commit()
+        
+        # Create account link for onboarding
+        account_link = stripe.AccountLink.create(
+            account=account.id,
+            refresh_url=f'{YOUR_DOMAIN}/payment/setup',
+            return_url=f'{YOUR_DOMAIN}/payment/dashboard',
+            type='account_onboarding',
+        )
+        
+        return redirect(account_link.url)
+        
+    except Exception as e:
+        flash(f'Error creating Stripe account: {str(e)}', 'error')
+        return redirect(url_for('payments.payment_setup'))
+
+@bp.route('/payment/dashboard')
+@login_required
+def payment_dashboard():
+    """Payment dashboard with earnings and payout info"""
+    # Balances come from the earnings ledger and the account status from
+    # webhooks (see earnings_ledger.py, stripe_accounts.py), so rendering
+    # needs no call to Stripe
+    # Calculate potential earnings: sum of all confirmed, upcoming bookings (not yet completed)
+    # Industry standard: only count confirmed bookings as potential earnings
+    from datetime import datetime
+    now = datetime.now()
+    potential_earnings_bookings = Booking.query.filter(
+        (Booking.provider_id == current_user.id) &
+        (Booking.status == 'confirmed') &
+        (Booking.start_time > now)
+    ).all()
+    potential_earnings = sum(booking.payment_amount for booking in potential_earnings_bookings)
+
+    recent_bookings = Booking.query.filter(
+        (Booking.provider_id == current_user.id) &
+        (Booking.status.in_(['pending', 'confirmed']))
+    ).order_by(Booking.start_time.desc()).limit(5).all()
+    recent_payouts = Payout.query.filter_by(user_id=current_user.id).order_by(Payout.created_at.desc()).limit(5).all()
+    return render_template('payment_dashboard.html', 
+                         recent_bookings=recent_bookings,
+                         recent_payouts=recent_payouts,
+                         potential_earnings=potential_earnings)
+
+@bp.route('/expert/request-payout', methods=['POST'])
+@login_required
+def request_payout():
+    """Request a payout to expert's bank account"""
+    # Production safeguard
+    if is_production_environment() and stripe.api_key.startswith('sk_test_'):
+        flash('Payout system temporarily unavailable. Please try again later.', 'error')
+        return redirect(url_for('payments.payment_dashboard'))
+    
+    if not current_user.stripe_account_id:
+        flash('You need to complete Stripe onboarding first', 'error')
+        return redirect(url_for('payments.payment_dashboard'))
+    
+    if not current_user.payout_enabled:
+        flash('Payouts are not enabled for your account', 'error')
+        return redirect(url_for('payments.payment_dashboard'))
+    
+    if current_user.pending_balance <= 0:
+        flash('No pending balance to payout', 'error')
+        return redirect(url_for('payments.payment_dashboard'))
+    
+    try:
+        # Reserve the row and debit the ledger first, then send it with the
+        # idempotency key payout:<id>, so a retry can never pay out twice
+        cents = int(round(current_user.pending_balance * 100))
+        payout_ids = scheduled_payouts.reserve_payouts(
+            [(current_user.id, cents, scheduled_payouts.manual_window())]
+        )
+        scheduled_payouts.submit_payouts(payout_ids)
+        payout_record = db.session.get(Payout, payout_ids[0])
+        
+        if payout_record.stripe_payout_id:
+            flash(f'Payout of ${payout_record.amount / 100:.2f} requested successfully!', 'success')
+        elif payout_record.status == 'failed':
+            flash('Stripe declined the payout; your balance has been restored', 'error')
+        else:
+            flash(f'Payout of ${payout_record.amount / 100:.2f} requested; it will be sent shortly', 'info')
+        
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Error requesting payout: {str(e)}', 'error')
+    
+    return redirect(url_for('payments.payment_dashboard'))
+
+@bp.route('/user/stripe-onboarding', methods=['GET', 'POST'])
+@login_required
+def user_stripe_onboarding():
+    """Handle Stripe onboarding for experts"""
+    if request.method == 'POST':
+        try:
+            # Create Stripe Connect account for the expert
+            account = stripe.Account.create(
+                type='express',
+                country='US',  # You might want to make this configurable
+                email=current_user.email,
+                capabilities={
+                    'card_payments': {'requested': True},
+                    'transfers': {'requested': True},
+                },
+                business_type='individual',
+                individual={
+                    'email': current_user.email,
+                    'first_name': current_user.full_name.split(' ')[0] if current_user.full_name else '',
+                    'last_name': ' '.join(current_user.full_name.split(' ')[1:]) if current_user.full_name and len(current_user.full_name.split(' ')) > 1 else '',
+                },
+            )
+            
+            # Save the account ID to the user
+            current_user.stripe_account_id = account.id
+            current_user.stripe_account_status = 'pending'
+            db.session.commit()
+            
+            # Create account link for onboarding
+            account_link = stripe.AccountLink.create(
+                account=account.id,
+                refresh_url=f"{YOUR_DOMAIN}/expert/stripe-onboarding",
+                return_url=f"{YOUR_DOMAIN}/expert/complete-verification",
+                type='account_onboarding',
+            )
+            
+            return redirect(account_link.url)
+            
+        except Exception as e:
+            print(f"Error creating Stripe account: {e}")
+            flash('Error setting up payment processing. Please try again.', 'error')
+            return redirect(url_for('payments.user_stripe_onboarding'))
+    
+    # GET request - show the onboarding page
+    return render_template('user_stripe_onboarding.html')
+
+@bp.route('/expert/complete-verification')
+@login_required
+def complete_verification():
+    """Redirect to Stripe dashboard for the expert's account"""
+    if not current_user.stripe_account_id:
+        flash('No Stripe account found. Please complete payout setup first.', 'error')
+        return redirect(url_for('payments.payment_dashboard'))
+    
+    # Create a login link for the account (works for both test and live)
+    try:
+        login_link = stripe.Account.create_login_link(
+            current_user.stripe_account_id,
+            redirect_url=f"{YOUR_DOMAIN}/payment/dashboard"
+        )
+        return redirect(login_link.url)
+    except stripe.error.StripeError as e:
+        # Fallback to direct URL if login link fails
+        dashboard_url = f"https://connect.stripe.com/express/{current_user.stripe_account_id}/settings"
+        return redirect(dashboard_url)
+
+@bp.route('/stripe/webhook', methods=['POST'])
+def stripe_webhook():
+    """Receive Stripe webhooks for payment confirmations and payouts (see stripe_events.py)"""
+    # Production safeguard
+    if is_production_environment() and stripe.api_key.startswith('sk_test_'):
+        return 'Production environment detected with test keys', 500
+    
+    payload = request.get_data()
+    sig_header = request.headers.get('Stripe-Signature')
+    
+    try:
+        webhook_secret = os.environ.get('STRIPE_WEBHOOK_SECRET')
+        if not webhook_secret:
+            return 'Webhook secret not configured', 500
+            
+        event = stripe.Webhook.construct_event(
+            payload, sig_header, webhook_secret
+        )
+    except ValueError as e:
+        return 'Invalid payload', 400
+    except stripe.error.SignatureVerificationError as e:
+        return 'Invalid signature', 400
+    
+    # Store the event and answer straight away; it is applied in the
+    # background, exactly once however often Stripe redelivers it
+    if stripe_events.record_event(event, payload):
+        stripe_events.enqueue_event(event['id'])
+    
+    return 'OK', 200
+
+@bp.route('/earnings')
+@login_required
+def earnings():
+    """Show expert's earnings history with enhanced analytics"""
+    # Totals and the chart come from the daily roll-ups (see earnings_stats.py);
+    # only the five transactions shown are loaded
+    payouts = Payout.query.filter_by(user_id=current_user.id).order_by(Payout.created_at.desc()).limit(5).all()
+    summary = earnings_stats.earnings_summary(current_user.id)
+    paid_count = summary['paid_count']
+    avg_session_value = (summary['total_earned'] / 100) / paid_count if paid_count > 0 else 0
+    chart_labels, chart_data = earnings_stats.chart_series(current_user.id, '7d')
+    
+    return render_template('earnings.html', 
+                         payouts=payouts,
+                         total_earned=summary['total_earned'],
+                         pending_total=summary['pending_total'],
+                         failed_total=summary['failed_total'],
+                         paid_count=paid_count,
+                         monthly_earnings=summary['monthly_earned'] / 100,
+                         weekly_earnings=summary['weekly_earned'] / 100,
+                         avg_session_value=avg_session_value,
+                         chart_labels=chart_labels,
+                         chart_data=chart_data)
+
+@bp.route('/api/earnings-chart-data')
+@login_required
+def earnings_chart_data():
+    """API endpoint to get chart data for different time periods (7d, 30d, 90d, 1y, all)"""
+    period = request.args.get('period', '7d')
+    labels, data = earnings_stats.chart_series(current_user.id, period)
+    
+    return jsonify({
+        'labels': labels,
+        'data': data
+    })
+
+@bp.route('/expert/payout-details')
+@login_required
+def expert_payout_details():
+    # On the way to your bank: payouts with status 'pending'
+    pending_payouts = Payout.query.filter_by(user_id=current_user.id, status='pending').all()
+    on_the_way = sum(payout.amount for payout in pending_payouts) / 100  # convert cents to dollars
+    # Upcoming payouts: (for now, same as on_the_way unless you have scheduled payouts)
+    upcoming_payouts = on_the_way
+    # Available in your balance: pending_balance
+    available_balance = current_user.pending_balance
+    # Total balance: total_earnings
+    total_balance = current_user.total_earnings
+    # Payout method: the bank account cached from Stripe
+    payout_method = stripe_accounts.payout_method(stripe_accounts.account_state(current_user.stripe_account_id))
+    payout_schedule = current_user.payout_schedule
+    return jsonify({
+        'on_the_way': f"${on_the_way:.2f}",
+        'upcoming_payouts': f"${upcoming_payouts:.2f}",
+        'available_balance': f"${available_balance:.2f}",
+        'total_balance': f"${total_balance:.2f}",
+        'payout_method': payout_method,
+        'payout_schedule': payout_schedule
+    })
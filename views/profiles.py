@@ -0,0 +1,748 @@
+"""Profile pages, profile editing and profile APIs."""
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, jsonify
+from flask_login import logout_user, login_required, current_user
+from extensions import db
+from models import User, AvailabilityRule, Favorite, Content
+import json
+import os
+import time
+
+bp = Blueprint('profiles', __name__)
+
+# Removed /profile/<username> route - use /user/<username> instead
+
+@bp.route('/edit-profile', methods=['GET', 'POST'])
+@login_required
+def edit_profile():
+    """Edit user profile"""
+    if request.method == 'POST':
+        try:
+            # Update basic information
+            current_user.full_name = request.form.get('full_name', '')
+            current_user.profession = request.form.get('profession', '')
+            current_user.bio = request.form.get('bio', '')
+            current_user.hourly_rate = float(request.form.get('hourly_rate', 0) or 0)
+            current_user.industry = request.form.get('industry', '')
+            current_user.location = request.form.get('location', '')
+            current_user.skills = request.form.get('skills', '')  # Legacy field
+            current_user.skills_1 = request.form.get('skills_1', '')
+            current_user.skills_2 = request.form.get('skills_2', '')
+            current_user.skills_3 = request.form.get('skills_3', '')
+            
+            # Update social media links
+            current_user.linkedin_url = request.form.get('linkedin', '')
+            current_user.twitter_url = request.form.get('twitter', '')
+            current_user.github_url = request.form.get('github', '')
+            current_user.website_url = request.form.get('website', '')
+            current_user.instagram_url = request.form.get('instagram', '')
+            current_user.facebook_url = request.form.get('facebook', '')
+            current_user.youtube_url = request.form.get('youtube', '')
+            current_user.snapchat_url = request.form.get('snapchat', '')
+            
+            # Update availability
+            current_user.is_available = 'is_available' in request.form
+            
+            # Handle profile picture upload
+            if 'profile_picture' in request.files:
+                file = request.files['profile_picture']
+                if file and file.filename:
+                    # Save the file
+                    filename = f"profile_{current_user.id}_{int(time.time())}.{file.filename.split('.')[-1]}"
+                    filepath = os.path.join('static', 'uploads', filename)
+                    file.save(filepath)
+                    current_user.profile_picture = f"/static/uploads/{filename}"
+            
+            db.session.commit()
+            
+            # Check if this is an AJAX request (auto-save)
+            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                return jsonify({'success': True, 'message': 'Profile updated successfully'})
+            
+            flash('Profile updated successfully!', 'success')
+            return redirect(url_for('main.dashboard'))
+            
+        except Exception as e:
+            db.session.rollback()
+            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                return jsonify({'success': False, 'message': str(e)}), 400
+            
+            flash('Error updating profile. Please try again.', 'error')
+            return redirect(url_for('profiles.profile_setup'))
+    
+    return redirect(url_for('profiles.profile_setup'))
+
+@bp.route('/profile/setup')
+@login_required
+def profile_setup():
+    """Profile setup page for signed-in users"""
+    return render_template('profile_setup.html')
+
+@bp.route('/profile/preview/<username>')
+@login_required
+def profile_preview(username):
+    """Preview profile as a visitor would see it"""
+    user = User.query.options(User.detail_options()).filter_by(username=username).first_or_404()
+    
+    # Only allow users to preview their own profile
+    if current_user.username != username:
+        flash('You can only preview your own profile.', 'error')
+        return redirect(url_for('profiles.profile_setup'))
+    
+    # Show the user profile view for preview
+    availability_rules = AvailabilityRule.query.filter_by(user_id=user.id).all()
+    return render_template('user_profile.html', user=user, availability_rules=availability_rules)
+
+@bp.route('/user/<username>')
+def public_user_profile(username):
+    """Public user profile page - accessible without login"""
+    user = User.query.options(User.detail_options()).filter_by(username=username).first_or_404()
+    
+    # Get user's availability for booking
+    availability_rules = AvailabilityRule.query.filter_by(user_id=user.id).all()
+    
+    return render_template('user_profile_ultra_simple.html', user=user, availability_rules=availability_rules)
+
+@bp.route('/user/<username>/private')
+@login_required
+def user_profile(username):
+    """Private user profile for booking - requires login"""
+    user = User.query.options(User.detail_options()).filter_by(username=username).first_or_404()
+    
+    # Get user's availability for booking
+    availability_rules = AvailabilityRule.query.filter_by(user_id=user.id).all()
+    
+    # Check if current user has favorited this user
+    is_favorited = False
+    if current_user.is_authenticated:
+        favorite = Favorite.query.filter_by(
+            user_id=current_user.id, 
+            favorited_user_id=user.id
+        ).first()
+        is_favorited = favorite is not None
+    
+    return render_template('user_profile.html', user=user, availability_rules=availability_rules, is_favorited=is_favorited)
+
+@bp.route('/profile')
+@login_required
+def profile():
+    """User profile management page - now redirects to profile editor"""
+    return redirect(url_for('profiles.profile_editor'))
+
+@bp.route('/profile/<username>')
+def public_profile(username):
+    """Public profile page for viewing someone's store"""
+    user = User.query.filter_by(username=username).first_or_404()
+    return render_template('public_profile.html', user=user)
+
+@bp.route('/settings')
+@login_required
+def settings():
+    """Settings page"""
+    return render_template('settings.html')
+
+@bp.route('/account')
+@login_required
+def account():
+    """Account management page - redirect to settings"""
+    return redirect(url_for('profiles.settings'))
+
+@bp.route('/profile/editor')
+@login_required
+def profile_editor():
+    """Enhanced profile editor with customization options"""
+    return render_template('profile_editor_ultra_simple.html')
+
+@bp.route('/api/profile/update', methods=['POST'])
+@login_required
+def api_profile_update():
+    """API endpoint for updating user profile"""
+    try:
+        # Handle JSON data from inline editor
+        if request.is_json:
+            data = request.get_json()
+            
+            # Update all fields from JSON data
+            current_user.full_name = data.get('fullName', current_user.full_name)
+            current_user.profession = data.get('profession', current_user.profession)
+            current_user.bio = data.get('bio', current_user.bio)
+            current_user.location = data.get('location', current_user.location)
+            current_user.service_description = data.get('serviceDescription', current_user.service_description)
+            current_user.session_duration = int(data.get('sessionDuration', current_user.session_duration or 30))
+            current_user.hourly_rate = float(data.get('hourlyRate', current_user.hourly_rate or 0))
+            current_user.specialty_tags = data.get('skillsTags', current_user.specialty_tags)
+            current_user.linkedin_url = data.get('linkedinUrl', current_user.linkedin_url)
+            current_user.twitter_url = data.get('twitterUrl', current_user.twitter_url)
+            current_user.github_url = data.get('githubUrl', current_user.github_url)
+            current_user.primary_color = data.get('primaryColor', current_user.primary_color)
+            current_user.secondary_color = data.get('secondaryColor', current_user.secondary_color)
+            current_user.background_color = data.get('backgroundColor', current_user.background_color)
+            
+        else:
+            # Get form data
+            full_name = request.form.get('fullName', '').strip()
+            profession = request.form.get('profession', '').strip()
+            bio = request.form.get('bio', '').strip()
+            location = request.form.get('location', '').strip()
+            industry = request.form.get('industry', '').strip()
+            skills_tags = request.form.get('skillsTags', '').strip()
+            hourly_rate = request.form.get('hourlyRate', '').strip()
+            
+            # Social media URLs
+            linkedin_url = request.form.get('linkedinUrl', '').strip()
+            twitter_url = request.form.get('twitterUrl', '').strip()
+            github_url = request.form.get('githubUrl', '').strip()
+            instagram_url = request.form.get('instagramUrl', '').strip()
+            youtube_url = request.form.get('youtubeUrl', '').strip()
+            website_url = request.form.get('websiteUrl', '').strip()
+            
+            # Appearance settings
+            primary_color = request.form.get('primaryColor', '').strip()
+            secondary_color = request.form.get('secondaryColor', '').strip()
+            background_color = request.form.get('backgroundColor', '').strip()
+            font_family = request.form.get('fontFamily', '').strip()
+            font_size = request.form.get('fontSize', '').strip()
+            
+            # Content settings
+            service_description = request.form.get('serviceDescription', '').strip()
+            session_duration = request.form.get('sessionDuration', '').strip()
+            content_description = request.form.get('contentDescription', '').strip()
+            content_categories = request.form.get('contentCategories', '').strip()
+            
+            # Boolean settings
+            is_available = request.form.get('isAvailable')
+            if isinstance(is_available, str):
+                is_available = is_available.lower() == 'true'
+            else:
+                is_available = bool(is_available)
+            email_notifications = request.form.get('emailNotifications') == 'true'
+            show_services = request.form.get('showServices') == 'true'
+            show_content = request.form.get('showContent') == 'true'
+        
+            # Update user profile
+            if full_name:
+                current_user.full_name = full_name
+            if profession:
+                current_user.profession = profession
+            if bio:
+                current_user.bio = bio
+            if location:
+                current_user.location = location
+            if industry:
+                current_user.industry = industry
+            if skills_tags:
+                current_user.specialty_tags = skills_tags
+            if hourly_rate:
+                try:
+                    current_user.hourly_rate = float(hourly_rate)
+                except ValueError:
+                    pass
+        
+            # Update social media URLs
+            if linkedin_url:
+                current_user.linkedin_url = linkedin_url
+            if twitter_url:
+                current_user.twitter_url = twitter_url
+            if github_url:
+                current_user.github_url = github_url
+            if instagram_url:
+                current_user.instagram_url = instagram_url
+            if youtube_url:
+                current_user.youtube_url = youtube_url
+            if website_url:
+                current_user.website_url = website_url
+        
+            # Update appearance settings
+            if primary_color:
+                current_user.primary_color = primary_color
+            if secondary_color:
+                current_user.secondary_color = secondary_color
+            if background_color:
+                current_user.background_color = background_color
+            if font_family:
+                current_user.font_family = font_family
+            if font_size:
+                try:
+                    current_user.font_size = int(font_size)
+                except ValueError:
+                    pass
+            
+            # Update content settings
+            if service_description:
+                current_user.service_description = service_description
+            if session_duration:
+                try:
+                    current_user.session_duration = int(session_duration)
+                except ValueError:
+                    pass
+            if content_description:
+                current_user.content_description = content_description
+            if content_categories:
+                current_user.content_categories = content_categories
+            
+            # Update boolean settings
+            current_user.is_available = is_available
+            current_user.email_notifications = email_notifications
+        
+            # Handle profile image upload
+            profile_image = None
+            if 'profile_image' in request.files:
+                profile_image = request.files['profile_image']
+            elif 'profile_picture' in request.files:
+                profile_image = request.files['profile_picture']
+            
+            if profile_image and profile_image.filename:
+                # Generate unique filename
+                import time
+                import os
+                from werkzeug.utils import secure_filename
+                
+                filename = secure_filename(profile_image.filename)
+                timestamp = str(int(time.time()))
+                name, ext = os.path.splitext(filename)
+                unique_filename = f"profile_{current_user.id}_{timestamp}{ext}"
+                
+                # Create uploads directory if it doesn't exist
+                upload_dir = os.path.join(current_app.static_folder, 'uploads')
+                os.makedirs(upload_dir, exist_ok=True)
+                
+                # Save the file
+                file_path = os.path.join(upload_dir, unique_filename)
+                profile_image.save(file_path)
+                
+                # Update user's profile picture path
+                current_user.profile_picture = f"/static/uploads/{unique_filename}"
+            
+            # Commit changes
+            db.session.commit()
+            
+            return jsonify({
+                'success': True,
+                'message': 'Profile updated successfully'
+            })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': 'Failed to update profile'
+        }), 500
+
+@bp.route('/profile/update', methods=['POST'])
+@login_required
+def profile_update():
+    """Update user profile via form submission"""
+    try:
+        # Get form data
+        full_name = request.form.get('full_name', '').strip()
+        phone = request.form.get('phone', '').strip()
+        username = request.form.get('username', '').strip()
+        bio = request.form.get('bio', '').strip()
+        profession = request.form.get('profession', '').strip()
+        industry = request.form.get('industry', '').strip()
+        location = request.form.get('location', '').strip()
+        hourly_rate = request.form.get('hourly_rate', '').strip()
+        linkedin = request.form.get('linkedin', '').strip()
+        twitter = request.form.get('twitter', '').strip()
+        github = request.form.get('github', '').strip()
+        website = request.form.get('website', '').strip()
+        instagram = request.form.get('instagram', '').strip()
+        youtube = request.form.get('youtube', '').strip()
+        language = request.form.get('language', '').strip()
+        timezone = request.form.get('timezone', '').strip()
+        email_notifications = request.form.get('email_notifications') == 'on'
+        is_available = request.form.get('is_available') == 'on'
+        
+        # Update user profile
+        if full_name:
+            current_user.full_name = full_name
+        if phone:
+            current_user.phone = phone
+        if username and username != current_user.username:
+            # Check if username is available
+            existing_user = User.query.filter_by(username=username).first()
+            if existing_user:
+                flash('Username is already taken', 'error')
+                return redirect(url_for('profiles.account'))
+            current_user.username = username
+        if bio:
+            current_user.bio = bio
+        if profession:
+            current_user.profession = profession
+        if industry:
+            current_user.industry = industry
+        if location:
+            current_user.location = location
+        if hourly_rate:
+            try:
+                current_user.hourly_rate = float(hourly_rate)
+            except ValueError:
+                flash('Invalid hourly rate', 'error')
+                return redirect(url_for('profiles.account'))
+        if linkedin:
+            current_user.linkedin_url = linkedin
+        if twitter:
+            current_user.twitter_url = twitter
+        if github:
+            current_user.github_url = github
+        if website:
+            current_user.website_url = website
+        if instagram:
+            current_user.instagram_url = instagram
+        if youtube:
+            current_user.youtube_url = youtube
+        if language:
+            current_user.language = language
+        if timezone:
+            current_user.timezone = timezone
+        
+        current_user.email_notifications = email_notifications
+        current_user.is_available = is_available
+            
+        db.session.commit()
+        flash('Profile updated successfully!', 'success')
+        
+    except Exception as e:
+        db.session.rollback()
+        flash('Failed to update profile: ' + str(e), 'error')
+    
+    return redirect(url_for('profiles.settings'))
+
+@bp.route('/profile/add-content', methods=['POST'])
+@login_required
+def add_content():
+    """Add content to user's profile store"""
+    try:
+        content_type = request.form.get('type')
+        title = request.form.get('contentTitle', '').strip()
+        description = request.form.get('contentDescription', '').strip()
+        price = float(request.form.get('contentPrice', 0))
+        allow_preview = request.form.get('contentPreview') == 'on'
+        
+        # Validate required fields
+        if not title:
+            return jsonify({'success': False, 'error': 'Title is required'}), 400
+        if not content_type:
+            return jsonify({'success': False, 'error': 'Content type is required'}), 400
+            
+        # Handle file upload
+        if 'contentFile' not in request.files:
+            return jsonify({'success': False, 'error': 'No file provided'}), 400
+            
+        file = request.files['contentFile']
+        if file.filename == '':
+            return jsonify({'success': False, 'error': 'No file selected'}), 400
+        
+        # Create content record
+        content = Content(
+            user_id=current_user.id,
+            title=title,
+            description=description,
+            content_type=content_type,
+            price=price,
+            preview_available=allow_preview,
+            status='draft'  # Start as draft
+        )
+        
+        # For now, just save the content without file handling
+        # File handling will be implemented in the next iteration
+        db.session.add(content)
+        db.session.commit()
+        
+        flash(f'{content_type.title()} content "{title}" added successfully!', 'success')
+        return jsonify({'success': True, 'message': 'Content added successfully', 'content_id': content.id})
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/delete-account', methods=['POST'])
+@login_required
+def delete_account():
+    """Delete user account permanently"""
+    try:
+        user_id = current_user.id
+        user_email = current_user.email
+        
+        print(f"DEBUG: Starting deletion for user {user_id}")
+        
+        # Simple approach: just delete the user and let database handle cascading
+        # First clear any self-references
+        User.query.filter_by(referred_by=user_id).update({'referred_by': None})
+        db.session.commit()
+        
+        # Delete the user
+        db.session.delete(current_user)
+        db.session.commit()
+        
+        print(f"DEBUG: User {user_id} deleted successfully")
+        logout_user()
+        
+        return jsonify({'success': True, 'message': 'Account deleted successfully'})
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"DEBUG: Error deleting account: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/check-username', methods=['POST'])
+def check_username():
+    """Check if username is available"""
+    data = request.get_json()
+    username = data.get('username', '').strip().lower()
+    
+    if not username:
+        return jsonify({'available': False, 'message': 'Username is required'})
+    
+    # Check if username exists
+    existing_user = User.query.filter_by(username=username).first()
+    
+    if existing_user:
+        return jsonify({'available': False, 'message': 'Username is already taken'})
+    else:
+        return jsonify({'available': True, 'message': 'Username is available'})
+
+@bp.route('/api/profile/test', methods=['GET', 'POST'])
+@login_required
+def api_profile_test():
+    """Test endpoint to check authentication"""
+    return jsonify({
+        'success': True,
+        'message': 'Authentication working',
+        'user_id': current_user.id,
+        'username': current_user.username
+    })
+
+
+@bp.route('/api/profile/specialties', methods=['POST'])
+@login_required
+def api_profile_specialties():
+    """Update user specialties via API"""
+    try:
+        data = request.get_json()
+        specialties = data.get('specialties', [])
+        current_user.specialty_tags = json.dumps(specialties)
+        db.session.commit()
+        return jsonify({'success': True})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@bp.route('/api/profile/upload-picture', methods=['POST'])
+@login_required
+def upload_profile_picture():
+    """Upload and update user profile picture"""
+    try:
+        print(f"Upload request from user {current_user.id} ({current_user.username})")
+        print(f"Files in request: {list(request.files.keys())}")
+        
+        if 'profile_picture' not in request.files:
+            print("No profile_picture in request files")
+            return jsonify({
+                'success': False,
+                'message': 'No file provided'
+            }), 400
+        
+        file = request.files['profile_picture']
+        print(f"File received: {file.filename}, Content type: {file.content_type}, Size: {file.content_length}")
+        
+        if file.filename == '':
+            print("Empty filename")
+            return jsonify({
+                'success': False,
+                'message': 'No file selected'
+            }), 400
+        
+        # Validate file type
+        if not file.content_type.startswith('image/'):
+            print(f"Invalid file type: {file.content_type}")
+            return jsonify({
+                'success': False,
+                'message': 'File must be an image'
+            }), 400
+        
+        # Generate unique filename
+        import os
+        import uuid
+        from werkzeug.utils import secure_filename
+        
+        # Get file extension
+        filename = secure_filename(file.filename)
+        file_ext = os.path.splitext(filename)[1]
+        
+        # Generate unique filename
+        unique_filename = f"profile_{current_user.id}_{uuid.uuid4().hex}{file_ext}"
+        print(f"Generated filename: {unique_filename}")
+        
+        # Create uploads directory if it doesn't exist
+        upload_dir = os.path.join(current_app.root_path, 'static', 'uploads')
+        os.makedirs(upload_dir, exist_ok=True)
+        print(f"Upload directory: {upload_dir}")
+        
+        # Save file
+        file_path = os.path.join(upload_dir, unique_filename)
+        file.save(file_path)
+        print(f"File saved to: {file_path}")
+        
+        # Update user profile picture
+        profile_picture_url = f"/static/uploads/{unique_filename}"
+        current_user.profile_picture = profile_picture_url
+        db.session.commit()
+        print(f"Updated user profile picture to: {profile_picture_url}")
+        
+        return jsonify({
+            'success': True,
+            'message': 'Profile picture updated successfully',
+            'profile_picture_url': current_user.profile_picture
+        })
+        
+    except Exception as e:
+        print(f"Error in upload_profile_picture: {str(e)}")
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': f'Error uploading profile picture: {str(e)}'
+        }), 500
+
+@bp.route('/api/username/check', methods=['POST'])
+@login_required
+def check_username_availability():
+    """Check if a username is available"""
+    try:
+        data = request.get_json()
+        username = data.get('username', '').strip()
+        
+        if not username:
+            return jsonify({
+                'available': False,
+                'message': 'Username is required'
+            }), 400
+        
+        # Validate username format
+        import re
+        if not re.match(r'^[a-zA-Z0-9_]{3,20}$', username):
+            return jsonify({
+                'available': False,
+                'message': 'Username must be 3-20 characters, letters, numbers, and underscores only'
+            }), 400
+        
+        # Check if username is already taken (excluding current user)
+        existing_user = User.query.filter_by(username=username).first()
+        if existing_user and existing_user.id != current_user.id:
+            return jsonify({
+                'available': False,
+                'message': 'Username is already taken'
+            })
+        
+        return jsonify({
+            'available': True,
+            'message': 'Username is available'
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'available': False,
+            'message': f'Error checking username: {str(e)}'
+        }), 500
+
+@bp.route('/api/profile/picture', methods=['POST', 'DELETE'])
+@login_required
+def api_profile_picture():
+    """Upload or delete profile picture via API"""
+    if request.method == 'POST':
+        try:
+            if 'profile_picture' not in request.files:
+                return jsonify({'success': False, 'error': 'No file provided'})
+            file = request.files['profile_picture']
+            if file.filename == '':
+                return jsonify({'success': False, 'error': 'No file selected'})
+            # Save file
+            ext = file.filename.rsplit('.', 1)[-1].lower()
+            filename = f"profile_{current_user.id}_{int(time.time())}.{ext}"
+            path = os.path.join('static', 'uploads', filename)
+            file.save(path)
+            # Remove old file if exists
+            if current_user.profile_picture and os.path.exists(current_user.profile_picture[1:]):
+                try:
+                    os.remove(current_user.profile_picture[1:])
+                except Exception:
+                    pass
+            current_user.profile_picture = f"/{path}"
+            db.session.commit()
+            return jsonify({'success': True, 'url': current_user.profile_picture})
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)})
+    elif request.method == 'DELETE':
+        try:
+            # Remove file if exists
+            if current_user.profile_picture and os.path.exists(current_user.profile_picture[1:]):
+                try:
+                    os.remove(current_user.profile_picture[1:])
+                except Exception:
+                    pass
+            current_user.profile_picture = None
+            db.session.commit()
+            return jsonify({'success': True})
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)})
+
+@bp.route('/api/favorites/toggle', methods=['POST'])
+@login_required
+def api_favorites_toggle():
+    """Toggle favorite status for an expert"""
+    try:
+        data = request.get_json()
+        user_id = data.get('user_id')
+        user_username = data.get('user_username')
+        
+        if not user_id or not user_username:
+            return jsonify({'success': False, 'error': 'Missing user information'})
+        
+        # Verify the user exists
+        user = User.query.filter_by(id=user_id, username=user_username, is_available=True).first()
+        if not user:
+            return jsonify({'success': False, 'error': 'User not found'})
+        
+        # Check if already favorited
+        existing_favorite = Favorite.query.filter_by(
+            user_id=current_user.id, 
+            favorited_user_id=user_id
+        ).first()
+        
+        if existing_favorite:
+            # Remove from favorites
+            db.session.delete(existing_favorite)
+            db.session.commit()
+            return jsonify({'success': True, 'action': 'removed'})
+        else:
+            # Add to favorites
+            new_favorite = Favorite(user_id=current_user.id, favorited_user_id=user_id)
+            db.session.add(new_favorite)
+            db.session.commit()
+            return jsonify({'success': True, 'action': 'added'})
+            
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)})
+
+@bp.route('/api/profile/background', methods=['POST'])
+@login_required
+def api_profile_background():
+    """Save background color preference via API"""
+    try:
+        data = request.get_json()
+        background_color = data.get('background_color', '#f7faff')
+        current_user.background_color = background_color
+        db.session.commit()
+        return jsonify({'success': True})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@bp.route('/api/user/timezone', methods=['GET'])
+@login_required
+def api_user_timezone():
+    """Get user's timezone preference"""
+    return jsonify({
+        'timezone': current_user.timezone or 'America/New_York'
+    })